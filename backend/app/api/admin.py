@@ -1,13 +1,31 @@
-from typing import List, Dict
-from fastapi import APIRouter, Depends, HTTPException
+from typing import List, Dict, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import FileResponse
 from sqlalchemy.orm import Session
-from sqlalchemy import func, and_
-from app.core.database import get_db
+from sqlalchemy import func, and_, or_, select, update, delete
+from app.core.database import get_db, get_read_db
 from app.models.user import User
 from app.models.bus import Bus, BusRoute
 from app.models.reservation import Reservation, ReservationStatus
-from app.api.auth import get_current_user
+from app.models.hold import SeatHold
+from app.models.waitlist import WaitlistEntry, WaitlistStatus
+from app.api.auth import get_current_user, get_read_user
+from app.core.metrics import BOOKINGS_TOTAL
+from app.core.profiling import profile_store
+from app.core.events import event_broker
+from app.core.changes import record_changes, insert_tracked
+from app.core.outbox import enqueue_reservations
+from app.core.serialization import FastJSONResponse, parse_fields
+from app.utils.bus_seats import generate_seat_numbers
+from app.utils.reaccommodation import assign_groups
+from app.api.waitlist import promote_waitlist, notify_promotions
+from app.api.reservations import check_bookable
+from app.models.schedule import TripStatus
+from app.schedule import trip_schedule
+from app import queries
 from datetime import date, datetime
+import time
+from collections import namedtuple
 
 router = APIRouter()
 
@@ -16,55 +34,51 @@ def require_admin(current_user: User = Depends(get_current_user)):
         raise HTTPException(status_code=403, detail="Admin access required")
     return current_user
 
+def require_admin_read(current_user: User = Depends(get_read_user)):
+    # 읽기 엔드포인트용 (사용자도 읽기 세션에서 찾는다)
+    return require_admin(current_user)
+
 @router.get("/dashboard")
 async def get_admin_dashboard(
-    current_user: User = Depends(require_admin),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(require_admin_read),
+    db: Session = Depends(get_read_db)
 ):
     # Get statistics
-    total_users = db.query(User).count()
-    total_buses = db.query(Bus).filter(Bus.is_active == True).count()
-    total_routes = db.query(BusRoute).filter(BusRoute.is_active == True).count()
-    
-    today = date.today()
-    today_reservations = db.query(Reservation).filter(
-        Reservation.reservation_date == today,
-        Reservation.status == ReservationStatus.CONFIRMED
-    ).count()
-    
+    counts = queries.dashboard_counts(db, date.today())
+
     return {
-        "total_users": total_users,
-        "total_buses": total_buses,
-        "total_routes": total_routes,
-        "today_reservations": today_reservations
+        "total_users": counts.total_users,
+        "total_buses": counts.total_buses,
+        "total_routes": counts.total_routes,
+        "today_reservations": counts.today_reservations
     }
 
 @router.get("/occupancy")
 async def get_occupancy_stats(
     reservation_date: date = None,
-    current_user: User = Depends(require_admin),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(require_admin_read),
+    db: Session = Depends(get_read_db)
 ):
     if not reservation_date:
         reservation_date = date.today()
     
     # Get occupancy rate for each bus
     occupancy_stats = []
-    buses = db.query(Bus).filter(Bus.is_active == True).all()
-    
+    buses = queries.active_bus_rows(db)
+    reserved_counts = queries.confirmed_seat_counts(db, reservation_date)
+    trips = trip_schedule.trips_for(reservation_date)
+
     for bus in buses:
-        reserved_count = db.query(Reservation).filter(
-            Reservation.bus_id == bus.id,
-            Reservation.reservation_date == reservation_date,
-            Reservation.status == ReservationStatus.CONFIRMED
-        ).count()
-        
+        if bus.id not in trips:
+            continue
+        reserved_count = reserved_counts.get(bus.id, 0)
+
         occupancy_rate = (reserved_count / bus.total_seats) * 100 if bus.total_seats > 0 else 0
         
         occupancy_stats.append({
             "bus_id": bus.id,
             "bus_number": bus.bus_number,
-            "route": bus.route.name if bus.route else "Unknown",
+            "route": bus.route_name or "Unknown",
             "total_seats": bus.total_seats,
             "reserved_seats": reserved_count,
             "available_seats": bus.total_seats - reserved_count,
@@ -86,9 +100,14 @@ async def admin_cancel_reservation(
     if not reservation:
         raise HTTPException(status_code=404, detail="Reservation not found")
     
+    was_confirmed = reservation.status == ReservationStatus.CONFIRMED
     reservation.status = ReservationStatus.CANCELLED
     reservation.cancelled_by = current_user.id
+    promotions = []
+    if was_confirmed:
+        promotions = promote_waitlist(db, reservation.bus_id, reservation.reservation_date, reservation.seat_number)
     db.commit()
+    notify_promotions(promotions)
     
     return {"message": "Reservation cancelled by admin"}
 
@@ -116,24 +135,16 @@ async def direct_booking(
         raise HTTPException(status_code=404, detail="User not found")
 
     # Check if bus exists
-    bus = db.query(Bus).filter(Bus.id == bus_id).first()
-    if not bus:
+    bus = queries.bus_by_id(db, bus_id)
+    if bus is None:
         raise HTTPException(status_code=404, detail="Bus not found")
 
+    # 관리자 예약도 일반 예약과 같은 확인을 거친다 (운행, 추첨, 예약/다른 사용자의 홀드, 좌석 번호)
+    check_bookable(db, bus, reservation_date, seat_numbers, user_id)
+
     created_reservations = []
 
     for seat_number in seat_numbers:
-        # Check if seat is already reserved
-        existing_reservation = db.query(Reservation).filter(
-            Reservation.bus_id == bus_id,
-            Reservation.seat_number == seat_number,
-            Reservation.reservation_date == reservation_date,
-            Reservation.status == ReservationStatus.CONFIRMED
-        ).first()
-
-        if existing_reservation:
-            raise HTTPException(status_code=400, detail=f"Seat {seat_number} already reserved")
-
         # Create reservation
         reservation = Reservation(
             user_id=user_id,
@@ -144,7 +155,15 @@ async def direct_booking(
         db.add(reservation)
         created_reservations.append(reservation)
 
+    # 그 사용자가 홀드로 잡아 둔 좌석이면 홀드는 예약으로 대체
+    db.execute(delete(SeatHold).where(
+        SeatHold.user_id == user_id,
+        SeatHold.bus_id == bus_id,
+        SeatHold.reservation_date == reservation_date,
+        SeatHold.seat_number.in_(seat_numbers),
+    ))
     db.commit()
+    BOOKINGS_TOTAL.inc("success")
 
     # Refresh all reservations
     for reservation in created_reservations:
@@ -152,24 +171,255 @@ async def direct_booking(
 
     return created_reservations
 
+def _minutes(value):
+    return value.hour * 60 + value.minute
+
+Alternative = namedtuple("Alternative", "id bus_number total_seats departure_time route_id")
+
+def _alternative_buses(db: Session, bus: Bus, trip_date: date, window_minutes: int):
+    """
+    같은 노선이거나 같은 목적지이면서 출발 시각이 window_minutes 이내인 버스를 출발 시각이 가까운 순서로
+    (차이가 같으면 같은 노선 먼저).
+    """
+    rows = db.execute(
+        select(Bus.id, Bus.bus_number, Bus.total_seats, Bus.departure_time, Bus.route_id)
+        .join(BusRoute, Bus.route_id == BusRoute.id)
+        .where(
+            Bus.is_active == True,
+            Bus.id != bus.id,
+            or_(Bus.route_id == bus.route_id, BusRoute.destination == bus.route.destination),
+        )
+    ).all()
+    # 그 날짜에 운행하는 버스만, 운행별로 바뀐 출발 시각 기준
+    trips = trip_schedule.trips_for(trip_date)
+    cancelled_trip = trips.get(bus.id)
+    departure = _minutes(cancelled_trip.departure_time if cancelled_trip else bus.departure_time)
+    candidates = []
+    for row in rows:
+        trip = trips.get(row.id)
+        if trip is None:
+            continue
+        gap = abs(_minutes(trip.departure_time) - departure)
+        if gap <= window_minutes:
+            # 안내하는 출발 시각도 그 날짜 운행 기준
+            row = Alternative(*row)._replace(departure_time=trip.departure_time)
+            candidates.append((gap, 0 if row.route_id == bus.route_id else 1, row))
+    candidates.sort(key=lambda item: (item[0], item[1], item[2].id))
+    buses = [row for _, _, row in candidates]
+    if not buses:
+        return []
+
+    bus_ids = [row.id for row in buses]
+    taken = {}
+    for bus_id, seat_number in db.execute(
+        select(Reservation.bus_id, Reservation.seat_number).where(
+            Reservation.bus_id.in_(bus_ids),
+            Reservation.reservation_date == trip_date,
+            Reservation.status == ReservationStatus.CONFIRMED,
+        ).union_all(
+            select(SeatHold.bus_id, SeatHold.seat_number).where(
+                SeatHold.bus_id.in_(bus_ids),
+                SeatHold.reservation_date == trip_date,
+                SeatHold.expires_at > datetime.utcnow(),
+            )
+        )
+    ):
+        taken.setdefault(bus_id, set()).add(seat_number)
+    return [
+        (row, [seat for seat in generate_seat_numbers(row.total_seats) if seat not in taken.get(row.id, ())])
+        for row in buses
+    ]
+
+@router.post("/buses/{bus_id}/trips/{trip_date}/cancel")
+async def cancel_trip(
+    bus_id: int,
+    trip_date: date,
+    request_data: dict = None,
+    current_user: User = Depends(require_admin),
+    db: Session = Depends(get_db)
+):
+    started = time.perf_counter()
+    request_data = request_data or {}
+    window_minutes = int(request_data.get("window_minutes", 60))
+    reaccommodate = request_data.get("reaccommodate", True)
+    dry_run = request_data.get("dry_run", False)
+
+    bus = queries.bus_by_id(db, bus_id)
+    if not bus:
+        raise HTTPException(status_code=404, detail="Bus not found")
+    # 그 날짜의 운행 인스턴스는 별도 세션에서 만들어지므로 이 트랜잭션이 쓰기를 시작하기 전에 준비한다
+    trip_schedule.trips_for(trip_date)
+
+    # 운행의 확정 예약을 한 번의 UPDATE로 취소
+    trip_filter = (
+        Reservation.bus_id == bus_id,
+        Reservation.reservation_date == trip_date,
+        Reservation.status == ReservationStatus.CONFIRMED,
+    )
+    cancel = update(Reservation).where(*trip_filter).values(
+        status=ReservationStatus.CANCELLED, cancelled_by=current_user.id
+    )
+    if db.get_bind().dialect.update_returning:
+        affected = db.execute(
+            cancel.returning(Reservation.id, Reservation.user_id, Reservation.bus_id, Reservation.seat_number),
+            execution_options={"synchronize_session": False},
+        ).all()
+    else:
+        affected = db.execute(select(Reservation.id, Reservation.user_id, Reservation.bus_id, Reservation.seat_number).where(*trip_filter)).all()
+        db.execute(cancel, execution_options={"synchronize_session": False})
+    record_changes(db, Reservation, affected)
+    enqueue_reservations(db, "reservation.cancelled", affected,
+                         reservation_date=trip_date, status=ReservationStatus.CANCELLED)
+
+    # 이 운행의 홀드와 대기열도 정리
+    db.execute(delete(SeatHold).where(SeatHold.bus_id == bus_id, SeatHold.reservation_date == trip_date))
+    db.execute(
+        update(WaitlistEntry).where(
+            WaitlistEntry.bus_id == bus_id,
+            WaitlistEntry.reservation_date == trip_date,
+            WaitlistEntry.status == WaitlistStatus.WAITING,
+        ).values(status=WaitlistStatus.CANCELLED),
+        execution_options={"synchronize_session": False},
+    )
+
+    groups = {}
+    for row in sorted(affected, key=lambda row: row.id):
+        groups.setdefault(row.user_id, []).append(row.seat_number)
+
+    assignments, unplaced, split_groups = [], [(user_id, seat) for user_id, seats in groups.items() for seat in seats], 0
+    alternatives = {}
+    if reaccommodate and groups:
+        candidates = _alternative_buses(db, bus, trip_date, window_minutes)
+        alternatives = {row.id: row for row, _ in candidates}
+        assignments, unplaced, split_groups = assign_groups(
+            list(groups.items()), [(row.id, seats) for row, seats in candidates]
+        )
+        if assignments:
+            insert_tracked(db, Reservation, [
+                {
+                    "user_id": user_id,
+                    "bus_id": new_bus_id,
+                    "seat_number": new_seat,
+                    "reservation_date": trip_date,
+                    "status": ReservationStatus.CONFIRMED,
+                }
+                for user_id, _, new_bus_id, new_seat in assignments
+            ])
+
+    # 운행 자체를 취소해 이후 예약/좌석 조회에서 빠지게 한다
+    trip_schedule.override(db, bus, trip_date, status=TripStatus.CANCELLED)
+
+    if dry_run:
+        db.rollback()
+    else:
+        db.commit()
+        trip_schedule.forget(trip_date)
+
+    moved = {}
+    for user_id, old_seat, new_bus_id, new_seat in assignments:
+        alternative = alternatives[new_bus_id]
+        moved.setdefault(user_id, []).append({
+            "from_seat": old_seat,
+            "bus_id": new_bus_id,
+            "bus_number": alternative.bus_number,
+            "departure_time": alternative.departure_time.strftime("%H:%M"),
+            "seat_number": new_seat
+        })
+    stranded = {}
+    for user_id, old_seat in unplaced:
+        stranded.setdefault(user_id, []).append(old_seat)
+
+    if not dry_run:
+        for user_id in groups:
+            event_broker.publish(user_id, "trip_cancelled", {
+                "bus_id": bus_id,
+                "bus_number": bus.bus_number,
+                "reservation_date": trip_date.isoformat(),
+                "reaccommodated": moved.get(user_id, []),
+                "unplaced_seats": stranded.get(user_id, [])
+            })
+
+    per_bus = {}
+    for _, _, new_bus_id, _ in assignments:
+        per_bus[new_bus_id] = per_bus.get(new_bus_id, 0) + 1
+
+    return {
+        "bus_id": bus_id,
+        "bus_number": bus.bus_number,
+        "reservation_date": trip_date,
+        "dry_run": bool(dry_run),
+        "cancelled": len(affected),
+        "passengers": len(groups),
+        "reaccommodated": len(assignments),
+        "unplaced": len(unplaced),
+        "split_groups": split_groups,
+        "buses": [
+            {
+                "bus_id": alternative_id,
+                "bus_number": alternatives[alternative_id].bus_number,
+                "departure_time": alternatives[alternative_id].departure_time.strftime("%H:%M"),
+                "assigned": count
+            }
+            for alternative_id, count in per_bus.items()
+        ],
+        "assignments": [
+            {"user_id": user_id, **assignment}
+            for user_id, user_assignments in moved.items() for assignment in user_assignments
+        ],
+        "unplaced_passengers": [
+            {"user_id": user_id, "seat_numbers": seats} for user_id, seats in stranded.items()
+        ],
+        "elapsed_ms": round((time.perf_counter() - started) * 1000, 2)
+    }
+
+RESERVATION_FIELDS = tuple(column.name for column in Reservation.__table__.columns)
+
+
 @router.get("/reservations")
 async def get_all_reservations(
     reservation_date: date = None,
-    current_user: User = Depends(require_admin),
-    db: Session = Depends(get_db)
+    fields: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, le=10000),
+    after_id: Optional[int] = None,
+    current_user: User = Depends(require_admin_read),
+    db: Session = Depends(get_read_db)
 ):
-    query = db.query(Reservation)
+    # ORM 객체를 만들지 않고 필요한 컬럼만 읽어 바로 직렬화한다
+    selected = parse_fields(fields, RESERVATION_FIELDS) or list(RESERVATION_FIELDS)
+    columns = [Reservation.__table__.c[name] for name in selected]
+    if "id" not in selected:
+        columns.append(Reservation.id)
+    query = select(*columns).order_by(Reservation.id)
 
     if reservation_date:
-        query = query.filter(Reservation.reservation_date == reservation_date)
+        query = query.where(Reservation.reservation_date == reservation_date)
+    if after_id is not None:
+        query = query.where(Reservation.id > after_id)
+    if limit is not None:
+        query = query.limit(limit)
 
-    reservations = query.all()
-    return reservations
+    rows = db.execute(query).all()
+    headers = {}
+    if limit is not None and len(rows) == limit:
+        # 다음 페이지는 ?after_id=<X-Next-After-Id>
+        headers["X-Next-After-Id"] = str(rows[-1].id)
+    return FastJSONResponse([dict(zip(selected, row)) for row in rows], headers=headers)
 
 @router.get("/users")
 async def get_all_users(
-    current_user: User = Depends(require_admin),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(require_admin_read),
+    db: Session = Depends(get_read_db)
 ):
     users = db.query(User).all()
-    return users
\ No newline at end of file
+    return users
+
+@router.get("/profiles")
+async def list_profiles(current_user: User = Depends(require_admin)):
+    return profile_store.list()
+
+@router.get("/profiles/{name}")
+async def download_profile(name: str, current_user: User = Depends(require_admin)):
+    path = profile_store.path_for(name)
+    if not path:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return FileResponse(path, media_type="application/octet-stream", filename=name)
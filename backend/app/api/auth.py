@@ -1,39 +1,111 @@
-from datetime import timedelta
-from fastapi import APIRouter, Depends, HTTPException, status
+from datetime import datetime, timedelta
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
+from sqlalchemy import or_, select, update
 from sqlalchemy.orm import Session
-from app.core.database import get_db
-from app.core.security import verify_password, create_access_token, verify_token, get_password_hash
+from app.core.config import settings
+from app.core.database import SessionLocal, get_db, get_read_db
+from app.core.security import (
+    verify_password, create_access_token, create_refresh_token, verify_token, get_password_hash, new_jti,
+    REFRESH_TOKEN_TYPE,
+)
+from app.core.revocation import revocation_list
+from app.core.metrics import TOKEN_REFRESH_TOTAL
 from app.models.user import User
-from app.schemas.user import UserLogin, Token, UserCreate, User as UserSchema
+from app.models.token import RefreshToken
+from app.schemas.user import UserLogin, Token, TokenRefresh, UserCreate, User as UserSchema
 
 router = APIRouter()
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="api/auth/login")
 
+# /api/batch 가 한 번 인증한 사용자를 하위 요청에 넘길 때 쓰는 ASGI scope 키
+BATCH_USER_KEY = "batch.user"
+
 def authenticate_user(db: Session, username: str, password: str):
     user = db.query(User).filter(User.username == username).first()
     if not user or not verify_password(password, user.hashed_password):
         return False
     return user
 
-def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
-    credentials_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Could not validate credentials",
-        headers={"WWW-Authenticate": "Bearer"},
+def issue_tokens(db: Session, user: User, family_id: str = None):
+    """access 토큰과 리프레시 토큰을 한 쌍으로 발급한다. 커밋은 호출한 쪽에서 한다."""
+    access_jti, refresh_jti = new_jti(), new_jti()
+    family_id = family_id or new_jti()
+    access_token = create_access_token(
+        data={"sub": user.username, "role": user.role.value, "jti": access_jti, "fam": family_id}
+    )
+    expires_at = datetime.utcnow() + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
+    db.add(RefreshToken(
+        jti=refresh_jti, user_id=user.id, family_id=family_id, access_jti=access_jti, expires_at=expires_at
+    ))
+    refresh_token = create_refresh_token({"sub": user.username, "jti": refresh_jti, "fam": family_id}, expires_at)
+    return {
+        "access_token": access_token,
+        "token_type": "bearer",
+        "refresh_token": refresh_token,
+        "expires_in": settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60,
+    }
+
+def revoke_family(db: Session, family_id: str, now: datetime):
+    """리프레시 토큰 체인을 폐기하고, 아직 만료되지 않았을 수 있는 access 토큰도 폐기 목록에 넣는다."""
+    access_ttl = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+    # 짝이 되는 리프레시 토큰을 아직 안 썼거나 최근 access 토큰 유효 시간 안에 쓴 경우만 살아 있을 수 있다
+    access_jtis = db.execute(
+        select(RefreshToken.access_jti).where(
+            RefreshToken.family_id == family_id,
+            or_(RefreshToken.used_at.is_(None), RefreshToken.used_at >= now - access_ttl),
+        )
+    ).scalars().all()
+    db.execute(
+        update(RefreshToken)
+        .where(RefreshToken.family_id == family_id, RefreshToken.revoked_at.is_(None))
+        .values(revoked_at=now),
+        execution_options={"synchronize_session": False},
     )
+    revocation_list.revoke(db, [(jti, now + access_ttl) for jti in access_jtis])
+
+def _token_username(token: str):
     payload = verify_token(token)
-    if payload is None:
-        raise credentials_exception
-    username: str = payload.get("sub")
+    username = payload.get("sub") if payload else None
     if username is None:
-        raise credentials_exception
-    
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return username
+
+def _find_user(db: Session, username: str):
     user = db.query(User).filter(User.username == username).first()
     if user is None:
-        raise credentials_exception
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
     return user
 
+def get_current_user(request: Request, token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
+    batch_user = request.scope.get(BATCH_USER_KEY)
+    if batch_user is not None:
+        return batch_user
+    return _find_user(db, _token_username(token))
+
+def get_read_user(request: Request, token: str = Depends(oauth2_scheme), db: Session = Depends(get_read_db)):
+    """
+    읽기 엔드포인트용 get_current_user. 엔드포인트와 같은 읽기 세션(replica)에서 사용자를 찾으므로 읽기 요청이
+    primary 세션을 따로 열지 않는다. 방금 가입해 replica 에 아직 없는 사용자만 primary 에서 다시 찾는다.
+    """
+    batch_user = request.scope.get(BATCH_USER_KEY)
+    if batch_user is not None:
+        return batch_user
+    username = _token_username(token)
+    user = db.query(User).filter(User.username == username).first()
+    if user is not None:
+        return user
+    with SessionLocal() as primary:
+        return _find_user(primary, username)
+
 @router.post("/register", response_model=UserSchema)
 async def register(user_data: UserCreate, db: Session = Depends(get_db)):
     # Check if user already exists
@@ -70,19 +142,64 @@ async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session =
             detail="Incorrect username or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
-    access_token_expires = timedelta(hours=24)  # 24시간으로 연장
-    access_token = create_access_token(
-        data={"sub": user.username, "role": user.role.value}, expires_delta=access_token_expires
+    tokens = issue_tokens(db, user)
+    db.commit()
+    return {**tokens, "user": user}
+
+@router.post("/refresh", response_model=Token)
+async def refresh(token_data: TokenRefresh, db: Session = Depends(get_db)):
+    invalid_exception = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Invalid refresh token",
+        headers={"WWW-Authenticate": "Bearer"},
     )
-    return {
-        "access_token": access_token,
-        "token_type": "bearer",
-        "user": user
-    }
+    payload = verify_token(token_data.refresh_token, REFRESH_TOKEN_TYPE)
+    if payload is None or not payload.get("jti"):
+        TOKEN_REFRESH_TOTAL.inc("invalid")
+        raise invalid_exception
+
+    # 동시에 같은 토큰으로 요청해도 한 번만 회전되도록 조건부 UPDATE 로 사용 처리
+    now = datetime.utcnow()
+    rotated = db.execute(
+        update(RefreshToken)
+        .where(RefreshToken.jti == payload["jti"], RefreshToken.used_at.is_(None), RefreshToken.revoked_at.is_(None))
+        .values(used_at=now),
+        execution_options={"synchronize_session": False},
+    ).rowcount
+    stored = db.get(RefreshToken, payload["jti"])
+    if not rotated:
+        if stored is not None and stored.used_at is not None:
+            # 이미 쓴 토큰이 다시 왔다 = 탈취 가능성. 이 로그인에서 이어진 토큰을 모두 폐기
+            revoke_family(db, stored.family_id, now)
+            db.commit()
+            TOKEN_REFRESH_TOTAL.inc("reused")
+        else:
+            TOKEN_REFRESH_TOTAL.inc("invalid")
+        raise invalid_exception
+
+    user = db.get(User, stored.user_id)
+    if user is None:
+        db.rollback()
+        TOKEN_REFRESH_TOTAL.inc("invalid")
+        raise invalid_exception
+    tokens = issue_tokens(db, user, stored.family_id)
+    db.commit()
+    TOKEN_REFRESH_TOTAL.inc("rotated")
+    return {**tokens, "user": user}
 
 @router.post("/logout")
-async def logout(current_user: User = Depends(get_current_user)):
-    # 실제 구현에서는 토큰을 블랙리스트에 추가하거나 토큰 저장소에서 제거
+async def logout(
+    token: str = Depends(oauth2_scheme),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    payload = verify_token(token)
+    if payload is not None and payload.get("jti"):
+        # access 토큰은 남은 유효 시간 동안 폐기 목록에, 함께 발급된 리프레시 토큰 체인은 DB 에서 폐기
+        revocation_list.revoke(db, [(payload["jti"], datetime.utcfromtimestamp(payload["exp"]))])
+        if payload.get("fam"):
+            revoke_family(db, payload["fam"], datetime.utcnow())
+        db.commit()
     return {"message": "Successfully logged out"}
 
 @router.get("/me", response_model=UserSchema)
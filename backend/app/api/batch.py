@@ -0,0 +1,137 @@
+import asyncio
+import json
+import logging
+import re
+from urllib.parse import urlsplit
+from fastapi import APIRouter, Depends, HTTPException, Request
+from starlette.exceptions import HTTPException as StarletteHTTPException
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.database import get_read_db, BATCH_SESSION_KEY
+from app.core.security import verify_token
+from app.models.user import User
+from app.schemas.batch import BatchRequest, BatchResponse
+from app.api.auth import BATCH_USER_KEY
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+# 스트리밍 응답이나 배치 자신은 하위 요청으로 부를 수 없다. 목록에 없는 스트리밍 응답도 content-type 으로 막는다
+EXCLUDED_PATHS = re.compile(r"^/api/(batch|waitlist/events|tracking/buses/[^/]+/stream)(/|$)")
+STREAMING_CONTENT_TYPE = "text/event-stream"
+# 하위 응답에서 클라이언트에 돌려줄 헤더
+FORWARDED_HEADERS = {"etag", "cache-control", "content-type", "retry-after"}
+
+class _StreamingRejected(Exception):
+    """하위 요청이 SSE 스트림을 열려고 했다."""
+
+def _batch_user(request: Request, db: Session):
+    # 토큰 검증과 사용자 조회는 배치에서 한 번만. 실패하면 하위 요청이 각자 401 을 돌려준다
+    scheme, _, token = request.headers.get("authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    payload = verify_token(token)
+    if not payload or not payload.get("sub"):
+        return None
+    return db.query(User).filter(User.username == payload["sub"]).first()
+
+async def _dispatch(request: Request, db: Session, user, sub_id: str, path: str):
+    """하위 요청을 미들웨어를 거치지 않고 라우터로 바로 보내 응답을 모은다."""
+    url = urlsplit(path)
+    headers = [
+        (name, value) for name, value in request.scope["headers"]
+        if name not in (b"content-length", b"content-type", b"if-none-match")
+    ]
+    scope = {
+        **{key: value for key, value in request.scope.items() if key not in ("router", "endpoint", "path_params", "route")},
+        "method": "GET",
+        "path": url.path,
+        "raw_path": url.path.encode(),
+        "query_string": url.query.encode(),
+        "headers": headers,
+        BATCH_SESSION_KEY: db,
+        BATCH_USER_KEY: user,
+    }
+    status_code, response_headers, chunks = 500, {}, []
+
+    received = False
+
+    async def receive():
+        # 본문은 한 번만 주고, 그 뒤로는 연결이 끊긴 것으로 알린다. 계속 http.request 를 주면 스트리밍 응답의
+        # 연결 끊김 감시 루프가 한 번도 양보하지 않고 돌아 이벤트 루프 전체가 멈춘다
+        nonlocal received
+        if received:
+            return {"type": "http.disconnect"}
+        received = True
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        nonlocal status_code, response_headers
+        if message["type"] == "http.response.start":
+            status_code = message["status"]
+            response_headers = {
+                name.decode("latin-1").lower(): value.decode("latin-1") for name, value in message.get("headers", [])
+            }
+            if response_headers.get("content-type", "").startswith(STREAMING_CONTENT_TYPE):
+                raise _StreamingRejected()
+        elif message["type"] == "http.response.body":
+            chunks.append(message.get("body", b""))
+
+    try:
+        await asyncio.wait_for(request.app.router(scope, receive, send), timeout=settings.BATCH_TIMEOUT_SECONDS)
+    except asyncio.TimeoutError:
+        return {"id": sub_id, "status": 504, "body": {"detail": "Sub-request timed out"}, "headers": {}}
+    except _StreamingRejected:
+        return {"id": sub_id, "status": 400, "body": {"detail": "Streaming responses are not allowed in a batch"},
+                "headers": {}}
+    except StarletteHTTPException as exc:
+        # 라우터는 맞는 경로가 없으면 응답 대신 예외를 올린다 (404/405)
+        return {"id": sub_id, "status": exc.status_code, "body": {"detail": exc.detail}, "headers": {}}
+    except Exception:
+        logger.exception("Batch sub-request failed: %s", path)
+        return {"id": sub_id, "status": 500, "body": {"detail": "Internal Server Error"}, "headers": {}}
+
+    body = b"".join(chunks)
+    if response_headers.get("content-type", "").startswith("application/json"):
+        body = json.loads(body) if body else None
+    else:
+        body = body.decode("utf-8", errors="replace")
+    return {
+        "id": sub_id,
+        "status": status_code,
+        "body": body,
+        "headers": {name: value for name, value in response_headers.items() if name in FORWARDED_HEADERS}
+    }
+
+@router.post("/", response_model=BatchResponse)
+async def batch(
+    batch_data: BatchRequest,
+    request: Request,
+    db: Session = Depends(get_read_db)
+):
+    """
+    여러 GET 요청을 한 번에 처리한다. 인증은 배치에서 한 번만 하고, 하위 요청은 읽기 세션 하나(같은 트랜잭션)를
+    같이 써서 같은 시점의 데이터를 본다. 하위 요청은 동시에 시작되지만 엔드포인트가 이벤트 루프에서 동기 DB 호출을
+    하므로 세션은 한 번에 하나씩만 쓰인다. 하위 요청마다 status 를 따로 돌려주므로 일부가 실패해도 배치는 200 이다.
+    """
+    if not batch_data.requests:
+        raise HTTPException(status_code=400, detail="No sub-requests")
+    if len(batch_data.requests) > settings.BATCH_MAX_REQUESTS:
+        raise HTTPException(status_code=400, detail=f"At most {settings.BATCH_MAX_REQUESTS} sub-requests per batch")
+    for sub in batch_data.requests:
+        if sub.method.upper() != "GET":
+            raise HTTPException(status_code=400, detail="Only GET sub-requests are supported")
+        if not sub.path.startswith("/api/") or EXCLUDED_PATHS.match(urlsplit(sub.path).path):
+            raise HTTPException(status_code=400, detail=f"Path not allowed in a batch: {sub.path}")
+
+    if db.get_bind().dialect.name == "postgresql":
+        # 하위 요청들이 같은 스냅샷을 보도록 (SQLite 는 한 읽기 트랜잭션이 이미 스냅샷)
+        db.connection(execution_options={"isolation_level": "REPEATABLE READ"})
+    user = _batch_user(request, db)
+
+    responses = await asyncio.gather(*[
+        _dispatch(request, db, user, sub.id or str(index), sub.path)
+        for index, sub in enumerate(batch_data.requests)
+    ])
+    return {"responses": responses}
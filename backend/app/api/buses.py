@@ -1,21 +1,44 @@
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException
+import hashlib
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import JSONResponse
+from sqlalchemy import delete, exists, insert, select, update
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
-from app.core.database import get_db
+from app.core.config import settings
+from app.core.database import get_db, get_read_db
+from app.core.serialization import FastJSONResponse, parse_fields, sparse
 from app.models.user import User, UserRole
-from app.models.bus import Bus, BusRoute
-from app.models.reservation import Reservation, ReservationStatus
-from app.schemas.bus import Bus as BusSchema, BusCreate, BusUpdate, BusRoute as BusRouteSchema, BusRouteCreate, BusRouteUpdate
-from app.api.auth import get_current_user
-from datetime import date
+from app.models.bus import Bus, BusRoute, RouteStop
+from app.models.reservation import Reservation, ReservationSegment, ReservationStatus
+from app.models.boarding import Boarding, BoardingStatus
+from app.schemas.boarding import BoardingSync
+from app.schemas.bus import Bus as BusSchema, BusCreate, BusUpdate, BusRoute as BusRouteSchema, BusRouteCreate, BusRouteUpdate, RouteStopsUpdate
+from app.api.auth import get_current_user, get_read_user
+from app.utils.bus_seats import generate_seat_numbers
+from app.utils.segments import build_inventory
+from app.route_search import route_index
+from app.schedule import trip_schedule
+from app.tracking import location_tracker
+from app import queries
+from datetime import date, datetime, timezone
 
 router = APIRouter()
 
 @router.get("/routes", response_model=List[BusRouteSchema])
-async def get_routes(db: Session = Depends(get_db)):
+async def get_routes(db: Session = Depends(get_read_db)):
     routes = db.query(BusRoute).filter(BusRoute.is_active == True).all()
     return routes
 
+@router.get("/routes/search")
+async def search_routes(
+    q: str = Query(..., min_length=1, max_length=50),
+    limit: int = Query(10, ge=1, le=settings.ROUTE_SEARCH_MAX_RESULTS),
+):
+    # 메모리 색인만 읽는다 (초성 "ㅍㄱ", 입력 중인 글자 "판ㄱ", 오타 "강냠역" 포함)
+    routes, stops = route_index.search(q, limit)
+    return {"query": q, "stops": stops, "routes": routes}
+
 @router.post("/routes", response_model=BusRouteSchema)
 async def create_route(
     route_data: BusRouteCreate,
@@ -29,6 +52,7 @@ async def create_route(
     db.add(route)
     db.commit()
     db.refresh(route)
+    route_index.upsert(route)
     return route
 
 @router.put("/routes/{route_id}", response_model=BusRouteSchema)
@@ -52,6 +76,7 @@ async def update_route(
 
     db.commit()
     db.refresh(route)
+    route_index.upsert(route)
     return route
 
 @router.delete("/routes/{route_id}")
@@ -75,50 +100,114 @@ async def delete_route(
     # Soft delete by setting is_active to False
     route.is_active = False
     db.commit()
+    route_index.upsert(route)
 
     return {"message": "Route deleted successfully"}
 
+def _stop_list(rows):
+    return [
+        {"sequence": sequence, "name": name, "offset_minutes": offset, "latitude": latitude, "longitude": longitude}
+        for sequence, name, offset, latitude, longitude in rows
+    ]
+
+@router.get("/routes/{route_id}/stops")
+async def get_route_stops(route_id: int, db: Session = Depends(get_read_db)):
+    stops = queries.route_stop_rows(db, route_id)
+    if not stops:
+        raise HTTPException(status_code=404, detail="Route not found")
+    return {"route_id": route_id, "stops": _stop_list(stops)}
+
+@router.put("/routes/{route_id}/stops")
+async def update_route_stops(
+    route_id: int,
+    stops_update: RouteStopsUpdate,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    if current_user.role.value != "admin":
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+
+    route = db.query(BusRoute).filter(BusRoute.id == route_id).first()
+    if not route:
+        raise HTTPException(status_code=404, detail="Route not found")
+    if len(stops_update.stops) < 2:
+        raise HTTPException(status_code=400, detail="A route needs at least two stops")
+    for stop in stops_update.stops:
+        if (stop.latitude is None) != (stop.longitude is None) or (
+            stop.latitude is not None and not (-90 <= stop.latitude <= 90 and -180 <= stop.longitude <= 180)
+        ):
+            raise HTTPException(status_code=400, detail=f"Invalid coordinates for stop {stop.name}")
+
+    # 구간 예약은 정류장 순번을 저장하므로 앞으로의 구간 예약이 남아 있으면 바꾸지 않는다
+    segment_booked = db.execute(select(exists().where(
+        ReservationSegment.reservation_id == Reservation.id,
+        Reservation.bus_id == Bus.id,
+        Bus.route_id == route_id,
+        Reservation.reservation_date >= date.today(),
+        Reservation.status == ReservationStatus.CONFIRMED,
+    ))).scalar()
+    if segment_booked:
+        raise HTTPException(status_code=409, detail="Route has upcoming reservations for partial segments")
+
+    db.execute(delete(RouteStop).where(RouteStop.route_id == route_id))
+    db.add_all([
+        RouteStop(route_id=route_id, sequence=sequence, **stop.dict())
+        for sequence, stop in enumerate(stops_update.stops)
+    ])
+    # 출발지/목적지는 첫/마지막 정류장과 맞춘다 (목록, 검색 색인에서 사용)
+    route.departure_location = stops_update.stops[0].name
+    route.destination = stops_update.stops[-1].name
+    db.commit()
+    db.refresh(route)
+    route_index.upsert(route)
+    location_tracker.forget_route(route_id)
+    return {"route_id": route_id, "stops": _stop_list(queries.route_stop_rows(db, route_id))}
+
+BUS_LIST_FIELDS = (
+    "id", "bus_number", "route", "departure_time", "arrival_time", "destination", "bus_type",
+    "total_seats", "available_seats", "occupancy_rate",
+)
+
+
 @router.get("/")
 async def get_buses(
     destination: str = None,
     reservation_date: str = None,
-    db: Session = Depends(get_db)
+    route_id: int = None,
+    fields: Optional[str] = None,
+    db: Session = Depends(get_read_db)
 ):
-    query = db.query(Bus).join(BusRoute).filter(Bus.is_active == True)
-
-    if destination:
-        query = query.filter(BusRoute.destination == destination)
+    selected = parse_fields(fields, BUS_LIST_FIELDS)
+    target_date = date.today()
+    if reservation_date:
+        try:
+            from datetime import datetime
+            target_date = datetime.strptime(reservation_date, "%Y-%m-%d").date()
+        except ValueError:
+            target_date = date.today()
 
-    buses = query.all()
+    buses = queries.active_bus_rows(db, destination, route_id)
+    reserved_counts = queries.confirmed_seat_counts(db, target_date)
+    # 그 날짜에 운행하는 버스만 (운휴일, 취소된 운행 제외), 시간은 운행별 변경을 반영
+    trips = trip_schedule.trips_for(target_date)
 
     # 프론트엔드 호환성을 위해 데이터 형태 변환
     result = []
     for bus in buses:
-        # 해당 버스의 예약된 좌석 수 계산
-        target_date = date.today()
-        if reservation_date:
-            try:
-                from datetime import datetime
-                target_date = datetime.strptime(reservation_date, "%Y-%m-%d").date()
-            except ValueError:
-                target_date = date.today()
-
-        reserved_count = db.query(Reservation).filter(
-            Reservation.bus_id == bus.id,
-            Reservation.reservation_date == target_date,
-            Reservation.status == ReservationStatus.CONFIRMED
-        ).count()
-
+        trip = trips.get(bus.id)
+        if trip is None:
+            continue
+        reserved_count = reserved_counts.get(bus.id, 0)
         available_seats = bus.total_seats - reserved_count
         occupancy_rate = (reserved_count / bus.total_seats) * 100 if bus.total_seats > 0 else 0
 
         bus_data = {
             "id": bus.id,
             "bus_number": bus.bus_number,
-            "route": f"{bus.route.departure_location} → {bus.route.destination}" if bus.route else "",
-            "departure_time": bus.departure_time.strftime("%H:%M"),
-            "arrival_time": bus.arrival_time.strftime("%H:%M"),
-            "destination": bus.route.destination if bus.route else "",
+            "route": f"{bus.departure_location} → {bus.destination}",
+            "departure_time": trip.departure_time.strftime("%H:%M"),
+            "arrival_time": trip.arrival_time.strftime("%H:%M"),
+            "destination": bus.destination,
             "bus_type": f"{bus.total_seats}-seat",
             "total_seats": bus.total_seats,
             "available_seats": available_seats,
@@ -126,14 +215,24 @@ async def get_buses(
         }
         result.append(bus_data)
 
-    return result
+    return FastJSONResponse(sparse(result, selected))
+
+def _trip_times(bus, target_date):
+    """그 날짜 운행의 (출발, 도착, 운행 여부). 운행하지 않는 날은 버스 시간표를 돌려준다."""
+    trip = trip_schedule.trip(bus.id, target_date)
+    if trip is None:
+        return bus.departure_time, bus.arrival_time, False
+    return trip.departure_time, trip.arrival_time, True
 
 @router.get("/{bus_id}", response_model=BusSchema)
-async def get_bus(bus_id: int, db: Session = Depends(get_db)):
-    bus = db.query(Bus).filter(Bus.id == bus_id).first()
+async def get_bus(bus_id: int, reservation_date: date = None, db: Session = Depends(get_read_db)):
+    bus = queries.bus_by_id(db, bus_id)
     if not bus:
         raise HTTPException(status_code=404, detail="Bus not found")
-    return bus
+    # 시각은 그 날짜(기본 오늘) 운행 기준. ORM 객체는 건드리지 않고 응답만 바꾼다
+    departure_time, arrival_time, _ = _trip_times(bus, reservation_date or date.today())
+    return BusSchema.model_validate(bus).model_copy(
+        update={"departure_time": departure_time, "arrival_time": arrival_time})
 
 @router.post("/", response_model=BusSchema)
 async def create_bus(
@@ -148,34 +247,96 @@ async def create_bus(
     db.add(bus)
     db.commit()
     db.refresh(bus)
+    trip_schedule.invalidate()
     return bus
 
-@router.get("/{bus_id}/seats")
-async def get_bus_seats(
+def trip_segments(db: Session, bus: Bus, reservation_date: date):
+    """운행의 정류장 이름 목록과 구간별 좌석 재고 (SegmentInventory)."""
+    stops = [row[1] for row in queries.route_stop_rows(db, bus.route_id)]
+    inventory = build_inventory(
+        generate_seat_numbers(bus.total_seats), len(stops),
+        queries.segment_rows(db, bus.id, reservation_date),
+    )
+    return stops, inventory
+
+def parse_segment(stops, board_stop, alight_stop):
+    """
+    승차/하차 정류장 순번을 검사해 (board_stop, alight_stop) 을 돌려준다. 생략하면 출발지/종점.
+    전 구간이면 None.
+    """
+    last_stop = len(stops) - 1
+    board_stop = 0 if board_stop is None else board_stop
+    alight_stop = last_stop if alight_stop is None else alight_stop
+    if not (isinstance(board_stop, int) and isinstance(alight_stop, int) and 0 <= board_stop < alight_stop <= last_stop):
+        raise HTTPException(status_code=400, detail=f"Invalid stops. Use 0 <= board_stop < alight_stop <= {last_stop}")
+    if board_stop == 0 and alight_stop == last_stop:
+        return None
+    return board_stop, alight_stop
+
+@router.get("/{bus_id}/segments")
+async def get_bus_segments(
     bus_id: int,
     reservation_date: date,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
-    bus = db.query(Bus).filter(Bus.id == bus_id).first()
+    bus = queries.bus_by_id(db, bus_id)
     if not bus:
         raise HTTPException(status_code=404, detail="Bus not found")
+    if not trip_schedule.trip(bus_id, reservation_date):
+        raise HTTPException(status_code=404, detail="Bus does not run on this date")
 
-    # Get reserved seats for the date
-    reserved_seats = db.query(Reservation.seat_number).filter(
-        Reservation.bus_id == bus_id,
-        Reservation.reservation_date == reservation_date,
-        Reservation.status == ReservationStatus.CONFIRMED
-    ).all()
+    stops, inventory = trip_segments(db, bus, reservation_date)
+    return {
+        "bus_id": bus_id,
+        "reservation_date": reservation_date.isoformat(),
+        "stops": stops,
+        "segments": [
+            {"board_stop": i, "from": stops[i], "to": stops[i + 1], "available_seats": count}
+            for i, count in enumerate(inventory.free_counts())
+        ]
+    }
 
-    reserved_seat_numbers = [seat[0] for seat in reserved_seats]
+@router.get("/{bus_id}/seats")
+async def get_bus_seats(
+    bus_id: int,
+    reservation_date: date,
+    board_stop: Optional[int] = Query(None, ge=0),
+    alight_stop: Optional[int] = Query(None, ge=1),
+    db: Session = Depends(get_read_db)
+):
+    if board_stop is None and alight_stop is None:
+        total_seats = queries.bus_total_seats(db, bus_id)
+        if total_seats is None:
+            raise HTTPException(status_code=404, detail="Bus not found")
+
+        # Get reserved seats for the date (구간 예약 좌석은 어느 구간이든 차 있으면 포함)
+        reserved_seat_numbers = queries.confirmed_seat_numbers(db, bus_id, reservation_date)
+    else:
+        bus = queries.bus_by_id(db, bus_id)
+        if not bus:
+            raise HTTPException(status_code=404, detail="Bus not found")
+        total_seats = bus.total_seats
+        # 승차~하차 구간에서 빈 좌석만 예약 가능으로 본다
+        stops, inventory = trip_segments(db, bus, reservation_date)
+        segment = parse_segment(stops, board_stop, alight_stop) or (0, len(stops) - 1)
+        free_seats = set(inventory.free_seats(*segment))
+        reserved_seat_numbers = [seat for seat in inventory.seat_numbers if seat not in free_seats]
+    if not trip_schedule.trip(bus_id, reservation_date):
+        raise HTTPException(status_code=404, detail="Bus does not run on this date")
+    # 다른 사용자가 결제 중으로 잡아 둔 좌석
+    held_seat_numbers = queries.held_seat_numbers(db, bus_id, reservation_date, datetime.utcnow())
+    # 추첨 모드면 좌석 선택 대신 응모 화면으로 안내
+    lottery_id = queries.open_lottery_id(db, bus_id, reservation_date)
 
     return {
         "bus_id": bus_id,
-        "bus_type": f"{bus.total_seats}-seat",
-        "total_seats": bus.total_seats,
+        "bus_type": f"{total_seats}-seat",
+        "total_seats": total_seats,
         "reserved_seats": len(reserved_seat_numbers),
-        "available_seats": bus.total_seats - len(reserved_seat_numbers),
-        "reserved_seat_numbers": reserved_seat_numbers  # 예약된 좌석 번호 리스트 (1A, 11C 형식)
+        "available_seats": total_seats - len(reserved_seat_numbers),
+        "reserved_seat_numbers": reserved_seat_numbers,  # 예약된 좌석 번호 리스트 (1A, 11C 형식)
+        "held_seat_numbers": held_seat_numbers,
+        "lottery_id": lottery_id
     }
 
 @router.put("/{bus_id}", response_model=BusSchema)
@@ -199,6 +360,8 @@ async def update_bus(
 
     db.commit()
     db.refresh(bus)
+    trip_schedule.invalidate()
+    location_tracker.forget_bus(bus_id)
     return bus
 
 @router.delete("/{bus_id}")
@@ -217,13 +380,16 @@ async def delete_bus(
     # Soft delete by setting is_active to False
     bus.is_active = False
     db.commit()
+    trip_schedule.invalidate()
+    location_tracker.forget_bus(bus_id)
 
     return {"message": "Bus deleted successfully"}
 
 @router.get("/driver/my-buses")
 async def get_driver_buses(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    reservation_date: date = None,
+    current_user: User = Depends(get_read_user),
+    db: Session = Depends(get_read_db)
 ):
     if current_user.role != UserRole.DRIVER:
         raise HTTPException(status_code=403, detail="Only drivers can access this endpoint")
@@ -237,13 +403,21 @@ async def get_driver_buses(
     if not buses:
         raise HTTPException(status_code=404, detail="No buses assigned to this driver")
 
-    return buses
+    # 시각은 그 날짜(기본 오늘) 운행 기준, 운행하지 않는 버스는 runs=False
+    target_date = reservation_date or date.today()
+    result = []
+    for bus in buses:
+        departure_time, arrival_time, runs = _trip_times(bus, target_date)
+        data = {column.name: getattr(bus, column.name) for column in Bus.__table__.columns}
+        data.update(departure_time=departure_time, arrival_time=arrival_time, runs=runs)
+        result.append(data)
+    return result
 
 @router.get("/driver/my-bus")
 async def get_driver_bus(
-    current_user: User = Depends(get_current_user),
+    current_user: User = Depends(get_read_user),
     reservation_date: str = None,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     if current_user.role != UserRole.DRIVER:
         raise HTTPException(status_code=403, detail="Only drivers can access this endpoint")
@@ -266,11 +440,8 @@ async def get_driver_bus(
         except ValueError:
             target_date = date.today()
 
-    reserved_count = db.query(Reservation).filter(
-        Reservation.bus_id == bus.id,
-        Reservation.reservation_date == target_date,
-        Reservation.status == ReservationStatus.CONFIRMED
-    ).count()
+    reserved_count = queries.confirmed_seat_count(db, bus.id, target_date)
+    departure_time, arrival_time, runs = _trip_times(bus, target_date)
 
     available_seats = bus.total_seats - reserved_count
     occupancy_rate = (reserved_count / bus.total_seats) * 100 if bus.total_seats > 0 else 0
@@ -279,11 +450,162 @@ async def get_driver_bus(
         "id": bus.id,
         "bus_number": bus.bus_number,
         "route": f"{bus.route.departure_location} → {bus.route.destination}" if bus.route else "",
-        "departure_time": bus.departure_time.strftime("%H:%M"),
-        "arrival_time": bus.arrival_time.strftime("%H:%M"),
+        "departure_time": departure_time.strftime("%H:%M"),
+        "arrival_time": arrival_time.strftime("%H:%M"),
         "destination": bus.route.destination if bus.route else "",
         "bus_type": f"{bus.total_seats}-seat",
         "total_seats": bus.total_seats,
         "available_seats": available_seats,
-        "occupancy_rate": round(occupancy_rate, 1)
-    }
\ No newline at end of file
+        "occupancy_rate": round(occupancy_rate, 1),
+        "runs": runs
+    }
+# board_stop/alight_stop 은 버스별 stops 의 순번 (전 구간이면 None)
+MANIFEST_COLUMNS = ["seat_number", "reservation_id", "full_name", "phone", "boarding", "board_stop", "alight_stop"]
+
+def _manifest_driver_id(current_user: User, driver_id: int = None):
+    if current_user.role == UserRole.DRIVER:
+        return current_user.id
+    if current_user.role == UserRole.ADMIN and driver_id is not None:
+        return driver_id
+    raise HTTPException(status_code=403, detail="Only drivers can access this endpoint")
+
+@router.get("/driver/manifest")
+async def get_driver_manifest(
+    request: Request,
+    reservation_date: date = None,
+    driver_id: int = None,
+    current_user: User = Depends(get_read_user),
+    db: Session = Depends(get_read_db)
+):
+    """
+    기사 단말이 출발 전에 내려받는 탑승 명단. 담당 버스 전체의 승객을 한 번의 쿼리로 읽고, 승객은
+    MANIFEST_COLUMNS 순서의 배열로 보내 크기를 줄인다. ETag 가 같으면 304 로 본문 없이 응답한다.
+    """
+    target_driver_id = _manifest_driver_id(current_user, driver_id)
+    target_date = reservation_date or date.today()
+
+    # 운행하지 않거나 취소된 운행의 버스는 명단에서 뺀다 (운행 행을 먼저 만들어 둔다)
+    trip_schedule.trips_for(target_date)
+    rows = queries.driver_manifest_rows(db, target_driver_id, target_date)
+    stop_names = queries.route_stop_names(db, {row.route_id for row in rows})
+
+    buses = {}
+    for row in rows:
+        bus = buses.get(row.bus_id)
+        if bus is None:
+            bus = buses[row.bus_id] = {
+                "bus_id": row.bus_id,
+                "bus_number": row.bus_number,
+                "route": f"{row.departure_location} → {row.destination}" if row.destination else "",
+                "departure_time": row.departure_time.strftime("%H:%M"),
+                "arrival_time": row.arrival_time.strftime("%H:%M"),
+                "total_seats": row.total_seats,
+                "stops": stop_names.get(row.route_id) or [row.departure_location, row.destination],
+                "passengers": []
+            }
+        if row.reservation_id is not None:
+            bus["passengers"].append([
+                row.seat_number, row.reservation_id, row.full_name, row.phone,
+                row.boarding_status.value if row.boarding_status else None,
+                row.board_stop, row.alight_stop
+            ])
+
+    for bus in buses.values():
+        # 같은 좌석을 구간별로 나눠 탄 승객은 승차 순서대로
+        order = {seat: index for index, seat in enumerate(generate_seat_numbers(bus["total_seats"]))}
+        bus["passengers"].sort(key=lambda passenger: (order.get(passenger[0], len(order)), passenger[5] or 0))
+        bus["boarded"] = sum(1 for passenger in bus["passengers"] if passenger[4] == BoardingStatus.BOARDED.value)
+
+    response = JSONResponse({
+        "driver_id": target_driver_id,
+        "reservation_date": target_date.isoformat(),
+        "columns": MANIFEST_COLUMNS,
+        "buses": list(buses.values())
+    })
+    etag = '"' + hashlib.sha1(response.body).hexdigest()[:20] + '"'
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return response
+
+@router.post("/driver/check-ins")
+async def sync_driver_check_ins(
+    sync_data: BoardingSync,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    오프라인 동안 쌓인 탑승 스캔을 한 번에 반영한다. 같은 예약의 스캔은 scanned_at 이 가장 늦은 것이 이기므로
+    같은 배치를 다시 올려도 결과가 같다. 담당 버스가 아니거나 취소된 예약은 rejected 로 돌려준다.
+    """
+    if current_user.role not in (UserRole.DRIVER, UserRole.ADMIN):
+        raise HTTPException(status_code=403, detail="Only drivers can access this endpoint")
+    if len(sync_data.scans) > settings.BOARDING_SYNC_MAX_SCANS:
+        raise HTTPException(status_code=400, detail=f"At most {settings.BOARDING_SYNC_MAX_SCANS} scans per request")
+
+    latest = {}
+    for scan in sync_data.scans:
+        scanned_at = scan.scanned_at.astimezone(timezone.utc).replace(tzinfo=None) if scan.scanned_at.tzinfo else scan.scanned_at
+        current = latest.get(scan.reservation_id)
+        if current is None or scanned_at >= current[1]:
+            latest[scan.reservation_id] = (scan.status, scanned_at)
+
+    reservations = {
+        row.id: row for row in db.execute(
+            select(Reservation.id, Reservation.status, Bus.driver_id)
+            .join(Bus, Reservation.bus_id == Bus.id)
+            .where(Reservation.id.in_(list(latest)))
+        )
+    }
+    rejected = []
+    for reservation_id in list(latest):
+        row = reservations.get(reservation_id)
+        reason = None
+        if row is None:
+            reason = "not_found"
+        elif current_user.role == UserRole.DRIVER and row.driver_id != current_user.id:
+            reason = "not_your_bus"
+        elif row.status == ReservationStatus.CANCELLED:
+            reason = "cancelled"
+        if reason:
+            rejected.append({"reservation_id": reservation_id, "reason": reason})
+            del latest[reservation_id]
+
+    existing = {
+        row.reservation_id: row for row in db.execute(
+            select(Boarding.id, Boarding.reservation_id, Boarding.scanned_at)
+            .where(Boarding.reservation_id.in_(list(latest)))
+        )
+    } if latest else {}
+
+    now = datetime.utcnow()
+    inserts, updates, stale = [], [], 0
+    for reservation_id, (status, scanned_at) in latest.items():
+        values = {"status": status, "scanned_at": scanned_at, "recorded_by": current_user.id, "recorded_at": now}
+        row = existing.get(reservation_id)
+        if row is None:
+            inserts.append({"reservation_id": reservation_id, **values})
+        elif scanned_at >= row.scanned_at:
+            updates.append({"id": row.id, **values})
+        else:
+            stale += 1
+
+    if inserts:
+        db.execute(insert(Boarding), inserts)
+    if updates:
+        db.execute(update(Boarding), updates)
+    try:
+        db.commit()
+    except IntegrityError:
+        # 다른 단말이 같은 예약을 동시에 올린 경우. 다시 올리면 최신 스캔 기준으로 합쳐진다
+        db.rollback()
+        raise HTTPException(status_code=409, detail="Concurrent check-in sync. Please retry")
+
+    return {
+        "accepted": len(inserts) + len(updates),
+        "created": len(inserts),
+        "updated": len(updates),
+        "stale": stale,
+        "rejected": rejected
+    }
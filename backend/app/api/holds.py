@@ -0,0 +1,155 @@
+import uuid
+from datetime import datetime, timedelta
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import and_, delete, or_, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.database import get_db
+from app.core.hold_sweeper import hold_sweeper
+from app.core.metrics import BOOKINGS_TOTAL
+from app.models.user import User
+from app.models.hold import SeatHold
+from app.models.reservation import Reservation, ReservationStatus
+from app.schemas.hold import SeatHold as SeatHoldSchema, SeatHoldCreate
+from app.api.auth import get_current_user
+from app.api.reservations import reservation_response, check_bookable
+from app.utils.bus_seats import generate_seat_numbers, SEAT_NUMBER_PATTERN
+from app.schedule import trip_schedule
+from app import queries
+
+router = APIRouter()
+
+@router.post("/", response_model=SeatHoldSchema)
+async def create_hold(
+    hold_data: SeatHoldCreate,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    seat_numbers = sorted(set(hold_data.seat_numbers))
+    if not seat_numbers:
+        raise HTTPException(status_code=400, detail="No seats selected")
+    if len(seat_numbers) > settings.SEAT_HOLD_MAX_SEATS:
+        raise HTTPException(status_code=400, detail=f"At most {settings.SEAT_HOLD_MAX_SEATS} seats can be held at once")
+
+    bus = queries.bus_by_id(db, hold_data.bus_id)
+    if not bus:
+        raise HTTPException(status_code=404, detail="Bus not found")
+
+    if not trip_schedule.scheduled_trip(db, bus.id, hold_data.reservation_date):
+        raise HTTPException(status_code=409, detail="This bus does not run on that date")
+
+    if queries.open_lottery_id(db, bus.id, hold_data.reservation_date):
+        raise HTTPException(status_code=409, detail="This departure is allocated by lottery. Please enter the lottery")
+
+    # 예약 API 가 받지 않는 좌석은 잡아 둬도 확정할 수 없다
+    valid_seats = {seat for seat in generate_seat_numbers(bus.total_seats) if SEAT_NUMBER_PATTERN.match(seat)}
+    invalid_seats = [seat for seat in seat_numbers if seat not in valid_seats]
+    if invalid_seats:
+        raise HTTPException(status_code=400, detail=f"Invalid seat numbers: {invalid_seats}")
+
+    reserved_seats = queries.taken_seat_numbers(db, bus.id, hold_data.reservation_date, seat_numbers)
+    if reserved_seats:
+        raise HTTPException(status_code=400, detail=f"Seats already reserved: {reserved_seats}")
+
+    now = datetime.utcnow()
+    # 같은 버스/날짜에 잡아 둔 내 이전 홀드는 새 선택으로 대체하고, 요청 좌석의 만료된 홀드는 여기서 정리
+    db.execute(delete(SeatHold).where(
+        SeatHold.bus_id == bus.id,
+        SeatHold.reservation_date == hold_data.reservation_date,
+        or_(
+            SeatHold.user_id == current_user.id,
+            and_(SeatHold.seat_number.in_(seat_numbers), SeatHold.expires_at <= now),
+        ),
+    ))
+
+    hold_id = uuid.uuid4().hex
+    expires_at = now + timedelta(seconds=settings.SEAT_HOLD_TTL_SECONDS)
+    db.add_all([
+        SeatHold(hold_id=hold_id, user_id=current_user.id, bus_id=bus.id, seat_number=seat_number,
+                 reservation_date=hold_data.reservation_date, expires_at=expires_at)
+        for seat_number in seat_numbers
+    ])
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        held_seats = queries.seats_held_by_others(
+            db, bus.id, hold_data.reservation_date, seat_numbers, current_user.id, now
+        )
+        raise HTTPException(status_code=400, detail=f"Seats are being held by another user: {held_seats}")
+
+    hold_sweeper.schedule(hold_id, expires_at)
+
+    return {
+        "hold_id": hold_id,
+        "bus_id": bus.id,
+        "reservation_date": hold_data.reservation_date,
+        "seat_numbers": seat_numbers,
+        "expires_at": expires_at,
+        "ttl_seconds": settings.SEAT_HOLD_TTL_SECONDS
+    }
+
+@router.post("/{hold_id}/confirm")
+async def confirm_hold(
+    hold_id: str,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    holds = db.execute(
+        select(SeatHold).where(SeatHold.hold_id == hold_id, SeatHold.user_id == current_user.id)
+    ).scalars().all()
+    if not holds:
+        raise HTTPException(status_code=404, detail="Seat hold not found")
+
+    if holds[0].expires_at <= datetime.utcnow():
+        for hold in holds:
+            db.delete(hold)
+        db.commit()
+        raise HTTPException(status_code=410, detail="Seat hold has expired")
+
+    bus = queries.bus_by_id(db, holds[0].bus_id)
+    reservation_date = holds[0].reservation_date
+    seat_numbers = [hold.seat_number for hold in holds]
+
+    # 홀드 이후에 운행이 취소되었거나 추첨이 열렸을 수 있고, 관리자 직접 예약 등 홀드를 거치지 않은 예약과
+    # 겹칠 수 있으므로 바로 예약과 같은 확인을 다시 한다
+    trip = check_bookable(db, bus, reservation_date, seat_numbers, current_user.id)
+
+    created_reservations = []
+    for hold in holds:
+        reservation = Reservation(
+            user_id=current_user.id,
+            bus_id=bus.id,
+            seat_number=hold.seat_number,
+            reservation_date=reservation_date,
+            status=ReservationStatus.CONFIRMED
+        )
+        db.add(reservation)
+        created_reservations.append(reservation)
+        db.delete(hold)
+
+    db.commit()
+    BOOKINGS_TOTAL.inc("success")
+
+    result = []
+    for reservation in created_reservations:
+        db.refresh(reservation)
+        result.append(reservation_response(reservation, bus, current_user, trip))
+
+    return result
+
+@router.delete("/{hold_id}")
+async def release_hold(
+    hold_id: str,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    deleted = db.execute(
+        delete(SeatHold).where(SeatHold.hold_id == hold_id, SeatHold.user_id == current_user.id)
+    ).rowcount
+    if not deleted:
+        raise HTTPException(status_code=404, detail="Seat hold not found")
+    db.commit()
+
+    return {"message": "Seat hold released"}
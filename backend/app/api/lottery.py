@@ -0,0 +1,179 @@
+from datetime import date, datetime
+from typing import List
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import delete, func, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from app.core.database import get_db, get_read_db
+from app.core.metrics import LOTTERY_ENTRIES_TOTAL
+from app.models.user import User
+from app.models.lottery import Lottery, LotteryEntry, LotteryStatus, LotteryEntryStatus
+from app.schemas.lottery import (
+    Lottery as LotterySchema, LotteryCreate,
+    LotteryEntry as LotteryEntrySchema, LotteryEntryCreate,
+)
+from app.api.auth import get_current_user, get_read_user
+from app.api.admin import require_admin
+from app.lottery import draw_lottery
+from app.schedule import trip_schedule
+from app import queries
+
+router = APIRouter()
+
+def _entry_count(db: Session, lottery_id: int):
+    return db.execute(
+        select(func.count(LotteryEntry.id)).where(LotteryEntry.lottery_id == lottery_id)
+    ).scalar_one()
+
+def _lottery_response(db: Session, lottery: Lottery):
+    return {
+        "id": lottery.id,
+        "bus_id": lottery.bus_id,
+        "reservation_date": lottery.reservation_date,
+        "closes_at": lottery.closes_at,
+        "max_seats_per_entry": lottery.max_seats_per_entry,
+        "status": lottery.status,
+        "drawn_at": lottery.drawn_at,
+        "entry_count": _entry_count(db, lottery.id)
+    }
+
+@router.post("/", response_model=LotterySchema)
+async def create_lottery(
+    lottery_data: LotteryCreate,
+    current_user: User = Depends(require_admin),
+    db: Session = Depends(get_db)
+):
+    if lottery_data.reservation_date < date.today():
+        raise HTTPException(status_code=400, detail="Cannot open a lottery for a past date")
+    if lottery_data.closes_at.replace(tzinfo=None) <= datetime.utcnow():
+        raise HTTPException(status_code=400, detail="closes_at must be in the future")
+    if lottery_data.max_seats_per_entry < 1:
+        raise HTTPException(status_code=400, detail="max_seats_per_entry must be at least 1")
+
+    bus = queries.bus_by_id(db, lottery_data.bus_id)
+    if not bus:
+        raise HTTPException(status_code=404, detail="Bus not found")
+    if not trip_schedule.scheduled_trip(db, bus.id, lottery_data.reservation_date):
+        raise HTTPException(status_code=409, detail="This bus does not run on that date")
+
+    lottery = Lottery(
+        bus_id=bus.id,
+        reservation_date=lottery_data.reservation_date,
+        closes_at=lottery_data.closes_at.replace(tzinfo=None),
+        max_seats_per_entry=lottery_data.max_seats_per_entry,
+        status=LotteryStatus.OPEN,
+        created_by=current_user.id
+    )
+    db.add(lottery)
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(status_code=400, detail="A lottery already exists for this departure")
+    db.refresh(lottery)
+
+    return _lottery_response(db, lottery)
+
+@router.get("/", response_model=List[LotterySchema])
+async def get_open_lotteries(
+    db: Session = Depends(get_read_db)
+):
+    lotteries = db.execute(
+        select(Lottery).where(Lottery.status == LotteryStatus.OPEN).order_by(Lottery.closes_at)
+    ).scalars().all()
+    return [_lottery_response(db, lottery) for lottery in lotteries]
+
+@router.get("/{lottery_id}", response_model=LotterySchema)
+async def get_lottery(
+    lottery_id: int,
+    db: Session = Depends(get_read_db)
+):
+    lottery = db.get(Lottery, lottery_id)
+    if not lottery:
+        raise HTTPException(status_code=404, detail="Lottery not found")
+    return _lottery_response(db, lottery)
+
+@router.post("/{lottery_id}/draw")
+async def draw_lottery_now(
+    lottery_id: int,
+    current_user: User = Depends(require_admin),
+    db: Session = Depends(get_db)
+):
+    lottery = db.get(Lottery, lottery_id)
+    if not lottery:
+        raise HTTPException(status_code=404, detail="Lottery not found")
+
+    # 마감 전이라도 관리자가 바로 추첨할 수 있다
+    result = draw_lottery(db, lottery_id, force=True)
+    if result is None:
+        raise HTTPException(status_code=400, detail="Lottery has already been drawn")
+    return result
+
+@router.post("/{lottery_id}/entries", response_model=LotteryEntrySchema)
+async def enter_lottery(
+    lottery_id: int,
+    entry_data: LotteryEntryCreate,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    lottery = db.get(Lottery, lottery_id)
+    if not lottery:
+        raise HTTPException(status_code=404, detail="Lottery not found")
+    if lottery.status != LotteryStatus.OPEN or lottery.closes_at <= datetime.utcnow():
+        raise HTTPException(status_code=400, detail="Lottery is closed")
+    if not 1 <= entry_data.seat_count <= lottery.max_seats_per_entry:
+        raise HTTPException(status_code=400, detail=f"seat_count must be between 1 and {lottery.max_seats_per_entry}")
+
+    # 응모는 단순 INSERT. 중복 응모는 유니크 제약으로 막는다
+    entry = LotteryEntry(
+        lottery_id=lottery.id,
+        user_id=current_user.id,
+        seat_count=entry_data.seat_count,
+        status=LotteryEntryStatus.PENDING
+    )
+    db.add(entry)
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(status_code=400, detail="Already entered this lottery")
+    db.refresh(entry)
+    LOTTERY_ENTRIES_TOTAL.inc()
+
+    return entry
+
+@router.get("/{lottery_id}/entries/me", response_model=LotteryEntrySchema)
+async def get_my_lottery_entry(
+    lottery_id: int,
+    current_user: User = Depends(get_read_user),
+    db: Session = Depends(get_read_db)
+):
+    entry = db.execute(select(LotteryEntry).where(
+        LotteryEntry.lottery_id == lottery_id,
+        LotteryEntry.user_id == current_user.id,
+    )).scalar_one_or_none()
+    if not entry:
+        raise HTTPException(status_code=404, detail="Lottery entry not found")
+    return entry
+
+@router.delete("/{lottery_id}/entries/me")
+async def withdraw_lottery_entry(
+    lottery_id: int,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    lottery = db.get(Lottery, lottery_id)
+    if not lottery:
+        raise HTTPException(status_code=404, detail="Lottery not found")
+    if lottery.status != LotteryStatus.OPEN:
+        raise HTTPException(status_code=400, detail="Lottery is closed")
+
+    deleted = db.execute(delete(LotteryEntry).where(
+        LotteryEntry.lottery_id == lottery_id,
+        LotteryEntry.user_id == current_user.id,
+    )).rowcount
+    if not deleted:
+        raise HTTPException(status_code=404, detail="Lottery entry not found")
+    db.commit()
+
+    return {"message": "Lottery entry withdrawn"}
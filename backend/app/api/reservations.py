@@ -1,41 +1,143 @@
-import re
 from datetime import datetime, date
-from typing import List
+from typing import List, Optional
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from app.core.database import get_db
+from sqlalchemy import delete, select
+from sqlalchemy.orm import Session, selectinload
+from app.core.database import get_db, get_read_db
 from app.models.user import User
 from app.models.bus import Bus
-from app.models.reservation import Reservation, ReservationStatus
+from app.models.reservation import Reservation, ReservationSegment, ReservationStatus
+from app.models.hold import SeatHold
 from app.schemas.reservation import Reservation as ReservationSchema, ReservationCreate, ReservationUpdate
-from app.api.auth import get_current_user
+from app.schemas.user import User as UserSchema
+from app.schemas.bus import Bus as BusSchema
+from app.api.auth import get_current_user, get_read_user
+from app.core.metrics import BOOKINGS_TOTAL
+from app.core.serialization import FastJSONResponse, parse_fields, sparse
+from app.api.waitlist import promote_waitlist, notify_promotions
+from app.api.buses import trip_segments, parse_segment
+from app.utils.bus_seats import SEAT_NUMBER_PATTERN
+from app.schedule import trip_schedule
+from app import queries
 
 router = APIRouter()
 
+def reservation_response(reservation: Reservation, bus: Bus, user: User, trip=None):
+    # trip: 그 날짜의 운행 (운행별로 바뀐 출발 시각 반영)
+    departure_time = trip.departure_time if trip is not None else bus.departure_time
+    return {
+        "id": reservation.id,
+        "user_id": reservation.user_id,
+        "bus_id": reservation.bus_id,
+        "seat_number": reservation.seat_number,
+        "reservation_date": reservation.reservation_date.isoformat() if reservation.reservation_date else "",
+        "departure_time": departure_time.strftime("%H:%M"),
+        "status": reservation.status.value,
+        "bus_number": bus.bus_number,
+        "route": f"{bus.route.departure_location} → {bus.route.destination}" if bus.route else "",
+        "bus_type": bus.bus_type.value if bus.bus_type else "28-seat",
+        "full_name": user.full_name,
+        "phone": user.phone
+    }
+
+RESERVATION_FIELDS = tuple(ReservationSchema.model_fields)
+USER_RESERVATION_FIELDS = (
+    "id", "user_id", "bus_id", "seat_number", "reservation_date", "departure_time", "status",
+    "bus_number", "route", "bus_type", "full_name", "phone", "board_stop", "alight_stop",
+)
+
+
+def _nested(db, model, schema, ids, *options):
+    # 같은 사용자/버스는 예약마다 반복되므로 한 번씩만 읽고 검증한다
+    if not ids:
+        return {}
+    objects = db.query(model).options(*options).filter(model.id.in_(ids)).all()
+    return {obj.id: schema.model_validate(obj).model_dump(mode="json") for obj in objects}
+
+
+def check_bookable(db: Session, bus: Bus, reservation_date: date, seat_numbers, user_id: int,
+                   segment=None, inventory=None):
+    """
+    바로 예약과 홀드 확정이 같이 쓰는 예약 가능 확인. 그 날짜의 운행을 돌려준다.
+    segment/inventory: 구간 예약이면 (board_stop, alight_stop) 과 trip_segments 의 구간 재고.
+    """
+    # 운휴일이거나 취소된 운행은 예약할 수 없다
+    trip = trip_schedule.scheduled_trip(db, bus.id, reservation_date)
+    if trip is None:
+        raise HTTPException(status_code=409, detail="This bus does not run on that date")
+
+    # 추첨 모드인 운행은 응모로만 받는다
+    if queries.open_lottery_id(db, bus.id, reservation_date):
+        raise HTTPException(status_code=409, detail="This departure is allocated by lottery. Please enter the lottery")
+
+    # Check if seats are already reserved
+    if segment:
+        reserved_seats = [seat for seat in seat_numbers if not inventory.is_free(seat, *segment)]
+    else:
+        reserved_seats = queries.taken_seat_numbers(db, bus.id, reservation_date, seat_numbers)
+
+    if reserved_seats:
+        BOOKINGS_TOTAL.inc("conflict")
+        raise HTTPException(status_code=400, detail=f"Seats already reserved: {reserved_seats}")
+
+    # Check if seats are held by another user during checkout
+    held_seats = queries.seats_held_by_others(db, bus.id, reservation_date, seat_numbers, user_id, datetime.utcnow())
+    if held_seats:
+        BOOKINGS_TOTAL.inc("conflict")
+        raise HTTPException(status_code=400, detail=f"Seats are being held by another user: {held_seats}")
+
+    # Validate seat numbers (format: "1A", "2B", etc.)
+    invalid_seats = [seat for seat in seat_numbers if not SEAT_NUMBER_PATTERN.match(seat)]
+    if invalid_seats:
+        raise HTTPException(status_code=400, detail=f"Invalid seat numbers: {invalid_seats}")
+    return trip
+
+
 @router.get("/", response_model=List[ReservationSchema])
 async def get_reservations(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    fields: Optional[str] = None,
+    current_user: User = Depends(get_read_user),
+    db: Session = Depends(get_read_db)
 ):
+    selected = parse_fields(fields, RESERVATION_FIELDS) or list(RESERVATION_FIELDS)
+    query = (select(Reservation.__table__, ReservationSegment.board_stop, ReservationSegment.alight_stop)
+             .outerjoin(ReservationSegment, ReservationSegment.reservation_id == Reservation.id)
+             .order_by(Reservation.id))
     if current_user.role.value == "admin":
-        reservations = db.query(Reservation).all()
+        pass
     elif current_user.role.value == "driver":
         # 기사님은 자신이 담당하는 버스의 모든 예약을 볼 수 있음
-        reservations = db.query(Reservation).join(Bus).filter(Bus.driver_id == current_user.id).all()
+        query = query.join(Bus, Bus.id == Reservation.bus_id).where(Bus.driver_id == current_user.id)
     else:
         # 일반 사용자는 자신의 예약만
-        reservations = db.query(Reservation).filter(Reservation.user_id == current_user.id).all()
+        query = query.where(Reservation.user_id == current_user.id)
+
+    rows = db.execute(query).mappings().all()
+    users = _nested(db, User, UserSchema, {row["user_id"] for row in rows}) if "user" in selected else {}
+    buses = _nested(db, Bus, BusSchema, {row["bus_id"] for row in rows},
+                    selectinload(Bus.route)) if "bus" in selected else {}
 
-    return reservations
+    result = []
+    for row in rows:
+        item = {}
+        for name in selected:
+            if name == "user":
+                item[name] = users.get(row["user_id"])
+            elif name == "bus":
+                item[name] = buses.get(row["bus_id"])
+            else:
+                item[name] = row[name]
+        result.append(item)
+    return FastJSONResponse(result)
 
 @router.get("/user")
 async def get_user_reservations(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    fields: Optional[str] = None,
+    current_user: User = Depends(get_read_user),
+    db: Session = Depends(get_read_db)
 ):
-    reservations = db.query(Reservation).filter(
-        Reservation.user_id == current_user.id
-    ).join(Bus).all()
+    selected = parse_fields(fields, USER_RESERVATION_FIELDS)
+    reservations = queries.user_reservation_rows(db, current_user.id)
 
     result = []
     for reservation in reservations:
@@ -45,17 +147,20 @@ async def get_user_reservations(
             "bus_id": reservation.bus_id,
             "seat_number": reservation.seat_number,
             "reservation_date": reservation.reservation_date.isoformat() if reservation.reservation_date else "",
-            "departure_time": reservation.bus.departure_time.strftime("%H:%M") if reservation.bus else "",
+            "departure_time": reservation.departure_time.strftime("%H:%M"),
             "status": reservation.status.value if reservation.status else "confirmed",
-            "bus_number": reservation.bus.bus_number if reservation.bus else "",
-            "route": f"{reservation.bus.route.departure_location} → {reservation.bus.route.destination}" if reservation.bus and reservation.bus.route else "",
-            "bus_type": reservation.bus.bus_type.value if reservation.bus and reservation.bus.bus_type else "28-seat",
+            "bus_number": reservation.bus_number,
+            "route": f"{reservation.departure_location} → {reservation.destination}" if reservation.destination else "",
+            "bus_type": reservation.bus_type.value if reservation.bus_type else "28-seat",
             "full_name": current_user.full_name,
-            "phone": current_user.phone
+            "phone": current_user.phone,
+            # 구간 예약의 정류장 순번 (전 구간이면 None)
+            "board_stop": reservation.board_stop,
+            "alight_stop": reservation.alight_stop
         }
         result.append(reservation_data)
 
-    return result
+    return FastJSONResponse(sparse(result, selected))
 
 @router.post("/")
 async def create_reservation(
@@ -63,10 +168,8 @@ async def create_reservation(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    print(f"Received reservation data: {reservation_data}")  # Debug logging
-
     # Check if bus exists
-    bus = db.query(Bus).filter(Bus.id == reservation_data["bus_id"]).first()
+    bus = queries.bus_by_id(db, reservation_data["bus_id"])
     if not bus:
         raise HTTPException(status_code=404, detail="Bus not found")
 
@@ -79,23 +182,13 @@ async def create_reservation(
     except ValueError:
         raise HTTPException(status_code=400, detail="Invalid date format. Use YYYY-MM-DD")
 
-    # Check if seats are already reserved
-    existing_reservations = db.query(Reservation).filter(
-        Reservation.bus_id == reservation_data["bus_id"],
-        Reservation.seat_number.in_(seat_numbers),
-        Reservation.reservation_date == reservation_date,
-        Reservation.status == ReservationStatus.CONFIRMED
-    ).all()
-
-    if existing_reservations:
-        reserved_seats = [r.seat_number for r in existing_reservations]
-        raise HTTPException(status_code=400, detail=f"Seats already reserved: {reserved_seats}")
+    # 승차/하차 정류장을 주면 그 구간만 예약한다 (같은 좌석의 겹치지 않는 구간은 다른 승객이 쓸 수 있다)
+    segment = inventory = None
+    if reservation_data.get("board_stop") is not None or reservation_data.get("alight_stop") is not None:
+        stops, inventory = trip_segments(db, bus, reservation_date)
+        segment = parse_segment(stops, reservation_data.get("board_stop"), reservation_data.get("alight_stop"))
 
-    # Validate seat numbers (format: "1A", "2B", etc.)
-    valid_seat_pattern = re.compile(r'^\d+[A-D]$')
-    invalid_seats = [seat for seat in seat_numbers if not valid_seat_pattern.match(seat)]
-    if invalid_seats:
-        raise HTTPException(status_code=400, detail=f"Invalid seat numbers: {invalid_seats}")
+    trip = check_bookable(db, bus, reservation_date, seat_numbers, current_user.id, segment, inventory)
 
     # Create reservations
     created_reservations = []
@@ -109,36 +202,40 @@ async def create_reservation(
         )
         db.add(reservation)
         created_reservations.append(reservation)
+    if segment:
+        db.flush()
+        db.add_all([
+            ReservationSegment(reservation_id=reservation.id, board_stop=segment[0], alight_stop=segment[1])
+            for reservation in created_reservations
+        ])
 
+    # 자신의 홀드로 잡아 둔 좌석이면 홀드는 예약으로 대체
+    db.execute(delete(SeatHold).where(
+        SeatHold.user_id == current_user.id,
+        SeatHold.bus_id == reservation_data["bus_id"],
+        SeatHold.reservation_date == reservation_date,
+        SeatHold.seat_number.in_(seat_numbers),
+    ))
     db.commit()
+    BOOKINGS_TOTAL.inc("success")
 
     # Return reservation data in the format expected by frontend
     result = []
     for reservation in created_reservations:
         db.refresh(reservation)
-        reservation_data = {
-            "id": reservation.id,
-            "user_id": reservation.user_id,
-            "bus_id": reservation.bus_id,
-            "seat_number": reservation.seat_number,
-            "reservation_date": reservation.reservation_date.isoformat() if reservation.reservation_date else "",
-            "departure_time": bus.departure_time.strftime("%H:%M"),
-            "status": reservation.status.value,
-            "bus_number": bus.bus_number,
-            "route": f"{bus.route.departure_location} → {bus.route.destination}" if bus.route else "",
-            "bus_type": bus.bus_type.value if bus.bus_type else "28-seat",
-            "full_name": current_user.full_name,
-            "phone": current_user.phone
-        }
-        result.append(reservation_data)
+        item = reservation_response(reservation, bus, current_user, trip)
+        if segment:
+            item["board_stop"], item["alight_stop"] = segment
+            item["route"] = f"{stops[segment[0]]} → {stops[segment[1]]}"
+        result.append(item)
 
     return result
 
 @router.get("/{reservation_id}", response_model=ReservationSchema)
 async def get_reservation(
     reservation_id: int,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_read_user),
+    db: Session = Depends(get_read_db)
 ):
     reservation = db.query(Reservation).filter(Reservation.id == reservation_id).first()
     if not reservation:
@@ -166,12 +263,17 @@ async def update_reservation(
         raise HTTPException(status_code=403, detail="Not enough permissions")
     
     # Update reservation
+    promotions = []
     if reservation_update.status:
+        was_confirmed = reservation.status == ReservationStatus.CONFIRMED
         reservation.status = reservation_update.status
         if reservation_update.status == ReservationStatus.CANCELLED:
             reservation.cancelled_by = current_user.id
+            if was_confirmed:
+                promotions = promote_waitlist(db, reservation.bus_id, reservation.reservation_date, reservation.seat_number)
     
     db.commit()
+    notify_promotions(promotions)
     db.refresh(reservation)
     return reservation
 
@@ -189,8 +291,14 @@ async def cancel_reservation(
     if current_user.role.value != "admin" and reservation.user_id != current_user.id:
         raise HTTPException(status_code=403, detail="Not enough permissions")
     
+    was_confirmed = reservation.status == ReservationStatus.CONFIRMED
     reservation.status = ReservationStatus.CANCELLED
     reservation.cancelled_by = current_user.id
+    promotions = []
+    if was_confirmed:
+        # 빈 좌석은 같은 트랜잭션에서 대기열 맨 앞 사용자에게 배정
+        promotions = promote_waitlist(db, reservation.bus_id, reservation.reservation_date, reservation.seat_number)
     db.commit()
+    notify_promotions(promotions)
     
     return {"message": "Reservation cancelled successfully"}
\ No newline at end of file
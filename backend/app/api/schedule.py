@@ -0,0 +1,168 @@
+from datetime import date
+from typing import List
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import delete, select
+from sqlalchemy.orm import Session, selectinload
+from app.core.database import get_db, get_read_db
+from app.models.user import User
+from app.models.schedule import ServiceCalendar, ServiceException, BusService
+from app.schemas.schedule import (
+    ServiceCalendar as ServiceCalendarSchema, ServiceCalendarCreate, ServiceCalendarUpdate,
+    ServiceExceptionUpdate, BusServiceUpdate, TripUpdate,
+)
+from app.api.admin import require_admin, require_admin_read
+from app.schedule import trip_schedule
+from app import queries
+
+router = APIRouter()
+
+def _calendar(db: Session, calendar_id: int):
+    calendar = db.execute(
+        select(ServiceCalendar).options(selectinload(ServiceCalendar.exceptions))
+        .where(ServiceCalendar.id == calendar_id)
+    ).scalar_one_or_none()
+    if not calendar:
+        raise HTTPException(status_code=404, detail="Service calendar not found")
+    return calendar
+
+@router.get("/calendars", response_model=List[ServiceCalendarSchema])
+async def get_calendars(
+    current_user: User = Depends(require_admin_read),
+    db: Session = Depends(get_read_db)
+):
+    return db.execute(
+        select(ServiceCalendar).options(selectinload(ServiceCalendar.exceptions)).order_by(ServiceCalendar.id)
+    ).scalars().all()
+
+@router.post("/calendars", response_model=ServiceCalendarSchema)
+async def create_calendar(
+    calendar_data: ServiceCalendarCreate,
+    current_user: User = Depends(require_admin),
+    db: Session = Depends(get_db)
+):
+    calendar = ServiceCalendar(**calendar_data.dict())
+    db.add(calendar)
+    db.commit()
+    # 아직 연결된 버스가 없으므로 운행 인스턴스는 그대로 둔다
+    return _calendar(db, calendar.id)
+
+@router.put("/calendars/{calendar_id}", response_model=ServiceCalendarSchema)
+async def update_calendar(
+    calendar_id: int,
+    calendar_update: ServiceCalendarUpdate,
+    current_user: User = Depends(require_admin),
+    db: Session = Depends(get_db)
+):
+    calendar = _calendar(db, calendar_id)
+    for field, value in calendar_update.dict(exclude_unset=True).items():
+        setattr(calendar, field, value)
+    db.commit()
+    trip_schedule.invalidate()
+    return _calendar(db, calendar_id)
+
+@router.put("/calendars/{calendar_id}/exceptions/{service_date}", response_model=ServiceCalendarSchema)
+async def set_calendar_exception(
+    calendar_id: int,
+    service_date: date,
+    exception_data: ServiceExceptionUpdate,
+    current_user: User = Depends(require_admin),
+    db: Session = Depends(get_db)
+):
+    calendar = _calendar(db, calendar_id)
+    exception = next((item for item in calendar.exceptions if item.service_date == service_date), None)
+    if exception is None:
+        exception = ServiceException(calendar_id=calendar_id, service_date=service_date)
+        db.add(exception)
+    exception.runs = exception_data.runs
+    exception.note = exception_data.note
+    db.commit()
+    trip_schedule.invalidate()
+    return _calendar(db, calendar_id)
+
+@router.delete("/calendars/{calendar_id}/exceptions/{service_date}", response_model=ServiceCalendarSchema)
+async def delete_calendar_exception(
+    calendar_id: int,
+    service_date: date,
+    current_user: User = Depends(require_admin),
+    db: Session = Depends(get_db)
+):
+    _calendar(db, calendar_id)
+    db.execute(delete(ServiceException).where(
+        ServiceException.calendar_id == calendar_id,
+        ServiceException.service_date == service_date,
+    ))
+    db.commit()
+    trip_schedule.invalidate()
+    return _calendar(db, calendar_id)
+
+@router.put("/buses/{bus_id}")
+async def set_bus_calendar(
+    bus_id: int,
+    service_data: BusServiceUpdate,
+    current_user: User = Depends(require_admin),
+    db: Session = Depends(get_db)
+):
+    if not queries.bus_by_id(db, bus_id):
+        raise HTTPException(status_code=404, detail="Bus not found")
+    if service_data.calendar_id is not None:
+        _calendar(db, service_data.calendar_id)
+
+    service = db.get(BusService, bus_id)
+    if service_data.calendar_id is None:
+        if service is not None:
+            db.delete(service)
+    elif service is None:
+        db.add(BusService(bus_id=bus_id, calendar_id=service_data.calendar_id))
+    else:
+        service.calendar_id = service_data.calendar_id
+    db.commit()
+    trip_schedule.invalidate()
+    return {"bus_id": bus_id, "calendar_id": service_data.calendar_id}
+
+def _trip_response(trip, bus):
+    return {
+        "trip_id": trip.id,
+        "bus_id": bus.id,
+        "bus_number": bus.bus_number,
+        "route": f"{bus.departure_location} → {bus.destination}",
+        "departure_time": trip.departure_time.strftime("%H:%M"),
+        "arrival_time": trip.arrival_time.strftime("%H:%M"),
+        "total_seats": bus.total_seats
+    }
+
+@router.get("/trips")
+async def get_trips(
+    service_date: date = None,
+    db: Session = Depends(get_read_db)
+):
+    service_date = service_date or date.today()
+    trips = trip_schedule.trips_for(service_date)
+    buses = [bus for bus in queries.active_bus_rows(db) if bus.id in trips]
+    result = [_trip_response(trips[bus.id], bus) for bus in buses]
+    result.sort(key=lambda item: (item["departure_time"], item["bus_id"]))
+    return {"service_date": service_date, "trips": result}
+
+@router.put("/trips/{bus_id}/{service_date}")
+async def update_trip(
+    bus_id: int,
+    service_date: date,
+    trip_update: TripUpdate,
+    current_user: User = Depends(require_admin),
+    db: Session = Depends(get_db)
+):
+    bus = queries.bus_by_id(db, bus_id)
+    if not bus:
+        raise HTTPException(status_code=404, detail="Bus not found")
+
+    # 이 날짜만 바꾼다 (운행하지 않는 날이면 임시 운행을 추가)
+    trip = trip_schedule.override(db, bus, service_date, **trip_update.dict(exclude_none=True))
+    db.commit()
+    trip_schedule.forget(service_date)
+    return {
+        "trip_id": trip.id,
+        "bus_id": bus_id,
+        "service_date": service_date,
+        "departure_time": trip.departure_time.strftime("%H:%M"),
+        "arrival_time": trip.arrival_time.strftime("%H:%M"),
+        "status": trip.status.value
+    }
@@ -0,0 +1,190 @@
+from datetime import date, datetime, timedelta
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import and_, func, or_, select
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.database import get_read_db
+from app.models.user import User, UserRole
+from app.models.bus import Bus, BusRoute
+from app.models.reservation import Reservation, ReservationStatus
+from app.models.change import ChangeLog
+from app.models.schedule import Trip
+from app.api.auth import get_read_user
+
+router = APIRouter()
+
+CATALOG = ("bus", "route")
+
+def _scope(current_user: User):
+    # 버스/노선은 모두에게, 예약은 역할별 범위만
+    if current_user.role == UserRole.ADMIN:
+        return None
+    if current_user.role == UserRole.DRIVER:
+        own = (ChangeLog.entity == "reservation") & ChangeLog.bus_id.in_(
+            select(Bus.id).where(Bus.driver_id == current_user.id)
+        )
+    else:
+        own = (ChangeLog.entity == "reservation") & (ChangeLog.user_id == current_user.id)
+    return or_(ChangeLog.entity.in_(CATALOG), own)
+
+def _settled_cursor(db: Session):
+    """
+    이 번호 이하의 변경은 모두 커밋됐다고 볼 수 있는 커서. 번호는 INSERT 시점에 매겨지고 커밋은 그 뒤라서
+    최근 번호 사이에는 아직 보이지 않는 변경이 있을 수 있으므로, SYNC_SETTLE_SECONDS 보다 오래된 변경까지만
+    커서를 올린다 (트랜잭션이 그보다 짧다는 가정). 그 뒤의 변경은 다음 동기화에서 다시 보낸다.
+    """
+    cutoff = datetime.utcnow() - timedelta(seconds=settings.SYNC_SETTLE_SECONDS)
+    return db.execute(
+        select(ChangeLog.seq).where(ChangeLog.recorded_at <= cutoff).order_by(ChangeLog.seq.desc()).limit(1)
+    ).scalar_one_or_none() or 0
+
+def _reservation_rows(db: Session, ids):
+    if not ids:
+        return []
+    return db.execute(
+        select(
+            Reservation.id, Reservation.user_id, Reservation.bus_id, Reservation.seat_number,
+            Reservation.reservation_date, Reservation.status,
+            Bus.bus_number, Bus.bus_type,
+            func.coalesce(Trip.departure_time, Bus.departure_time).label("departure_time"),
+            BusRoute.departure_location, BusRoute.destination,
+            User.full_name, User.phone,
+        ).join(Bus, Reservation.bus_id == Bus.id)
+         .outerjoin(Trip, and_(Trip.bus_id == Reservation.bus_id, Trip.service_date == Reservation.reservation_date))
+         .outerjoin(BusRoute, Bus.route_id == BusRoute.id)
+         .join(User, Reservation.user_id == User.id)
+         .where(Reservation.id.in_(ids))
+    ).all()
+
+def _bus_rows(db: Session, ids):
+    # 버스 목록과 같이 시각은 오늘 운행 기준 (오늘 운행 행이 없으면 버스 시간표)
+    if not ids:
+        return []
+    today = date.today()
+    return db.execute(
+        select(
+            Bus.id, Bus.bus_number, Bus.route_id, Bus.driver_id, Bus.bus_type, Bus.total_seats,
+            func.coalesce(Trip.departure_time, Bus.departure_time).label("departure_time"),
+            func.coalesce(Trip.arrival_time, Bus.arrival_time).label("arrival_time"),
+            Bus.is_active,
+            BusRoute.departure_location, BusRoute.destination,
+        ).outerjoin(BusRoute, Bus.route_id == BusRoute.id)
+         .outerjoin(Trip, and_(Trip.bus_id == Bus.id, Trip.service_date == today))
+         .where(Bus.id.in_(ids))
+    ).all()
+
+def _route_rows(db: Session, ids):
+    if not ids:
+        return []
+    return db.execute(select(BusRoute).where(BusRoute.id.in_(ids))).scalars().all()
+
+@router.get("/")
+async def sync_changes(
+    since: int = None,
+    limit: int = None,
+    current_user: User = Depends(get_read_user),
+    db: Session = Depends(get_read_db)
+):
+    """
+    커서(since) 이후에 바뀐 예약/버스/노선만 돌려준다. 처음이거나 서버 데이터가 초기화되어 커서가 맞지 않으면
+    full_resync 로 알리고, 클라이언트는 목록을 전체 조회한 뒤 받은 cursor 부터 동기화한다.
+    취소된 예약, 비활성화되거나 지워진 버스/노선은 deleted 에 ID 만 담긴다.
+    """
+    limit = min(limit or settings.SYNC_PAGE_SIZE, settings.SYNC_PAGE_SIZE)
+    if limit < 1:
+        raise HTTPException(status_code=400, detail="limit must be positive")
+    settled = _settled_cursor(db)
+
+    if since is None or since < 0:
+        return {"cursor": settled, "full_resync": True, "has_more": False}
+    latest = db.execute(select(func.max(ChangeLog.seq))).scalar_one() or 0
+    if since > latest:
+        return {"cursor": settled, "full_resync": True, "has_more": False}
+
+    # 커서 이후 범위만 PK 인덱스로 읽는다
+    stmt = select(ChangeLog.seq, ChangeLog.entity, ChangeLog.entity_id).where(ChangeLog.seq > since)
+    scope = _scope(current_user)
+    if scope is not None:
+        stmt = stmt.where(scope)
+    changes = db.execute(stmt.order_by(ChangeLog.seq).limit(limit + 1)).all()
+    has_more = len(changes) > limit
+    changes = changes[:limit]
+
+    cursor = max(min(settled, changes[-1].seq) if has_more else settled, since)
+    # 남은 변경이 아직 정착 전이면 지금 다시 불러도 같은 페이지이므로 다음 주기로 미룬다
+    has_more = has_more and cursor > since
+
+    changed = {"reservation": set(), "bus": set(), "route": set()}
+    for change in changes:
+        changed[change.entity].add(change.entity_id)
+
+    deleted = {"reservations": [], "buses": [], "routes": []}
+
+    reservations = []
+    found = set()
+    for row in _reservation_rows(db, changed["reservation"]):
+        found.add(row.id)
+        if row.status == ReservationStatus.CANCELLED:
+            deleted["reservations"].append(row.id)
+            continue
+        reservations.append({
+            "id": row.id,
+            "user_id": row.user_id,
+            "bus_id": row.bus_id,
+            "seat_number": row.seat_number,
+            "reservation_date": row.reservation_date.isoformat(),
+            "departure_time": row.departure_time.strftime("%H:%M"),
+            "status": row.status.value,
+            "bus_number": row.bus_number,
+            "route": f"{row.departure_location} → {row.destination}" if row.destination else "",
+            "bus_type": row.bus_type.value if row.bus_type else "28-seat",
+            "full_name": row.full_name,
+            "phone": row.phone
+        })
+    deleted["reservations"].extend(sorted(changed["reservation"] - found))
+
+    buses = []
+    found = set()
+    for row in _bus_rows(db, changed["bus"]):
+        found.add(row.id)
+        if not row.is_active:
+            deleted["buses"].append(row.id)
+            continue
+        buses.append({
+            "id": row.id,
+            "bus_number": row.bus_number,
+            "route_id": row.route_id,
+            "driver_id": row.driver_id,
+            "route": f"{row.departure_location} → {row.destination}" if row.destination else "",
+            "departure_time": row.departure_time.strftime("%H:%M"),
+            "arrival_time": row.arrival_time.strftime("%H:%M"),
+            "destination": row.destination or "",
+            "bus_type": f"{row.total_seats}-seat",
+            "total_seats": row.total_seats
+        })
+    deleted["buses"].extend(sorted(changed["bus"] - found))
+
+    routes = []
+    found = set()
+    for route in _route_rows(db, changed["route"]):
+        found.add(route.id)
+        if not route.is_active:
+            deleted["routes"].append(route.id)
+            continue
+        routes.append({
+            "id": route.id,
+            "name": route.name,
+            "departure_location": route.departure_location,
+            "destination": route.destination
+        })
+    deleted["routes"].extend(sorted(changed["route"] - found))
+
+    return {
+        "cursor": cursor,
+        "full_resync": False,
+        "has_more": has_more,
+        "reservations": reservations,
+        "buses": buses,
+        "routes": routes,
+        "deleted": deleted
+    }
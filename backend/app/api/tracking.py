@@ -0,0 +1,118 @@
+import asyncio
+from datetime import date
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy import exists, select
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.database import get_db, get_read_db, BATCH_SESSION_KEY
+from app.core.events import format_sse
+from app.models.user import User, UserRole
+from app.models.reservation import Reservation, ReservationStatus
+from app.schemas.location import LocationBatch
+from app.api.auth import get_current_user, get_read_user
+from app.tracking import location_tracker
+
+router = APIRouter()
+
+KEEPALIVE_SECONDS = 15
+
+def _release(request: Request, db: Session):
+    # 배치 하위 요청이면 배치가 연 세션(같은 스냅샷)을 다른 하위 요청도 쓰므로 닫지 않는다
+    if request.scope.get(BATCH_SESSION_KEY) is not db:
+        db.close()
+
+def _can_follow(db: Session, user: User, bus_id: int, driver_id):
+    # 오늘 이 버스를 타는 승객, 담당 기사, 관리자만 위치를 볼 수 있다
+    if user.role == UserRole.ADMIN or user.id == driver_id:
+        return True
+    return db.execute(select(exists().where(
+        Reservation.user_id == user.id,
+        Reservation.bus_id == bus_id,
+        Reservation.reservation_date == date.today(),
+        Reservation.status == ReservationStatus.CONFIRMED,
+    ))).scalar()
+
+@router.post("/locations")
+async def ingest_locations(
+    batch: LocationBatch,
+    request: Request,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    기사 단말이 몇 초마다 모아 보내는 GPS 위치. DB 에는 바로 쓰지 않고 모아서 쓴다 (app/tracking.py).
+    같은 배치를 다시 보내도 이미 받은 시각의 위치는 stale 로 건너뛴다.
+    """
+    if current_user.role not in (UserRole.DRIVER, UserRole.ADMIN):
+        raise HTTPException(status_code=403, detail="Only drivers can access this endpoint")
+    if not batch.pings:
+        raise HTTPException(status_code=400, detail="No locations")
+    if len(batch.pings) > settings.TRACKING_MAX_PINGS:
+        raise HTTPException(status_code=400, detail=f"At most {settings.TRACKING_MAX_PINGS} locations per request")
+
+    info = location_tracker.bus_info(db, batch.bus_id)
+    if info is None:
+        raise HTTPException(status_code=404, detail="Bus not found")
+    if current_user.role == UserRole.DRIVER and info.driver_id != current_user.id:
+        raise HTTPException(status_code=403, detail="Not your bus")
+    # 인증/버스 조회에 쓴 커넥션은 바로 반납 (이후는 메모리에서만 처리)
+    _release(request, db)
+
+    accepted, stale, invalid, snapshot = location_tracker.ingest(batch.bus_id, current_user.id, info, batch.pings)
+    return {
+        "accepted": accepted,
+        "stale": stale,
+        "invalid": invalid,
+        "eta_seconds": snapshot["eta_seconds"] if snapshot else None
+    }
+
+@router.get("/buses/{bus_id}")
+async def get_bus_location(
+    bus_id: int,
+    current_user: User = Depends(get_read_user),
+    db: Session = Depends(get_read_db)
+):
+    info = location_tracker.bus_info(db, bus_id)
+    if info is None:
+        raise HTTPException(status_code=404, detail="Bus not found")
+    if not _can_follow(db, current_user, bus_id, info.driver_id):
+        raise HTTPException(status_code=403, detail="Only riders of this bus can see its location")
+
+    snapshot = location_tracker.latest(db, bus_id, info)
+    if snapshot is None:
+        raise HTTPException(status_code=404, detail="No location reported yet")
+    return snapshot
+
+@router.get("/buses/{bus_id}/stream")
+async def stream_bus_location(
+    bus_id: int,
+    request: Request,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    info = location_tracker.bus_info(db, bus_id)
+    if info is None:
+        raise HTTPException(status_code=404, detail="Bus not found")
+    if not _can_follow(db, current_user, bus_id, info.driver_id):
+        raise HTTPException(status_code=403, detail="Only riders of this bus can see its location")
+    snapshot = location_tracker.latest(db, bus_id, info)
+    # 스트림이 열려 있는 동안 DB 커넥션을 잡고 있지 않도록 미리 반납
+    _release(request, db)
+
+    async def stream():
+        with location_tracker.broker.subscribe(bus_id) as queue:
+            yield ": connected\n\n"
+            if snapshot is not None:
+                yield format_sse("location", snapshot)
+            while True:
+                try:
+                    # 트래커가 직렬화해 둔 SSE 메시지를 그대로 보낸다
+                    _, message = await asyncio.wait_for(queue.get(), timeout=KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                yield message
+
+    return StreamingResponse(stream(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
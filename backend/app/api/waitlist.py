@@ -0,0 +1,230 @@
+import asyncio
+from datetime import date, datetime
+from typing import List
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+from app.core.database import get_db, get_read_db
+from app.core.events import event_broker, format_sse
+from app.core.metrics import WAITLIST_PROMOTIONS_TOTAL
+from app.models.user import User
+from app.models.reservation import Reservation, ReservationStatus
+from app.models.waitlist import WaitlistEntry, WaitlistStatus
+from app.schemas.waitlist import WaitlistEntry as WaitlistEntrySchema, WaitlistJoin
+from app.api.auth import get_current_user, get_read_user
+from app.api.buses import trip_segments, parse_segment
+from app.utils.bus_seats import generate_seat_numbers
+from app.schedule import trip_schedule
+from app import queries
+
+router = APIRouter()
+
+KEEPALIVE_SECONDS = 15
+
+def _seat_list(value):
+    return [seat for seat in (value or "").split(",") if seat]
+
+def _position(db: Session, entry: WaitlistEntry):
+    if entry.status != WaitlistStatus.WAITING:
+        return None
+    ahead = db.execute(select(func.count(WaitlistEntry.id)).where(
+        WaitlistEntry.bus_id == entry.bus_id,
+        WaitlistEntry.reservation_date == entry.reservation_date,
+        WaitlistEntry.status == WaitlistStatus.WAITING,
+        WaitlistEntry.id < entry.id,
+    )).scalar_one()
+    return ahead + 1
+
+def _entry_response(db: Session, entry: WaitlistEntry):
+    return {
+        "id": entry.id,
+        "bus_id": entry.bus_id,
+        "reservation_date": entry.reservation_date,
+        "preferred_seats": _seat_list(entry.preferred_seats),
+        "status": entry.status,
+        "position": _position(db, entry),
+        "reservation_id": entry.reservation_id,
+        "seat_number": entry.reservation.seat_number if entry.reservation else None,
+        "created_at": entry.created_at,
+        "promoted_at": entry.promoted_at
+    }
+
+def promote_waitlist(db: Session, bus_id: int, reservation_date: date, freed_seat: str):
+    """
+    취소로 비게 된 좌석을 대기열 맨 앞 사용자에게 같은 트랜잭션 안에서 배정한다. 대기자의 선호 좌석 중
+    빈 좌석이 있으면 그 좌석을, 없으면 빈 좌석을 준다. 선호 좌석을 줬다면 빈 좌석은 다음 대기자에게 넘어간다.
+    그 운행의 확정 예약이 이미 있는 대기자는 건너뛰고 대기를 취소한다.
+    커밋은 호출한 쪽이 하고, 커밋 후 notify_promotions 로 알린다.
+    """
+    promotions = []
+    if reservation_date < date.today():
+        return promotions
+
+    # 취소된 좌석이 쿼리에 반영되도록
+    db.flush()
+    # 구간 예약을 취소했으면 같은 좌석의 다른 구간이 아직 차 있을 수 있다 (대기열은 전 구간 좌석만 배정)
+    if queries.taken_seat_numbers(db, bus_id, reservation_date, [freed_seat]):
+        return promotions
+    while freed_seat:
+        entry = db.execute(
+            select(WaitlistEntry).where(
+                WaitlistEntry.bus_id == bus_id,
+                WaitlistEntry.reservation_date == reservation_date,
+                WaitlistEntry.status == WaitlistStatus.WAITING,
+            ).order_by(WaitlistEntry.id).limit(1).with_for_update(skip_locked=True)
+        ).scalar_one_or_none()
+        if entry is None:
+            break
+        # 기다리는 동안 같은 운행을 직접 예약했으면 대기는 끝난 것으로 두고 다음 대기자에게 넘긴다
+        if queries.has_confirmed_reservation(db, entry.user_id, bus_id, reservation_date):
+            entry.status = WaitlistStatus.CANCELLED
+            db.flush()
+            continue
+
+        seat_number = freed_seat
+        preferred = _seat_list(entry.preferred_seats)
+        if preferred and freed_seat not in preferred:
+            unavailable = set(queries.taken_seat_numbers(db, bus_id, reservation_date, preferred))
+            unavailable.update(queries.seats_held_by_others(
+                db, bus_id, reservation_date, preferred, entry.user_id, datetime.utcnow()
+            ))
+            free_preferred = [seat for seat in preferred if seat not in unavailable]
+            if free_preferred:
+                seat_number = free_preferred[0]
+
+        reservation = Reservation(
+            user_id=entry.user_id,
+            bus_id=bus_id,
+            seat_number=seat_number,
+            reservation_date=reservation_date,
+            status=ReservationStatus.CONFIRMED
+        )
+        db.add(reservation)
+        db.flush()
+        entry.status = WaitlistStatus.PROMOTED
+        entry.reservation_id = reservation.id
+        entry.promoted_at = datetime.utcnow()
+        db.flush()
+        promotions.append({
+            "user_id": entry.user_id,
+            "entry_id": entry.id,
+            "reservation_id": reservation.id,
+            "bus_id": bus_id,
+            "reservation_date": reservation_date.isoformat(),
+            "seat_number": seat_number
+        })
+        WAITLIST_PROMOTIONS_TOTAL.inc()
+        freed_seat = freed_seat if seat_number != freed_seat else None
+
+    return promotions
+
+def notify_promotions(promotions):
+    for promotion in promotions:
+        event_broker.publish(promotion["user_id"], "waitlist_promoted", promotion)
+
+@router.post("/", response_model=WaitlistEntrySchema)
+async def join_waitlist(
+    waitlist_data: WaitlistJoin,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    if waitlist_data.reservation_date < date.today():
+        raise HTTPException(status_code=400, detail="Cannot join the waitlist for a past date")
+
+    bus = queries.bus_by_id(db, waitlist_data.bus_id)
+    if not bus:
+        raise HTTPException(status_code=404, detail="Bus not found")
+
+    # 추첨 전에는 응모로, 낙첨자는 추첨 작업이 대기열에 넣는다
+    if not trip_schedule.scheduled_trip(db, bus.id, waitlist_data.reservation_date):
+        raise HTTPException(status_code=409, detail="This bus does not run on that date")
+
+    if queries.open_lottery_id(db, bus.id, waitlist_data.reservation_date):
+        raise HTTPException(status_code=409, detail="This departure is allocated by lottery. Please enter the lottery")
+
+    preferred_seats = list(dict.fromkeys(waitlist_data.preferred_seats))
+    valid_seats = set(generate_seat_numbers(bus.total_seats))
+    invalid_seats = [seat for seat in preferred_seats if seat not in valid_seats]
+    if invalid_seats:
+        raise HTTPException(status_code=400, detail=f"Invalid seat numbers: {invalid_seats}")
+
+    # 타려는 구간에 빈 좌석이 있으면 대기할 필요 없이 바로 예약
+    stops, inventory = trip_segments(db, bus, waitlist_data.reservation_date)
+    board_stop, alight_stop = parse_segment(stops, waitlist_data.board_stop, waitlist_data.alight_stop) \
+        or (0, inventory.segment_count)
+    held = set(queries.held_seat_numbers(db, bus.id, waitlist_data.reservation_date, datetime.utcnow()))
+    if any(seat not in held for seat in inventory.free_seats(board_stop, alight_stop)):
+        raise HTTPException(status_code=400, detail="Seats are available for this bus. Please book directly")
+
+    existing = db.execute(select(WaitlistEntry.id).where(
+        WaitlistEntry.user_id == current_user.id,
+        WaitlistEntry.bus_id == bus.id,
+        WaitlistEntry.reservation_date == waitlist_data.reservation_date,
+        WaitlistEntry.status == WaitlistStatus.WAITING,
+    )).first()
+    if existing:
+        raise HTTPException(status_code=400, detail="Already on the waitlist for this bus")
+
+    entry = WaitlistEntry(
+        user_id=current_user.id,
+        bus_id=bus.id,
+        reservation_date=waitlist_data.reservation_date,
+        preferred_seats=",".join(preferred_seats) or None,
+        status=WaitlistStatus.WAITING
+    )
+    db.add(entry)
+    db.commit()
+    db.refresh(entry)
+
+    return _entry_response(db, entry)
+
+@router.get("/me", response_model=List[WaitlistEntrySchema])
+async def get_my_waitlist(
+    current_user: User = Depends(get_read_user),
+    db: Session = Depends(get_read_db)
+):
+    entries = db.execute(
+        select(WaitlistEntry).where(WaitlistEntry.user_id == current_user.id).order_by(WaitlistEntry.id.desc())
+    ).scalars().all()
+    return [_entry_response(db, entry) for entry in entries]
+
+@router.delete("/{entry_id}")
+async def leave_waitlist(
+    entry_id: int,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    entry = db.get(WaitlistEntry, entry_id)
+    if not entry or entry.user_id != current_user.id:
+        raise HTTPException(status_code=404, detail="Waitlist entry not found")
+    if entry.status != WaitlistStatus.WAITING:
+        raise HTTPException(status_code=400, detail="Waitlist entry is no longer waiting")
+
+    entry.status = WaitlistStatus.CANCELLED
+    db.commit()
+
+    return {"message": "Left the waitlist"}
+
+@router.get("/events")
+async def waitlist_events(
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    user_id = current_user.id
+    # 스트림이 열려 있는 동안 DB 커넥션을 잡고 있지 않도록 미리 반납
+    db.close()
+
+    async def stream():
+        with event_broker.subscribe(user_id) as queue:
+            yield ": connected\n\n"
+            while True:
+                try:
+                    event_type, data = await asyncio.wait_for(queue.get(), timeout=KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                yield format_sse(event_type, data)
+
+    return StreamingResponse(stream(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
@@ -0,0 +1,80 @@
+"""
+변경 기록 (델타 동기화용)
+
+reservations / buses / bus_routes 에 쓰기가 일어날 때마다 같은 트랜잭션에서 change_log 에 한 줄을 남긴다.
+ORM 단위 작업(add, 속성 변경, delete)은 SessionLocal 의 after_flush 리스너가 자동으로 기록하고, 플러시를
+거치지 않는 일괄 INSERT/UPDATE 는 insert_tracked / record_changes 로 직접 기록한다.
+
+로그에는 "무엇이 바뀌었는지"만 남기고 내용은 남기지 않는다. 동기화 시 현재 행을 읽어 보내고, 행이 없거나
+취소/비활성 상태면 삭제 표시(tombstone)로 보낸다.
+"""
+from datetime import datetime
+from sqlalchemy import event, insert
+from app.core.database import SessionLocal
+from app.core.outbox import enqueue_reservations
+from app.models.change import ChangeLog
+from app.models.reservation import Reservation
+from app.models.bus import Bus, BusRoute
+
+# 모델 → (엔티티 이름, 소유자 user_id, bus_id) 추출기
+TRACKED = {
+    Reservation: ("reservation", lambda row: row.user_id, lambda row: row.bus_id),
+    Bus: ("bus", lambda row: None, lambda row: row.id),
+    BusRoute: ("route", lambda row: None, lambda row: None),
+}
+
+
+def _change_rows(model, rows, now):
+    entity, user_of, bus_of = TRACKED[model]
+    return [{
+        "entity": entity,
+        "entity_id": row.id,
+        "user_id": user_of(row),
+        "bus_id": bus_of(row),
+        "recorded_at": now,
+    } for row in rows]
+
+
+def record_changes(session, model, rows):
+    """rows: id(와 예약이면 user_id, bus_id) 속성을 가진 객체/Row 목록."""
+    values = _change_rows(model, rows, datetime.utcnow())
+    if values:
+        session.execute(insert(ChangeLog), values)
+
+
+def insert_tracked(session, model, rows):
+    """
+    일괄 INSERT 후 만들어진 행을 변경 기록(과 예약이면 아웃박스)에 남긴다. RETURNING 을 못 쓰는 DB면
+    ORM 경로로 넣어 플러시 리스너가 기록하게 한다.
+    """
+    if not rows:
+        return
+    if session.get_bind().dialect.insert_executemany_returning:
+        if model is Reservation:
+            returning = [Reservation.id, Reservation.user_id, Reservation.bus_id, Reservation.seat_number,
+                         Reservation.reservation_date, Reservation.status]
+        else:
+            returning = [model.id]
+        created = session.execute(insert(model).returning(*returning), rows).all()
+        record_changes(session, model, created)
+        if model is Reservation:
+            enqueue_reservations(session, "reservation.created", created)
+    else:
+        session.add_all([model(**row) for row in rows])
+        session.flush()
+
+
+@event.listens_for(SessionLocal, "after_flush")
+def _record_flush_changes(session, flush_context):
+    changed = {}
+    for obj in list(session.new) + list(session.deleted):
+        if type(obj) in TRACKED:
+            changed.setdefault(type(obj), []).append(obj)
+    for obj in session.dirty:
+        if type(obj) in TRACKED and session.is_modified(obj, include_collections=False):
+            changed.setdefault(type(obj), []).append(obj)
+    if changed:
+        now = datetime.utcnow()
+        values = [value for model, objs in changed.items() for value in _change_rows(model, objs, now)]
+        # 플러시 도중이므로 세션이 아닌 커넥션으로 직접 INSERT
+        session.connection().execute(insert(ChangeLog.__table__), values)
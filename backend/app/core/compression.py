@@ -0,0 +1,98 @@
+"""
+응답 압축 (ASGI 미들웨어)
+
+Accept-Encoding 을 보고 brotli(설치된 경우) 또는 gzip 으로 COMPRESSION_MIN_BYTES 이상인 응답 본문을 압축한다.
+한 번에 끝나는 본문만 압축하고 스트리밍 응답(SSE 등)과 이미 인코딩된 응답은 그대로 보낸다.
+"""
+import gzip
+from app.core.config import settings
+
+try:
+    import brotli
+except ImportError:  # 선택 의존성
+    brotli = None
+
+SKIP_CONTENT_TYPES = ("text/event-stream", "image/", "application/octet-stream", "application/zip")
+
+
+def _accepted(headers):
+    accept = ""
+    for name, value in headers:
+        if name == b"accept-encoding":
+            accept = value.decode("latin-1").lower()
+            break
+    codings = {}
+    for part in accept.split(","):
+        coding, _, params = part.strip().partition(";")
+        quality = 1.0
+        if params.strip().startswith("q="):
+            try:
+                quality = float(params.strip()[2:])
+            except ValueError:
+                quality = 0.0
+        if coding:
+            codings[coding] = quality
+    return codings
+
+
+def choose_encoding(headers):
+    codings = _accepted(headers)
+    if brotli is not None and codings.get("br", 0) > 0:
+        return "br"
+    if codings.get("gzip", 0) > 0:
+        return "gzip"
+    return None
+
+
+def compress(body, encoding):
+    if encoding == "br":
+        return brotli.compress(body, quality=settings.COMPRESSION_BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=settings.COMPRESSION_GZIP_LEVEL)
+
+
+class CompressionMiddleware:
+    def __init__(self, app, minimum_size=None):
+        self.app = app
+        self.minimum_size = settings.COMPRESSION_MIN_BYTES if minimum_size is None else minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = choose_encoding(scope["headers"])
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start = None
+
+        async def send_compressed(message):
+            nonlocal start
+            if message["type"] == "http.response.start":
+                # 본문을 보기 전까지 헤더를 미룬다
+                start = message
+                return
+            if message["type"] != "http.response.body" or start is None:
+                await send(message)
+                return
+
+            pending, start = start, None
+            headers = list(pending.get("headers", []))
+            body = message.get("body", b"")
+            content_type = next((value for name, value in headers if name == b"content-type"), b"").decode("latin-1")
+            already_encoded = any(name == b"content-encoding" for name, _ in headers)
+            if (message.get("more_body", False) or already_encoded or len(body) < self.minimum_size
+                    or content_type.startswith(SKIP_CONTENT_TYPES)):
+                await send(pending)
+                await send(message)
+                return
+
+            compressed = compress(body, encoding)
+            headers = [(name, value) for name, value in headers if name != b"content-length"]
+            headers.append((b"content-encoding", encoding.encode()))
+            headers.append((b"content-length", str(len(compressed)).encode()))
+            headers.append((b"vary", b"Accept-Encoding"))
+            await send({**pending, "headers": headers})
+            await send({"type": "http.response.body", "body": compressed})
+
+        await self.app(scope, receive, send_compressed)
@@ -1,25 +1,234 @@
 import os
-from sqlalchemy import create_engine
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+from fastapi import Request
+from jose import jwt, JWTError
+from sqlalchemy import create_engine, event, insert
+from sqlalchemy.exc import DBAPIError, DisconnectionError, IntegrityError
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from .config import settings
+from .metrics import InstrumentedQueuePool, instrument_engine, DB_READ_ROUTING_TOTAL
 
-# Use environment variable or fall back to SQLite for development
-DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./bus_reservation.db")
+DATABASE_URL = settings.DATABASE_URL
 
-# SQLite specific connection args
-connect_args = {}
-if DATABASE_URL.startswith("sqlite"):
-    connect_args = {"check_same_thread": False}
+# fork 이후 자식 프로세스에서 풀을 새로 만들기 위해 생성한 엔진을 기록
+_engines = []
 
-engine = create_engine(DATABASE_URL, connect_args=connect_args)
+def is_sqlite(url: str) -> bool:
+    return url.startswith("sqlite")
+
+def is_memory_sqlite(url: str) -> bool:
+    return is_sqlite(url) and (":memory:" in url or url.rstrip("/") == "sqlite:")
+
+def _apply_sqlite_pragmas(config):
+    pragmas = [
+        f"PRAGMA journal_mode={config.SQLITE_JOURNAL_MODE}",
+        f"PRAGMA synchronous={config.SQLITE_SYNCHRONOUS}",
+        f"PRAGMA busy_timeout={int(config.SQLITE_BUSY_TIMEOUT_MS)}",
+        f"PRAGMA mmap_size={int(config.SQLITE_MMAP_SIZE)}",
+        f"PRAGMA cache_size={int(config.SQLITE_CACHE_SIZE)}",
+    ]
+
+    def on_connect(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for pragma in pragmas:
+                cursor.execute(pragma)
+        finally:
+            cursor.close()
+
+    return on_connect
+
+def _guard_process(engine):
+    # 다른 프로세스(fork 이전)에서 만든 커넥션은 재사용하지 않는다
+    @event.listens_for(engine, "connect")
+    def record_pid(dbapi_connection, connection_record):
+        connection_record.info["pid"] = os.getpid()
+
+    @event.listens_for(engine, "checkout")
+    def check_pid(dbapi_connection, connection_record, connection_proxy):
+        pid = os.getpid()
+        if connection_record.info.get("pid") != pid:
+            connection_record.dbapi_connection = connection_proxy.dbapi_connection = None
+            raise DisconnectionError(
+                f"Connection record belongs to pid {connection_record.info.get('pid')}, attempting to check out in pid {pid}"
+            )
+
+def create_db_engine(url: str, config=settings, name: str = "primary"):
+    connect_args = {}
+    engine_kwargs = {"pool_pre_ping": config.DB_POOL_PRE_PING}
+
+    if is_sqlite(url):
+        # SQLite specific connection args
+        connect_args["check_same_thread"] = False
+    elif url.startswith("postgresql") and config.DB_STATEMENT_TIMEOUT_MS:
+        connect_args["options"] = f"-c statement_timeout={int(config.DB_STATEMENT_TIMEOUT_MS)}"
+
+    if not is_memory_sqlite(url):
+        engine_kwargs.update(
+            poolclass=InstrumentedQueuePool,
+            pool_size=config.DB_POOL_SIZE,
+            max_overflow=config.DB_MAX_OVERFLOW,
+            pool_timeout=config.DB_POOL_TIMEOUT,
+            pool_recycle=config.DB_POOL_RECYCLE,
+            pool_logging_name=name,
+        )
+
+    engine = create_engine(url, connect_args=connect_args, **engine_kwargs)
+    if is_sqlite(url) and not is_memory_sqlite(url):
+        event.listen(engine, "connect", _apply_sqlite_pragmas(config))
+    _guard_process(engine)
+    instrument_engine(engine, name)
+    _engines.append(engine)
+    return engine
+
+def _dispose_engines_after_fork():
+    # gunicorn --preload 등으로 fork된 워커는 부모의 커넥션을 닫지 않고 버린 뒤 새 풀을 사용
+    for engine in _engines:
+        engine.dispose(close=False)
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_dispose_engines_after_fork)
+
+engine = create_db_engine(DATABASE_URL)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# 읽기 전용 엔드포인트용 replica. 설정이 없으면 primary를 그대로 사용
+replica_engine = create_db_engine(settings.DATABASE_REPLICA_URL, name="replica") if settings.DATABASE_REPLICA_URL else None
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=replica_engine) if replica_engine else None
+
 Base = declarative_base()
 
-def get_db():
+class ReadRouter:
+    """
+    read-your-writes: 최근에 쓰기를 커밋한 사용자(토큰 sub, 없으면 클라이언트 IP)의 읽기는
+    REPLICA_STICKY_SECONDS 동안 primary로 보낸다. replica 연결에 실패하면 REPLICA_RETRY_SECONDS 동안
+    모든 읽기를 primary로 보낸다.
+    """
+
+    def __init__(self, sticky_seconds: float, retry_seconds: float, max_keys: int = 100000):
+        self.sticky_seconds = sticky_seconds
+        self.retry_seconds = retry_seconds
+        self.max_keys = max_keys
+        # 키 -> 마지막 쓰기 시각, 오래된 것이 앞쪽. 커밋은 여러 스레드에서 오므로 쓰기는 잠금 안에서만 한다
+        self._last_write = OrderedDict()
+        self._lock = threading.Lock()
+        self._replica_down_until = 0.0
+
+    def mark_write(self, key: Optional[str]):
+        if not key:
+            return
+        now = time.monotonic()
+        cutoff = now - self.sticky_seconds
+        with self._lock:
+            self._last_write[key] = now
+            self._last_write.move_to_end(key)
+            # 앞쪽부터 끈끈함이 끝났거나 한도를 넘은 만큼 버린다 (키마다 한 번씩만 버려지므로 평균 O(1))
+            while self._last_write and (len(self._last_write) > self.max_keys
+                                        or next(iter(self._last_write.values())) <= cutoff):
+                self._last_write.popitem(last=False)
+
+    def is_sticky(self, key: Optional[str]) -> bool:
+        written_at = self._last_write.get(key) if key else None
+        return written_at is not None and time.monotonic() - written_at < self.sticky_seconds
+
+    def replica_available(self) -> bool:
+        return time.monotonic() >= self._replica_down_until
+
+    def mark_replica_down(self):
+        self._replica_down_until = time.monotonic() + self.retry_seconds
+
+read_router = ReadRouter(settings.REPLICA_STICKY_SECONDS, settings.REPLICA_RETRY_SECONDS)
+
+def sticky_key(request: Optional[Request]) -> Optional[str]:
+    if request is None:
+        return None
+    scheme, _, token = request.headers.get("authorization", "").partition(" ")
+    if scheme.lower() == "bearer" and token:
+        try:
+            # 라우팅 결정에만 쓰므로 서명 검증은 하지 않는다 (인증은 get_current_user가 담당)
+            subject = jwt.get_unverified_claims(token).get("sub")
+            if subject:
+                return f"user:{subject}"
+        except JWTError:
+            pass
+    return f"ip:{request.client.host}" if request.client else None
+
+@event.listens_for(SessionLocal, "after_flush")
+def _record_flush(session, flush_context):
+    session.info["wrote"] = True
+
+@event.listens_for(SessionLocal, "after_commit")
+def _record_commit(session):
+    if session.info.pop("wrote", False):
+        read_router.mark_write(session.info.get("sticky_key"))
+
+# /api/batch 하위 요청은 배치가 연 세션 하나를 같이 쓴다 (ASGI scope 로 전달)
+BATCH_SESSION_KEY = "batch.session"
+
+def _batch_session(request: Optional[Request]):
+    return request.scope.get(BATCH_SESSION_KEY) if request is not None else None
+
+def get_db(request: Request = None):
+    shared = _batch_session(request)
+    if shared is not None:
+        yield shared
+        return
     db = SessionLocal()
+    db.info["sticky_key"] = sticky_key(request)
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+def _open_read_session(request: Optional[Request]):
+    if ReadSessionLocal is None:
+        return SessionLocal(), "primary"
+    if not read_router.replica_available():
+        return SessionLocal(), "primary_fallback"
+    if read_router.is_sticky(sticky_key(request)):
+        return SessionLocal(), "primary_sticky"
+
+    db = ReadSessionLocal()
+    try:
+        # 커넥션을 미리 확보해 replica 장애를 여기서 감지한다
+        db.connection()
+    except DBAPIError:
+        db.close()
+        read_router.mark_replica_down()
+        return SessionLocal(), "primary_fallback"
+    return db, "replica"
+
+def get_read_db(request: Request = None):
+    shared = _batch_session(request)
+    if shared is not None:
+        yield shared
+        return
+    db, target = _open_read_session(request)
+    DB_READ_ROUTING_TOTAL.inc(target)
+    try:
+        yield db
+    finally:
+        db.close()
+
+def insert_ignoring_duplicates(db, model, rows, index_elements):
+    """index_elements 유니크 키가 이미 있는 행은 건너뛰고 INSERT 한다 (여러 워커가 같은 행을 넣을 때)."""
+    if not rows:
+        return
+    dialect = db.get_bind().dialect.name
+    if dialect in ("postgresql", "sqlite"):
+        if dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert as dialect_insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert as dialect_insert
+        db.execute(dialect_insert(model).values(rows).on_conflict_do_nothing(index_elements=index_elements))
+        return
+    for row in rows:
+        try:
+            with db.begin_nested():
+                db.execute(insert(model), [row])
+        except IntegrityError:
+            pass
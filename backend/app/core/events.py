@@ -0,0 +1,62 @@
+"""
+사용자별 인프로세스 이벤트 채널
+
+대기열 승격 같은 알림을 연결된 클라이언트(SSE)에 밀어 준다. 구독자마다 크기가 제한된 asyncio.Queue를 두고,
+느린 구독자는 가장 오래된 이벤트부터 버린다. 같은 워커 프로세스에 연결된 구독자에게만 전달되므로
+클라이언트는 재연결 시 REST 조회로 상태를 다시 맞춰야 한다.
+"""
+import asyncio
+import json
+import threading
+from contextlib import contextmanager
+
+
+class EventBroker:
+    def __init__(self, queue_size=100):
+        self.queue_size = queue_size
+        self._subscribers = {}
+        self._lock = threading.Lock()
+
+    def subscriber_count(self, user_id=None):
+        with self._lock:
+            if user_id is not None:
+                return len(self._subscribers.get(user_id, ()))
+            return sum(len(queues) for queues in self._subscribers.values())
+
+    @contextmanager
+    def subscribe(self, user_id):
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        entry = (queue, asyncio.get_running_loop())
+        with self._lock:
+            self._subscribers.setdefault(user_id, set()).add(entry)
+        try:
+            yield queue
+        finally:
+            with self._lock:
+                queues = self._subscribers.get(user_id)
+                if queues is not None:
+                    queues.discard(entry)
+                    if not queues:
+                        del self._subscribers[user_id]
+
+    def publish(self, user_id, event_type, data):
+        """이벤트 루프/스레드풀 어느 쪽에서 호출해도 된다. 전달한 구독자 수를 돌려준다."""
+        message = (event_type, data)
+        with self._lock:
+            entries = list(self._subscribers.get(user_id, ()))
+        for queue, loop in entries:
+            loop.call_soon_threadsafe(_put_latest, queue, message)
+        return len(entries)
+
+
+def _put_latest(queue, message):
+    if queue.full():
+        queue.get_nowait()
+    queue.put_nowait(message)
+
+
+def format_sse(event_type, data):
+    return f"event: {event_type}\ndata: {json.dumps(data, ensure_ascii=False, default=str)}\n\n"
+
+
+event_broker = EventBroker()
@@ -0,0 +1,85 @@
+"""
+좌석 홀드 만료 스위퍼
+
+홀드를 만들 때 (만료 시각, 홀드 ID)를 최소 힙에 넣고, 백그라운드 태스크가 가장 이른 만료 시각까지 잠들었다가
+만료된 홀드만 ID로 지운다. 테이블을 주기적으로 훑지 않는다. 만료됐지만 아직 지워지지 않은 홀드는
+조회/선점 쿼리가 expires_at 으로 걸러내므로 스위퍼가 늦어도 좌석이 잠기지는 않는다.
+"""
+import asyncio
+import heapq
+import logging
+from datetime import datetime
+from sqlalchemy import delete, select
+from starlette.concurrency import run_in_threadpool
+from .database import SessionLocal
+from app.models.hold import SeatHold
+
+logger = logging.getLogger(__name__)
+
+
+class HoldSweeper:
+    def __init__(self, session_factory=SessionLocal):
+        self.session_factory = session_factory
+        self._heap = []
+        self._wakeup = None
+        self._task = None
+
+    def __len__(self):
+        return len(self._heap)
+
+    def schedule(self, hold_id, expires_at):
+        heapq.heappush(self._heap, (expires_at, hold_id))
+        # 새 홀드가 가장 먼저 만료되면 잠든 스위퍼를 깨워 대기 시간을 다시 계산한다
+        if self._wakeup is not None and self._heap[0][1] == hold_id:
+            self._wakeup.set()
+
+    def _load_pending(self):
+        # 재시작 시 남아 있는 홀드를 한 번만 읽어 힙을 복원
+        with self.session_factory() as db:
+            rows = db.execute(select(SeatHold.hold_id, SeatHold.expires_at).distinct()).all()
+        for hold_id, expires_at in rows:
+            heapq.heappush(self._heap, (expires_at, hold_id))
+
+    def _delete_expired(self, hold_ids, now):
+        with self.session_factory() as db:
+            db.execute(delete(SeatHold).where(SeatHold.hold_id.in_(hold_ids), SeatHold.expires_at <= now))
+            db.commit()
+
+    def pop_due(self, now):
+        due = []
+        while self._heap and self._heap[0][0] <= now:
+            due.append(heapq.heappop(self._heap)[1])
+        return due
+
+    async def run(self):
+        self._wakeup = asyncio.Event()
+        while True:
+            now = datetime.utcnow()
+            due = self.pop_due(now)
+            if due:
+                try:
+                    await run_in_threadpool(self._delete_expired, due, now)
+                except Exception:
+                    logger.exception("Failed to delete expired seat holds")
+            timeout = (self._heap[0][0] - datetime.utcnow()).total_seconds() if self._heap else None
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=max(timeout, 0) if timeout is not None else None)
+            except asyncio.TimeoutError:
+                pass
+
+    async def start(self):
+        await run_in_threadpool(self._load_pending)
+        self._task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+hold_sweeper = HoldSweeper()
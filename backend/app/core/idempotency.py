@@ -0,0 +1,305 @@
+"""
+Idempotency-Key 지원
+
+타임아웃 후 재시도하는 모바일 클라이언트를 위해 예약/취소 엔드포인트에서 Idempotency-Key 헤더를 받는다.
+같은 사용자가 같은 키로 다시 보내면 엔드포인트를 실행하지 않고 첫 응답을 그대로 재생한다.
+첫 요청이 아직 처리 중이면 끝날 때까지(최대 IDEMPOTENCY_WAIT_SECONDS) 기다렸다가 그 응답을 돌려준다.
+
+처리 중인 키는 IDEMPOTENCY_LEASE_SECONDS 동안만 선점하므로 처리하던 워커가 죽어도 그 뒤에는 같은 키로 다시
+시도할 수 있다. 완료된 응답은 idempotency_keys 테이블에 IDEMPOTENCY_TTL_SECONDS 동안 보관하고, 프로세스 안에는 LRU 캐시를 둬서
+재시도 폭주가 DB까지 내려가지 않게 한다. 5xx 응답은 저장하지 않으므로 같은 키로 다시 시도할 수 있다.
+"""
+import asyncio
+import hashlib
+import re
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from sqlalchemy import delete, select, update
+from sqlalchemy.exc import IntegrityError
+from starlette.concurrency import run_in_threadpool
+from starlette.responses import JSONResponse, Response
+from .config import settings
+from .database import SessionLocal
+from .security import verify_token
+from app.models.idempotency import IdempotencyKey
+
+IDEMPOTENCY_HEADER = b"idempotency-key"
+MAX_KEY_LENGTH = 255
+
+# 멱등 처리 대상 (메서드, 경로)
+IDEMPOTENT_ROUTES = [
+    ("POST", re.compile(r"^/api/reservations/?$")),
+    ("DELETE", re.compile(r"^/api/reservations/\d+/?$")),
+    ("POST", re.compile(r"^/api/admin/reservations/direct/?$")),
+    ("POST", re.compile(r"^/api/admin/reservations/\d+/cancel/?$")),
+    ("POST", re.compile(r"^/api/admin/buses/\d+/trips/[\d-]+/cancel/?$")),
+    ("POST", re.compile(r"^/api/holds/?$")),
+    ("POST", re.compile(r"^/api/holds/\w+/confirm/?$")),
+    ("POST", re.compile(r"^/api/lottery/\d+/entries/?$")),
+    ("POST", re.compile(r"^/api/lottery/\d+/draw/?$")),
+]
+
+
+class StoredResponse:
+    __slots__ = ("request_hash", "status_code", "content_type", "body", "expires_at")
+
+    def __init__(self, request_hash, status_code, content_type, body, expires_at):
+        self.request_hash = request_hash
+        self.status_code = status_code
+        self.content_type = content_type
+        self.body = body
+        self.expires_at = expires_at
+
+
+class IdempotencyStore:
+    """완료된 응답의 DB 저장소 + 프로세스 내 LRU 캐시."""
+
+    def __init__(self, session_factory=SessionLocal, ttl_seconds=86400, cache_size=10000, lease_seconds=60):
+        self.session_factory = session_factory
+        self.ttl_seconds = ttl_seconds
+        self.lease_seconds = lease_seconds
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        self._table_ready = False
+        self._claims = 0
+
+    def cached(self, key):
+        with self._lock:
+            stored = self._cache.get(key)
+            if stored is None:
+                return None
+            if stored.expires_at <= datetime.utcnow():
+                del self._cache[key]
+                return None
+            self._cache.move_to_end(key)
+            return stored
+
+    def _remember(self, key, stored):
+        with self._lock:
+            self._cache[key] = stored
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def _ensure_table(self, db):
+        # 기존 DB에는 테이블이 없을 수 있으므로 처음 사용할 때 만든다
+        if not self._table_ready:
+            IdempotencyKey.__table__.create(bind=db.get_bind(), checkfirst=True)
+            self._table_ready = True
+
+    def claim(self, key, request_hash):
+        """
+        키를 선점한다. 선점에 성공하면 None, 이미 있으면 StoredResponse를 돌려준다
+        (status_code가 None이면 다른 요청이 처리 중). 처리 중 선점은 lease_seconds 가 지나면 만료되어
+        다른 요청이 가져갈 수 있고, complete 에서 ttl_seconds 로 늘린다.
+        """
+        now = datetime.utcnow()
+        with self.session_factory() as db:
+            self._ensure_table(db)
+            self._claims += 1
+            if self._claims % 1000 == 0:
+                db.execute(delete(IdempotencyKey).where(IdempotencyKey.expires_at < now))
+                db.commit()
+            for _ in range(2):
+                db.add(IdempotencyKey(key=key, request_hash=request_hash,
+                                      expires_at=now + timedelta(seconds=self.lease_seconds)))
+                try:
+                    db.commit()
+                    return None
+                except IntegrityError:
+                    db.rollback()
+                row = db.execute(select(IdempotencyKey).where(IdempotencyKey.key == key)).scalar_one_or_none()
+                if row is None:
+                    continue
+                if row.expires_at < now:
+                    db.delete(row)
+                    db.commit()
+                    continue
+                stored = StoredResponse(row.request_hash, row.status_code, row.content_type,
+                                        row.response_body, row.expires_at)
+                if stored.status_code is not None:
+                    self._remember(key, stored)
+                return stored
+        return None
+
+    def lookup(self, key):
+        with self.session_factory() as db:
+            row = db.execute(select(IdempotencyKey).where(IdempotencyKey.key == key)).scalar_one_or_none()
+            if row is None:
+                return None
+            stored = StoredResponse(row.request_hash, row.status_code, row.content_type,
+                                    row.response_body, row.expires_at)
+        if stored.status_code is not None:
+            self._remember(key, stored)
+        return stored
+
+    def complete(self, key, request_hash, status_code, content_type, body):
+        expires_at = datetime.utcnow() + timedelta(seconds=self.ttl_seconds)
+        with self.session_factory() as db:
+            db.execute(update(IdempotencyKey).where(IdempotencyKey.key == key).values(
+                status_code=status_code, content_type=content_type, response_body=body, expires_at=expires_at,
+            ))
+            db.commit()
+        self._remember(key, StoredResponse(request_hash, status_code, content_type, body, expires_at))
+
+    def release(self, key):
+        with self.session_factory() as db:
+            db.execute(delete(IdempotencyKey).where(IdempotencyKey.key == key))
+            db.commit()
+
+
+idempotency_store = IdempotencyStore(ttl_seconds=settings.IDEMPOTENCY_TTL_SECONDS,
+                                     cache_size=settings.IDEMPOTENCY_CACHE_SIZE,
+                                     lease_seconds=settings.IDEMPOTENCY_LEASE_SECONDS)
+
+
+def _is_idempotent_route(method, path):
+    return any(method == route_method and pattern.match(path) for route_method, pattern in IDEMPOTENT_ROUTES)
+
+
+def _caller(scope):
+    for name, value in scope["headers"]:
+        if name == b"authorization":
+            scheme, _, token = value.decode("latin-1").partition(" ")
+            if scheme.lower() != "bearer":
+                return None
+            payload = verify_token(token)
+            return payload.get("sub") if payload else None
+    return None
+
+
+def _header(scope, wanted):
+    for name, value in scope["headers"]:
+        if name == wanted:
+            return value.decode("latin-1")
+    return None
+
+
+async def _read_body(receive):
+    chunks = []
+    while True:
+        message = await receive()
+        if message["type"] != "http.request":
+            break
+        chunks.append(message.get("body", b""))
+        if not message.get("more_body", False):
+            break
+    return b"".join(chunks)
+
+
+def _in_progress_response():
+    return JSONResponse({"detail": "A request with this Idempotency-Key is still being processed"},
+                        status_code=409, headers={"Retry-After": "1"})
+
+
+def _replay(stored, request_hash):
+    if stored.status_code is None:
+        return _in_progress_response()
+    if stored.request_hash != request_hash:
+        return JSONResponse({"detail": "Idempotency-Key was already used with a different request"},
+                            status_code=422)
+    return Response(stored.body, status_code=stored.status_code, media_type=stored.content_type,
+                    headers={"Idempotent-Replayed": "true"})
+
+
+class IdempotencyMiddleware:
+    def __init__(self, app, store=idempotency_store, wait_seconds=None):
+        self.app = app
+        self.store = store
+        self.wait_seconds = settings.IDEMPOTENCY_WAIT_SECONDS if wait_seconds is None else wait_seconds
+        # 이 프로세스에서 처리 중인 키 -> 완료 이벤트
+        self._inflight = {}
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not _is_idempotent_route(scope["method"], scope["path"]):
+            await self.app(scope, receive, send)
+            return
+        idempotency_key = _header(scope, IDEMPOTENCY_HEADER)
+        caller = _caller(scope) if idempotency_key else None
+        if not caller:
+            # 키가 없거나 인증되지 않은 요청은 그대로 통과 (인증 오류는 엔드포인트가 응답)
+            await self.app(scope, receive, send)
+            return
+
+        if len(idempotency_key) > MAX_KEY_LENGTH:
+            await JSONResponse({"detail": "Idempotency-Key is too long"}, status_code=400)(scope, receive, send)
+            return
+
+        body = await _read_body(receive)
+        key = f"{caller}:{idempotency_key}"
+        request_hash = hashlib.sha256(b"\n".join([scope["method"].encode(), scope["path"].encode(), body])).hexdigest()
+
+        # 같은 프로세스의 중복 요청은 DB에 가지 않고 캐시/완료 이벤트로 처리
+        while True:
+            stored = self.store.cached(key)
+            if stored is not None:
+                await _replay(stored, request_hash)(scope, receive, send)
+                return
+            event = self._inflight.get(key)
+            if event is None:
+                break
+            try:
+                await asyncio.wait_for(event.wait(), timeout=self.wait_seconds)
+            except asyncio.TimeoutError:
+                await _in_progress_response()(scope, receive, send)
+                return
+
+        response = await self._execute(scope, body, send, key, request_hash)
+        if response is not None:
+            await response(scope, receive, send)
+
+    async def _wait_other_process(self, key):
+        deadline = time.monotonic() + self.wait_seconds
+        while time.monotonic() < deadline:
+            await asyncio.sleep(0.1)
+            stored = await run_in_threadpool(self.store.lookup, key)
+            if stored is None or stored.status_code is not None:
+                return stored
+        return None
+
+    async def _execute(self, scope, body, send, key, request_hash):
+        event = asyncio.Event()
+        self._inflight[key] = event
+        try:
+            stored = await run_in_threadpool(self.store.claim, key, request_hash)
+            if stored is not None and stored.status_code is None:
+                # 다른 워커 프로세스가 처리 중
+                stored = await self._wait_other_process(key)
+                if stored is None or stored.status_code is None:
+                    return _in_progress_response()
+            if stored is not None:
+                return _replay(stored, request_hash)
+
+            status_code, content_type, chunks = None, None, []
+
+            async def receive_body():
+                return {"type": "http.request", "body": body, "more_body": False}
+
+            async def send_wrapper(message):
+                nonlocal status_code, content_type
+                if message["type"] == "http.response.start":
+                    status_code = message["status"]
+                    for name, value in message.get("headers", []):
+                        if name == b"content-type":
+                            content_type = value.decode("latin-1")
+                elif message["type"] == "http.response.body":
+                    chunks.append(message.get("body", b""))
+                await send(message)
+
+            try:
+                await self.app(scope, receive_body, send_wrapper)
+            except BaseException:
+                await run_in_threadpool(self.store.release, key)
+                raise
+            if status_code is not None and status_code < 500:
+                await run_in_threadpool(self.store.complete, key, request_hash, status_code, content_type,
+                                        b"".join(chunks))
+            else:
+                await run_in_threadpool(self.store.release, key)
+            return None
+        finally:
+            del self._inflight[key]
+            event.set()
@@ -0,0 +1,345 @@
+"""
+Prometheus 호환 메트릭 수집
+
+카운터/히스토그램은 스레드별 shard에 기록하고 /metrics 스크레이프 시점에 합산한다.
+요청 경로에서는 락을 잡지 않는다 (스레드가 처음 기록할 때 shard 등록 시에만 락 사용).
+"""
+import threading
+import time
+from bisect import bisect_left
+from sqlalchemy import event
+from sqlalchemy.pool import QueuePool
+
+CONTENT_TYPE_LATEST = "text/plain; version=0.0.4; charset=utf-8"
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names, values, extra=None):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.extend(f'{name}="{_escape(value)}"' for name, value in extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class _ShardedMetric:
+    metric_type = "untyped"
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._local = threading.local()
+        self._shards = []
+        self._shards_lock = threading.Lock()
+
+    def _shard(self):
+        try:
+            return self._local.shard
+        except AttributeError:
+            shard = {}
+            with self._shards_lock:
+                self._shards.append(shard)
+            self._local.shard = shard
+            return shard
+
+    def _snapshots(self):
+        with self._shards_lock:
+            shards = list(self._shards)
+        # dict() 복사는 GIL 안에서 원자적으로 수행된다
+        return [dict(shard) for shard in shards]
+
+    def header(self):
+        return [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.metric_type}",
+        ]
+
+
+class Counter(_ShardedMetric):
+    metric_type = "counter"
+
+    def inc(self, *labelvalues, amount=1):
+        shard = self._shard()
+        shard[labelvalues] = shard.get(labelvalues, 0) + amount
+
+    def collect(self):
+        totals = {}
+        for snapshot in self._snapshots():
+            for labels, value in snapshot.items():
+                totals[labels] = totals.get(labels, 0) + value
+        return totals
+
+    def render(self):
+        lines = self.header()
+        for labels, value in sorted(self.collect().items()):
+            lines.append(f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}")
+        return lines
+
+
+class Gauge(Counter):
+    """inc/dec 기반 게이지. 스레드별 변화량을 합산한다."""
+
+    metric_type = "gauge"
+
+    def dec(self, *labelvalues, amount=1):
+        self.inc(*labelvalues, amount=-amount)
+
+
+class CallbackGauge:
+    """스크레이프 시점에 레이블별 콜백으로 값을 읽는 게이지."""
+
+    metric_type = "gauge"
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._callbacks = {}
+
+    def set_function(self, callback, *labelvalues):
+        self._callbacks[labelvalues] = callback
+
+    def render(self):
+        lines = []
+        for labels, callback in sorted(self._callbacks.items()):
+            value = callback()
+            if value is not None:
+                lines.append(f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}")
+        if not lines:
+            return []
+        return [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.metric_type}",
+        ] + lines
+
+
+class Histogram(_ShardedMetric):
+    metric_type = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, *labelvalues):
+        shard = self._shard()
+        state = shard.get(labelvalues)
+        if state is None:
+            # [버킷별 카운트..., +Inf 카운트, 합계]
+            state = [0] * (len(self.buckets) + 1) + [0.0]
+            shard[labelvalues] = state
+        state[bisect_left(self.buckets, value)] += 1
+        state[-1] += value
+
+    def collect(self):
+        totals = {}
+        for snapshot in self._snapshots():
+            for labels, state in snapshot.items():
+                total = totals.get(labels)
+                if total is None:
+                    totals[labels] = list(state)
+                else:
+                    for i, value in enumerate(state):
+                        total[i] += value
+        return totals
+
+    def render(self):
+        lines = self.header()
+        bounds = self.buckets + (float("inf"),)
+        for labels, state in sorted(self.collect().items()):
+            cumulative = 0
+            for bound, count in zip(bounds, state):
+                cumulative += count
+                label_str = _format_labels(self.labelnames, labels, [("le", _format_value(bound))])
+                lines.append(f"{self.name}_bucket{label_str} {cumulative}")
+            label_str = _format_labels(self.labelnames, labels)
+            lines.append(f"{self.name}_sum{label_str} {_format_value(state[-1])}")
+            lines.append(f"{self.name}_count{label_str} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics = []
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        with self._lock:
+            self._metrics.append(metric)
+        return metric
+
+    def render(self):
+        with self._lock:
+            metrics = list(self._metrics)
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+# HTTP
+HTTP_REQUESTS_TOTAL = REGISTRY.register(Counter(
+    "http_requests_total", "Total HTTP requests by route template and status code.",
+    ("method", "route", "status"),
+))
+HTTP_REQUEST_DURATION = REGISTRY.register(Histogram(
+    "http_request_duration_seconds", "HTTP request latency by route template.",
+    ("method", "route"),
+))
+HTTP_REQUESTS_IN_PROGRESS = REGISTRY.register(Gauge(
+    "http_requests_in_progress", "HTTP requests currently being served.",
+))
+
+# Database connection pool (engine 레이블: primary, replica)
+DB_POOL_CHECKOUTS_TOTAL = REGISTRY.register(Counter(
+    "db_pool_checkouts_total", "Connections checked out from the pool.", ("engine",),
+))
+DB_POOL_WAIT = REGISTRY.register(Histogram(
+    "db_pool_wait_seconds", "Time spent waiting for a pooled connection.", ("engine",),
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0),
+))
+DB_POOL_SIZE = REGISTRY.register(CallbackGauge(
+    "db_pool_size", "Configured pool size.", ("engine",),
+))
+DB_POOL_CHECKED_OUT = REGISTRY.register(CallbackGauge(
+    "db_pool_checked_out", "Connections currently checked out.", ("engine",),
+))
+DB_POOL_OVERFLOW = REGISTRY.register(CallbackGauge(
+    "db_pool_overflow", "Connections opened beyond the pool size.", ("engine",),
+))
+DB_READ_ROUTING_TOTAL = REGISTRY.register(Counter(
+    "db_read_routing_total", "Read-only sessions by target (replica, primary, primary_sticky, primary_fallback).",
+    ("target",),
+))
+
+# Booking
+BOOKINGS_TOTAL = REGISTRY.register(Counter(
+    "reservation_bookings_total", "Booking attempts by outcome (success, conflict).",
+    ("outcome",),
+))
+
+WAITLIST_PROMOTIONS_TOTAL = REGISTRY.register(Counter(
+    "waitlist_promotions_total", "Waitlist entries promoted to a reservation after a cancellation.",
+))
+
+LOTTERY_ENTRIES_TOTAL = REGISTRY.register(Counter(
+    "lottery_entries_total", "Lottery entries accepted.",
+))
+
+LOTTERY_SEATS_ALLOCATED_TOTAL = REGISTRY.register(Counter(
+    "lottery_seats_allocated_total", "Seats allocated to lottery winners.",
+))
+
+OUTBOX_EVENTS_TOTAL = REGISTRY.register(Counter(
+    "outbox_events_total", "Outbox event deliveries by outcome (delivered, retried).",
+    ("outcome",),
+))
+
+NOTIFICATIONS_TOTAL = REGISTRY.register(Counter(
+    "notifications_total", "Notification messages by outcome (sent, failed).",
+    ("outcome",),
+))
+
+TOKEN_REFRESH_TOTAL = REGISTRY.register(Counter(
+    "auth_token_refresh_total", "Refresh token exchanges by outcome (rotated, reused, invalid).",
+    ("outcome",),
+))
+
+TRACKING_PINGS_TOTAL = REGISTRY.register(Counter(
+    "tracking_pings_total", "Driver GPS pings by outcome (accepted, stale, invalid, dropped).",
+    ("outcome",),
+))
+
+TRACKING_ROWS_WRITTEN_TOTAL = REGISTRY.register(Counter(
+    "tracking_rows_written_total", "GPS pings written to the database in batches.",
+))
+
+RATE_LIMITED_TOTAL = REGISTRY.register(Counter(
+    "rate_limited_requests_total", "Requests rejected with 429 by route group.",
+    ("group",),
+))
+
+
+def render_metrics():
+    return REGISTRY.render()
+
+
+class InstrumentedQueuePool(QueuePool):
+    """
+    커넥션 대기 시간을 기록하는 QueuePool. dispose() 후 재생성돼도 유지된다.
+    create_engine(pool_logging_name=...) 값이 engine 레이블이 된다.
+    """
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            DB_POOL_WAIT.observe(time.perf_counter() - start, getattr(self, "logging_name", None) or "primary")
+
+
+def instrument_engine(engine, name="primary"):
+    def on_checkout(dbapi_connection, connection_record, connection_proxy):
+        DB_POOL_CHECKOUTS_TOTAL.inc(name)
+
+    event.listen(engine, "checkout", on_checkout)
+
+    # engine.pool은 dispose() 시 교체되므로 스크레이프 시점에 다시 조회한다
+    def pool_stat(method_name):
+        def read():
+            method = getattr(engine.pool, method_name, None)
+            # QueuePool.overflow()는 풀이 다 차기 전까지 음수를 반환한다
+            return max(method(), 0) if method else None
+        return read
+
+    DB_POOL_SIZE.set_function(pool_stat("size"), name)
+    DB_POOL_CHECKED_OUT.set_function(pool_stat("checkedout"), name)
+    DB_POOL_OVERFLOW.set_function(pool_stat("overflow"), name)
+
+
+class MetricsMiddleware:
+    """라우트 템플릿(/api/buses/{bus_id}) 단위로 지연 시간과 상태 코드를 기록하는 ASGI 미들웨어."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        HTTP_REQUESTS_IN_PROGRESS.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            HTTP_REQUESTS_IN_PROGRESS.dec()
+            # 라우터가 매칭 후 scope["route"]를 채운다. 매칭되지 않은 경로는 하나로 묶어 카디널리티를 제한
+            route = scope.get("route")
+            template = getattr(route, "path", None) or "<unmatched>"
+            method = scope["method"]
+            HTTP_REQUEST_DURATION.observe(elapsed, method, template)
+            HTTP_REQUESTS_TOTAL.inc(method, template, str(status_code))
@@ -0,0 +1,275 @@
+"""
+트랜잭셔널 아웃박스
+
+예약이 생기거나 상태가 바뀌면 같은 트랜잭션에서 outbox_events 에 이벤트를 한 줄 쓴다. 알림/통계/감사 같은
+부수 효과는 요청 처리 중에 실행하지 않고, 백그라운드 디스패처가 커밋된 이벤트를 배치로 꺼내 등록된 소비자에게
+넘긴다. 예약 커밋과 이벤트 기록이 한 트랜잭션이므로 이벤트가 빠지지 않는다.
+
+전달은 at-least-once 다. 배치 중 한 소비자라도 실패하면 배치 전체를 백오프 후 다시 보내므로 소비자는 event id
+로 중복을 걸러야 한다. OUTBOX_MAX_ATTEMPTS 번 실패한 이벤트는 FAILED 로 남긴다.
+
+ORM 단위 작업은 after_flush 리스너가 기록하고, 일괄 INSERT/UPDATE 는 enqueue_reservations 로 직접 기록한다.
+"""
+import asyncio
+import json
+import logging
+import random
+import sys
+import threading
+import uuid
+from datetime import datetime, timedelta
+from sqlalchemy import delete, event, insert, inspect, select, update
+from starlette.concurrency import run_in_threadpool
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.core.metrics import OUTBOX_EVENTS_TOTAL
+from app.models.outbox import OutboxEvent, OutboxStatus
+from app.models.reservation import Reservation
+
+logger = logging.getLogger(__name__)
+
+
+def reservation_payload(row, reservation_date=None, status=None):
+    reservation_date = reservation_date or row.reservation_date
+    status = status or row.status
+    return {
+        "reservation_id": row.id,
+        "user_id": row.user_id,
+        "bus_id": row.bus_id,
+        "seat_number": row.seat_number,
+        "reservation_date": reservation_date.isoformat() if reservation_date else None,
+        "status": status.value if status else None,
+    }
+
+
+def _event_rows(event_type, payloads, now):
+    return [{
+        "event_type": event_type,
+        "aggregate_id": payload["reservation_id"],
+        "payload": json.dumps(payload, ensure_ascii=False),
+        "status": OutboxStatus.PENDING,
+        "attempts": 0,
+        "next_attempt_at": now,
+        "created_at": now,
+    } for payload in payloads]
+
+
+def enqueue_reservations(session, event_type, rows, **payload_overrides):
+    """일괄 문장으로 바뀐 예약들의 이벤트를 같은 트랜잭션에 기록한다."""
+    values = _event_rows(event_type, [reservation_payload(row, **payload_overrides) for row in rows],
+                         datetime.utcnow())
+    if values:
+        session.execute(insert(OutboxEvent), values)
+        session.info["outbox"] = True
+
+
+def _reservation_event_type(session, reservation):
+    if reservation in session.new:
+        return "reservation.created"
+    if reservation in session.deleted:
+        return "reservation.deleted"
+    history = inspect(reservation).attrs.status.history
+    if history.has_changes():
+        return f"reservation.{reservation.status.value}"
+    return "reservation.updated"
+
+
+@event.listens_for(SessionLocal, "after_flush")
+def _record_flush_events(session, flush_context):
+    changed = [obj for obj in list(session.new) + list(session.deleted) if isinstance(obj, Reservation)]
+    changed.extend(
+        obj for obj in session.dirty
+        if isinstance(obj, Reservation) and session.is_modified(obj, include_collections=False)
+    )
+    if not changed:
+        return
+    now = datetime.utcnow()
+    values = []
+    for reservation in changed:
+        values.extend(_event_rows(_reservation_event_type(session, reservation), [reservation_payload(reservation)], now))
+    session.connection().execute(insert(OutboxEvent.__table__), values)
+    session.info["outbox"] = True
+
+
+@event.listens_for(SessionLocal, "after_commit")
+def _wake_dispatcher(session):
+    if session.info.pop("outbox", False):
+        outbox_dispatcher.wake()
+
+
+@event.listens_for(SessionLocal, "after_rollback")
+def _forget_events(session):
+    session.info.pop("outbox", None)
+
+
+class FileSink:
+    """이벤트를 JSON Lines 로 파일(또는 "stdout")에 쓰는 소비자. 외부 서비스 없이 파이프라인을 확인할 때 쓴다."""
+
+    def __init__(self, path):
+        self.name = f"file:{path}"
+        self.path = path
+        self._lock = threading.Lock()
+
+    def _write(self, lines):
+        with self._lock:
+            if self.path == "stdout":
+                sys.stdout.write(lines)
+                sys.stdout.flush()
+                return
+            with open(self.path, "a", encoding="utf-8") as file:
+                file.write(lines)
+
+    async def handle(self, events):
+        lines = "".join(json.dumps(event, ensure_ascii=False) + "\n" for event in events)
+        await run_in_threadpool(self._write, lines)
+
+
+class OutboxDispatcher:
+    """
+    등록된 소비자에게 아웃박스 이벤트를 배치로 전달하는 백그라운드 태스크. 소비자는 name 속성과
+    async handle(events) 메서드를 가진 객체다. events 는 {"id", "type", "created_at", "data"} 목록이다.
+    """
+
+    def __init__(self, session_factory=SessionLocal):
+        self.session_factory = session_factory
+        self.consumers = []
+        self._wakeup = None
+        self._loop = None
+        self._task = None
+
+    def register(self, consumer):
+        self.consumers.append(consumer)
+        return consumer
+
+    def wake(self):
+        """커밋 직후(스레드풀 포함 어디서든) 호출되어 폴링 주기를 기다리지 않고 바로 꺼내게 한다."""
+        if self._loop is not None and self._wakeup is not None:
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+
+    def _claim(self, now):
+        # 다른 워커와 같은 이벤트를 동시에 가져가지 않도록 토큰과 임대 시간을 먼저 써 넣는다
+        token = uuid.uuid4().hex
+        lease_until = now + timedelta(seconds=settings.OUTBOX_LEASE_SECONDS)
+        with self.session_factory() as db:
+            due = select(OutboxEvent.id).where(
+                OutboxEvent.status == OutboxStatus.PENDING,
+                OutboxEvent.next_attempt_at <= now,
+            ).order_by(OutboxEvent.id).limit(settings.OUTBOX_BATCH_SIZE)
+            db.execute(
+                update(OutboxEvent).where(
+                    OutboxEvent.id.in_(due.scalar_subquery()),
+                    OutboxEvent.status == OutboxStatus.PENDING,
+                    OutboxEvent.next_attempt_at <= now,
+                ).values(claim_token=token, next_attempt_at=lease_until),
+                execution_options={"synchronize_session": False},
+            )
+            db.commit()
+            rows = db.execute(
+                select(OutboxEvent.id, OutboxEvent.event_type, OutboxEvent.payload,
+                       OutboxEvent.attempts, OutboxEvent.created_at)
+                .where(OutboxEvent.claim_token == token).order_by(OutboxEvent.id)
+            ).all()
+        return rows
+
+    def _mark_delivered(self, ids, now):
+        with self.session_factory() as db:
+            db.execute(
+                update(OutboxEvent).where(OutboxEvent.id.in_(ids))
+                .values(status=OutboxStatus.DELIVERED, delivered_at=now, claim_token=None, last_error=None),
+                execution_options={"synchronize_session": False},
+            )
+            db.commit()
+
+    def _mark_failed(self, rows, error, now):
+        attempts = rows[0].attempts + 1
+        if attempts >= settings.OUTBOX_MAX_ATTEMPTS:
+            values = {"status": OutboxStatus.FAILED}
+        else:
+            backoff = min(settings.OUTBOX_BACKOFF_SECONDS * 2 ** (attempts - 1), settings.OUTBOX_BACKOFF_MAX_SECONDS)
+            values = {"next_attempt_at": now + timedelta(seconds=backoff * random.uniform(0.8, 1.2))}
+        with self.session_factory() as db:
+            db.execute(
+                update(OutboxEvent).where(OutboxEvent.id.in_([row.id for row in rows]))
+                .values(attempts=attempts, claim_token=None, last_error=error[:1000], **values),
+                execution_options={"synchronize_session": False},
+            )
+            db.commit()
+
+    def _purge_delivered(self, now):
+        cutoff = now - timedelta(hours=settings.OUTBOX_RETENTION_HOURS)
+        with self.session_factory() as db:
+            db.execute(delete(OutboxEvent).where(
+                OutboxEvent.status == OutboxStatus.DELIVERED, OutboxEvent.delivered_at < cutoff,
+            ))
+            db.commit()
+
+    async def dispatch_once(self):
+        """한 배치를 꺼내 전달하고 처리한 이벤트 수를 돌려준다."""
+        rows = await run_in_threadpool(self._claim, datetime.utcnow())
+        if not rows:
+            return 0
+
+        # 재시도 횟수가 같은 이벤트끼리 묶어 백오프를 함께 계산
+        by_attempts = {}
+        for row in rows:
+            by_attempts.setdefault(row.attempts, []).append(row)
+
+        for group in by_attempts.values():
+            events = [{
+                "id": row.id,
+                "type": row.event_type,
+                "created_at": row.created_at.isoformat(),
+                "data": json.loads(row.payload),
+            } for row in group]
+            try:
+                for consumer in self.consumers:
+                    await consumer.handle(events)
+            except Exception as exc:
+                logger.exception("Outbox consumer failed for %d events", len(group))
+                OUTBOX_EVENTS_TOTAL.inc("retried", amount=len(group))
+                await run_in_threadpool(self._mark_failed, group, f"{type(exc).__name__}: {exc}", datetime.utcnow())
+                continue
+            await run_in_threadpool(self._mark_delivered, [row.id for row in group], datetime.utcnow())
+            OUTBOX_EVENTS_TOTAL.inc("delivered", amount=len(group))
+        return len(rows)
+
+    async def run(self):
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        last_purge = datetime.min
+        while True:
+            self._wakeup.clear()
+            try:
+                # 배치가 가득 차면 쉬지 않고 다음 배치를 꺼낸다
+                while await self.dispatch_once() >= settings.OUTBOX_BATCH_SIZE:
+                    pass
+                now = datetime.utcnow()
+                if now - last_purge > timedelta(hours=1):
+                    await run_in_threadpool(self._purge_delivered, now)
+                    last_purge = now
+            except Exception:
+                logger.exception("Outbox dispatch failed")
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=settings.OUTBOX_POLL_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+
+    async def start(self):
+        self._task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+            self._wakeup = None
+            self._loop = None
+
+
+outbox_dispatcher = OutboxDispatcher()
+
+if settings.OUTBOX_SINK:
+    outbox_dispatcher.register(FileSink(settings.OUTBOX_SINK))
@@ -0,0 +1,172 @@
+"""
+요청 단위 cProfile 프로파일링
+
+PROFILING_ENABLED=true 일 때만 미들웨어가 등록된다. 샘플링된 요청 또는 관리자 토큰과 함께
+X-Profile 헤더를 보낸 요청을 cProfile로 실행하고, 결과(pstats)를 디스크 링 버퍼에 보관한다.
+
+cProfile 은 스레드 단위이므로
+- 한 번에 한 요청만 프로파일링한다 (그동안 샘플링된 다른 요청은 프로파일 없이 처리).
+- 요청 코루틴이 이벤트 루프에서 실제로 실행되는 동안만 프로파일러를 켠다. await 로 양보한 사이에 돌아가는
+  다른 요청과 백그라운드 작업은 섞이지 않고, 기다린 시간도 포함되지 않는다.
+- 스레드풀에서 실행되는 일 (FastAPI 의 동기 의존성 get_db, get_current_user 등) 은 프로파일에 없다.
+  요청 전체 시간은 /metrics 의 http_request_duration_seconds 로 본다.
+"""
+import cProfile
+import itertools
+import os
+import random
+import re
+import threading
+import time
+from starlette.concurrency import run_in_threadpool
+from .config import settings
+from .security import verify_token
+
+PROFILE_HEADER = b"x-profile"
+PROFILE_NAME_PATTERN = re.compile(r"^[\w.-]+\.prof$")
+
+_slug_pattern = re.compile(r"[^a-zA-Z0-9]+")
+
+
+class ProfileStore:
+    """가장 최근 max_files 개의 프로파일만 유지하는 디렉터리 기반 링 버퍼."""
+
+    def __init__(self, directory, max_files=50):
+        self.directory = directory
+        self.max_files = max_files
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
+
+    def new_name(self, method, path):
+        slug = _slug_pattern.sub("_", path).strip("_")[:60] or "root"
+        return f"{int(time.time() * 1000)}-{os.getpid()}-{next(self._counter)}-{method}-{slug}.prof"
+
+    def path_for(self, name):
+        if not PROFILE_NAME_PATTERN.match(name):
+            return None
+        path = os.path.join(self.directory, name)
+        return path if os.path.isfile(path) else None
+
+    def save(self, profiler, name):
+        os.makedirs(self.directory, exist_ok=True)
+        profiler.dump_stats(os.path.join(self.directory, name))
+        self._prune()
+
+    def _prune(self):
+        with self._lock:
+            # 파일명이 밀리초 타임스탬프로 시작하므로 이름순 = 생성순
+            entries = sorted(self._entries(), key=lambda entry: entry.name)
+            for entry in entries[:max(len(entries) - self.max_files, 0)]:
+                try:
+                    os.remove(entry.path)
+                except FileNotFoundError:
+                    pass
+
+    def _entries(self):
+        try:
+            return [entry for entry in os.scandir(self.directory) if entry.name.endswith(".prof")]
+        except FileNotFoundError:
+            return []
+
+    def list(self):
+        profiles = []
+        for entry in self._entries():
+            stat = entry.stat()
+            profiles.append({
+                "name": entry.name,
+                "size": stat.st_size,
+                "created_at": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(stat.st_mtime)),
+            })
+        profiles.sort(key=lambda profile: profile["name"], reverse=True)
+        return profiles
+
+
+profile_store = ProfileStore(settings.PROFILING_DIR, settings.PROFILING_MAX_FILES)
+
+# cProfile은 스레드당 하나만 활성화할 수 있으므로 동시에 하나의 요청만 프로파일링한다
+_active = threading.Lock()
+
+
+def _is_admin_request(scope):
+    for name, value in scope["headers"]:
+        if name == b"authorization":
+            scheme, _, token = value.decode("latin-1").partition(" ")
+            if scheme.lower() != "bearer":
+                return False
+            payload = verify_token(token)
+            return bool(payload) and payload.get("role") == "admin"
+    return False
+
+
+class _ProfiledCoroutine:
+    """코루틴을 한 단계(send/throw)씩 실행하면서 그동안만 프로파일러를 켠다."""
+
+    def __init__(self, coro, profiler):
+        self._coro = coro
+        self._profiler = profiler
+
+    def __await__(self):
+        return self
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        return self.send(None)
+
+    def send(self, value):
+        self._profiler.enable()
+        try:
+            return self._coro.send(value)
+        finally:
+            self._profiler.disable()
+
+    def throw(self, *args):
+        self._profiler.enable()
+        try:
+            return self._coro.throw(*args)
+        finally:
+            self._profiler.disable()
+
+    def close(self):
+        self._coro.close()
+
+
+class ProfilingMiddleware:
+    def __init__(self, app, store=profile_store, sample_rate=None):
+        self.app = app
+        self.store = store
+        self.sample_rate = settings.PROFILING_SAMPLE_RATE if sample_rate is None else sample_rate
+
+    def _should_profile(self, scope):
+        if self.sample_rate and random.random() < self.sample_rate:
+            return True
+        if any(name == PROFILE_HEADER for name, _ in scope["headers"]):
+            return _is_admin_request(scope)
+        return False
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self._should_profile(scope):
+            await self.app(scope, receive, send)
+            return
+
+        if not _active.acquire(blocking=False):
+            await self.app(scope, receive, send)
+            return
+
+        name = self.store.new_name(scope["method"], scope["path"])
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((b"x-profile-id", name.encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        profiler = cProfile.Profile()
+        try:
+            await _ProfiledCoroutine(self.app(scope, receive, send_wrapper), profiler)
+            # 통계 변환과 디스크 쓰기는 이벤트 루프를 막지 않게 스레드풀에서
+            await run_in_threadpool(self.store.save, profiler, name)
+        finally:
+            _active.release()
@@ -0,0 +1,230 @@
+"""
+토큰 버킷 기반 요청 제한
+
+요청을 라우트 그룹(auth, booking, read)으로 나누고 그룹별 정책으로 제한한다. 인증된 요청은 사용자(토큰 sub)
+단위, 그 외에는 클라이언트 IP 단위로 버킷을 둔다. 여기에 더해
+- 인증된 예약 요청은 IP 버킷(booking_ip)도 함께 확인한다 (여러 계정을 돌려 쓰는 스크립트).
+- 로그인은 제출한 아이디 버킷(login_account)도 함께 확인한다 (여러 IP에서 한 계정을 노리는 무차별 대입).
+  아이디를 읽기 위해 로그인 요청만 본문을 미리 읽어 앱에 다시 넘겨준다.
+- 배치(POST /api/batch)는 본문을 같은 방식으로 읽어 하위 요청 하나당 읽기 토큰 하나를 쓴다. 버킷은 프로세스 메모리에만 있으며 (DB 조회 없음)
+최대 RATE_LIMIT_MAX_KEYS 개까지 LRU로 유지하고, 가득 찰 만큼 오래 쉰 버킷은 새 버킷과 같으므로 버린다.
+워커 프로세스가 여러 개면 한도도 워커마다 따로 적용된다.
+"""
+import json
+import math
+import re
+import time
+from collections import OrderedDict
+from urllib.parse import parse_qs
+from starlette.responses import JSONResponse
+from .config import settings
+from .metrics import RATE_LIMITED_TOTAL
+from .security import verify_token
+
+
+# 분당 0 인 정책은 버스트를 다 쓰면 다시 차지 않는다. Retry-After 는 유한해야 하므로 고정값으로 알린다
+NO_REFILL_RETRY_SECONDS = 60.0
+
+
+class RateLimitPolicy:
+    def __init__(self, name, per_minute, burst):
+        self.name = name
+        self.rate = per_minute / 60.0  # 초당 충전되는 토큰
+        self.burst = burst
+        # 이 시간 이상 쉰 버킷은 가득 찬 상태이므로 저장할 필요가 없다
+        self.idle_seconds = burst / self.rate if self.rate > 0 else float("inf")
+
+
+class TokenBucketStore:
+    def __init__(self, max_keys=100000):
+        self.max_keys = max_keys
+        # (그룹, 주체) -> [남은 토큰, 마지막 갱신 시각, 정책], 가장 오래 쓰지 않은 것이 앞쪽
+        self._buckets = OrderedDict()
+
+    def __len__(self):
+        return len(self._buckets)
+
+    def take(self, policy, subject, now=None, cost=1):
+        """토큰 cost 개를 쓴다 (버스트보다 많이는 쓰지 않는다). 허용되면 0, 아니면 그만큼 찰 때까지 남은 초를 돌려준다."""
+        now = time.monotonic() if now is None else now
+        cost = min(cost, policy.burst)
+        key = (policy.name, subject)
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = [float(policy.burst), now, policy]
+            self._buckets[key] = bucket
+            self._evict(now)
+        else:
+            bucket[0] = min(policy.burst, bucket[0] + (now - bucket[1]) * policy.rate)
+            bucket[1] = now
+            self._buckets.move_to_end(key)
+
+        if bucket[0] >= cost:
+            bucket[0] -= cost
+            return 0.0
+        return (cost - bucket[0]) / policy.rate if policy.rate > 0 else NO_REFILL_RETRY_SECONDS
+
+    def _evict(self, now):
+        # 앞쪽(가장 오래된)부터 쉬고 있는 버킷을 몇 개씩만 정리해 요청당 비용을 일정하게 유지
+        for _ in range(2):
+            if not self._buckets:
+                return
+            key, (_, last, policy) = next(iter(self._buckets.items()))
+            if now - last < policy.idle_seconds and len(self._buckets) <= self.max_keys:
+                return
+            del self._buckets[key]
+
+
+AUTH = RateLimitPolicy("auth", settings.RATE_LIMIT_AUTH_PER_MINUTE, settings.RATE_LIMIT_AUTH_BURST)
+BOOKING = RateLimitPolicy("booking", settings.RATE_LIMIT_BOOKING_PER_MINUTE, settings.RATE_LIMIT_BOOKING_BURST)
+READ = RateLimitPolicy("read", settings.RATE_LIMIT_READ_PER_MINUTE, settings.RATE_LIMIT_READ_BURST)
+BOOKING_IP = RateLimitPolicy("booking_ip", settings.RATE_LIMIT_BOOKING_IP_PER_MINUTE, settings.RATE_LIMIT_BOOKING_IP_BURST)
+LOGIN_ACCOUNT = RateLimitPolicy("login_account", settings.RATE_LIMIT_LOGIN_ACCOUNT_PER_MINUTE,
+                                settings.RATE_LIMIT_LOGIN_ACCOUNT_BURST)
+
+# 인증된 요청에 사용자 버킷과 함께 적용하는 IP 버킷 정책
+IP_POLICIES = {BOOKING.name: BOOKING_IP}
+LOGIN_PATH = re.compile(r"^/api/auth/login/?$")
+BATCH_PATH = re.compile(r"^/api/batch/?$")
+MULTIPART_USERNAME = re.compile(rb'name="username"\r\n\r\n([^\r]*)\r\n')
+
+# (메서드, 경로 패턴, 정책) - 위에서부터 처음 맞는 것
+ROUTE_GROUPS = [
+    ("POST", re.compile(r"^/api/auth/(login|register)/?$"), AUTH),
+    (None, re.compile(r"^/api/((admin/)?reservations|holds|waitlist|lottery)(/|$)"), BOOKING),
+    ("POST", BATCH_PATH, READ),
+]
+
+
+def policy_for(method, path):
+    for route_method, pattern, policy in ROUTE_GROUPS:
+        if (route_method is None and method != "GET") or route_method == method:
+            if pattern.match(path):
+                return policy
+    if method == "GET" and path.startswith("/api/"):
+        return READ
+    return None
+
+
+def _subjects(scope, trust_forwarded):
+    """(사용자 주체 또는 None, IP 주체)."""
+    authorization = forwarded = None
+    for name, value in scope["headers"]:
+        if name == b"authorization":
+            authorization = value.decode("latin-1")
+        elif name == b"x-forwarded-for":
+            forwarded = value.decode("latin-1")
+
+    user = None
+    if authorization:
+        scheme, _, token = authorization.partition(" ")
+        payload = verify_token(token) if scheme.lower() == "bearer" else None
+        if payload and payload.get("sub"):
+            user = "user:" + payload["sub"]
+    if trust_forwarded and forwarded:
+        return user, "ip:" + forwarded.split(",")[0].strip()
+    client = scope.get("client")
+    return user, "ip:" + (client[0] if client else "unknown")
+
+
+def _header(scope, wanted):
+    for name, value in scope["headers"]:
+        if name == wanted:
+            return value.decode("latin-1")
+    return ""
+
+
+def login_username(content_type, body):
+    """로그인 폼(urlencoded / multipart)에서 아이디를 꺼낸다. 없으면 None."""
+    if content_type.startswith("multipart/form-data"):
+        match = MULTIPART_USERNAME.search(body)
+        username = match.group(1).decode("utf-8", "replace") if match else None
+    else:
+        username = parse_qs(body.decode("utf-8", "replace")).get("username", [None])[0]
+    return username.strip().lower() if username else None
+
+
+def batch_size(body):
+    """배치 본문의 하위 요청 수 (최소 1). 형식이 틀린 본문은 앱이 422 로 거절하므로 1 로 센다."""
+    try:
+        requests = json.loads(body).get("requests")
+    except (ValueError, AttributeError):
+        return 1
+    if not isinstance(requests, list):
+        return 1
+    return max(1, min(len(requests), settings.BATCH_MAX_REQUESTS))
+
+
+async def _read_body(receive):
+    chunks = []
+    while True:
+        message = await receive()
+        if message["type"] != "http.request":
+            break
+        chunks.append(message.get("body", b""))
+        if not message.get("more_body", False):
+            break
+    return b"".join(chunks)
+
+
+class RateLimitMiddleware:
+    def __init__(self, app, store=None, trust_forwarded=None):
+        self.app = app
+        self.store = store if store is not None else TokenBucketStore(settings.RATE_LIMIT_MAX_KEYS)
+        self.trust_forwarded = settings.RATE_LIMIT_TRUST_FORWARDED if trust_forwarded is None else trust_forwarded
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        policy = policy_for(scope["method"], scope["path"])
+        if policy is None:
+            await self.app(scope, receive, send)
+            return
+
+        user, ip = _subjects(scope, self.trust_forwarded)
+        cost = 1
+        if scope["method"] == "POST" and BATCH_PATH.match(scope["path"]):
+            # 하위 요청마다 GET 하나와 같은 비용
+            body = await _read_body(receive)
+            receive = _replay(body, receive)
+            cost = batch_size(body)
+        if user is None:
+            checks = [(policy, ip, cost)]
+        else:
+            checks = [(policy, user, cost)]
+            if policy.name in IP_POLICIES:
+                checks.append((IP_POLICIES[policy.name], ip, cost))
+        if policy is AUTH and LOGIN_PATH.match(scope["path"]):
+            body = await _read_body(receive)
+            receive = _replay(body, receive)
+            username = login_username(_header(scope, b"content-type"), body)
+            if username:
+                checks.append((LOGIN_ACCOUNT, "account:" + username, 1))
+
+        # 앞의 버킷에서 거절되면 뒤의 버킷 토큰은 쓰지 않는다
+        for check_policy, subject, check_cost in checks:
+            retry_after = self.store.take(check_policy, subject, cost=check_cost)
+            if retry_after:
+                RATE_LIMITED_TOTAL.inc(check_policy.name)
+                response = JSONResponse(
+                    {"detail": "Too many requests. Please try again later."},
+                    status_code=429,
+                    headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+                )
+                await response(scope, receive, send)
+                return
+        await self.app(scope, receive, send)
+
+
+def _replay(body, receive):
+    sent = False
+
+    async def replay():
+        nonlocal sent
+        if not sent:
+            sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        return await receive()
+
+    return replay
@@ -0,0 +1,172 @@
+"""
+토큰 폐기 목록 (jti 기준)
+
+폐기한 토큰의 jti 는 revoked_tokens 테이블에 남기고, 각 프로세스는 이를 메모리에 블룸 필터 + 정확한 집합으로
+들고 있다. 인증할 때마다 DB 를 조회하지 않고 블룸 필터에 없으면 바로 통과, 있으면 집합으로 오탐을 걸러낸다.
+백그라운드 태스크가 REVOCATION_SYNC_SECONDS 마다 id 커서 이후 새로 추가된 행만 읽어 오고, REVOCATION_REBUILD_SECONDS
+마다 만료된 행을 지우고 전체를 다시 읽는다 (커서보다 늦게 커밋된 행도 이때 반영된다).
+같은 프로세스에서 폐기한 토큰은 즉시 반영되고, 다른 프로세스에는 최대 동기화 주기만큼 늦게 반영된다.
+
+목록은 시작할 때(start) 읽고 요청 경로에서는 DB 를 읽지 않는다. 아직 한 번도 읽지 못했으면(시작 시 DB 장애 등)
+폐기 여부를 알 수 없으므로 모든 토큰을 폐기된 것으로 본다 (fail closed). 백그라운드 태스크가 동기화 주기마다
+다시 읽기를 시도하고, 읽히면 바로 정상 인증으로 돌아온다.
+"""
+import asyncio
+import hashlib
+import logging
+import math
+import threading
+import time
+from datetime import datetime
+from sqlalchemy import delete, func, select
+from starlette.concurrency import run_in_threadpool
+from .config import settings
+from .database import SessionLocal, insert_ignoring_duplicates
+from app.models.token import RefreshToken, RevokedToken
+
+logger = logging.getLogger(__name__)
+
+
+class BloomFilter:
+    def __init__(self, capacity, error_rate):
+        self.capacity = max(capacity, 1)
+        self.size = max(64, int(-self.capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / self.capacity * math.log(2)))
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, key):
+        # 128비트 해시 하나를 둘로 나눠 k 개의 위치를 만든다 (double hashing). 없는 키는 첫 0 비트에서 멈춘다
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "little")
+        second = int.from_bytes(digest[8:], "little") | 1
+        return ((first + i * second) % self.size for i in range(self.hashes))
+
+    def add(self, key):
+        for position in self._positions(key):
+            self._bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, key):
+        bits = self._bits
+        return all(bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+
+class RevocationList:
+    def __init__(self, session_factory=SessionLocal):
+        self.session_factory = session_factory
+        self._lock = threading.Lock()
+        self._bloom = BloomFilter(settings.REVOCATION_BLOOM_CAPACITY, settings.REVOCATION_BLOOM_ERROR_RATE)
+        self._exact = {}  # jti -> 토큰 만료 시각
+        self._cursor = 0
+        self._loaded = False
+        self._reloaded_at = 0.0
+        self._task = None
+
+    def __len__(self):
+        return len(self._exact)
+
+    def is_revoked(self, jti):
+        if not self._loaded:
+            # 폐기 목록을 모르는 동안은 거절한다 (fail closed)
+            return True
+        if not jti:
+            return False
+        if jti not in self._bloom:
+            return False
+        return jti in self._exact
+
+    def _remember(self, jti, expires_at):
+        self._exact[jti] = expires_at
+        self._bloom.add(jti)
+
+    def revoke(self, db, tokens):
+        """
+        tokens: [(jti, 토큰 만료 시각), ...]. 커밋은 호출한 쪽에서 한다.
+        이 프로세스에는 바로 반영한다 (커밋이 실패해도 더 엄격해질 뿐이다).
+        """
+        rows = [{"jti": jti, "expires_at": expires_at} for jti, expires_at in tokens if jti]
+        if not rows:
+            return
+        insert_ignoring_duplicates(db, RevokedToken, rows, ["jti"])
+        with self._lock:
+            for row in rows:
+                self._remember(row["jti"], row["expires_at"])
+
+    def sync(self):
+        """커서 이후 다른 프로세스가 추가한 폐기 행만 읽는다."""
+        with self.session_factory() as db:
+            rows = db.execute(
+                select(RevokedToken.id, RevokedToken.jti, RevokedToken.expires_at)
+                .where(RevokedToken.id > self._cursor).order_by(RevokedToken.id)
+            ).all()
+        if not rows:
+            return 0
+        with self._lock:
+            for row in rows:
+                self._remember(row.jti, row.expires_at)
+            self._cursor = max(self._cursor, rows[-1].id)
+        return len(rows)
+
+    def reload(self):
+        """만료되지 않은 폐기 행 전체로 블룸 필터와 집합을 새로 만든다."""
+        now = datetime.utcnow()
+        with self.session_factory() as db:
+            cursor = db.execute(select(func.max(RevokedToken.id))).scalar() or 0
+            rows = db.execute(
+                select(RevokedToken.jti, RevokedToken.expires_at).where(RevokedToken.expires_at > now)
+            ).all()
+        with self._lock:
+            # 읽는 동안 이 프로세스에서 폐기한 항목은 잃지 않도록 합친다
+            exact = {jti: expires_at for jti, expires_at in self._exact.items() if expires_at > now}
+            exact.update((row.jti, row.expires_at) for row in rows)
+            bloom = BloomFilter(max(settings.REVOCATION_BLOOM_CAPACITY, 2 * len(exact)),
+                                settings.REVOCATION_BLOOM_ERROR_RATE)
+            for jti in exact:
+                bloom.add(jti)
+            self._bloom, self._exact = bloom, exact
+            self._cursor = max(self._cursor, cursor)
+            self._loaded = True
+            self._reloaded_at = time.monotonic()
+
+    def purge(self):
+        """만료된 폐기 행과 리프레시 토큰을 지운다. 만료된 토큰은 서명 검증에서 이미 거절된다."""
+        now = datetime.utcnow()
+        with self.session_factory() as db:
+            db.execute(delete(RevokedToken).where(RevokedToken.expires_at <= now))
+            db.execute(delete(RefreshToken).where(RefreshToken.expires_at <= now))
+            db.commit()
+
+    def _refresh(self):
+        if not self._loaded \
+                or time.monotonic() - self._reloaded_at >= settings.REVOCATION_REBUILD_SECONDS \
+                or len(self._exact) > self._bloom.capacity:
+            self.purge()
+            self.reload()
+        else:
+            self.sync()
+
+    async def run(self):
+        while True:
+            await asyncio.sleep(settings.REVOCATION_SYNC_SECONDS)
+            try:
+                await run_in_threadpool(self._refresh)
+            except Exception:
+                logger.exception("Failed to refresh token revocation list")
+
+    async def start(self):
+        try:
+            await run_in_threadpool(self.reload)
+        except Exception:
+            logger.exception("Failed to load token revocation list")
+        self._task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+revocation_list = RevocationList()
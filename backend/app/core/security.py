@@ -1,11 +1,19 @@
+import uuid
 from datetime import datetime, timedelta
 from typing import Union
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from .config import settings
+from .revocation import revocation_list
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+ACCESS_TOKEN_TYPE = "access"
+REFRESH_TOKEN_TYPE = "refresh"
+
+def new_jti():
+    return uuid.uuid4().hex
+
 def create_access_token(data: dict, expires_delta: Union[timedelta, None] = None):
     to_encode = data.copy()
     if expires_delta:
@@ -13,18 +21,29 @@ def create_access_token(data: dict, expires_delta: Union[timedelta, None] = None
     else:
         expire = datetime.utcnow() + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     to_encode.update({"exp": expire})
+    to_encode.setdefault("jti", new_jti())
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
     return encoded_jwt
 
+def create_refresh_token(data: dict, expires_at: datetime):
+    to_encode = {**data, "type": REFRESH_TOKEN_TYPE, "exp": expires_at}
+    return jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
+
 def verify_password(plain_password, hashed_password):
     return pwd_context.verify(plain_password, hashed_password)
 
 def get_password_hash(password):
     return pwd_context.hash(password)
 
-def verify_token(token: str):
+def verify_token(token: str, token_type: str = ACCESS_TOKEN_TYPE):
     try:
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        return payload
     except JWTError:
-        return None
\ No newline at end of file
+        return None
+    # 리프레시 토큰을 access 토큰 자리에 쓰지 못하게 한다 (type 이 없는 예전 토큰은 access)
+    if payload.get("type", ACCESS_TOKEN_TYPE) != token_type:
+        return None
+    # 메모리 블룸 필터로 확인하므로 DB 조회가 없다
+    if revocation_list.is_revoked(payload.get("jti")):
+        return None
+    return payload
@@ -0,0 +1,57 @@
+"""
+대량 목록 응답용 직렬화
+
+목록 엔드포인트는 신뢰할 수 있는 DB 행을 바로 dict 로 만들어 FastJSONResponse 로 돌려준다. response_model 검증과
+jsonable_encoder 를 거치지 않고, orjson 이 설치돼 있으면 orjson 으로 인코딩한다 (없으면 표준 json).
+?fields=id,seat_number 처럼 필요한 최상위 필드만 골라 받을 수 있다.
+"""
+import enum
+import json
+from datetime import date, datetime, time
+from decimal import Decimal
+from typing import Optional
+from fastapi import HTTPException
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # 선택 의존성
+    orjson = None
+
+
+def _default(value):
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(content) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(content, default=_default, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    def render(self, content) -> bytes:
+        return dumps(content)
+
+
+def parse_fields(fields: Optional[str], allowed):
+    """?fields= 값을 검증해 필드 목록으로. 비어 있으면 None (전체 필드)."""
+    if not fields:
+        return None
+    selected = [field.strip() for field in fields.split(",") if field.strip()]
+    unknown = [field for field in selected if field not in allowed]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {unknown}. Allowed: {list(allowed)}")
+    return selected
+
+
+def sparse(items, fields):
+    if fields is None:
+        return items
+    return [{field: item[field] for field in fields} for item in items]
@@ -0,0 +1,289 @@
+"""
+추첨(로터리) 배정
+
+수요가 좌석보다 훨씬 많은 운행은 선착순 대신 응모를 받는다. 응모 기간에는 lottery_entries 에 한 줄씩
+INSERT만 하고(좌석 경합 없음), 마감 후 한 번의 배치 작업이 가중치 랜덤 추첨으로 당첨자를 정해 예약을
+일괄 INSERT 한다. 낙첨자는 추첨 순서대로 대기열에 들어간다.
+
+가중치는 1 + LOTTERY_LOSS_WEIGHT × (최근 LOTTERY_LOOKBACK_DAYS 일 동안 낙첨 횟수) 로, 계속 떨어진 사용자가
+다음 추첨에서 유리하다. 추첨 순서는 Efraimidis-Spirakis 방식(키 = U^(1/w))으로 한 번에 정한다.
+
+응모 기간에 운행이 취소됐거나 달력상 운행하지 않게 되면 좌석을 배정하지 않고 추첨을 무효(VOID)로 닫는다.
+무효 응모는 낙첨 횟수에 들어가지 않는다.
+
+    python -m app.lottery            # 마감된 추첨을 모두 실행 (cron 용)
+"""
+import asyncio
+import logging
+import random
+import secrets
+from datetime import datetime, timedelta
+from sqlalchemy import func, insert, select, update
+from starlette.concurrency import run_in_threadpool
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.core.events import event_broker
+from app.core.changes import insert_tracked
+from app.core.metrics import LOTTERY_SEATS_ALLOCATED_TOTAL
+from app.models.lottery import Lottery, LotteryEntry, LotteryStatus, LotteryEntryStatus
+from app.models.reservation import Reservation, ReservationStatus
+from app.models.waitlist import WaitlistEntry, WaitlistStatus
+from app.models.hold import SeatHold
+from app.models.bus import Bus
+from app.schedule import trip_schedule
+from app.utils.bus_seats import generate_seat_numbers
+from app.utils.reaccommodation import pick_seats
+
+logger = logging.getLogger(__name__)
+
+
+def weighted_order(entries, weights, rng):
+    """가중치 비복원 추첨 순서. entries 와 weights 는 같은 길이."""
+    keyed = [(rng.random() ** (1.0 / weight), index) for index, weight in enumerate(weights)]
+    keyed.sort(reverse=True)
+    return [entries[index] for _, index in keyed]
+
+
+def _claim(db, lottery_id, force):
+    # 여러 워커/크론이 동시에 돌아도 한 곳만 추첨하도록 상태를 바꿔 선점
+    conditions = [Lottery.id == lottery_id, Lottery.status == LotteryStatus.OPEN]
+    if not force:
+        conditions.append(Lottery.closes_at <= datetime.utcnow())
+    claimed = db.execute(
+        update(Lottery).where(*conditions).values(status=LotteryStatus.DRAWING),
+        execution_options={"synchronize_session": False},
+    ).rowcount
+    db.commit()
+    return claimed == 1
+
+
+def draw_lottery(db, lottery_id, force=False):
+    """
+    추첨을 실행하고 결과 요약을 돌려준다. 이미 추첨됐거나 아직 마감 전이면(force 가 아니면) None.
+    """
+    if not _claim(db, lottery_id, force):
+        return None
+    try:
+        return _draw(db, db.get(Lottery, lottery_id))
+    except Exception:
+        db.rollback()
+        db.execute(update(Lottery).where(Lottery.id == lottery_id).values(status=LotteryStatus.OPEN))
+        db.commit()
+        raise
+
+
+def _void(db, lottery, entries, now):
+    db.execute(
+        update(LotteryEntry).where(LotteryEntry.id.in_([entry.id for entry in entries]))
+        .values(status=LotteryEntryStatus.VOID),
+        execution_options={"synchronize_session": False},
+    )
+    db.execute(
+        update(Lottery).where(Lottery.id == lottery.id).values(status=LotteryStatus.VOID, drawn_at=now),
+        execution_options={"synchronize_session": False},
+    )
+    db.commit()
+
+    for entry in entries:
+        event_broker.publish(entry.user_id, "lottery_result", {
+            "lottery_id": lottery.id, "result": "void", "bus_id": lottery.bus_id,
+            "reservation_date": lottery.reservation_date.isoformat(),
+        })
+
+    return {
+        "lottery_id": lottery.id,
+        "bus_id": lottery.bus_id,
+        "reservation_date": lottery.reservation_date,
+        "status": LotteryStatus.VOID.value,
+        "seed": None,
+        "entries": len(entries),
+        "winners": 0,
+        "losers": 0,
+        "seats_allocated": 0,
+        "seats_left": 0,
+    }
+
+
+def _draw(db, lottery):
+    now = datetime.utcnow()
+    seed = secrets.token_hex(8)
+    rng = random.Random(seed)
+
+    entries = db.execute(
+        select(LotteryEntry.id, LotteryEntry.user_id, LotteryEntry.seat_count)
+        .where(LotteryEntry.lottery_id == lottery.id, LotteryEntry.status == LotteryEntryStatus.PENDING)
+        .order_by(LotteryEntry.id)
+    ).all()
+
+    # 응모 기간에 운행이 취소됐으면 배정하지 않는다 (캐시가 아닌 DB 의 운행 상태로 확인)
+    if trip_schedule.scheduled_trip(db, lottery.bus_id, lottery.reservation_date) is None:
+        return _void(db, lottery, entries, now)
+
+    # 최근 낙첨 횟수 (한 번의 GROUP BY)
+    losses = dict(db.execute(
+        select(LotteryEntry.user_id, func.count(LotteryEntry.id)).where(
+            LotteryEntry.status == LotteryEntryStatus.LOST,
+            LotteryEntry.created_at >= now - timedelta(days=settings.LOTTERY_LOOKBACK_DAYS),
+            LotteryEntry.user_id.in_([entry.user_id for entry in entries]),
+        ).group_by(LotteryEntry.user_id)
+    ).all()) if entries else {}
+    weights = [1.0 + settings.LOTTERY_LOSS_WEIGHT * losses.get(entry.user_id, 0) for entry in entries]
+    order = weighted_order(entries, weights, rng)
+
+    bus = db.get(Bus, lottery.bus_id)
+    taken = set(db.execute(
+        select(Reservation.seat_number).where(
+            Reservation.bus_id == lottery.bus_id,
+            Reservation.reservation_date == lottery.reservation_date,
+            Reservation.status == ReservationStatus.CONFIRMED,
+        ).union(
+            select(SeatHold.seat_number).where(
+                SeatHold.bus_id == lottery.bus_id,
+                SeatHold.reservation_date == lottery.reservation_date,
+                SeatHold.expires_at > now,
+            )
+        )
+    ).scalars())
+    free_seats = [seat for seat in generate_seat_numbers(bus.total_seats) if seat not in taken]
+
+    winners, losers, reservations = [], [], []
+    for entry in order:
+        chosen = pick_seats(free_seats, entry.seat_count) if free_seats else None
+        if not chosen:
+            # 남은 좌석보다 많이 신청했으면 건너뛰고 더 작은 응모에 기회를 준다
+            losers.append(entry)
+            continue
+        for seat in chosen:
+            free_seats.remove(seat)
+        winners.append((entry, chosen))
+        reservations.extend({
+            "user_id": entry.user_id,
+            "bus_id": lottery.bus_id,
+            "seat_number": seat,
+            "reservation_date": lottery.reservation_date,
+            "status": ReservationStatus.CONFIRMED,
+        } for seat in chosen)
+
+    if reservations:
+        insert_tracked(db, Reservation, reservations)
+    if winners:
+        db.execute(
+            update(LotteryEntry).where(LotteryEntry.id.in_([entry.id for entry, _ in winners]))
+            .values(status=LotteryEntryStatus.WON),
+            execution_options={"synchronize_session": False},
+        )
+    if losers:
+        db.execute(
+            update(LotteryEntry).where(LotteryEntry.id.in_([entry.id for entry in losers]))
+            .values(status=LotteryEntryStatus.LOST),
+            execution_options={"synchronize_session": False},
+        )
+        # 낙첨자는 추첨 순서대로 대기열에 (이미 대기 중인 사용자는 제외)
+        waiting = set(db.execute(select(WaitlistEntry.user_id).where(
+            WaitlistEntry.bus_id == lottery.bus_id,
+            WaitlistEntry.reservation_date == lottery.reservation_date,
+            WaitlistEntry.status == WaitlistStatus.WAITING,
+        )).scalars())
+        rows = [{
+            "user_id": entry.user_id,
+            "bus_id": lottery.bus_id,
+            "reservation_date": lottery.reservation_date,
+            "status": WaitlistStatus.WAITING,
+        } for entry in losers if entry.user_id not in waiting]
+        if rows:
+            db.execute(insert(WaitlistEntry), rows)
+
+    db.execute(
+        update(Lottery).where(Lottery.id == lottery.id)
+        .values(status=LotteryStatus.DRAWN, seed=seed, drawn_at=now),
+        execution_options={"synchronize_session": False},
+    )
+    db.commit()
+    LOTTERY_SEATS_ALLOCATED_TOTAL.inc(amount=len(reservations))
+
+    for entry, seats in winners:
+        event_broker.publish(entry.user_id, "lottery_result", {
+            "lottery_id": lottery.id, "result": "won", "bus_id": lottery.bus_id,
+            "reservation_date": lottery.reservation_date.isoformat(), "seat_numbers": seats,
+        })
+    for entry in losers:
+        event_broker.publish(entry.user_id, "lottery_result", {
+            "lottery_id": lottery.id, "result": "lost", "bus_id": lottery.bus_id,
+            "reservation_date": lottery.reservation_date.isoformat(),
+        })
+
+    return {
+        "lottery_id": lottery.id,
+        "bus_id": lottery.bus_id,
+        "reservation_date": lottery.reservation_date,
+        "status": LotteryStatus.DRAWN.value,
+        "seed": seed,
+        "entries": len(entries),
+        "winners": len(winners),
+        "losers": len(losers),
+        "seats_allocated": len(reservations),
+        "seats_left": len(free_seats),
+    }
+
+
+def due_lottery_ids(db):
+    return db.execute(
+        select(Lottery.id).where(Lottery.status == LotteryStatus.OPEN, Lottery.closes_at <= datetime.utcnow())
+        .order_by(Lottery.closes_at)
+    ).scalars().all()
+
+
+def draw_due_lotteries(session_factory=SessionLocal):
+    results = []
+    with session_factory() as db:
+        for lottery_id in due_lottery_ids(db):
+            result = draw_lottery(db, lottery_id)
+            if result is not None:
+                results.append(result)
+    return results
+
+
+class LotteryRunner:
+    """마감된 추첨을 주기적으로 실행하는 백그라운드 태스크."""
+
+    def __init__(self, interval_seconds, session_factory=SessionLocal):
+        self.interval_seconds = interval_seconds
+        self.session_factory = session_factory
+        self._task = None
+
+    async def run(self):
+        while True:
+            try:
+                for result in await run_in_threadpool(draw_due_lotteries, self.session_factory):
+                    if result["status"] == LotteryStatus.VOID.value:
+                        logger.info("Lottery %s voided: trip is not running", result["lottery_id"])
+                        continue
+                    logger.info("Lottery %s drawn: %s winners, %s losers",
+                                result["lottery_id"], result["winners"], result["losers"])
+            except Exception:
+                logger.exception("Failed to draw due lotteries")
+            await asyncio.sleep(self.interval_seconds)
+
+    async def start(self):
+        self._task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+lottery_runner = LotteryRunner(settings.LOTTERY_POLL_SECONDS)
+
+
+if __name__ == "__main__":
+    for summary in draw_due_lotteries():
+        if summary["status"] == LotteryStatus.VOID.value:
+            print(f"Lottery {summary['lottery_id']}: voided, trip is not running")
+            continue
+        print(f"Lottery {summary['lottery_id']}: {summary['winners']} winners, {summary['losers']} losers, "
+              f"{summary['seats_allocated']} seats allocated")
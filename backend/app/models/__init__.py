@@ -1,5 +1,16 @@
 from .user import User
-from .bus import Bus, BusRoute
-from .reservation import Reservation
+from .bus import Bus, BusRoute, RouteStop
+from .reservation import Reservation, ReservationSegment
+from .idempotency import IdempotencyKey
+from .hold import SeatHold
+from .waitlist import WaitlistEntry
+from .lottery import Lottery, LotteryEntry
+from .boarding import Boarding
+from .change import ChangeLog
+from .outbox import OutboxEvent
+from .notification import NotificationLog
+from .token import RefreshToken, RevokedToken
+from .schedule import ServiceCalendar, ServiceException, BusService, Trip, ServiceDay
+from .location import BusLocation
 
-__all__ = ["User", "Bus", "BusRoute", "Reservation"]
\ No newline at end of file
+__all__ = ["User", "Bus", "BusRoute", "RouteStop", "Reservation", "ReservationSegment", "IdempotencyKey", "SeatHold", "WaitlistEntry", "Lottery", "LotteryEntry", "Boarding", "ChangeLog", "OutboxEvent", "NotificationLog", "RefreshToken", "RevokedToken", "ServiceCalendar", "ServiceException", "BusService", "Trip", "ServiceDay", "BusLocation"]
\ No newline at end of file
@@ -0,0 +1,18 @@
+from sqlalchemy import Column, Integer, DateTime, ForeignKey, Enum
+from sqlalchemy.sql import func
+from app.core.database import Base
+import enum
+
+class BoardingStatus(enum.Enum):
+    BOARDED = "boarded"
+    NO_SHOW = "no_show"
+
+class Boarding(Base):
+    __tablename__ = "boardings"
+
+    id = Column(Integer, primary_key=True, index=True)
+    reservation_id = Column(Integer, ForeignKey("reservations.id"), nullable=False, unique=True)  # 예약당 한 줄 (마지막 스캔 기준)
+    status = Column(Enum(BoardingStatus), nullable=False)
+    scanned_at = Column(DateTime, nullable=False)  # 기사 단말에서 스캔한 시각 (UTC)
+    recorded_by = Column(Integer, ForeignKey("users.id"), nullable=False)
+    recorded_at = Column(DateTime, server_default=func.now(), onupdate=func.now(), nullable=False)  # 서버에 동기화된 시각
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, ForeignKey, Time, Enum
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, ForeignKey, Time, Enum, Float, UniqueConstraint
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.core.database import Base
@@ -20,6 +20,20 @@ class BusRoute(Base):
 
     # Relationships
     buses = relationship("Bus", back_populates="route")
+    stops = relationship("RouteStop", order_by="RouteStop.sequence")
+
+class RouteStop(Base):
+    """노선의 정차 순서. 정의하지 않은 노선은 출발지 → 목적지 두 정류장으로 본다."""
+    __tablename__ = "route_stops"
+    __table_args__ = (UniqueConstraint("route_id", "sequence", name="uq_route_stops_sequence"),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    route_id = Column(Integer, ForeignKey("bus_routes.id"), nullable=False)
+    sequence = Column(Integer, nullable=False)  # 0부터 (0 = 출발지)
+    name = Column(String, nullable=False)
+    offset_minutes = Column(Integer, nullable=True)  # 출발 시각 기준 도착 예정 (분)
+    latitude = Column(Float, nullable=True)  # 실시간 위치 ETA 계산용 (WGS84)
+    longitude = Column(Float, nullable=True)
 
 class Bus(Base):
     __tablename__ = "buses"
@@ -0,0 +1,13 @@
+from sqlalchemy import Column, Integer, String, DateTime, Index
+from app.core.database import Base
+
+class ChangeLog(Base):
+    __tablename__ = "change_log"
+    __table_args__ = (Index("ix_change_log_user_seq", "user_id", "seq"),)
+
+    seq = Column(Integer, primary_key=True, autoincrement=True)  # 단조 증가하는 변경 번호 (동기화 커서)
+    entity = Column(String(20), nullable=False)  # reservation / bus / route
+    entity_id = Column(Integer, nullable=False)
+    user_id = Column(Integer, nullable=True)  # 예약 소유자 (사용자 범위 필터)
+    bus_id = Column(Integer, nullable=True)  # 예약의 버스 (기사 범위 필터)
+    recorded_at = Column(DateTime, nullable=False)
@@ -0,0 +1,17 @@
+from sqlalchemy import Column, Integer, String, DateTime, Date, ForeignKey, UniqueConstraint
+from sqlalchemy.sql import func
+from app.core.database import Base
+
+class SeatHold(Base):
+    __tablename__ = "seat_holds"
+    # 한 좌석은 동시에 하나의 홀드만 가질 수 있다 (만료된 홀드는 스위퍼가 지운다)
+    __table_args__ = (UniqueConstraint("bus_id", "reservation_date", "seat_number", name="uq_seat_holds_seat"),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    hold_id = Column(String(32), nullable=False, index=True)  # 한 번에 잡은 좌석들이 공유하는 홀드 ID
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    bus_id = Column(Integer, ForeignKey("buses.id"), nullable=False)
+    seat_number = Column(String(10), nullable=False)
+    reservation_date = Column(Date, nullable=False)
+    expires_at = Column(DateTime, nullable=False)
+    created_at = Column(DateTime, server_default=func.now(), nullable=False)
@@ -0,0 +1,14 @@
+from sqlalchemy import Column, Integer, String, DateTime, LargeBinary
+from sqlalchemy.sql import func
+from app.core.database import Base
+
+class IdempotencyKey(Base):
+    __tablename__ = "idempotency_keys"
+
+    key = Column(String(320), primary_key=True)  # "<사용자>:<Idempotency-Key 헤더>"
+    request_hash = Column(String(64), nullable=False)  # 메서드 + 경로 + 본문의 SHA-256
+    status_code = Column(Integer, nullable=True)  # NULL이면 첫 요청이 아직 처리 중
+    content_type = Column(String(100), nullable=True)
+    response_body = Column(LargeBinary, nullable=True)
+    created_at = Column(DateTime, server_default=func.now(), nullable=False)
+    expires_at = Column(DateTime, nullable=False, index=True)
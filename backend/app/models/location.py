@@ -0,0 +1,19 @@
+from sqlalchemy import Column, Integer, Float, DateTime, ForeignKey, Index
+from sqlalchemy.sql import func
+from app.core.database import Base
+
+class BusLocation(Base):
+    """기사 단말이 보낸 GPS 위치. 요청마다 쓰지 않고 모아서 한 번에 INSERT 한다 (app/tracking.py)."""
+    __tablename__ = "bus_locations"
+    __table_args__ = (Index("ix_bus_locations_bus_recorded", "bus_id", "recorded_at"),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    bus_id = Column(Integer, ForeignKey("buses.id"), nullable=False)
+    driver_id = Column(Integer, ForeignKey("users.id"), nullable=True)
+    latitude = Column(Float, nullable=False)
+    longitude = Column(Float, nullable=False)
+    speed_kmh = Column(Float, nullable=True)  # 단말이 보고한 속도
+    heading = Column(Float, nullable=True)  # 진행 방향 (도, 북쪽 0)
+    accuracy_m = Column(Float, nullable=True)
+    recorded_at = Column(DateTime, nullable=False)  # 단말에서 측정한 시각 (UTC)
+    received_at = Column(DateTime, server_default=func.now(), nullable=False)
@@ -0,0 +1,49 @@
+from sqlalchemy import Column, Integer, String, DateTime, Date, ForeignKey, Enum, UniqueConstraint, Index
+from sqlalchemy.orm import relationship
+from sqlalchemy.sql import func
+from app.core.database import Base
+import enum
+
+class LotteryStatus(enum.Enum):
+    OPEN = "open"  # 응모 접수 중
+    DRAWING = "drawing"  # 추첨 작업이 선점함
+    DRAWN = "drawn"
+    VOID = "void"  # 추첨 시점에 운행하지 않아 무효 (배정 없음)
+
+class LotteryEntryStatus(enum.Enum):
+    PENDING = "pending"
+    WON = "won"
+    LOST = "lost"
+    VOID = "void"
+
+class Lottery(Base):
+    __tablename__ = "lotteries"
+    __table_args__ = (
+        UniqueConstraint("bus_id", "reservation_date", name="uq_lotteries_trip"),
+        Index("ix_lotteries_due", "status", "closes_at"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    bus_id = Column(Integer, ForeignKey("buses.id"), nullable=False)
+    reservation_date = Column(Date, nullable=False)
+    closes_at = Column(DateTime, nullable=False)  # 응모 마감 (UTC), 이후 일괄 추첨
+    max_seats_per_entry = Column(Integer, default=2, nullable=False)
+    status = Column(Enum(LotteryStatus), default=LotteryStatus.OPEN, nullable=False)
+    seed = Column(String(32), nullable=True)  # 추첨에 쓴 난수 시드 (재현/감사용)
+    drawn_at = Column(DateTime, nullable=True)
+    created_by = Column(Integer, ForeignKey("users.id"), nullable=True)
+    created_at = Column(DateTime, server_default=func.now(), nullable=False)
+
+    # Relationships
+    bus = relationship("Bus")
+
+class LotteryEntry(Base):
+    __tablename__ = "lottery_entries"
+    __table_args__ = (UniqueConstraint("lottery_id", "user_id", name="uq_lottery_entries_user"),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    lottery_id = Column(Integer, ForeignKey("lotteries.id"), nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    seat_count = Column(Integer, default=1, nullable=False)
+    status = Column(Enum(LotteryEntryStatus), default=LotteryEntryStatus.PENDING, nullable=False)
+    created_at = Column(DateTime, server_default=func.now(), nullable=False)
@@ -0,0 +1,23 @@
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Enum, UniqueConstraint
+from sqlalchemy.sql import func
+from app.core.database import Base
+import enum
+
+class NotificationStatus(enum.Enum):
+    QUEUED = "queued"
+    SENT = "sent"
+    FAILED = "failed"
+
+class NotificationLog(Base):
+    __tablename__ = "notification_log"
+    # 같은 예약에 같은 종류의 알림은 한 번만 (여러 워커/이벤트 재전달 중복 방지)
+    __table_args__ = (UniqueConstraint("reservation_id", "kind", name="uq_notification_log_kind"),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    reservation_id = Column(Integer, ForeignKey("reservations.id"), nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    kind = Column(String(20), nullable=False)  # confirmation / cancellation / reminder
+    status = Column(Enum(NotificationStatus), default=NotificationStatus.QUEUED, nullable=False)
+    error = Column(Text, nullable=True)
+    created_at = Column(DateTime, server_default=func.now(), nullable=False)
+    sent_at = Column(DateTime, nullable=True)
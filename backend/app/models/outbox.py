@@ -0,0 +1,24 @@
+from sqlalchemy import Column, Integer, String, Text, DateTime, Enum, Index
+from app.core.database import Base
+import enum
+
+class OutboxStatus(enum.Enum):
+    PENDING = "pending"
+    DELIVERED = "delivered"
+    FAILED = "failed"  # 재시도 한도 초과 (수동 확인 대상)
+
+class OutboxEvent(Base):
+    __tablename__ = "outbox_events"
+    __table_args__ = (Index("ix_outbox_events_due", "status", "next_attempt_at"),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    event_type = Column(String(50), nullable=False)  # reservation.created, reservation.cancelled, ...
+    aggregate_id = Column(Integer, nullable=False)
+    payload = Column(Text, nullable=False)  # JSON
+    status = Column(Enum(OutboxStatus), default=OutboxStatus.PENDING, nullable=False)
+    attempts = Column(Integer, default=0, nullable=False)
+    next_attempt_at = Column(DateTime, nullable=False)
+    claim_token = Column(String(32), nullable=True)  # 배치를 가져간 디스패처
+    last_error = Column(Text, nullable=True)
+    created_at = Column(DateTime, nullable=False)
+    delivered_at = Column(DateTime, nullable=True)
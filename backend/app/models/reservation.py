@@ -25,4 +25,24 @@ class Reservation(Base):
     # Relationships
     user = relationship("User", back_populates="reservations", foreign_keys=[user_id])
     bus = relationship("Bus", back_populates="reservations")
-    cancelled_by_user = relationship("User", foreign_keys=[cancelled_by])
\ No newline at end of file
+    cancelled_by_user = relationship("User", foreign_keys=[cancelled_by])
+    segment = relationship("ReservationSegment", uselist=False, viewonly=True)  # 없으면 전 구간 예약
+
+    @property
+    def board_stop(self):
+        return self.segment.board_stop if self.segment else None
+
+    @property
+    def alight_stop(self):
+        return self.segment.alight_stop if self.segment else None
+
+class ReservationSegment(Base):
+    """
+    일부 구간만 타는 예약의 승차/하차 정류장 (노선 정류장 sequence). 이 행이 없는 예약은 전 구간을 탄다.
+    같은 좌석이라도 구간이 겹치지 않으면 다른 예약이 쓸 수 있다.
+    """
+    __tablename__ = "reservation_segments"
+
+    reservation_id = Column(Integer, ForeignKey("reservations.id"), primary_key=True)
+    board_stop = Column(Integer, nullable=False)
+    alight_stop = Column(Integer, nullable=False)
@@ -0,0 +1,74 @@
+from sqlalchemy import Column, Integer, String, DateTime, Date, Time, Boolean, ForeignKey, Enum, UniqueConstraint, Index
+from sqlalchemy.orm import relationship
+from sqlalchemy.sql import func
+from app.core.database import Base
+import enum
+
+class ServiceCalendar(Base):
+    """요일별 운행 패턴. 버스에 달력을 연결하지 않으면 매일 운행한다."""
+    __tablename__ = "service_calendars"
+
+    id = Column(Integer, primary_key=True, index=True)
+    name = Column(String, nullable=False)  # 예: 평일, 주말, 방학
+    monday = Column(Boolean, default=True, nullable=False)
+    tuesday = Column(Boolean, default=True, nullable=False)
+    wednesday = Column(Boolean, default=True, nullable=False)
+    thursday = Column(Boolean, default=True, nullable=False)
+    friday = Column(Boolean, default=True, nullable=False)
+    saturday = Column(Boolean, default=True, nullable=False)
+    sunday = Column(Boolean, default=True, nullable=False)
+    start_date = Column(Date, nullable=True)  # 비우면 제한 없음
+    end_date = Column(Date, nullable=True)
+    created_at = Column(DateTime, server_default=func.now(), nullable=False)
+
+    # Relationships
+    exceptions = relationship("ServiceException", order_by="ServiceException.service_date")
+
+class ServiceException(Base):
+    """특정 날짜의 예외 (공휴일 운휴, 임시 운행). 요일 패턴보다 우선한다."""
+    __tablename__ = "service_exceptions"
+    __table_args__ = (UniqueConstraint("calendar_id", "service_date", name="uq_service_exceptions_date"),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    calendar_id = Column(Integer, ForeignKey("service_calendars.id"), nullable=False)
+    service_date = Column(Date, nullable=False)
+    runs = Column(Boolean, nullable=False)  # True = 추가 운행, False = 운휴
+    note = Column(String, nullable=True)
+
+class BusService(Base):
+    """버스별 운행 달력 (buses 테이블에 컬럼을 추가하지 않도록 따로 둔다)."""
+    __tablename__ = "bus_services"
+
+    bus_id = Column(Integer, ForeignKey("buses.id"), primary_key=True)
+    calendar_id = Column(Integer, ForeignKey("service_calendars.id"), nullable=False)
+
+class TripStatus(enum.Enum):
+    SCHEDULED = "scheduled"
+    CANCELLED = "cancelled"
+
+class Trip(Base):
+    """
+    날짜별 운행 인스턴스. 그 날짜를 처음 조회할 때 달력으로 계산해 만든다 (app/schedule.py).
+    예약은 (bus_id, reservation_date) 로 운행에 연결된다.
+    """
+    __tablename__ = "trips"
+    __table_args__ = (
+        UniqueConstraint("bus_id", "service_date", name="uq_trips_bus_date"),
+        Index("ix_trips_service_date", "service_date"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    bus_id = Column(Integer, ForeignKey("buses.id"), nullable=False)
+    service_date = Column(Date, nullable=False)
+    departure_time = Column(Time, nullable=False)
+    arrival_time = Column(Time, nullable=False)
+    status = Column(Enum(TripStatus), default=TripStatus.SCHEDULED, nullable=False)
+    is_override = Column(Boolean, default=False, nullable=False)  # 관리자가 바꾼 운행 (다시 계산할 때 유지)
+    created_at = Column(DateTime, server_default=func.now(), nullable=False)
+
+class ServiceDay(Base):
+    """운행 인스턴스를 만들어 둔 날짜."""
+    __tablename__ = "service_days"
+
+    service_date = Column(Date, primary_key=True)
+    materialized_at = Column(DateTime, server_default=func.now(), nullable=False)
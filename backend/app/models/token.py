@@ -0,0 +1,28 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index
+from sqlalchemy.sql import func
+from app.core.database import Base
+
+class RefreshToken(Base):
+    __tablename__ = "refresh_tokens"
+
+    jti = Column(String(32), primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    family_id = Column(String(32), nullable=False, index=True)  # 로그인 한 번에서 이어지는 회전 체인
+    access_jti = Column(String(32), nullable=False)  # 함께 발급한 access 토큰 (체인 폐기 시 같이 폐기)
+    expires_at = Column(DateTime, nullable=False)
+    used_at = Column(DateTime, nullable=True)  # 회전에 쓰인 시각. 다시 쓰이면 탈취로 보고 체인 전체를 폐기
+    revoked_at = Column(DateTime, nullable=True)
+    created_at = Column(DateTime, server_default=func.now(), nullable=False)
+
+class RevokedToken(Base):
+    __tablename__ = "revoked_tokens"
+
+    # 프로세스별 메모리 사본은 id 커서로 새로 추가된 행만 읽어 간다
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    jti = Column(String(32), nullable=False, unique=True)
+    expires_at = Column(DateTime, nullable=False)  # 토큰 자체가 만료되면 목록에서 지워도 된다
+    revoked_at = Column(DateTime, server_default=func.now(), nullable=False)
+
+    __table_args__ = (
+        Index("ix_revoked_tokens_expires_at", "expires_at"),
+    )
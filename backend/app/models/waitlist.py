@@ -0,0 +1,29 @@
+from sqlalchemy import Column, Integer, String, DateTime, Date, ForeignKey, Enum, Index
+from sqlalchemy.orm import relationship
+from sqlalchemy.sql import func
+from app.core.database import Base
+import enum
+
+class WaitlistStatus(enum.Enum):
+    WAITING = "waiting"
+    PROMOTED = "promoted"
+    CANCELLED = "cancelled"
+
+class WaitlistEntry(Base):
+    __tablename__ = "waitlist_entries"
+    # (버스, 날짜)별 대기열의 맨 앞을 찾는 조회용
+    __table_args__ = (Index("ix_waitlist_queue", "bus_id", "reservation_date", "status", "id"),)
+
+    id = Column(Integer, primary_key=True, index=True)  # 선착순(FIFO) 기준
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    bus_id = Column(Integer, ForeignKey("buses.id"), nullable=False)
+    reservation_date = Column(Date, nullable=False)
+    preferred_seats = Column(String, nullable=True)  # 쉼표로 구분한 선호 좌석 (예: "1A,1B")
+    status = Column(Enum(WaitlistStatus), default=WaitlistStatus.WAITING, nullable=False)
+    reservation_id = Column(Integer, ForeignKey("reservations.id"), nullable=True)  # 승격 시 배정된 예약
+    created_at = Column(DateTime, server_default=func.now(), nullable=False)
+    promoted_at = Column(DateTime, nullable=True)
+
+    # Relationships
+    bus = relationship("Bus")
+    reservation = relationship("Reservation")
@@ -0,0 +1,12 @@
+"""
+예약 확정/취소 알림과 출발 알림
+
+    templates   - 알림 문구
+    providers   - 발송 프로바이더 (stub, smtp, 직접 만든 클래스)
+    sender      - 크기 제한 큐 + 배치/동시성 제한 발송 워커
+    reminders   - 출발 N분 전 알림 스케줄러 (힙)
+    service     - 아웃박스 소비자로 위 구성요소를 묶는다
+"""
+from .service import NotificationService
+
+__all__ = ["NotificationService"]
@@ -0,0 +1,80 @@
+"""
+알림 발송 프로바이더
+
+send(messages) 하나만 구현하면 된다 (블로킹 호출, 스레드풀에서 실행). 배치 단위로 호출되므로 SMTP 처럼 연결
+비용이 큰 프로바이더는 배치당 한 번만 연결한다. NOTIFY_PROVIDER 에 "module:Class" 를 주면 직접 만든
+프로바이더를 쓸 수 있다.
+"""
+import importlib
+import json
+import logging
+import smtplib
+import sys
+import threading
+from email.message import EmailMessage
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class Message:
+    __slots__ = ("recipient", "subject", "body", "log_ids")
+
+    def __init__(self, recipient, subject, body, log_ids):
+        self.recipient = recipient
+        self.subject = subject
+        self.body = body
+        self.log_ids = log_ids  # 이 메시지로 처리되는 notification_log 행
+
+
+class StubProvider:
+    """실제로 보내지 않고 JSON Lines 로 남긴다 (NOTIFY_STUB_PATH, 기본 stdout)."""
+
+    def __init__(self, path=None):
+        self.path = path or settings.NOTIFY_STUB_PATH
+        self._lock = threading.Lock()
+
+    def send(self, messages):
+        lines = "".join(json.dumps({
+            "to": message.recipient, "subject": message.subject, "body": message.body,
+        }, ensure_ascii=False) + "\n" for message in messages)
+        with self._lock:
+            if self.path == "stdout":
+                sys.stdout.write(lines)
+                sys.stdout.flush()
+                return
+            with open(self.path, "a", encoding="utf-8") as file:
+                file.write(lines)
+
+
+class SMTPProvider:
+    """배치당 SMTP 연결 하나로 보낸다. 로컬 테스트는 `python -m aiosmtpd -n` 같은 디버그 서버를 쓰면 된다."""
+
+    def send(self, messages):
+        with smtplib.SMTP(settings.SMTP_HOST, settings.SMTP_PORT, timeout=settings.SMTP_TIMEOUT_SECONDS) as smtp:
+            if settings.SMTP_USE_TLS:
+                smtp.starttls()
+            if settings.SMTP_USER:
+                smtp.login(settings.SMTP_USER, settings.SMTP_PASSWORD)
+            for message in messages:
+                email = EmailMessage()
+                email["From"] = settings.SMTP_FROM or settings.SMTP_USER
+                email["To"] = message.recipient
+                email["Subject"] = message.subject
+                email.set_content(message.body)
+                smtp.send_message(email)
+
+
+PROVIDERS = {
+    "stub": StubProvider,
+    "smtp": SMTPProvider,
+}
+
+
+def load_provider(name):
+    if name in PROVIDERS:
+        return PROVIDERS[name]()
+    module_name, _, class_name = name.partition(":")
+    if not class_name:
+        raise ValueError(f"Unknown notification provider: {name}")
+    return getattr(importlib.import_module(module_name), class_name)()
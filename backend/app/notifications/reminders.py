@@ -0,0 +1,116 @@
+"""
+출발 알림 스케줄러
+
+(알림 시각, 예약 ID) 최소 힙을 두고 가장 이른 알림 시각까지 잠든다. 테이블을 분 단위로 훑지 않고, 시작할 때와
+날짜가 바뀔 때 오늘~내일 확정 예약을 날짜별로 한 번씩 읽어 힙에 넣는다. 그 사이 새로 생긴 예약은 예약 이벤트가
+schedule 로 넣고, 취소된 예약은 힙에 남겨 두었다가 발송 시점 조회에서 걸러낸다. 발송에 실패한 예약은
+RETRY_SECONDS 뒤로 힙에 다시 넣는다 (이미 큐에 들어간 것은 notification_log 선점으로 걸러진다).
+
+알림 시각은 그 날짜 운행(Trip)의 출발 시각으로 잡고, 운행이 아직 없으면 버스 기본 출발 시각을 쓴다.
+운행 시각이 늦춰지면 발송 시점 조회에서 바뀐 시각으로 다시 예약한다. 출발 시각은 서버 로컬 시간 기준이다.
+"""
+import asyncio
+import heapq
+import logging
+from datetime import date, datetime, timedelta
+from sqlalchemy import and_, func, select
+from starlette.concurrency import run_in_threadpool
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.bus import Bus
+from app.models.reservation import Reservation, ReservationStatus
+from app.models.schedule import Trip
+
+logger = logging.getLogger(__name__)
+
+MAX_SLEEP_SECONDS = 3600
+RETRY_SECONDS = 60
+
+
+def remind_at(reservation_date, departure_time):
+    return datetime.combine(reservation_date, departure_time) - timedelta(minutes=settings.NOTIFY_REMINDER_MINUTES)
+
+
+class ReminderScheduler:
+    def __init__(self, fire, session_factory=SessionLocal):
+        self.fire = fire  # async fire(reservation_ids)
+        self.session_factory = session_factory
+        self._heap = []
+        self._loaded_until = None
+        self._wakeup = None
+        self._task = None
+
+    def __len__(self):
+        return len(self._heap)
+
+    def schedule(self, reservation_id, reservation_date, departure_time):
+        # 아직 읽지 않은 날짜는 그 날이 되면 한꺼번에 읽는다
+        if self._loaded_until is None or reservation_date > self._loaded_until:
+            return
+        heapq.heappush(self._heap, (remind_at(reservation_date, departure_time), reservation_id))
+        if self._wakeup is not None and self._heap[0][1] == reservation_id:
+            self._wakeup.set()
+
+    def _load_day(self, day):
+        with self.session_factory() as db:
+            rows = db.execute(
+                select(Reservation.id, func.coalesce(Trip.departure_time, Bus.departure_time))
+                .join(Bus, Reservation.bus_id == Bus.id)
+                .outerjoin(Trip, and_(Trip.bus_id == Reservation.bus_id, Trip.service_date == Reservation.reservation_date))
+                .where(Reservation.reservation_date == day, Reservation.status == ReservationStatus.CONFIRMED)
+            ).all()
+        return [(remind_at(day, departure_time), reservation_id) for reservation_id, departure_time in rows]
+
+    async def _extend_horizon(self):
+        horizon = date.today() + timedelta(days=1)
+        day = date.today() if self._loaded_until is None else self._loaded_until + timedelta(days=1)
+        while day <= horizon:
+            entries = await run_in_threadpool(self._load_day, day)
+            for entry in entries:
+                heapq.heappush(self._heap, entry)
+            self._loaded_until = day
+            logger.info("Loaded %d departure reminders for %s", len(entries), day)
+            day += timedelta(days=1)
+
+    def pop_due(self, now):
+        due = []
+        while self._heap and self._heap[0][0] <= now:
+            due.append(heapq.heappop(self._heap)[1])
+        return due
+
+    async def run(self):
+        self._wakeup = asyncio.Event()
+        while True:
+            due = []
+            try:
+                await self._extend_horizon()
+                due = self.pop_due(datetime.now())
+                if due:
+                    await self.fire(sorted(set(due)))
+            except Exception:
+                logger.exception("Failed to send departure reminders")
+                retry_at = datetime.now() + timedelta(seconds=RETRY_SECONDS)
+                for reservation_id in set(due):
+                    heapq.heappush(self._heap, (retry_at, reservation_id))
+            now = datetime.now()
+            next_day = datetime.combine(date.today() + timedelta(days=1), datetime.min.time())
+            timeout = min((next_day - now).total_seconds(), MAX_SLEEP_SECONDS)
+            if self._heap:
+                timeout = min(timeout, (self._heap[0][0] - now).total_seconds())
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=max(timeout, 0))
+            except asyncio.TimeoutError:
+                pass
+
+    async def start(self):
+        self._task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
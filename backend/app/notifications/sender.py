@@ -0,0 +1,94 @@
+"""
+비동기 발송 큐
+
+크기가 제한된 asyncio.Queue 에 메시지를 넣으면 NOTIFY_CONCURRENCY 개의 워커가 최대 NOTIFY_BATCH_SIZE 개씩 꺼내
+프로바이더로 보낸다 (프로바이더 호출은 스레드풀). 큐가 가득 차면 enqueue 가 기다리다 시간 초과로 실패하므로
+아웃박스 이벤트가 재시도되어 요청 경로로 부하가 번지지 않는다.
+"""
+import asyncio
+import logging
+from datetime import datetime
+from sqlalchemy import update
+from starlette.concurrency import run_in_threadpool
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.core.metrics import NOTIFICATIONS_TOTAL
+from app.models.notification import NotificationLog, NotificationStatus
+
+logger = logging.getLogger(__name__)
+
+
+class NotificationSender:
+    def __init__(self, provider, session_factory=SessionLocal):
+        self.provider = provider
+        self.session_factory = session_factory
+        self._queue = None
+        self._workers = []
+
+    @property
+    def pending(self):
+        return self._queue.qsize() if self._queue is not None else 0
+
+    async def enqueue(self, message):
+        await asyncio.wait_for(self._queue.put(message), timeout=settings.NOTIFY_ENQUEUE_TIMEOUT_SECONDS)
+
+    def _mark(self, messages, status, error=None):
+        log_ids = [log_id for message in messages for log_id in message.log_ids]
+        if not log_ids:
+            return
+        with self.session_factory() as db:
+            db.execute(
+                update(NotificationLog).where(NotificationLog.id.in_(log_ids))
+                .values(status=status, error=error, sent_at=datetime.utcnow() if status == NotificationStatus.SENT else None),
+                execution_options={"synchronize_session": False},
+            )
+            db.commit()
+
+    async def _send(self, batch):
+        for attempt in range(1, settings.NOTIFY_MAX_ATTEMPTS + 1):
+            try:
+                await run_in_threadpool(self.provider.send, batch)
+            except Exception as exc:
+                if attempt == settings.NOTIFY_MAX_ATTEMPTS:
+                    logger.exception("Failed to send %d notifications", len(batch))
+                    NOTIFICATIONS_TOTAL.inc("failed", amount=len(batch))
+                    await run_in_threadpool(self._mark, batch, NotificationStatus.FAILED, f"{type(exc).__name__}: {exc}")
+                    return
+                await asyncio.sleep(2 ** (attempt - 1))
+                continue
+            NOTIFICATIONS_TOTAL.inc("sent", amount=len(batch))
+            await run_in_threadpool(self._mark, batch, NotificationStatus.SENT)
+            return
+
+    async def _worker(self):
+        while True:
+            batch = [await self._queue.get()]
+            while len(batch) < settings.NOTIFY_BATCH_SIZE and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            try:
+                await self._send(batch)
+            except Exception:
+                logger.exception("Notification worker failed")
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    async def start(self):
+        self._queue = asyncio.Queue(maxsize=settings.NOTIFY_QUEUE_SIZE)
+        self._workers = [asyncio.create_task(self._worker()) for _ in range(settings.NOTIFY_CONCURRENCY)]
+
+    async def stop(self):
+        # 종료 전에 큐에 남은 메시지를 잠시 기다려 준다
+        if self._queue is not None:
+            try:
+                await asyncio.wait_for(self._queue.join(), timeout=settings.NOTIFY_DRAIN_SECONDS)
+            except asyncio.TimeoutError:
+                logger.warning("Dropping %d queued notifications on shutdown", self._queue.qsize())
+        for worker in self._workers:
+            worker.cancel()
+        for worker in self._workers:
+            try:
+                await worker
+            except asyncio.CancelledError:
+                pass
+        self._workers = []
@@ -0,0 +1,240 @@
+"""
+알림 파이프라인 조립
+
+아웃박스의 예약 이벤트(reservation.created / reservation.cancelled)를 받아 확정/취소 알림을 큐에 넣고 출발 알림을
+예약한다. 같은 사용자가 한 번에 예약한 좌석들은 메시지 하나로 묶는다. 발송 전에 notification_log 에
+(예약, 종류) 행을 먼저 넣어 선점하므로, 이벤트가 다시 전달되거나 여러 워커가 같은 알림을 만들어도 한 번만 보낸다.
+
+선점한 알림은 메모리 큐에만 있으므로 프로세스가 죽거나 종료 대기 시간을 넘기면 queued 로 남는다. 시작할 때
+NOTIFY_STALE_SECONDS 보다 오래된 queued 행을 읽어 다시 큐에 넣는다.
+"""
+import logging
+from datetime import datetime, timedelta
+from sqlalchemy import and_, delete, func, insert, select, update
+from sqlalchemy.exc import IntegrityError
+from starlette.concurrency import run_in_threadpool
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.user import User
+from app.models.bus import Bus, BusRoute
+from app.models.reservation import Reservation, ReservationStatus
+from app.models.notification import NotificationLog, NotificationStatus
+from app.models.schedule import Trip
+from app.notifications.providers import Message, load_provider
+from app.notifications.reminders import ReminderScheduler, remind_at
+from app.notifications.sender import NotificationSender
+from app.notifications.templates import render
+from app.utils.bus_seats import generate_seat_numbers
+
+logger = logging.getLogger(__name__)
+
+
+def _details(db, reservation_ids):
+    return db.execute(
+        select(
+            Reservation.id, Reservation.user_id, Reservation.bus_id, Reservation.seat_number,
+            Reservation.reservation_date, Reservation.status,
+            User.email, User.full_name,
+            Bus.bus_number, Bus.total_seats,
+            # 그 날짜 운행의 출발 시각 (관리자가 바꿨을 수 있다). 운행이 없으면 버스 기본 시각
+            func.coalesce(Trip.departure_time, Bus.departure_time).label("departure_time"),
+            BusRoute.departure_location, BusRoute.destination,
+        ).join(User, Reservation.user_id == User.id)
+         .join(Bus, Reservation.bus_id == Bus.id)
+         .outerjoin(Trip, and_(Trip.bus_id == Reservation.bus_id, Trip.service_date == Reservation.reservation_date))
+         .outerjoin(BusRoute, Bus.route_id == BusRoute.id)
+         .where(Reservation.id.in_(reservation_ids))
+         .order_by(Reservation.id)
+    ).all()
+
+
+def _claim(db, kind, rows):
+    """notification_log 에 (예약, 종류) 행을 넣고, 이번에 새로 넣은 예약 ID → 로그 ID 를 돌려준다."""
+    if not rows:
+        return {}
+    values = [{"reservation_id": row.id, "user_id": row.user_id, "kind": kind,
+               "status": NotificationStatus.QUEUED} for row in rows]
+    dialect = db.get_bind().dialect.name
+    if dialect in ("postgresql", "sqlite"):
+        if dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert as dialect_insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert as dialect_insert
+        claimed = db.execute(
+            dialect_insert(NotificationLog).values(values)
+            .on_conflict_do_nothing(index_elements=["reservation_id", "kind"])
+            .returning(NotificationLog.reservation_id, NotificationLog.id)
+        ).all()
+        db.commit()
+        return dict(claimed)
+
+    claimed = {}
+    for value in values:
+        try:
+            with db.begin_nested():
+                claimed[value["reservation_id"]] = db.execute(
+                    insert(NotificationLog).values(value).returning(NotificationLog.id)
+                ).scalar_one()
+        except IntegrityError:
+            pass
+    db.commit()
+    return claimed
+
+
+def _messages(kind, rows, claimed, now=None):
+    groups = {}
+    for row in rows:
+        if row.id in claimed:
+            groups.setdefault((row.user_id, row.bus_id, row.reservation_date), []).append(row)
+
+    messages = []
+    for group in groups.values():
+        first = group[0]
+        order = {seat: index for index, seat in enumerate(generate_seat_numbers(first.total_seats))}
+        seats = sorted((row.seat_number for row in group), key=lambda seat: order.get(seat, len(order)))
+        context = {
+            "full_name": first.full_name,
+            "route": f"{first.departure_location} → {first.destination}" if first.destination else "",
+            "reservation_date": first.reservation_date.isoformat(),
+            "departure_time": first.departure_time.strftime("%H:%M"),
+            "bus_number": first.bus_number,
+            "seats": ", ".join(seats),
+        }
+        if now is not None:
+            departure = datetime.combine(first.reservation_date, first.departure_time)
+            context["minutes"] = max(1, round((departure - now).total_seconds() / 60))
+        subject, body = render(kind, **context)
+        messages.append(Message(first.email, subject, body, [claimed[row.id] for row in group]))
+    return messages
+
+
+class NotificationService:
+    """아웃박스 소비자 겸 발송 큐/출발 알림 스케줄러의 묶음."""
+
+    name = "notifications"
+
+    def __init__(self, provider=None, session_factory=SessionLocal):
+        self.session_factory = session_factory
+        self.sender = NotificationSender(provider or load_provider(settings.NOTIFY_PROVIDER), session_factory)
+        self.reminders = ReminderScheduler(self.send_reminders, session_factory)
+
+    def _prepare(self, kind, reservation_ids, status):
+        with self.session_factory() as db:
+            rows = [row for row in _details(db, reservation_ids) if row.status == status]
+            return rows, _messages(kind, rows, _claim(db, kind, rows))
+
+    def _prepare_reminders(self, reservation_ids, now):
+        with self.session_factory() as db:
+            # 그 사이 취소됐거나 이미 출발한 예약은 보내지 않는다
+            rows = [
+                row for row in _details(db, reservation_ids)
+                if row.status == ReservationStatus.CONFIRMED
+                and datetime.combine(row.reservation_date, row.departure_time) > now
+            ]
+            # 힙에 넣은 뒤 운행 출발 시각이 늦춰진 예약은 바뀐 시각으로 다시 예약한다
+            due, later = [], []
+            for row in rows:
+                (later if remind_at(row.reservation_date, row.departure_time) > now else due).append(row)
+            rows = due
+            return _messages("reminder", rows, _claim(db, "reminder", rows), now), later
+
+    def _recover(self, now):
+        """오래된 queued 알림을 다시 만든다. 더는 보낼 필요가 없는 것(취소된 예약의 확정 알림 등)은 failed 로 둔다."""
+        cutoff = datetime.utcnow() - timedelta(seconds=settings.NOTIFY_STALE_SECONDS)
+        with self.session_factory() as db:
+            stale = db.execute(
+                select(NotificationLog.id, NotificationLog.reservation_id, NotificationLog.kind).where(
+                    NotificationLog.status == NotificationStatus.QUEUED,
+                    NotificationLog.created_at <= cutoff,
+                ).order_by(NotificationLog.id).limit(settings.NOTIFY_QUEUE_SIZE).with_for_update(skip_locked=True)
+            ).all()
+            if not stale:
+                return []
+            # 선점 시각을 새로 찍어 동시에 시작한 다른 워커가 같은 행을 또 가져가지 않게 한다
+            db.execute(
+                update(NotificationLog).where(NotificationLog.id.in_([row.id for row in stale]))
+                .values(created_at=datetime.utcnow()),
+                execution_options={"synchronize_session": False},
+            )
+            claimed = {}
+            for row in stale:
+                claimed.setdefault(row.kind, {})[row.reservation_id] = row.id
+            details = {row.id: row for row in _details(db, [row.reservation_id for row in stale])}
+
+            messages, dropped = [], []
+            for kind, logs in claimed.items():
+                status = ReservationStatus.CANCELLED if kind == "cancellation" else ReservationStatus.CONFIRMED
+                rows = [
+                    details[reservation_id] for reservation_id in logs
+                    if reservation_id in details and details[reservation_id].status == status
+                    and (kind != "reminder" or datetime.combine(
+                        details[reservation_id].reservation_date, details[reservation_id].departure_time) > now)
+                ]
+                kept = {row.id for row in rows}
+                dropped.extend(log_id for reservation_id, log_id in logs.items() if reservation_id not in kept)
+                messages.extend(_messages(kind, rows, logs, now if kind == "reminder" else None))
+            if dropped:
+                db.execute(
+                    update(NotificationLog).where(NotificationLog.id.in_(dropped))
+                    .values(status=NotificationStatus.FAILED, error="No longer applicable when recovered"),
+                    execution_options={"synchronize_session": False},
+                )
+            db.commit()
+        logger.info("Recovered %d stale notifications (%d dropped)", len(messages), len(dropped))
+        return messages
+
+    def _release(self, messages):
+        log_ids = [log_id for message in messages for log_id in message.log_ids]
+        with self.session_factory() as db:
+            db.execute(delete(NotificationLog).where(NotificationLog.id.in_(log_ids)))
+            db.commit()
+
+    async def _enqueue_all(self, messages):
+        for index, message in enumerate(messages):
+            try:
+                await self.sender.enqueue(message)
+            except Exception:
+                # 큐에 못 넣은 알림은 선점을 풀어 이벤트 재전달 때 다시 만들 수 있게 한다
+                await run_in_threadpool(self._release, messages[index:])
+                raise
+
+    async def handle(self, events):
+        created = [event["data"]["reservation_id"] for event in events if event["type"] == "reservation.created"]
+        cancelled = [event["data"]["reservation_id"] for event in events if event["type"] == "reservation.cancelled"]
+
+        if created:
+            rows, messages = await run_in_threadpool(self._prepare, "confirmation", created, ReservationStatus.CONFIRMED)
+            await self._enqueue_all(messages)
+            for row in rows:
+                self.reminders.schedule(row.id, row.reservation_date, row.departure_time)
+        if cancelled:
+            _, messages = await run_in_threadpool(self._prepare, "cancellation", cancelled, ReservationStatus.CANCELLED)
+            await self._enqueue_all(messages)
+
+    async def send_reminders(self, reservation_ids):
+        messages, later = await run_in_threadpool(self._prepare_reminders, reservation_ids, datetime.now())
+        for row in later:
+            self.reminders.schedule(row.id, row.reservation_date, row.departure_time)
+        await self._enqueue_all(messages)
+
+    async def recover(self):
+        messages = await run_in_threadpool(self._recover, datetime.now())
+        for message in messages:
+            try:
+                await self.sender.enqueue(message)
+            except Exception:
+                # 선점은 그대로 두어 다음 시작 때 다시 시도한다 (재전달될 이벤트가 없으므로 풀지 않는다)
+                logger.warning("Notification queue full while recovering; retrying on next start")
+                break
+
+    async def start(self):
+        await self.sender.start()
+        try:
+            await self.recover()
+        except Exception:
+            logger.exception("Failed to recover stale notifications")
+        await self.reminders.start()
+
+    async def stop(self):
+        await self.reminders.stop()
+        await self.sender.stop()
@@ -0,0 +1,32 @@
+"""알림 문구 템플릿. 종류별 (제목, 본문) 을 str.format 으로 채운다."""
+
+TEMPLATES = {
+    "confirmation": (
+        "[버스 예약] {reservation_date} {departure_time} {bus_number} 예약 완료",
+        "{full_name}님, 예약이 확정되었습니다.\n\n"
+        "노선: {route}\n"
+        "출발: {reservation_date} {departure_time}\n"
+        "버스: {bus_number}\n"
+        "좌석: {seats}\n",
+    ),
+    "cancellation": (
+        "[버스 예약] {reservation_date} {departure_time} {bus_number} 예약 취소",
+        "{full_name}님, 아래 예약이 취소되었습니다.\n\n"
+        "노선: {route}\n"
+        "출발: {reservation_date} {departure_time}\n"
+        "좌석: {seats}\n",
+    ),
+    "reminder": (
+        "[버스 예약] {minutes}분 후 {bus_number} 출발",
+        "{full_name}님, 예약하신 버스가 {minutes}분 후 출발합니다.\n\n"
+        "노선: {route}\n"
+        "출발: {departure_time}\n"
+        "버스: {bus_number}\n"
+        "좌석: {seats}\n",
+    ),
+}
+
+
+def render(kind, **context):
+    subject, body = TEMPLATES[kind]
+    return subject.format(**context), body.format(**context)
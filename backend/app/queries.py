@@ -0,0 +1,225 @@
+"""
+핫 패스 공용 쿼리
+
+라우터마다 반복되던 db.query(...) 조합을 SQLAlchemy 2.0 select() 기반의 이름 있는 문장으로 모았다.
+lambda_stmt 로 감싼 문장은 람다의 코드 위치를 캐시 키로 쓰므로 요청마다 SQL 컴파일을 다시 하지 않고,
+클로저 변수(bus_id, 날짜 등)만 바인드 파라미터로 바뀐다. 응답이 일부 컬럼만 필요한 곳은 ORM 엔티티 대신
+가벼운 Row 튜플을 돌려준다.
+"""
+from sqlalchemy import and_, func, lambda_stmt, select
+from sqlalchemy.orm import Session
+from app.models.user import User
+from app.models.bus import Bus, BusRoute, RouteStop
+from app.models.reservation import Reservation, ReservationSegment, ReservationStatus
+from app.models.hold import SeatHold
+from app.models.lottery import Lottery, LotteryStatus
+from app.models.boarding import Boarding
+from app.models.schedule import Trip, TripStatus
+
+CONFIRMED = ReservationStatus.CONFIRMED
+BOARDABLE = (ReservationStatus.CONFIRMED, ReservationStatus.COMPLETED)
+LOTTERY_PENDING = (LotteryStatus.OPEN, LotteryStatus.DRAWING)
+SCHEDULED = TripStatus.SCHEDULED
+
+
+def bus_by_id(db: Session, bus_id: int):
+    stmt = lambda_stmt(lambda: select(Bus).where(Bus.id == bus_id))
+    return db.execute(stmt).scalar_one_or_none()
+
+
+def bus_total_seats(db: Session, bus_id: int):
+    stmt = lambda_stmt(lambda: select(Bus.total_seats).where(Bus.id == bus_id))
+    return db.execute(stmt).scalar_one_or_none()
+
+
+def confirmed_seat_count(db: Session, bus_id: int, reservation_date):
+    # 구간 예약은 한 좌석에 여러 건이 있을 수 있으므로 좌석 번호로 센다 (어느 구간이든 찬 좌석)
+    stmt = lambda_stmt(lambda: select(func.count(func.distinct(Reservation.seat_number))).where(
+        Reservation.bus_id == bus_id,
+        Reservation.reservation_date == reservation_date,
+        Reservation.status == CONFIRMED,
+    ))
+    return db.execute(stmt).scalar_one()
+
+
+def confirmed_seat_counts(db: Session, reservation_date):
+    # 버스별 확정 좌석 수를 한 번의 GROUP BY로 계산 (버스마다 COUNT 하던 N+1 제거)
+    stmt = lambda_stmt(lambda: select(Reservation.bus_id, func.count(func.distinct(Reservation.seat_number))).where(
+        Reservation.reservation_date == reservation_date,
+        Reservation.status == CONFIRMED,
+    ).group_by(Reservation.bus_id))
+    return dict(db.execute(stmt).all())
+
+
+def confirmed_seat_numbers(db: Session, bus_id: int, reservation_date):
+    stmt = lambda_stmt(lambda: select(Reservation.seat_number).distinct().where(
+        Reservation.bus_id == bus_id,
+        Reservation.reservation_date == reservation_date,
+        Reservation.status == CONFIRMED,
+    ))
+    return db.execute(stmt).scalars().all()
+
+
+def segment_rows(db: Session, bus_id: int, reservation_date):
+    """확정 예약의 (seat_number, board_stop, alight_stop). 전 구간 예약은 board_stop/alight_stop 이 None."""
+    stmt = lambda_stmt(lambda: select(
+        Reservation.seat_number, ReservationSegment.board_stop, ReservationSegment.alight_stop,
+    ).outerjoin(ReservationSegment, ReservationSegment.reservation_id == Reservation.id).where(
+        Reservation.bus_id == bus_id,
+        Reservation.reservation_date == reservation_date,
+        Reservation.status == CONFIRMED,
+    ))
+    return db.execute(stmt).all()
+
+
+def route_stop_rows(db: Session, route_id: int):
+    """노선 정류장 (sequence, name, offset_minutes, latitude, longitude). 정류장을 정의하지 않은 노선은
+    출발지/목적지 두 줄 (좌표 없음)."""
+    stmt = lambda_stmt(lambda: select(
+        RouteStop.sequence, RouteStop.name, RouteStop.offset_minutes, RouteStop.latitude, RouteStop.longitude,
+    ).where(RouteStop.route_id == route_id).order_by(RouteStop.sequence))
+    rows = db.execute(stmt).all()
+    if rows:
+        return [tuple(row) for row in rows]
+    route = db.execute(lambda_stmt(lambda: select(BusRoute.departure_location, BusRoute.destination)
+                                   .where(BusRoute.id == route_id))).one_or_none()
+    if route is None:
+        return []
+    return [(0, route.departure_location, None, None, None), (1, route.destination, None, None, None)]
+
+
+def route_stop_names(db: Session, route_ids):
+    """{route_id: [정류장 이름, ...]}. 정류장을 정의하지 않은 노선은 빠지므로 호출한 쪽에서 출발지/목적지로 채운다."""
+    stmt = lambda_stmt(lambda: select(RouteStop.route_id, RouteStop.name)
+                       .where(RouteStop.route_id.in_(route_ids)).order_by(RouteStop.route_id, RouteStop.sequence))
+    names = {}
+    for route_id, name in db.execute(stmt).all():
+        names.setdefault(route_id, []).append(name)
+    return names
+
+
+def taken_seat_numbers(db: Session, bus_id: int, reservation_date, seat_numbers):
+    # seat_numbers 중 이미 확정된 좌석
+    stmt = lambda_stmt(lambda: select(Reservation.seat_number).distinct().where(
+        Reservation.bus_id == bus_id,
+        Reservation.seat_number.in_(seat_numbers),
+        Reservation.reservation_date == reservation_date,
+        Reservation.status == CONFIRMED,
+    ))
+    return db.execute(stmt).scalars().all()
+
+
+def held_seat_numbers(db: Session, bus_id: int, reservation_date, now):
+    # 아직 만료되지 않은 홀드 좌석 (스위퍼가 지우기 전의 만료 홀드는 제외)
+    stmt = lambda_stmt(lambda: select(SeatHold.seat_number).where(
+        SeatHold.bus_id == bus_id,
+        SeatHold.reservation_date == reservation_date,
+        SeatHold.expires_at > now,
+    ))
+    return db.execute(stmt).scalars().all()
+
+
+def seats_held_by_others(db: Session, bus_id: int, reservation_date, seat_numbers, user_id: int, now):
+    stmt = lambda_stmt(lambda: select(SeatHold.seat_number).where(
+        SeatHold.bus_id == bus_id,
+        SeatHold.reservation_date == reservation_date,
+        SeatHold.seat_number.in_(seat_numbers),
+        SeatHold.user_id != user_id,
+        SeatHold.expires_at > now,
+    ))
+    return db.execute(stmt).scalars().all()
+
+
+def has_confirmed_reservation(db: Session, user_id: int, bus_id: int, reservation_date):
+    stmt = lambda_stmt(lambda: select(Reservation.id).where(
+        Reservation.user_id == user_id,
+        Reservation.bus_id == bus_id,
+        Reservation.reservation_date == reservation_date,
+        Reservation.status == CONFIRMED,
+    ).limit(1))
+    return db.execute(stmt).first() is not None
+
+
+def open_lottery_id(db: Session, bus_id: int, reservation_date):
+    # 응모를 받는 중(또는 추첨 중)인 운행은 선착순 예약/홀드/대기열을 막는다
+    stmt = lambda_stmt(lambda: select(Lottery.id).where(
+        Lottery.bus_id == bus_id,
+        Lottery.reservation_date == reservation_date,
+        Lottery.status.in_(LOTTERY_PENDING),
+    ))
+    return db.execute(stmt).scalar_one_or_none()
+
+
+def active_bus_rows(db: Session, destination: str = None, route_id: int = None):
+    """운행 중인 버스 목록 (id, bus_number, bus_type, total_seats, departure_time, arrival_time,
+    route_name, departure_location, destination)."""
+    stmt = lambda_stmt(lambda: select(
+        Bus.id, Bus.bus_number, Bus.bus_type, Bus.total_seats, Bus.departure_time, Bus.arrival_time,
+        BusRoute.name.label("route_name"), BusRoute.departure_location, BusRoute.destination,
+    ).join(BusRoute, Bus.route_id == BusRoute.id).where(Bus.is_active == True).order_by(Bus.id))
+    if destination:
+        stmt += lambda s: s.where(BusRoute.destination == destination)
+    if route_id:
+        stmt += lambda s: s.where(Bus.route_id == route_id)
+    return db.execute(stmt).all()
+
+
+def user_reservation_rows(db: Session, user_id: int):
+    """사용자의 예약 목록 (id, user_id, bus_id, seat_number, reservation_date, status,
+    bus_number, bus_type, departure_time, departure_location, destination, board_stop, alight_stop).
+    departure_time 은 그 날짜 운행의 시각 (운행별 변경 반영, 운행 행이 없으면 버스 시간표)."""
+    stmt = lambda_stmt(lambda: select(
+        Reservation.id, Reservation.user_id, Reservation.bus_id, Reservation.seat_number,
+        Reservation.reservation_date, Reservation.status,
+        Bus.bus_number, Bus.bus_type,
+        func.coalesce(Trip.departure_time, Bus.departure_time).label("departure_time"),
+        BusRoute.departure_location, BusRoute.destination,
+        ReservationSegment.board_stop, ReservationSegment.alight_stop,
+    ).join(Bus, Reservation.bus_id == Bus.id)
+     .outerjoin(Trip, and_(Trip.bus_id == Reservation.bus_id, Trip.service_date == Reservation.reservation_date))
+     .outerjoin(BusRoute, Bus.route_id == BusRoute.id)
+     .outerjoin(ReservationSegment, ReservationSegment.reservation_id == Reservation.id)
+     .where(Reservation.user_id == user_id)
+     .order_by(Reservation.id))
+    return db.execute(stmt).all()
+
+
+def driver_manifest_rows(db: Session, driver_id: int, reservation_date):
+    """기사가 담당하는 버스와 그 날짜의 승객 (bus_id, bus_number, total_seats, departure_time, arrival_time,
+    route_id, departure_location, destination, reservation_id, seat_number, status, full_name, phone,
+    boarding_status, board_stop, alight_stop). 예약이 없는 버스는 reservation_id 가 None 인 한 줄로 나온다.
+    전 구간 예약은 board_stop/alight_stop 이 None. 그 날짜에 운행하는 버스만 나오고 시각은 운행의 시각이다
+    (운행은 호출 전에 trip_schedule.trips_for 로 만들어 둔다)."""
+    stmt = lambda_stmt(lambda: select(
+        Bus.id.label("bus_id"), Bus.bus_number, Bus.total_seats, Trip.departure_time, Trip.arrival_time,
+        Bus.route_id, BusRoute.departure_location, BusRoute.destination,
+        Reservation.id.label("reservation_id"), Reservation.seat_number, Reservation.status,
+        User.full_name, User.phone, Boarding.status.label("boarding_status"),
+        ReservationSegment.board_stop, ReservationSegment.alight_stop,
+    ).join(Trip, (Trip.bus_id == Bus.id)
+                & (Trip.service_date == reservation_date)
+                & (Trip.status == SCHEDULED))
+     .outerjoin(BusRoute, Bus.route_id == BusRoute.id)
+     .outerjoin(Reservation, (Reservation.bus_id == Bus.id)
+                & (Reservation.reservation_date == reservation_date)
+                & Reservation.status.in_(BOARDABLE))
+     .outerjoin(ReservationSegment, ReservationSegment.reservation_id == Reservation.id)
+     .outerjoin(User, Reservation.user_id == User.id)
+     .outerjoin(Boarding, Boarding.reservation_id == Reservation.id)
+     .where(Bus.driver_id == driver_id, Bus.is_active == True)
+     .order_by(Trip.departure_time, Bus.id, Reservation.id))
+    return db.execute(stmt).all()
+
+
+def dashboard_counts(db: Session, today):
+    # 대시보드 숫자 네 개를 스칼라 서브쿼리로 한 번에
+    stmt = lambda_stmt(lambda: select(
+        select(func.count(User.id)).scalar_subquery().label("total_users"),
+        select(func.count(Bus.id)).where(Bus.is_active == True).scalar_subquery().label("total_buses"),
+        select(func.count(BusRoute.id)).where(BusRoute.is_active == True).scalar_subquery().label("total_routes"),
+        select(func.count(Reservation.id)).where(
+            Reservation.reservation_date == today,
+            Reservation.status == CONFIRMED,
+        ).scalar_subquery().label("today_reservations"),
+    ))
+    return db.execute(stmt).one()
@@ -0,0 +1,264 @@
+"""
+노선/정류장 검색 색인 (자동완성)
+
+운행 중인 노선의 이름, 출발지, 목적지를 프로세스 메모리에 색인해서 검색할 때 DB 를 읽지 않는다.
+
+- 접두/중간 일치: 각 필드의 글자 위치마다 그 뒤 문자열을 자모로 풀어 정렬 리스트에 넣고, 질의를 자모로 풀어
+  이분 탐색한다. 입력 중인 글자("판ㄱ")도 접두어로 맞는다.
+- 초성 검색: 초성만 입력하면("ㅍㄱ") 초성 문자열 리스트에서 같은 방식으로 찾는다.
+- 오타 허용: 앞의 방법으로 결과가 모자라면 질의의 자모 trigram 이 필드에 얼마나 들어 있는지로 고른다.
+
+일치 종류별로 리스트를 나눠 앞 단계에서 결과가 limit 개 이상 나오면 뒤 단계는 훑지 않는다.
+
+노선을 추가/수정/삭제한 프로세스는 즉시 색인을 고치고, 다른 프로세스는 change_log 의 route 변경을
+ROUTE_SEARCH_SYNC_SECONDS 마다 읽어 바뀐 노선만 다시 색인한다.
+"""
+import asyncio
+import logging
+import threading
+from bisect import bisect_left, insort
+from collections import Counter
+from datetime import datetime, timedelta
+from sqlalchemy import func, select
+from starlette.concurrency import run_in_threadpool
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.bus import BusRoute
+from app.models.change import ChangeLog
+from app.utils.hangul import words, decompose, initials, is_initials
+
+logger = logging.getLogger(__name__)
+
+# 필드 우선순위 (정류장 이름이 노선 이름보다 앞)
+FIELDS = ("destination", "departure_location", "name")
+STOP_FIELDS = ("destination", "departure_location")
+
+# 일치 종류 (작을수록 앞)
+EXACT, PREFIX, WORD_PREFIX, INFIX, INITIALS_PREFIX, INITIALS_INFIX, FUZZY = range(7)
+MATCH_NAMES = ["exact", "prefix", "word_prefix", "infix", "initials", "initials", "fuzzy"]
+
+# 단계별 리스트에 들어가는 일치 종류
+JAMO_TIERS = (PREFIX, WORD_PREFIX, INFIX)
+INITIALS_TIERS = (INITIALS_PREFIX, INITIALS_INFIX)
+
+FUZZY_MIN_JAMO = 5  # 이보다 짧은 질의는 오타 허용 검색을 하지 않는다
+FUZZY_THRESHOLD = 0.5  # 질의 trigram 중 필드에 들어 있어야 하는 비율
+
+
+def _trigrams(jamo):
+    return {jamo[i:i + 3] for i in range(len(jamo) - 2)}
+
+
+def _route(row):
+    return {field: getattr(row, field) for field in ("id",) + FIELDS}
+
+
+def _range(entries, prefix):
+    index = bisect_left(entries, (prefix,))
+    while index < len(entries) and entries[index][0].startswith(prefix):
+        yield entries[index]
+        index += 1
+
+
+class RouteSearchIndex:
+    def __init__(self, session_factory=SessionLocal):
+        self.session_factory = session_factory
+        self._lock = threading.Lock()
+        self._routes = {}  # route_id -> {"id", "name", "departure_location", "destination"}
+        self._jamo = ([], [], [])  # JAMO_TIERS 별 (자모 접미 문자열, route_id, field) 정렬 리스트
+        self._initials = ([], [])  # INITIALS_TIERS 별 (초성 접미 문자열, route_id, field)
+        self._full = {}  # (route_id, field) -> 필드 전체 자모
+        self._grams = {}  # trigram -> {(route_id, field)}
+        self._entries = {}  # route_id -> 그 노선이 넣은 항목들 (지울 때 사용)
+        self._cursor = 0
+        self._loaded = False
+        self._task = None
+
+    def __len__(self):
+        return len(self._routes)
+
+    # 색인 갱신 ------------------------------------------------------------
+
+    def _add(self, route):
+        jamo_entries, initial_entries, grams = [], [], []
+        for field in FIELDS:
+            parts = words(route[field])
+            text = "".join(parts)
+            if not text:
+                continue
+            word_starts, offset = set(), 0
+            for part in parts:
+                word_starts.add(offset)
+                offset += len(part)
+            for start in range(len(text)):
+                tier = 0 if start == 0 else 1 if start in word_starts else 2
+                jamo_entries.append((tier, (decompose(text[start:]), route["id"], field)))
+                initial_entries.append((min(tier, 1), (initials(text[start:]), route["id"], field)))
+            full = decompose(text)
+            self._full[(route["id"], field)] = full
+            for gram in _trigrams(full):
+                self._grams.setdefault(gram, set()).add((route["id"], field))
+                grams.append((gram, (route["id"], field)))
+        for tier, entry in jamo_entries:
+            insort(self._jamo[tier], entry)
+        for tier, entry in initial_entries:
+            insort(self._initials[tier], entry)
+        self._routes[route["id"]] = route
+        self._entries[route["id"]] = (jamo_entries, initial_entries, grams)
+
+    def _remove(self, route_id):
+        entries = self._entries.pop(route_id, None)
+        self._routes.pop(route_id, None)
+        if entries is None:
+            return
+        jamo_entries, initial_entries, grams = entries
+        for lists, removed in ((self._jamo, jamo_entries), (self._initials, initial_entries)):
+            for tier, entry in removed:
+                target = lists[tier]
+                index = bisect_left(target, entry)
+                if index < len(target) and target[index] == entry:
+                    del target[index]
+        for gram, key in grams:
+            postings = self._grams.get(gram)
+            if postings is not None:
+                postings.discard(key)
+                if not postings:
+                    del self._grams[gram]
+        for field in FIELDS:
+            self._full.pop((route_id, field), None)
+
+    def upsert(self, route):
+        """노선 CRUD 직후 같은 프로세스의 색인을 바로 고친다. 비활성 노선은 색인에서 뺀다."""
+        with self._lock:
+            self._remove(route.id)
+            if route.is_active:
+                self._add(_route(route))
+
+    @staticmethod
+    def _load_routes(db, route_ids=None):
+        stmt = select(BusRoute.id, BusRoute.name, BusRoute.departure_location, BusRoute.destination, BusRoute.is_active)
+        if route_ids is not None:
+            stmt = stmt.where(BusRoute.id.in_(route_ids))
+        else:
+            stmt = stmt.where(BusRoute.is_active == True)
+        return db.execute(stmt).all()
+
+    def _settled_cursor(self, db):
+        # /api/sync 와 같이 커밋이 늦을 수 있는 최근 변경은 다음 주기에 다시 읽는다
+        cutoff = datetime.utcnow() - timedelta(seconds=settings.SYNC_SETTLE_SECONDS)
+        return db.execute(
+            select(func.max(ChangeLog.seq)).where(ChangeLog.recorded_at <= cutoff)
+        ).scalar() or 0
+
+    def reload(self):
+        with self.session_factory() as db:
+            cursor = self._settled_cursor(db)
+            rows = self._load_routes(db)
+        with self._lock:
+            self._routes, self._jamo, self._initials = {}, ([], [], []), ([], [])
+            self._full, self._grams, self._entries = {}, {}, {}
+            for row in rows:
+                self._add(_route(row))
+            self._cursor = cursor
+            self._loaded = True
+
+    def sync(self):
+        """커서 이후 바뀐 노선만 다시 읽어 색인을 고친다."""
+        with self.session_factory() as db:
+            route_ids = set(db.execute(
+                select(ChangeLog.entity_id).where(ChangeLog.entity == "route", ChangeLog.seq > self._cursor)
+            ).scalars())
+            cursor = self._settled_cursor(db)
+            rows = self._load_routes(db, route_ids) if route_ids else []
+        with self._lock:
+            for route_id in route_ids:
+                self._remove(route_id)
+            for row in rows:
+                if row.is_active:
+                    self._add(_route(row))
+            self._cursor = max(self._cursor, cursor)
+        return len(route_ids)
+
+    # 검색 ----------------------------------------------------------------
+
+    def search(self, query, limit=10):
+        """
+        (routes, stops) 를 돌려준다.
+        routes: 점수 순 [{"id", "name", "departure_location", "destination", "matched_field", "match"}, ...]
+        stops: 일치한 출발지/목적지 이름 (중복 없이, 점수 순)
+        """
+        if not self._loaded:
+            self.reload()
+        text = "".join(words(query))
+        if not text:
+            return [], []
+        jamo = decompose(text)
+        best = {}  # route_id -> (일치 종류, 오타 점수, 필드 순위, 필드 길이, field)
+
+        def consider(route_id, field, kind, fuzz=0.0):
+            key = (kind, fuzz, FIELDS.index(field), len(self._full[(route_id, field)]), field)
+            if route_id not in best or key < best[route_id]:
+                best[route_id] = key
+
+        with self._lock:
+            # 한 단계는 끝까지 훑어야 그 안의 순위가 맞다
+            for kind, entries in zip(JAMO_TIERS, self._jamo):
+                if len(best) >= limit:
+                    break
+                for _, route_id, field in _range(entries, jamo):
+                    exact = kind == PREFIX and self._full[(route_id, field)] == jamo
+                    consider(route_id, field, EXACT if exact else kind)
+            if is_initials(text):
+                for kind, entries in zip(INITIALS_TIERS, self._initials):
+                    if len(best) >= limit:
+                        break
+                    for _, route_id, field in _range(entries, text):
+                        consider(route_id, field, kind)
+            if len(best) < limit and len(jamo) >= FUZZY_MIN_JAMO:
+                grams = _trigrams(jamo)
+                counts = Counter(key for gram in grams for key in self._grams.get(gram, ()))
+                for (route_id, field), count in counts.items():
+                    score = count / len(grams)
+                    if score >= FUZZY_THRESHOLD:
+                        consider(route_id, field, FUZZY, 1.0 - score)
+            ranked = sorted(best.items(), key=lambda item: (item[1][:4], item[0]))[:limit]
+            routes = [
+                {**self._routes[route_id], "matched_field": key[4], "match": MATCH_NAMES[key[0]]}
+                for route_id, key in ranked
+            ]
+
+        stops = []
+        for route in routes:
+            field = route["matched_field"]
+            if field in STOP_FIELDS and route[field] not in stops:
+                stops.append(route[field])
+        return routes, stops
+
+    # 백그라운드 동기화 ---------------------------------------------------
+
+    async def run(self):
+        while True:
+            await asyncio.sleep(settings.ROUTE_SEARCH_SYNC_SECONDS)
+            try:
+                await run_in_threadpool(self.sync)
+            except Exception:
+                logger.exception("Failed to sync route search index")
+
+    async def start(self):
+        try:
+            await run_in_threadpool(self.reload)
+        except Exception:
+            logger.exception("Failed to build route search index")
+        self._task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+route_index = RouteSearchIndex()
@@ -0,0 +1,184 @@
+"""
+운행 달력과 날짜별 운행 인스턴스
+
+버스마다 운행 달력(요일 패턴 + 예외 날짜)을 연결할 수 있고, 연결하지 않은 버스는 매일 운행한다. 어떤 날짜를
+처음 조회하면 그날 운행하는 버스만 trips 테이블에 한 줄씩 만들고(service_days 에 표시), 이후에는 만들어 둔
+행만 읽는다. 각 프로세스는 날짜별 {bus_id: 운행} 을 TRIP_CACHE_SECONDS 동안 캐시하므로 목록/좌석 조회는
+운행하는 버스만 보고 달력을 다시 계산하지 않는다.
+
+달력, 예외, 버스 시간표를 바꾸면 오늘 이후의 계산된 운행을 지워 다음 조회 때 다시 만든다. 관리자가 직접 바꾼
+운행(시간 변경, 운행 취소)은 is_override 로 남겨 둔다.
+
+forget/invalidate 는 부른 워커의 캐시만 비우므로 다른 워커는 운행 취소를 최대 TRIP_CACHE_SECONDS 늦게 본다.
+목록/좌석 조회는 그 정도 지연을 허용하고, 예약처럼 쓰는 경로는 scheduled_trip 으로 DB 의 운행 상태를 직접 확인한다.
+"""
+import threading
+import time
+from collections import OrderedDict
+from datetime import date, datetime
+from sqlalchemy import delete, select
+from app.core.changes import record_changes
+from app.core.config import settings
+from app.core.database import SessionLocal, insert_ignoring_duplicates
+from app.models.bus import Bus
+from app.models.reservation import Reservation
+from app.models.schedule import ServiceCalendar, ServiceException, BusService, Trip, TripStatus, ServiceDay
+
+WEEKDAYS = ("monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday")
+
+
+def runs_on(calendar, service_date, exception=None):
+    """exception: 그 날짜의 예외 (True 운행 / False 운휴 / None 없음)."""
+    if exception is not None:
+        return exception
+    if calendar.start_date and service_date < calendar.start_date:
+        return False
+    if calendar.end_date and service_date > calendar.end_date:
+        return False
+    return getattr(calendar, WEEKDAYS[service_date.weekday()])
+
+
+class TripSchedule:
+    def __init__(self, session_factory=SessionLocal):
+        self.session_factory = session_factory
+        self._lock = threading.Lock()
+        self._cache = OrderedDict()  # service_date -> (읽은 시각, {bus_id: 운행 Row})
+
+    # 운행 인스턴스 만들기 ---------------------------------------------------
+
+    @staticmethod
+    def _materialize(db, service_date):
+        buses = db.execute(
+            select(Bus.id, Bus.departure_time, Bus.arrival_time, BusService.calendar_id)
+            .outerjoin(BusService, BusService.bus_id == Bus.id)
+            .where(Bus.is_active == True)
+        ).all()
+        calendars = {calendar.id: calendar for calendar in db.execute(select(ServiceCalendar)).scalars()}
+        exceptions = dict(db.execute(
+            select(ServiceException.calendar_id, ServiceException.runs)
+            .where(ServiceException.service_date == service_date)
+        ).all())
+
+        rows = [
+            {
+                "bus_id": bus.id,
+                "service_date": service_date,
+                "departure_time": bus.departure_time,
+                "arrival_time": bus.arrival_time,
+                "status": TripStatus.SCHEDULED,
+                "is_override": False,
+            }
+            for bus in buses
+            if bus.calendar_id is None
+            or (bus.calendar_id in calendars
+                and runs_on(calendars[bus.calendar_id], service_date, exceptions.get(bus.calendar_id)))
+        ]
+        # 다른 워커가 같은 날짜를 동시에 만들거나 관리자가 먼저 바꿔 둔 운행은 그대로 둔다
+        insert_ignoring_duplicates(db, Trip, rows, ["bus_id", "service_date"])
+        insert_ignoring_duplicates(db, ServiceDay, [{"service_date": service_date, "materialized_at": datetime.utcnow()}],
+                                   ["service_date"])
+        db.commit()
+
+    def _load(self, service_date):
+        with self.session_factory() as db:
+            if db.get(ServiceDay, service_date) is None:
+                self._materialize(db, service_date)
+            rows = db.execute(
+                select(Trip.id, Trip.bus_id, Trip.departure_time, Trip.arrival_time).where(
+                    Trip.service_date == service_date,
+                    Trip.status == TripStatus.SCHEDULED,
+                )
+            ).all()
+        return {row.bus_id: row for row in rows}
+
+    # 조회 ----------------------------------------------------------------
+
+    def trips_for(self, service_date):
+        """그 날짜에 운행하는 {bus_id: (id, bus_id, departure_time, arrival_time)}."""
+        now = time.monotonic()
+        with self._lock:
+            cached = self._cache.get(service_date)
+            if cached is not None and now - cached[0] < settings.TRIP_CACHE_SECONDS:
+                self._cache.move_to_end(service_date)
+                return cached[1]
+        trips = self._load(service_date)
+        with self._lock:
+            self._cache[service_date] = (now, trips)
+            self._cache.move_to_end(service_date)
+            while len(self._cache) > settings.TRIP_CACHE_SIZE:
+                self._cache.popitem(last=False)
+        return trips
+
+    def trip(self, bus_id, service_date):
+        """운행하지 않으면 None."""
+        return self.trips_for(service_date).get(bus_id)
+
+    @staticmethod
+    def _scheduled(db, bus_id, service_date):
+        return db.execute(
+            select(Trip.id, Trip.bus_id, Trip.departure_time, Trip.arrival_time).where(
+                Trip.bus_id == bus_id,
+                Trip.service_date == service_date,
+                Trip.status == TripStatus.SCHEDULED,
+            )
+        ).one_or_none()
+
+    def scheduled_trip(self, db, bus_id, service_date):
+        """
+        예약/홀드/추첨처럼 좌석을 배정하기 전에 부르는 확인. 캐시 대신 DB 의 운행 상태를 읽으므로 다른 워커에서
+        방금 취소한 운행도 바로 막는다. 운행하지 않으면 None. 요청 세션이 쓰기를 시작하기 전에 불러야 한다
+        (그 날짜를 처음 보면 별도 세션에서 운행을 만든다).
+        """
+        self.trips_for(service_date)
+        trip = self._scheduled(db, bus_id, service_date)
+        if trip is None and db.get(ServiceDay, service_date) is None:
+            # 다른 워커가 달력을 바꿔 계산된 운행을 지운 뒤 아직 다시 만들지 않았다
+            self.forget(service_date)
+            self.trips_for(service_date)
+            trip = self._scheduled(db, bus_id, service_date)
+        return trip
+
+    # 변경 ----------------------------------------------------------------
+
+    def override(self, db, bus, service_date, **values):
+        """
+        한 날짜의 운행을 직접 바꾼다 (departure_time, arrival_time, status). 운행하지 않는 날이면 임시 운행을
+        만든다. 커밋은 호출한 쪽에서 하고, 커밋 후 forget(service_date) 를 부른다.
+        """
+        trip = db.execute(
+            select(Trip).where(Trip.bus_id == bus.id, Trip.service_date == service_date)
+        ).scalar_one_or_none()
+        if trip is None:
+            trip = Trip(bus_id=bus.id, service_date=service_date, departure_time=bus.departure_time,
+                        arrival_time=bus.arrival_time, status=TripStatus.SCHEDULED)
+            db.add(trip)
+        for field, value in values.items():
+            setattr(trip, field, value)
+        trip.is_override = True
+        db.flush()
+        # 운행 행은 변경 기록 대상이 아니므로, 시각이 바뀐 그날 예약(과 오늘이면 버스)을 직접 남겨 동기화가 다시 읽게 한다
+        reservations = db.execute(
+            select(Reservation.id, Reservation.user_id, Reservation.bus_id).where(
+                Reservation.bus_id == bus.id, Reservation.reservation_date == service_date)
+        ).all()
+        record_changes(db, Reservation, reservations)
+        if service_date == date.today():
+            record_changes(db, Bus, [bus])
+        return trip
+
+    def forget(self, service_date):
+        with self._lock:
+            self._cache.pop(service_date, None)
+
+    def invalidate(self):
+        """달력/시간표가 바뀌면 오늘 이후의 계산된 운행을 지운다 (다음 조회 때 다시 만든다)."""
+        today = date.today()
+        with self.session_factory() as db:
+            db.execute(delete(Trip).where(Trip.service_date >= today, Trip.is_override == False))
+            db.execute(delete(ServiceDay).where(ServiceDay.service_date >= today))
+            db.commit()
+        with self._lock:
+            self._cache.clear()
+
+
+trip_schedule = TripSchedule()
@@ -1,9 +1,24 @@
-from .user import User, UserCreate, UserLogin, Token
-from .bus import Bus, BusCreate, BusRoute, BusRouteCreate
+from .user import User, UserCreate, UserLogin, Token, TokenRefresh
+from .bus import Bus, BusCreate, BusRoute, BusRouteCreate, RouteStop, RouteStopsUpdate
 from .reservation import Reservation, ReservationCreate, ReservationUpdate
+from .hold import SeatHold, SeatHoldCreate
+from .waitlist import WaitlistEntry, WaitlistJoin
+from .lottery import Lottery, LotteryCreate, LotteryEntry, LotteryEntryCreate
+from .boarding import BoardingScan, BoardingSync
+from .batch import BatchRequest, BatchResponse
+from .location import LocationPing, LocationBatch
+from .schedule import ServiceCalendar, ServiceCalendarCreate, ServiceCalendarUpdate, ServiceExceptionUpdate, BusServiceUpdate, TripUpdate
 
 __all__ = [
-    "User", "UserCreate", "UserLogin", "Token",
-    "Bus", "BusCreate", "BusRoute", "BusRouteCreate", 
-    "Reservation", "ReservationCreate", "ReservationUpdate"
+    "User", "UserCreate", "UserLogin", "Token", "TokenRefresh",
+    "Bus", "BusCreate", "BusRoute", "BusRouteCreate", "RouteStop", "RouteStopsUpdate",
+    "Reservation", "ReservationCreate", "ReservationUpdate",
+    "SeatHold", "SeatHoldCreate",
+    "WaitlistEntry", "WaitlistJoin",
+    "Lottery", "LotteryCreate", "LotteryEntry", "LotteryEntryCreate",
+    "BoardingScan", "BoardingSync",
+    "BatchRequest", "BatchResponse",
+    "ServiceCalendar", "ServiceCalendarCreate", "ServiceCalendarUpdate", "ServiceExceptionUpdate",
+    "BusServiceUpdate", "TripUpdate",
+    "LocationPing", "LocationBatch"
 ]
\ No newline at end of file
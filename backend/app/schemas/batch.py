@@ -0,0 +1,19 @@
+from pydantic import BaseModel
+from typing import Any, Dict, List, Optional
+
+class BatchSubRequest(BaseModel):
+    id: Optional[str] = None  # 응답에서 결과를 찾을 때 쓰는 키 (기본은 순번)
+    path: str  # 쿼리 문자열 포함, 예: /api/buses/?reservation_date=2024-01-01
+    method: str = "GET"
+
+class BatchRequest(BaseModel):
+    requests: List[BatchSubRequest]
+
+class BatchSubResponse(BaseModel):
+    id: str
+    status: int
+    body: Any = None
+    headers: Dict[str, str] = {}
+
+class BatchResponse(BaseModel):
+    responses: List[BatchSubResponse]
@@ -0,0 +1,12 @@
+from pydantic import BaseModel
+from typing import List
+from datetime import datetime
+from app.models.boarding import BoardingStatus
+
+class BoardingScan(BaseModel):
+    reservation_id: int
+    status: BoardingStatus = BoardingStatus.BOARDED
+    scanned_at: datetime  # 단말 시각 (UTC). 같은 예약의 스캔은 더 늦은 것이 이긴다
+
+class BoardingSync(BaseModel):
+    scans: List[BoardingScan]
@@ -24,6 +24,24 @@ class BusRoute(BusRouteBase):
     class Config:
         from_attributes = True
 
+class RouteStopBase(BaseModel):
+    name: str
+    offset_minutes: Optional[int] = None  # 출발 시각 기준 도착 예정 (분)
+    latitude: Optional[float] = None  # 실시간 위치 ETA 계산용
+    longitude: Optional[float] = None
+
+class RouteStopCreate(RouteStopBase):
+    pass
+
+class RouteStopsUpdate(BaseModel):
+    stops: List[RouteStopCreate]  # 출발지부터 종점까지 순서대로
+
+class RouteStop(RouteStopBase):
+    sequence: int
+
+    class Config:
+        from_attributes = True
+
 class BusBase(BaseModel):
     bus_number: str
     route_id: int
@@ -0,0 +1,16 @@
+from pydantic import BaseModel
+from typing import List
+from datetime import date, datetime
+
+class SeatHoldCreate(BaseModel):
+    bus_id: int
+    reservation_date: date
+    seat_numbers: List[str]
+
+class SeatHold(BaseModel):
+    hold_id: str
+    bus_id: int
+    reservation_date: date
+    seat_numbers: List[str]
+    expires_at: datetime
+    ttl_seconds: int
@@ -0,0 +1,15 @@
+from pydantic import BaseModel
+from typing import List, Optional
+from datetime import datetime
+
+class LocationPing(BaseModel):
+    latitude: float
+    longitude: float
+    recorded_at: datetime  # 단말 시각 (UTC)
+    speed_kmh: Optional[float] = None
+    heading: Optional[float] = None
+    accuracy_m: Optional[float] = None
+
+class LocationBatch(BaseModel):
+    bus_id: int
+    pings: List[LocationPing]  # 마지막 전송 이후 쌓인 위치 (몇 초 분량)
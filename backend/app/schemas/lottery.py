@@ -0,0 +1,36 @@
+from pydantic import BaseModel
+from typing import Optional
+from datetime import date, datetime
+from app.models.lottery import LotteryStatus, LotteryEntryStatus
+
+class LotteryCreate(BaseModel):
+    bus_id: int
+    reservation_date: date
+    closes_at: datetime  # UTC
+    max_seats_per_entry: int = 2
+
+class Lottery(BaseModel):
+    id: int
+    bus_id: int
+    reservation_date: date
+    closes_at: datetime
+    max_seats_per_entry: int
+    status: LotteryStatus
+    drawn_at: Optional[datetime] = None
+    entry_count: Optional[int] = None
+
+    class Config:
+        from_attributes = True
+
+class LotteryEntryCreate(BaseModel):
+    seat_count: int = 1
+
+class LotteryEntry(BaseModel):
+    id: int
+    lottery_id: int
+    seat_count: int
+    status: LotteryEntryStatus
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
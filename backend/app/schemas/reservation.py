@@ -22,6 +22,9 @@ class Reservation(ReservationBase):
     status: ReservationStatus
     created_at: datetime
     updated_at: datetime
+    # 구간 예약의 승차/하차 정류장 순번 (전 구간이면 None)
+    board_stop: Optional[int] = None
+    alight_stop: Optional[int] = None
     user: Optional[User] = None
     bus: Optional[Bus] = None
 
@@ -0,0 +1,57 @@
+from pydantic import BaseModel
+from typing import Optional, List
+from datetime import date, time, datetime
+from app.models.schedule import TripStatus
+
+class ServiceCalendarBase(BaseModel):
+    name: str
+    monday: bool = True
+    tuesday: bool = True
+    wednesday: bool = True
+    thursday: bool = True
+    friday: bool = True
+    saturday: bool = True
+    sunday: bool = True
+    start_date: Optional[date] = None
+    end_date: Optional[date] = None
+
+class ServiceCalendarCreate(ServiceCalendarBase):
+    pass
+
+class ServiceCalendarUpdate(BaseModel):
+    name: Optional[str] = None
+    monday: Optional[bool] = None
+    tuesday: Optional[bool] = None
+    wednesday: Optional[bool] = None
+    thursday: Optional[bool] = None
+    friday: Optional[bool] = None
+    saturday: Optional[bool] = None
+    sunday: Optional[bool] = None
+    start_date: Optional[date] = None
+    end_date: Optional[date] = None
+
+class ServiceExceptionUpdate(BaseModel):
+    runs: bool  # True = 추가 운행, False = 운휴
+    note: Optional[str] = None
+
+class ServiceException(ServiceExceptionUpdate):
+    service_date: date
+
+    class Config:
+        from_attributes = True
+
+class ServiceCalendar(ServiceCalendarBase):
+    id: int
+    created_at: datetime
+    exceptions: List[ServiceException] = []
+
+    class Config:
+        from_attributes = True
+
+class BusServiceUpdate(BaseModel):
+    calendar_id: Optional[int] = None  # None 이면 매일 운행
+
+class TripUpdate(BaseModel):
+    departure_time: Optional[time] = None
+    arrival_time: Optional[time] = None
+    status: Optional[TripStatus] = None
@@ -29,4 +29,9 @@ class User(UserBase):
 class Token(BaseModel):
     access_token: str
     token_type: str
-    user: User
\ No newline at end of file
+    refresh_token: Optional[str] = None
+    expires_in: Optional[int] = None  # access 토큰 유효 시간 (초)
+    user: User
+
+class TokenRefresh(BaseModel):
+    refresh_token: str
\ No newline at end of file
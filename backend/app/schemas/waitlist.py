@@ -0,0 +1,24 @@
+from pydantic import BaseModel
+from typing import List, Optional
+from datetime import date, datetime
+from app.models.waitlist import WaitlistStatus
+
+class WaitlistJoin(BaseModel):
+    bus_id: int
+    reservation_date: date
+    preferred_seats: List[str] = []
+    # 타려는 구간 (생략하면 전 구간). 그 구간에 빈 좌석이 있으면 바로 예약하도록 안내하고, 승격은 전 구간 좌석으로 한다
+    board_stop: Optional[int] = None
+    alight_stop: Optional[int] = None
+
+class WaitlistEntry(BaseModel):
+    id: int
+    bus_id: int
+    reservation_date: date
+    preferred_seats: List[str] = []
+    status: WaitlistStatus
+    position: Optional[int] = None  # 대기 중일 때만 (1부터)
+    reservation_id: Optional[int] = None
+    seat_number: Optional[str] = None
+    created_at: datetime
+    promoted_at: Optional[datetime] = None
@@ -0,0 +1,295 @@
+"""
+대량 합성 데이터 생성기
+
+시드가 같으면 항상 같은 사용자/노선/버스/예약 분포를 만든다. 행마다 SELECT 후 ORM add 하는 대신
+Core insert(executemany, PostgreSQL은 COPY)를 청크 단위로 스트리밍하므로 천만 건 규모도 메모리 사용량이
+일정하게 유지된다. 비밀번호 해시는 한 번만 계산해 모든 계정에 재사용한다.
+
+    python -m app.seed --users 10000 --routes 20 --buses 200 --reservations 10000000 --seed 42
+"""
+import argparse
+import csv
+import io
+import itertools
+import random
+import time as timer
+from datetime import date, time, timedelta
+from sqlalchemy import func, insert, select, text
+from app.core.database import Base
+from app.core.security import get_password_hash
+from app.models.user import User, UserRole
+from app.models.bus import Bus, BusRoute, BusType
+from app.models.reservation import Reservation, ReservationStatus
+from app.utils.bus_seats import generate_seat_numbers
+
+DEFAULT_PASSWORD = "user123"
+DEFAULT_START_DATE = date(2025, 1, 6)
+
+LOCATIONS = ["강남역", "판교 테크노밸리", "잠실", "서울역", "여의도 IFC", "분당", "수원", "일산", "광교", "송도",
+             "삼성역", "광화문", "구로디지털단지", "마곡", "동탄"]
+
+RESERVATION_COLUMNS = ("user_id", "bus_id", "seat_number", "reservation_date", "status")
+
+
+def username_for(user_id):
+    return f"user{user_id}"
+
+
+def insert_missing(db, model, key, rows):
+    # key 컬럼 기준으로 아직 없는 행만 한 번에 INSERT (행마다 SELECT 하지 않음)
+    column = getattr(model, key)
+    existing = set(db.execute(select(column).where(column.in_([row[key] for row in rows]))).scalars())
+    missing = [row for row in rows if row[key] not in existing]
+    if missing:
+        db.execute(insert(model), missing)
+    return missing
+
+
+def lookup_ids(db, model, key, values):
+    column = getattr(model, key)
+    return dict(db.execute(select(column, model.id).where(column.in_(values))).all())
+
+
+def _chunks(rows, size):
+    iterator = iter(rows)
+    while True:
+        chunk = list(itertools.islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _next_id(conn, model):
+    return (conn.execute(select(func.max(model.id))).scalar() or 0) + 1
+
+
+def _reset_sequences(conn, models):
+    # id 를 직접 넣었으므로 PostgreSQL 시퀀스를 최댓값으로 맞춘다 (앱의 다음 INSERT 가 중복 키가 되지 않게)
+    if conn.dialect.name != "postgresql":
+        return
+    for model in models:
+        table = model.__tablename__
+        conn.execute(text(
+            f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), COALESCE((SELECT MAX(id) FROM {table}), 1), "
+            f"(SELECT MAX(id) FROM {table}) IS NOT NULL)"
+        ))
+
+
+def build_users(rng, first_id, count, hashed_password, role=UserRole.USER, prefix="user"):
+    for user_id in range(first_id, first_id + count):
+        yield {
+            "id": user_id,
+            "username": f"{prefix}{user_id}",
+            "email": f"{prefix}{user_id}@example.com",
+            "hashed_password": hashed_password,
+            "full_name": f"{'기사' if role == UserRole.DRIVER else '사용자'}{user_id}",
+            "phone": f"010-{rng.randint(1000, 9999)}-{user_id % 10000:04d}",
+            "role": role,
+            "is_active": True,
+        }
+
+
+def build_routes(rng, first_id, count):
+    routes = []
+    for route_id in range(first_id, first_id + count):
+        departure, destination = rng.sample(LOCATIONS, 2)
+        routes.append({
+            "id": route_id,
+            "name": f"{departure}-{destination} {route_id}호선",
+            "departure_location": departure,
+            "destination": destination,
+            "is_active": True,
+        })
+    return routes
+
+
+def build_buses(rng, first_id, count, route_ids, driver_ids):
+    buses = []
+    for index, bus_id in enumerate(range(first_id, first_id + count)):
+        total_seats = 45 if rng.random() < 0.6 else 28
+        # 출퇴근 시간대에 몰리도록 배차
+        hour = rng.choice([6, 7, 7, 8, 8, 8, 9, 12, 17, 18, 18, 19, 20])
+        departure = time(hour, rng.choice([0, 10, 20, 30, 40, 50]))
+        duration = rng.choice([30, 45, 60, 75])
+        arrival_minutes = (hour * 60 + departure.minute + duration) % (24 * 60)
+        buses.append({
+            "id": bus_id,
+            "bus_number": f"BUS-{bus_id:05d}",
+            "route_id": rng.choice(route_ids),
+            "driver_id": driver_ids[index % len(driver_ids)] if driver_ids else None,
+            "bus_type": BusType.SEAT_45 if total_seats == 45 else BusType.SEAT_28,
+            "total_seats": total_seats,
+            "departure_time": departure,
+            "arrival_time": time(arrival_minutes // 60, arrival_minutes % 60),
+            "is_active": True,
+        })
+    return buses
+
+
+def generate_reservations(rng, buses, user_ids, count, start_date, today=None):
+    """
+    (날짜, 버스) 순으로 예약 행을 스트리밍 생성한다. 버스마다 인기도가 다르고 주말은 한산하며,
+    한 (버스, 날짜, 좌석)에는 예약이 하나만 생긴다. 지난 날짜의 예약은 대부분 COMPLETED.
+    """
+    today = today or date.today()
+    # 소수의 사용자가 대부분의 예약을 만드는 분포 (매일 타는 통근자)
+    cum_weights = list(itertools.accumulate(1.0 / (rank + 1) ** 0.8 for rank in range(len(user_ids))))
+    popularity = [(bus, rng.betavariate(2, 2), generate_seat_numbers(bus["total_seats"])) for bus in buses]
+
+    remaining = count
+    day = 0
+    while remaining > 0:
+        reservation_date = start_date + timedelta(days=day)
+        weekend = reservation_date.weekday() >= 5
+        past = reservation_date < today
+        for bus, bus_popularity, seats in popularity:
+            if remaining <= 0:
+                break
+            fill = bus_popularity * (0.3 if weekend else 1.0)
+            taken = min(remaining, int(len(seats) * min(1.0, max(0.05, rng.gauss(fill, 0.15)))))
+            if taken <= 0:
+                continue
+            owners = rng.choices(user_ids, cum_weights=cum_weights, k=taken)
+            for seat_number, user_id in zip(rng.sample(seats, taken), owners):
+                roll = rng.random()
+                if roll < 0.06:
+                    status = ReservationStatus.CANCELLED
+                elif past:
+                    status = ReservationStatus.COMPLETED
+                else:
+                    status = ReservationStatus.CONFIRMED
+                yield {
+                    "user_id": user_id,
+                    "bus_id": bus["id"],
+                    "seat_number": seat_number,
+                    "reservation_date": reservation_date,
+                    "status": status,
+                }
+            remaining -= taken
+        day += 1
+
+
+def _copy_reservations(conn, chunk):
+    # PostgreSQL: executemany 대신 COPY로 적재. 생략한 created_at/updated_at은 컬럼 기본값이 채운다
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in chunk:
+        writer.writerow([row["user_id"], row["bus_id"], row["seat_number"],
+                         row["reservation_date"].isoformat(), row["status"].name])
+    buffer.seek(0)
+    cursor = conn.connection.dbapi_connection.cursor()
+    try:
+        cursor.copy_expert(
+            f"COPY {Reservation.__tablename__} ({', '.join(RESERVATION_COLUMNS)}) FROM STDIN WITH (FORMAT csv)",
+            buffer,
+        )
+    finally:
+        cursor.close()
+
+
+def seed_database(engine, users=1000, routes=10, buses=50, reservations=100000, drivers=None,
+                  seed=42, start_date=DEFAULT_START_DATE, password=DEFAULT_PASSWORD, chunk_size=50000,
+                  today=None, progress=None):
+    rng = random.Random(seed)
+    Base.metadata.create_all(bind=engine)
+    drivers = drivers if drivers is not None else max(1, buses // 4)
+
+    # bcrypt는 한 번만
+    hashed_password = get_password_hash(password)
+    use_copy = engine.dialect.name == "postgresql" and engine.dialect.driver == "psycopg2"
+
+    with engine.connect() as conn:
+        synchronous = None
+        if engine.dialect.name == "sqlite":
+            # 적재 중에만 fsync를 줄인다. 커넥션이 풀로 돌아가기 전에 원래 값으로 되돌린다
+            synchronous = conn.exec_driver_sql("PRAGMA synchronous").scalar()
+            conn.exec_driver_sql("PRAGMA synchronous=OFF")
+        try:
+            summary = _seed(conn, rng, users, routes, buses, reservations, drivers, hashed_password,
+                            use_copy, start_date, chunk_size, today, progress)
+        finally:
+            if synchronous is not None:
+                conn.exec_driver_sql(f"PRAGMA synchronous={int(synchronous)}")
+
+    summary["password"] = password
+    return summary
+
+
+def _seed(conn, rng, users, routes, buses, reservations, drivers, hashed_password,
+          use_copy, start_date, chunk_size, today, progress):
+    first_user_id = _next_id(conn, User)
+    first_driver_id = first_user_id + users
+    first_route_id = _next_id(conn, BusRoute)
+    first_bus_id = _next_id(conn, Bus)
+
+    user_ids = list(range(first_user_id, first_user_id + users))
+    driver_ids = list(range(first_driver_id, first_driver_id + drivers))
+    for chunk in _chunks(build_users(rng, first_user_id, users, hashed_password), chunk_size):
+        conn.execute(insert(User.__table__), chunk)
+    conn.execute(insert(User.__table__),
+                 list(build_users(rng, first_driver_id, drivers, hashed_password, UserRole.DRIVER, "driver")))
+
+    route_rows = build_routes(rng, first_route_id, routes)
+    conn.execute(insert(BusRoute.__table__), route_rows)
+    bus_rows = build_buses(rng, first_bus_id, buses, [route["id"] for route in route_rows], driver_ids)
+    conn.execute(insert(Bus.__table__), bus_rows)
+    _reset_sequences(conn, (User, BusRoute, Bus))
+    conn.commit()
+
+    inserted = 0
+    if reservations and user_ids and bus_rows:
+        rows = generate_reservations(rng, bus_rows, user_ids, reservations, start_date, today)
+        for chunk in _chunks(rows, chunk_size):
+            if use_copy:
+                _copy_reservations(conn, chunk)
+            else:
+                conn.execute(insert(Reservation.__table__), chunk)
+            conn.commit()
+            inserted += len(chunk)
+            if progress:
+                progress(inserted, reservations)
+
+    return {
+        "first_user_id": first_user_id,
+        "users": users,
+        "driver_ids": driver_ids,
+        "route_ids": [route["id"] for route in route_rows],
+        "bus_ids": [bus["id"] for bus in bus_rows],
+        "reservations": inserted,
+        "start_date": start_date,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Seed a deterministic synthetic dataset")
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--drivers", type=int, default=None, help="Default: one driver per four buses")
+    parser.add_argument("--routes", type=int, default=10)
+    parser.add_argument("--buses", type=int, default=50)
+    parser.add_argument("--reservations", type=int, default=100000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--start-date", type=date.fromisoformat, default=DEFAULT_START_DATE)
+    parser.add_argument("--password", default=DEFAULT_PASSWORD, help="Password shared by all generated accounts")
+    parser.add_argument("--chunk-size", type=int, default=50000)
+    args = parser.parse_args(argv)
+
+    from app.core.database import engine
+
+    started = timer.perf_counter()
+
+    def progress(done, total):
+        elapsed = timer.perf_counter() - started
+        print(f"\r  reservations {done:>12,}/{total:,}  ({done / max(elapsed, 1e-9):,.0f} rows/s)", end="", flush=True)
+
+    summary = seed_database(
+        engine, users=args.users, routes=args.routes, buses=args.buses, reservations=args.reservations,
+        drivers=args.drivers, seed=args.seed, start_date=args.start_date, password=args.password,
+        chunk_size=args.chunk_size, progress=progress,
+    )
+    print(f"\n✅ {summary['users']:,} users, {len(summary['driver_ids'])} drivers, {len(summary['route_ids'])} routes, "
+          f"{len(summary['bus_ids'])} buses, {summary['reservations']:,} reservations "
+          f"in {timer.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
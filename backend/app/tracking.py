@@ -0,0 +1,321 @@
+"""
+실시간 버스 위치와 도착 예정 시각 (ETA)
+
+기사 단말은 몇 초마다 그동안 쌓인 GPS 위치를 한 번에 올린다 (POST /api/tracking/locations). 받은 위치는
+- 버스별 링 버퍼(TRACKING_BUFFER_SIZE)에 넣어 최근 속도와 ETA 를 계산하고,
+- 쓰기 대기 목록에 모았다가 TRACKING_FLUSH_SECONDS 마다 한 번의 INSERT 로 DB 에 쓰고,
+- 그 버스를 구독 중인 승객 스트림에 한 번 직렬화한 위치/ETA 를 나눠 준다.
+요청 경로에서는 DB 에 쓰지 않는다. 버스 담당 기사와 노선 정류장은 TRACKING_ROUTE_CACHE_SECONDS 동안 캐시하므로
+캐시가 찬 뒤에는 인증 외의 쿼리가 없다.
+
+ETA 는 좌표가 있는 정류장을 이은 경로에서 현재 위치와 가장 가까운 구간을 찾아 종점까지 남은 거리를 구하고,
+최근 TRACKING_SPEED_WINDOW_SECONDS 동안 이동한 거리/시간 (위치가 하나뿐이면 단말이 보고한 속도) 으로 나눈다.
+
+링 버퍼와 구독은 워커 프로세스별이다. 다른 워커에 연결된 승객은 최근 위치 조회가 DB 에 쓰인 위치로 대신한다
+(최대 TRACKING_FLUSH_SECONDS 늦음).
+"""
+import asyncio
+import logging
+import math
+import threading
+import time
+from collections import deque, namedtuple
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import delete, insert, select
+from starlette.concurrency import run_in_threadpool
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.core.events import EventBroker, format_sse
+from app.core.metrics import TRACKING_PINGS_TOTAL, TRACKING_ROWS_WRITTEN_TOTAL
+from app.models.bus import Bus
+from app.models.location import BusLocation
+from app import queries
+
+logger = logging.getLogger(__name__)
+
+EARTH_RADIUS_M = 6371000.0
+PURGE_INTERVAL_SECONDS = 3600
+MAX_CLOCK_SKEW = timedelta(minutes=5)  # 이보다 미래 시각의 위치는 단말 시계 오류로 본다
+
+Ping = namedtuple("Ping", "recorded_at latitude longitude speed_kmh heading accuracy_m")
+BusInfo = namedtuple("BusInfo", "driver_id route_id path destination")
+
+
+def haversine_m(lat1, lon1, lat2, lon2):
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    a = (math.sin((phi2 - phi1) / 2) ** 2
+         + math.cos(phi1) * math.cos(phi2) * math.sin(math.radians(lon2 - lon1) / 2) ** 2)
+    return 2 * EARTH_RADIUS_M * math.asin(min(1.0, math.sqrt(a)))
+
+
+def _project(lat, lon, start, end):
+    """점에서 선분 start-end 까지의 (거리 m, 선분 위 위치 0~1). 정류장 사이는 짧으므로 평면 근사."""
+    scale = math.cos(math.radians(lat))
+    ax, ay = (start[1] - lon) * scale, start[0] - lat
+    bx, by = (end[1] - lon) * scale, end[0] - lat
+    dx, dy = bx - ax, by - ay
+    length = dx * dx + dy * dy
+    t = 0.0 if length == 0 else min(1.0, max(0.0, -(ax * dx + ay * dy) / length))
+    return math.radians(math.hypot(ax + t * dx, ay + t * dy)) * EARTH_RADIUS_M, t
+
+
+class RoutePath:
+    """좌표가 있는 정류장 [(name, latitude, longitude), ...] 을 이은 경로."""
+
+    def __init__(self, stops):
+        self.stops = stops
+        self.legs = [
+            haversine_m(a[1], a[2], b[1], b[2]) for a, b in zip(stops, stops[1:])
+        ]
+        # tail[i]: 정류장 i 에서 종점까지의 거리
+        self.tail = [0.0] * len(stops)
+        for i in range(len(self.legs) - 1, -1, -1):
+            self.tail[i] = self.tail[i + 1] + self.legs[i]
+
+    def remaining(self, lat, lon):
+        """(종점까지 남은 거리 m, 다음 정류장 이름)."""
+        if not self.legs:
+            name, stop_lat, stop_lon = self.stops[-1]
+            return haversine_m(lat, lon, stop_lat, stop_lon), name
+        best = None
+        for k in range(len(self.legs)):
+            off_route, t = _project(lat, lon, self.stops[k][1:], self.stops[k + 1][1:])
+            if best is None or off_route < best[0]:
+                best = (off_route, k, t)
+        off_route, k, t = best
+        return off_route + (1 - t) * self.legs[k] + self.tail[k + 1], self.stops[k + 1][0]
+
+
+def _utc(value):
+    return value.astimezone(timezone.utc).replace(tzinfo=None) if value.tzinfo else value
+
+
+class LocationTracker:
+    def __init__(self, session_factory=SessionLocal):
+        self.session_factory = session_factory
+        self.broker = EventBroker(queue_size=5)  # 늦은 구독자는 오래된 위치부터 버린다
+        self._lock = threading.Lock()
+        self._buffers = {}  # bus_id -> deque[Ping]
+        self._latest = {}  # bus_id -> 마지막으로 보낸 위치/ETA
+        self._pending = []  # DB 에 쓸 행
+        self._buses = {}  # bus_id -> (읽은 시각, BusInfo)
+        self._purged_at = 0.0
+        self._task = None
+
+    # 버스/노선 캐시 --------------------------------------------------------
+
+    def bus_info(self, db, bus_id):
+        """운행 중인 버스의 담당 기사와 ETA 경로. 없는 버스면 None."""
+        now = time.monotonic()
+        cached = self._buses.get(bus_id)
+        if cached is not None and now - cached[0] < settings.TRACKING_ROUTE_CACHE_SECONDS:
+            return cached[1]
+        row = db.execute(
+            select(Bus.driver_id, Bus.route_id).where(Bus.id == bus_id, Bus.is_active == True)
+        ).one_or_none()
+        if row is None:
+            self._buses.pop(bus_id, None)
+            return None
+        stops = queries.route_stop_rows(db, row.route_id)
+        located = [(name, lat, lon) for _, name, _, lat, lon in stops if lat is not None]
+        info = BusInfo(row.driver_id, row.route_id, RoutePath(located) if located else None,
+                       stops[-1][1] if stops else None)
+        self._buses[bus_id] = (now, info)
+        return info
+
+    def forget_bus(self, bus_id):
+        self._buses.pop(bus_id, None)
+
+    def forget_route(self, route_id):
+        for bus_id, (_, info) in list(self._buses.items()):
+            if info.route_id == route_id:
+                self._buses.pop(bus_id, None)
+
+    # 위치 받기 ------------------------------------------------------------
+
+    def ingest(self, bus_id, driver_id, info, pings):
+        """
+        pings: LocationPing 목록. 이미 받은 시각 이전의 위치(재전송, 순서 뒤바뀜)는 건너뛴다.
+        (accepted, stale, invalid, snapshot) 을 돌려준다.
+        """
+        received_at = datetime.utcnow()
+        valid, invalid = [], 0
+        for ping in pings:
+            recorded_at = _utc(ping.recorded_at)
+            if not (-90 <= ping.latitude <= 90 and -180 <= ping.longitude <= 180) \
+                    or recorded_at > received_at + MAX_CLOCK_SKEW:
+                invalid += 1
+                continue
+            valid.append(Ping(recorded_at, ping.latitude, ping.longitude, ping.speed_kmh, ping.heading, ping.accuracy_m))
+        valid.sort(key=lambda ping: ping.recorded_at)
+
+        accepted = []
+        with self._lock:
+            buffer = self._buffers.get(bus_id)
+            if buffer is None:
+                buffer = self._buffers[bus_id] = deque(maxlen=settings.TRACKING_BUFFER_SIZE)
+            last = buffer[-1].recorded_at if buffer else None
+            for ping in valid:
+                if last is not None and ping.recorded_at <= last:
+                    continue
+                buffer.append(ping)
+                accepted.append(ping)
+                last = ping.recorded_at
+            self._pending.extend(
+                {
+                    "bus_id": bus_id, "driver_id": driver_id, "latitude": ping.latitude, "longitude": ping.longitude,
+                    "speed_kmh": ping.speed_kmh, "heading": ping.heading, "accuracy_m": ping.accuracy_m,
+                    "recorded_at": ping.recorded_at, "received_at": received_at,
+                }
+                for ping in accepted
+            )
+            dropped = self._trim_pending()
+            snapshot = self._snapshot(bus_id, info, buffer) if accepted else self._latest.get(bus_id)
+            if accepted:
+                self._latest[bus_id] = snapshot
+
+        stale = len(valid) - len(accepted)
+        TRACKING_PINGS_TOTAL.inc("accepted", amount=len(accepted))
+        if stale:
+            TRACKING_PINGS_TOTAL.inc("stale", amount=stale)
+        if invalid:
+            TRACKING_PINGS_TOTAL.inc("invalid", amount=invalid)
+        if dropped:
+            TRACKING_PINGS_TOTAL.inc("dropped", amount=dropped)
+        if accepted:
+            # 구독자마다 직렬화하지 않도록 한 번만 만든다
+            self.broker.publish(bus_id, "location", format_sse("location", snapshot))
+        return len(accepted), stale, invalid, snapshot
+
+    def _trim_pending(self):
+        overflow = len(self._pending) - settings.TRACKING_MAX_PENDING
+        if overflow > 0:
+            del self._pending[:overflow]
+            return overflow
+        return 0
+
+    # 속도/ETA -------------------------------------------------------------
+
+    @staticmethod
+    def _speed(buffer):
+        """최근 구간 평균 속도 (m/s). 위치가 하나뿐이면 단말이 보고한 속도."""
+        last = buffer[-1]
+        cutoff = last.recorded_at - timedelta(seconds=settings.TRACKING_SPEED_WINDOW_SECONDS)
+        distance, first, previous = 0.0, last, None
+        for ping in reversed(buffer):
+            if ping.recorded_at < cutoff:
+                break
+            if previous is not None:
+                distance += haversine_m(ping.latitude, ping.longitude, previous.latitude, previous.longitude)
+            previous = first = ping
+        elapsed = (last.recorded_at - first.recorded_at).total_seconds()
+        if elapsed > 0:
+            return distance / elapsed
+        return last.speed_kmh / 3.6 if last.speed_kmh is not None else None
+
+    def _snapshot(self, bus_id, info, buffer):
+        last = buffer[-1]
+        speed = self._speed(buffer)
+        snapshot = {
+            "bus_id": bus_id,
+            "latitude": last.latitude,
+            "longitude": last.longitude,
+            "heading": last.heading,
+            "speed_kmh": round(speed * 3.6, 1) if speed is not None else None,
+            "recorded_at": last.recorded_at.isoformat(),
+            "destination": info.destination if info else None,
+            "next_stop": None,
+            "remaining_m": None,
+            "eta_seconds": None,
+            "eta_at": None
+        }
+        if info is not None and info.path is not None:
+            remaining, next_stop = info.path.remaining(last.latitude, last.longitude)
+            # 정차 중이어도 ETA 가 끝없이 늘어나지 않도록 하한 속도를 둔다
+            effective = max(speed or 0.0, settings.TRACKING_MIN_SPEED_KMH / 3.6)
+            eta_seconds = int(remaining / effective)
+            snapshot.update({
+                "next_stop": next_stop,
+                "remaining_m": int(remaining),
+                "eta_seconds": eta_seconds,
+                "eta_at": (last.recorded_at + timedelta(seconds=eta_seconds)).isoformat()
+            })
+        return snapshot
+
+    def latest(self, db, bus_id, info):
+        """마지막 위치/ETA. 이 워커가 받은 위치가 없으면 DB 에 쓰인 최근 위치로 계산한다."""
+        snapshot = self._latest.get(bus_id)
+        if snapshot is not None:
+            return snapshot
+        rows = db.execute(
+            select(BusLocation.recorded_at, BusLocation.latitude, BusLocation.longitude,
+                   BusLocation.speed_kmh, BusLocation.heading, BusLocation.accuracy_m)
+            .where(BusLocation.bus_id == bus_id)
+            .order_by(BusLocation.recorded_at.desc())
+            .limit(settings.TRACKING_BUFFER_SIZE)
+        ).all()
+        if not rows:
+            return None
+        return self._snapshot(bus_id, info, [Ping(*row) for row in reversed(rows)])
+
+    # DB 쓰기 ---------------------------------------------------------------
+
+    def flush(self):
+        """쌓인 위치를 한 번의 INSERT 로 쓴다. 실패하면 다음 주기에 다시 쓴다."""
+        with self._lock:
+            rows, self._pending = self._pending, []
+        if not rows:
+            return 0
+        try:
+            with self.session_factory() as db:
+                db.execute(insert(BusLocation), rows)
+                db.commit()
+        except Exception:
+            with self._lock:
+                self._pending[:0] = rows
+                dropped = self._trim_pending()
+            if dropped:
+                TRACKING_PINGS_TOTAL.inc("dropped", amount=dropped)
+            raise
+        TRACKING_ROWS_WRITTEN_TOTAL.inc(amount=len(rows))
+        return len(rows)
+
+    def purge(self):
+        cutoff = datetime.utcnow() - timedelta(hours=settings.TRACKING_RETENTION_HOURS)
+        with self.session_factory() as db:
+            db.execute(delete(BusLocation).where(BusLocation.recorded_at < cutoff))
+            db.commit()
+        self._purged_at = time.monotonic()
+
+    def _flush_and_purge(self):
+        self.flush()
+        if time.monotonic() - self._purged_at >= PURGE_INTERVAL_SECONDS:
+            self.purge()
+
+    async def run(self):
+        while True:
+            await asyncio.sleep(settings.TRACKING_FLUSH_SECONDS)
+            try:
+                await run_in_threadpool(self._flush_and_purge)
+            except Exception:
+                logger.exception("Failed to write bus locations")
+
+    async def start(self):
+        self._task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        # 종료 전에 남은 위치를 쓴다
+        try:
+            await run_in_threadpool(self.flush)
+        except Exception:
+            logger.exception("Failed to write bus locations on shutdown")
+
+
+location_tracker = LocationTracker()
@@ -0,0 +1,25 @@
+"""
+버스 좌석 배치 (frontend/src/utils/busSeats.ts 와 동일한 좌석 번호 체계)
+"""
+import re
+
+COL_LABELS = ["A", "B", "C", "D", "E"]
+
+# 예약 API 가 받는 좌석 번호 형식 ("1A", "2B" 등). 45인승 마지막 열의 E 석은 예약 대상이 아니다
+SEAT_NUMBER_PATTERN = re.compile(r'^\d+[A-D]$')
+
+
+def generate_seat_numbers(total_seats: int = 28):
+    seats = []
+    if total_seats <= 28:
+        # 28인승 버스: 2-1 배열, 마지막 9열은 4석
+        for row in range(1, 10):
+            width = 4 if row == 9 else 3
+            seats.extend(f"{row}{col}" for col in COL_LABELS[:width])
+        return seats[:total_seats]
+
+    # 45인승 버스: 2-2 배열, 마지막 11열은 5연석
+    for row in range(1, 12):
+        width = 5 if row == 11 else 4
+        seats.extend(f"{row}{col}" for col in COL_LABELS[:width])
+    return seats[:total_seats]
@@ -0,0 +1,67 @@
+"""
+한글 자모 분해 (검색용)
+
+완성형 음절을 초성/중성/종성 호환 자모로 풀어 쓴다. 겹모음(ㅘ)과 겹받침(ㄳ)도 낱자로 나눠서 입력 중인
+글자("판ㄱ", "가ㄴ")가 완성된 글자("판교", "간")의 접두어가 되게 한다. 초성 ㄲ/ㄸ/ㅃ/ㅆ/ㅉ 은 한 번에 입력하는
+글자라 나누지 않는다.
+"""
+import re
+import unicodedata
+
+SYLLABLE_BASE = 0xAC00
+SYLLABLE_LAST = 0xD7A3
+
+CHOSEONG = "ㄱㄲㄴㄷㄸㄹㅁㅂㅃㅅㅆㅇㅈㅉㅊㅋㅌㅍㅎ"
+JUNGSEONG = [
+    "ㅏ", "ㅐ", "ㅑ", "ㅒ", "ㅓ", "ㅔ", "ㅕ", "ㅖ", "ㅗ", "ㅗㅏ", "ㅗㅐ", "ㅗㅣ", "ㅛ", "ㅜ",
+    "ㅜㅓ", "ㅜㅔ", "ㅜㅣ", "ㅠ", "ㅡ", "ㅡㅣ", "ㅣ",
+]
+JONGSEONG = [
+    "", "ㄱ", "ㄲ", "ㄱㅅ", "ㄴ", "ㄴㅈ", "ㄴㅎ", "ㄷ", "ㄹ", "ㄹㄱ", "ㄹㅁ", "ㄹㅂ", "ㄹㅅ", "ㄹㅌ",
+    "ㄹㅍ", "ㄹㅎ", "ㅁ", "ㅂ", "ㅂㅅ", "ㅅ", "ㅆ", "ㅇ", "ㅈ", "ㅊ", "ㅋ", "ㅌ", "ㅍ", "ㅎ",
+]
+# 따로 입력된 겹자모
+COMPOUND_JAMO = {
+    "ㅘ": "ㅗㅏ", "ㅙ": "ㅗㅐ", "ㅚ": "ㅗㅣ", "ㅝ": "ㅜㅓ", "ㅞ": "ㅜㅔ", "ㅟ": "ㅜㅣ", "ㅢ": "ㅡㅣ",
+    "ㄳ": "ㄱㅅ", "ㄵ": "ㄴㅈ", "ㄶ": "ㄴㅎ", "ㄺ": "ㄹㄱ", "ㄻ": "ㄹㅁ", "ㄼ": "ㄹㅂ", "ㄽ": "ㄹㅅ",
+    "ㄾ": "ㄹㅌ", "ㄿ": "ㄹㅍ", "ㅀ": "ㄹㅎ", "ㅄ": "ㅂㅅ",
+}
+
+_word_pattern = re.compile(r"[0-9a-z가-힣ㄱ-ㆎ]+")
+
+
+def words(text):
+    """소문자/NFC 로 맞춘 뒤 공백과 문장부호를 뺀 단어 목록."""
+    return _word_pattern.findall(unicodedata.normalize("NFC", text or "").lower())
+
+
+def normalize(text):
+    return "".join(words(text))
+
+
+def is_syllable(char):
+    return SYLLABLE_BASE <= ord(char) <= SYLLABLE_LAST
+
+
+def decompose(text):
+    """'판교' -> 'ㅍㅏㄴㄱㅛ'. 한글이 아닌 글자는 그대로 둔다."""
+    parts = []
+    for char in text:
+        if is_syllable(char):
+            index = ord(char) - SYLLABLE_BASE
+            parts.append(CHOSEONG[index // 588])
+            parts.append(JUNGSEONG[index % 588 // 28])
+            parts.append(JONGSEONG[index % 28])
+        else:
+            parts.append(COMPOUND_JAMO.get(char, char))
+    return "".join(parts)
+
+
+def initials(text):
+    """'강남역' -> 'ㄱㄴㅇ'. 한글이 아닌 글자는 그대로 둔다."""
+    return "".join(CHOSEONG[(ord(char) - SYLLABLE_BASE) // 588] if is_syllable(char) else char for char in text)
+
+
+def is_initials(text):
+    """초성만으로 된 입력인지 ('ㅍㄱ')."""
+    return bool(text) and all(char in CHOSEONG for char in text)
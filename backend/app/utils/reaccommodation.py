@@ -0,0 +1,75 @@
+"""
+운행 취소 승객 재배치
+
+취소된 운행의 승객 그룹(같은 사용자가 예약한 좌석들)을 대체 버스의 빈 좌석에 배정한다. 큰 그룹부터
+선호 순서(같은 노선 → 출발 시각이 가까운 순)대로 그룹 전체가 들어가는 첫 버스에 넣고, 가능하면 같은 줄의
+붙은 좌석을 준다. 어떤 버스에도 통째로 들어가지 않는 그룹은 다른 그룹을 모두 배정한 뒤 남은 좌석에 나눠 앉힌다.
+"""
+import re
+
+_seat_pattern = re.compile(r"^(\d+)([A-Z])$")
+
+
+def _row(seat_number):
+    match = _seat_pattern.match(seat_number)
+    return int(match.group(1)) if match else None
+
+
+def pick_seats(free_seats, count):
+    """free_seats(좌석 순서 유지)에서 count개를 고른다. 한 줄에 모두 앉을 수 있으면 그 줄의 좌석을 준다."""
+    if count > len(free_seats):
+        return None
+    by_row = {}
+    for seat in free_seats:
+        by_row.setdefault(_row(seat), []).append(seat)
+    for seats in by_row.values():
+        if len(seats) >= count:
+            return seats[:count]
+    # 연속한 줄에 걸쳐 앉히기
+    return free_seats[:count]
+
+
+def assign_groups(groups, buses):
+    """
+    groups: [(user_id, [원래 좌석, ...]), ...]
+    buses: 선호 순서로 정렬된 [(bus_id, [빈 좌석, ...]), ...] (리스트는 배정하면서 줄어든다)
+
+    (assignments, unplaced, split_groups) 를 돌려준다.
+    assignments: [(user_id, 원래 좌석, bus_id, 새 좌석), ...]
+    unplaced: [(user_id, 원래 좌석), ...]
+    """
+    free = [(bus_id, list(seats)) for bus_id, seats in buses]
+    assignments, unplaced, split_groups = [], [], 0
+
+    # 1차: 그룹 전체가 들어가는 첫 버스에 배정
+    deferred = []
+    for user_id, original_seats in sorted(groups, key=lambda group: -len(group[1])):
+        size = len(original_seats)
+        target = next(((bus_id, seats) for bus_id, seats in free if len(seats) >= size), None)
+        if target is None:
+            deferred.append((user_id, original_seats))
+            continue
+        bus_id, seats = target
+        chosen = pick_seats(seats, size)
+        for seat in chosen:
+            seats.remove(seat)
+        assignments.extend((user_id, old, bus_id, new) for old, new in zip(original_seats, chosen))
+
+    # 2차: 통째로 들어갈 버스가 없던 그룹만 남은 좌석이 많은 버스부터 나눠 앉힌다
+    for user_id, original_seats in deferred:
+        remaining = list(original_seats)
+        used_buses = 0
+        for bus_id, seats in sorted(free, key=lambda item: -len(item[1])):
+            if not remaining or not seats:
+                break
+            chosen = pick_seats(seats, min(len(seats), len(remaining)))
+            for seat in chosen:
+                seats.remove(seat)
+            assignments.extend((user_id, old, bus_id, new) for old, new in zip(remaining, chosen))
+            remaining = remaining[len(chosen):]
+            used_buses += 1
+        if used_buses > 1 or (used_buses and remaining):
+            split_groups += 1
+        unplaced.extend((user_id, seat) for seat in remaining)
+
+    return assignments, unplaced, split_groups
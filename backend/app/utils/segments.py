@@ -0,0 +1,63 @@
+"""
+구간별 좌석 재고 (정류장이 여러 개인 노선)
+
+정류장 n 개인 노선은 n-1 개 구간으로 나뉜다 (구간 i = 정류장 i → i+1). 구간마다 빈 좌석을 비트 하나씩으로 들고
+있어서 "정류장 a 에서 b 까지 빈 좌석" 은 구간 a..b-1 의 비트를 AND 한 값이다. 좌석 번호와 비트 위치는
+generate_seat_numbers 의 순서를 따른다.
+"""
+
+
+class SegmentInventory:
+    def __init__(self, seat_numbers, segment_count):
+        self.seat_numbers = list(seat_numbers)
+        self.segment_count = segment_count
+        self._index = {seat: i for i, seat in enumerate(self.seat_numbers)}
+        self._all = (1 << len(self.seat_numbers)) - 1
+        self._free = [self._all] * segment_count  # 구간별 빈 좌석 비트
+
+    def _bit(self, seat_number):
+        index = self._index.get(seat_number)
+        if index is None:
+            # 배치에 없는 좌석 번호 (좌석 수를 줄이기 전 예약 등) 는 모든 구간에서 빈 좌석으로 붙인다
+            index = len(self.seat_numbers)
+            self.seat_numbers.append(seat_number)
+            self._index[seat_number] = index
+            self._all |= 1 << index
+            self._free = [mask | 1 << index for mask in self._free]
+        return 1 << index
+
+    def occupy(self, seat_number, board_stop, alight_stop):
+        bit = self._bit(seat_number)
+        for segment in range(board_stop, alight_stop):
+            self._free[segment] &= ~bit
+
+    def free_mask(self, board_stop, alight_stop):
+        mask = self._all
+        for segment in range(board_stop, alight_stop):
+            mask &= self._free[segment]
+        return mask
+
+    def free_seats(self, board_stop, alight_stop):
+        mask = self.free_mask(board_stop, alight_stop)
+        return [seat for i, seat in enumerate(self.seat_numbers) if mask >> i & 1]
+
+    def is_free(self, seat_number, board_stop, alight_stop):
+        index = self._index.get(seat_number)
+        return index is None or bool(self.free_mask(board_stop, alight_stop) >> index & 1)
+
+    def free_counts(self):
+        """구간별 빈 좌석 수."""
+        return [mask.bit_count() for mask in self._free]
+
+
+def build_inventory(seat_numbers, stop_count, rows):
+    """
+    rows: [(seat_number, board_stop, alight_stop), ...] (queries.segment_rows).
+    구간 행이 없는 전 구간 예약은 board_stop/alight_stop 이 None 이므로 모든 구간을 차지한다.
+    """
+    segment_count = max(stop_count - 1, 1)
+    inventory = SegmentInventory(seat_numbers, segment_count)
+    for seat_number, board_stop, alight_stop in rows:
+        inventory.occupy(seat_number, 0 if board_stop is None else board_stop,
+                         segment_count if alight_stop is None else alight_stop)
+    return inventory
@@ -0,0 +1,48 @@
+"""
+벤치마크용 합성 데이터셋
+
+app.seed 의 대량 생성기로 만들고, 측정에 필요한 관리자 계정을 하나 추가한다. 같은 크기/시드로 호출하면
+항상 같은 데이터가 만들어진다.
+"""
+from datetime import date
+from sqlalchemy import insert, select
+from app.core.database import Base
+from app.core.security import get_password_hash
+from app.models.user import User, UserRole
+from app.models.bus import Bus
+from app.seed import seed_database
+
+BENCH_PASSWORD = "bench123"
+ADMIN_USERNAME = "bench_admin"
+START_DATE = date(2025, 1, 6)
+
+
+def seed_dataset(engine, users=1000, buses=10, reservations=1000, routes=None, seed=42):
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        conn.execute(insert(User.__table__), [{
+            "username": ADMIN_USERNAME, "email": "bench_admin@example.com",
+            "hashed_password": get_password_hash(BENCH_PASSWORD), "full_name": "벤치 관리자",
+            "role": UserRole.ADMIN, "is_active": True,
+        }])
+    # today=START_DATE: 모든 예약을 미래 예약(CONFIRMED)으로 만들어 실행 날짜와 무관하게 결과를 고정한다
+    return seed_database(
+        engine, users=users, routes=routes or max(1, buses // 2), buses=buses, reservations=reservations,
+        seed=seed, start_date=START_DATE, today=START_DATE, password=BENCH_PASSWORD,
+    )
+
+
+def dataset_info(engine):
+    # 예약이 가장 많은 사용자(생성 순서상 첫 사용자)와 가장 붐비는 날짜
+    with engine.connect() as conn:
+        heavy_username = conn.execute(
+            select(User.username).where(User.role == UserRole.USER).order_by(User.id).limit(1)
+        ).scalar_one()
+        bus_id = conn.execute(select(Bus.id).order_by(Bus.id).limit(1)).scalar_one()
+    return {
+        "admin_username": ADMIN_USERNAME,
+        "heavy_username": heavy_username,
+        "password": BENCH_PASSWORD,
+        "hot_date": START_DATE.isoformat(),
+        "bus_id": bus_id,
+    }
@@ -0,0 +1,220 @@
+"""
+API 엔드포인트 마이크로 벤치마크
+
+ASGI 앱을 프로세스 안에서 httpx ASGITransport로 호출하고, 엔드포인트별 지연 시간/CPU 시간/쿼리 수를
+측정한다. 데이터셋은 크기별로 SQLite 파일에 캐시된다.
+
+    python -m benchmarks.run --reservations 100000 --buses 500 --output benchmarks/baseline.json
+    python -m benchmarks.run --reservations 100000 --buses 500 --compare benchmarks/baseline.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from datetime import datetime
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".data")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark hot API endpoints against a synthetic dataset")
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--buses", type=int, default=10)
+    parser.add_argument("--reservations", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--warmup", type=int, default=5)
+    parser.add_argument("--only", action="append", help="Run only endpoints whose name contains this text")
+    parser.add_argument("--reseed", action="store_true", help="Rebuild the cached dataset")
+    parser.add_argument("--output", help="Write results to this JSON file")
+    parser.add_argument("--compare", help="Compare results against this JSON baseline")
+    parser.add_argument("--threshold", type=float, default=0.20,
+                        help="Allowed relative slowdown of p50 latency / CPU time before flagging (default 0.20)")
+    return parser.parse_args(argv)
+
+
+def prepare_database(args):
+    os.makedirs(DATA_DIR, exist_ok=True)
+    path = os.path.join(DATA_DIR, f"bench-u{args.users}-b{args.buses}-r{args.reservations}-s{args.seed}.db")
+    if args.reseed and os.path.exists(path):
+        os.remove(path)
+    fresh = not os.path.exists(path)
+    # 앱 모듈이 import 되기 전에 설정해야 엔진이 벤치마크 DB를 바라본다
+    os.environ["DATABASE_URL"] = f"sqlite:///{path}"
+    # 같은 클라이언트가 반복 호출하므로 요청 제한은 끈다
+    os.environ["RATE_LIMIT_ENABLED"] = "false"
+    return path, fresh
+
+
+class QueryCounter:
+    def __init__(self, engine):
+        from sqlalchemy import event
+        self.count = 0
+        event.listen(engine, "before_cursor_execute", self._on_execute)
+
+    def _on_execute(self, conn, cursor, statement, parameters, context, executemany):
+        self.count += 1
+
+
+def endpoint_cases(info):
+    hot_date = info["hot_date"]
+    return [
+        ("POST /api/auth/login", "post", "/api/auth/login", None,
+         {"data": {"username": info["heavy_username"], "password": info["password"]}}),
+        ("GET /api/buses/", "get", "/api/buses/", None, {"params": {"reservation_date": hot_date}}),
+        ("GET /api/buses/{bus_id}/seats", "get", f"/api/buses/{info['bus_id']}/seats", None,
+         {"params": {"reservation_date": hot_date}}),
+        ("GET /api/reservations/user", "get", "/api/reservations/user", "user", {}),
+        ("GET /api/admin/occupancy", "get", "/api/admin/occupancy", "admin", {"params": {"reservation_date": hot_date}}),
+        # 대량 목록: 압축 없이 / 필드 선택 / gzip
+        ("GET /api/admin/reservations 10k", "get", "/api/admin/reservations", "admin",
+         {"params": {"limit": 10000}, "headers": {"Accept-Encoding": "identity"}}),
+        ("GET /api/admin/reservations 10k fields", "get", "/api/admin/reservations", "admin",
+         {"params": {"limit": 10000, "fields": "id,bus_id,seat_number,status"},
+          "headers": {"Accept-Encoding": "identity"}}),
+        ("GET /api/admin/reservations 10k gzip", "get", "/api/admin/reservations", "admin",
+         {"params": {"limit": 10000}, "headers": {"Accept-Encoding": "gzip"}}),
+    ]
+
+
+def _percentile(values, fraction):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(fraction * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def run_benchmarks(args, info, counter):
+    import httpx
+    from main import app
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        headers = {}
+        for role, username in (("user", info["heavy_username"]), ("admin", info["admin_username"])):
+            response = await client.post("/api/auth/login", data={"username": username, "password": info["password"]})
+            response.raise_for_status()
+            headers[role] = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+        results = {}
+        for name, method, path, role, kwargs in endpoint_cases(info):
+            if args.only and not any(text in name for text in args.only):
+                continue
+            request = getattr(client, method)
+            kwargs = dict(kwargs)
+            request_headers = {**headers.get(role, {}), **kwargs.pop("headers", {})}
+            # 로그인은 bcrypt 비용이 대부분이므로 반복 횟수를 줄인다
+            iterations = max(1, args.iterations // 10) if "login" in name else args.iterations
+
+            for _ in range(args.warmup):
+                (await request(path, headers=request_headers, **kwargs)).raise_for_status()
+
+            wall_times, cpu_times = [], []
+            counter.count = 0
+            response_bytes = 0
+            for _ in range(iterations):
+                wall_start, cpu_start = time.perf_counter(), time.process_time()
+                response = await request(path, headers=request_headers, **kwargs)
+                cpu_times.append(time.process_time() - cpu_start)
+                wall_times.append(time.perf_counter() - wall_start)
+                response.raise_for_status()
+                # 압축된 경우 전송된 크기
+                response_bytes = response.num_bytes_downloaded
+
+            results[name] = {
+                "iterations": iterations,
+                "mean_ms": round(statistics.fmean(wall_times) * 1000, 3),
+                "p50_ms": round(_percentile(wall_times, 0.50) * 1000, 3),
+                "p95_ms": round(_percentile(wall_times, 0.95) * 1000, 3),
+                "min_ms": round(min(wall_times) * 1000, 3),
+                "cpu_ms": round(statistics.fmean(cpu_times) * 1000, 3),
+                "queries": round(counter.count / iterations, 2),
+                "response_bytes": response_bytes,
+            }
+            print(f"{name:<40} p50 {results[name]['p50_ms']:>9.2f} ms  p95 {results[name]['p95_ms']:>9.2f} ms  "
+                  f"cpu {results[name]['cpu_ms']:>9.2f} ms  queries {results[name]['queries']:>8}  "
+                  f"{response_bytes / 1024:>9.1f} KB")
+        return results
+
+
+def compare(results, baseline, threshold):
+    regressions = []
+    print(f"\n{'endpoint':<32} {'p50 base':>10} {'p50 now':>10} {'change':>8} {'queries':>15}")
+    for name, current in results.items():
+        previous = baseline.get("results", {}).get(name)
+        if previous is None:
+            print(f"{name:<32} {'-':>10} {current['p50_ms']:>10.2f} {'new':>8}")
+            continue
+        change = (current["p50_ms"] - previous["p50_ms"]) / previous["p50_ms"] if previous["p50_ms"] else 0.0
+        cpu_change = (current["cpu_ms"] - previous["cpu_ms"]) / previous["cpu_ms"] if previous["cpu_ms"] else 0.0
+        flags = []
+        if change > threshold and cpu_change > threshold:
+            flags.append(f"latency +{change:.0%}")
+        if current["queries"] > previous["queries"]:
+            flags.append(f"queries {previous['queries']} -> {current['queries']}")
+        marker = "  REGRESSION: " + ", ".join(flags) if flags else ""
+        print(f"{name:<32} {previous['p50_ms']:>10.2f} {current['p50_ms']:>10.2f} {change:>+8.0%} "
+              f"{previous['queries']:>7} -> {current['queries']:<5}{marker}")
+        if flags:
+            regressions.append(name)
+    return regressions
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    path, fresh = prepare_database(args)
+
+    from app.core.database import engine
+    from benchmarks.dataset import seed_dataset, dataset_info
+
+    if fresh:
+        print(f"Seeding {path} ...")
+        started = time.perf_counter()
+        seed_dataset(engine, users=args.users, buses=args.buses, reservations=args.reservations, seed=args.seed)
+        print(f"Seeded in {time.perf_counter() - started:.1f}s")
+    else:
+        # 캐시된 데이터셋에 이후 추가된 테이블만 만든다 (앱 lifespan 과 같은 동작)
+        from app.core.database import Base
+        Base.metadata.create_all(bind=engine)
+    info = dataset_info(engine)
+    # lifespan 을 돌리지 않으므로 앱 시작 때처럼 토큰 폐기 목록을 미리 읽는다 (안 읽으면 인증이 모두 거절된다)
+    from app.core.revocation import revocation_list
+    revocation_list.reload()
+
+    counter = QueryCounter(engine)
+    results = asyncio.run(run_benchmarks(args, info, counter))
+
+    report = {
+        "meta": {
+            "created_at": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "dataset": {"users": args.users, "buses": args.buses, "reservations": args.reservations, "seed": args.seed},
+            "iterations": args.iterations,
+        },
+        "results": results,
+    }
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"\nResults written to {args.output}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        if baseline.get("meta", {}).get("dataset") != report["meta"]["dataset"]:
+            print("\nWARNING: baseline was recorded against a different dataset")
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} endpoint(s) regressed")
+            return 1
+        print("\nNo regressions")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,12 +1,14 @@
 """
 데모 데이터 초기화 스크립트
 """
+from sqlalchemy import insert, select
 from sqlalchemy.orm import Session
 from app.core.database import SessionLocal, engine
 from app.models.user import User, UserRole
 from app.models.bus import Bus, BusRoute
 from app.models.reservation import Reservation, ReservationStatus
 from app.core.security import get_password_hash
+from app.seed import insert_missing, lookup_ids
 from datetime import datetime, time
 import app.models.user
 import app.models.bus
@@ -25,7 +27,7 @@ def init_demo_users(db: Session):
         {
             "username": "admin",
             "email": "admin@company.com",
-            "hashed_password": get_password_hash("admin123"),
+            "password": "admin123",
             "full_name": "관리자",
             "phone": "02-1234-5678",
             "role": UserRole.ADMIN
@@ -33,7 +35,7 @@ def init_demo_users(db: Session):
         {
             "username": "driver1",
             "email": "driver1@company.com",
-            "hashed_password": get_password_hash("driver123"),
+            "password": "driver123",
             "full_name": "김기사",
             "phone": "010-1111-2222",
             "role": UserRole.DRIVER
@@ -41,18 +43,21 @@ def init_demo_users(db: Session):
         {
             "username": "user1",
             "email": "user1@company.com",
-            "hashed_password": get_password_hash("user123"),
+            "password": "user123",
             "full_name": "홍길동",
             "phone": "010-3333-4444",
             "role": UserRole.USER
         }
     ]
 
-    for user_data in demo_users:
-        existing_user = db.query(User).filter(User.username == user_data["username"]).first()
-        if not existing_user:
-            db_user = User(**user_data)
-            db.add(db_user)
+    existing = lookup_ids(db, User, "username", [user["username"] for user in demo_users])
+    # bcrypt 해시는 새로 만들 계정에 대해서만 계산
+    missing = [
+        {**{k: v for k, v in user.items() if k != "password"}, "hashed_password": get_password_hash(user["password"])}
+        for user in demo_users if user["username"] not in existing
+    ]
+    if missing:
+        db.execute(insert(User), missing)
 
     db.commit()
     print("✅ 데모 사용자 생성 완료")
@@ -77,82 +82,75 @@ def init_demo_routes(db: Session):
         }
     ]
 
-    for route_data in demo_routes:
-        existing_route = db.query(BusRoute).filter(BusRoute.name == route_data["name"]).first()
-        if not existing_route:
-            db_route = BusRoute(**route_data)
-            db.add(db_route)
-
+    insert_missing(db, BusRoute, "name", demo_routes)
     db.commit()
     print("✅ 데모 노선 데이터 생성 완료")
 
 def init_demo_buses(db: Session):
     """데모 버스 데이터 생성"""
+    route_ids = lookup_ids(db, BusRoute, "name", ["강남-판교선", "잠실-강남선", "서울역-여의도선"])
+    driver_id = lookup_ids(db, User, "username", ["driver1"]).get("driver1")
     demo_buses = [
         {
             "bus_number": "BUS-001",
-            "route_id": 1,  # 강남-판교선
+            "route_id": route_ids["강남-판교선"],
             "departure_time": time(8, 0),
             "arrival_time": time(8, 45),
             "total_seats": 45,
-            "driver_id": 2  # driver1
+            "driver_id": driver_id
         },
         {
             "bus_number": "BUS-002",
-            "route_id": 2,  # 잠실-강남선
+            "route_id": route_ids["잠실-강남선"],
             "departure_time": time(8, 30),
             "arrival_time": time(9, 15),
             "total_seats": 28,
-            "driver_id": 2
+            "driver_id": driver_id
         },
         {
             "bus_number": "BUS-003",
-            "route_id": 3,  # 서울역-여의도선
+            "route_id": route_ids["서울역-여의도선"],
             "departure_time": time(7, 45),
             "arrival_time": time(8, 20),
             "total_seats": 45,
-            "driver_id": 2
+            "driver_id": driver_id
         }
     ]
 
-    for bus_data in demo_buses:
-        existing_bus = db.query(Bus).filter(Bus.bus_number == bus_data["bus_number"]).first()
-        if not existing_bus:
-            db_bus = Bus(**bus_data)
-            db.add(db_bus)
-
+    insert_missing(db, Bus, "bus_number", demo_buses)
     db.commit()
     print("✅ 데모 버스 데이터 생성 완료")
 
 def init_demo_reservations(db: Session):
     """데모 예약 데이터 생성"""
+    user_id = lookup_ids(db, User, "username", ["user1"]).get("user1")
+    bus_ids = lookup_ids(db, Bus, "bus_number", ["BUS-001", "BUS-002"])
     demo_reservations = [
         {
-            "user_id": 3,  # user1
-            "bus_id": 1,   # BUS-001
+            "user_id": user_id,
+            "bus_id": bus_ids["BUS-001"],
             "seat_number": "15",
             "reservation_date": datetime.now().date(),
             "status": ReservationStatus.CONFIRMED
         },
         {
-            "user_id": 3,
-            "bus_id": 2,   # BUS-002
+            "user_id": user_id,
+            "bus_id": bus_ids["BUS-002"],
             "seat_number": "10",
             "reservation_date": datetime.now().date(),
             "status": ReservationStatus.CONFIRMED
         }
     ]
 
-    for reservation_data in demo_reservations:
-        existing_reservation = db.query(Reservation).filter(
-            Reservation.user_id == reservation_data["user_id"],
-            Reservation.bus_id == reservation_data["bus_id"],
-            Reservation.seat_number == reservation_data["seat_number"]
-        ).first()
-
-        if not existing_reservation:
-            db_reservation = Reservation(**reservation_data)
-            db.add(db_reservation)
+    existing = set(db.execute(
+        select(Reservation.bus_id, Reservation.seat_number).where(
+            Reservation.user_id == user_id,
+            Reservation.bus_id.in_(bus_ids.values())
+        )
+    ).all())
+    missing = [r for r in demo_reservations if (r["bus_id"], r["seat_number"]) not in existing]
+    if missing:
+        db.execute(insert(Reservation), missing)
 
     db.commit()
     print("✅ 데모 예약 데이터 생성 완료")
@@ -1,14 +1,72 @@
+import logging
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from app.api import auth, users, buses, reservations, admin
+from fastapi.responses import PlainTextResponse
+from sqlalchemy.exc import DBAPIError
+from app.api import auth, users, buses, reservations, admin, holds, waitlist, lottery, sync, batch, schedule, tracking
 from app.core.config import settings
+from app.core.metrics import MetricsMiddleware, render_metrics, CONTENT_TYPE_LATEST
+from app.core.profiling import ProfilingMiddleware
+from app.core.idempotency import IdempotencyMiddleware
+from app.core.ratelimit import RateLimitMiddleware
+from app.core.compression import CompressionMiddleware
+from app.core.database import Base, engine
+from app.core.hold_sweeper import hold_sweeper
+from app.core.revocation import revocation_list
+from app.lottery import lottery_runner
+from app.route_search import route_index
+from app.tracking import location_tracker
+from app.core.outbox import outbox_dispatcher
+from app.notifications import NotificationService
+from app import models  # noqa: F401 - create_all 대상 테이블 등록
+from app.core import changes  # noqa: F401 - 변경 기록 리스너 등록
+
+logger = logging.getLogger(__name__)
+
+# 예약 이벤트를 아웃박스에서 받아 알림을 보낸다 (디스패처 시작 전에 등록)
+notification_service = outbox_dispatcher.register(NotificationService()) if settings.NOTIFY_ENABLED else None
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # 기존 DB에 새로 추가된 테이블만 만든다 (기존 테이블의 컬럼은 건드리지 않음).
+    # 여러 워커가 동시에 시작하면 한쪽이 실패할 수 있으나 테이블은 이미 만들어진 상태다
+    try:
+        Base.metadata.create_all(bind=engine)
+    except DBAPIError:
+        logger.warning("Skipping table creation at startup", exc_info=True)
+    await revocation_list.start()
+    await route_index.start()
+    await hold_sweeper.start()
+    await lottery_runner.start()
+    await location_tracker.start()
+    if notification_service is not None:
+        await notification_service.start()
+    await outbox_dispatcher.start()
+    yield
+    await outbox_dispatcher.stop()
+    if notification_service is not None:
+        await notification_service.stop()
+    await location_tracker.stop()
+    await lottery_runner.stop()
+    await hold_sweeper.stop()
+    await route_index.stop()
+    await revocation_list.stop()
 
 app = FastAPI(
     title="Bus Reservation System API",
     description="API for commuter bus reservation system",
     version="1.0.0",
+    lifespan=lifespan,
 )
 
+# CORS 안쪽에 둬야 재생된 응답/429 응답에도 CORS 헤더가 붙는다
+app.add_middleware(IdempotencyMiddleware)
+if settings.RATE_LIMIT_ENABLED:
+    app.add_middleware(RateLimitMiddleware)
+# Idempotency 바깥에 둬야 캐시된 응답을 요청마다 Accept-Encoding 에 맞춰 압축한다
+if settings.COMPRESSION_ENABLED:
+    app.add_middleware(CompressionMiddleware)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["http://localhost:3000", "http://localhost:3001", "http://localhost:3004"],  # Next.js frontend
@@ -16,12 +74,23 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+if settings.PROFILING_ENABLED:
+    app.add_middleware(ProfilingMiddleware)
+# 가장 바깥쪽에서 측정하도록 마지막에 등록
+app.add_middleware(MetricsMiddleware)
 
 app.include_router(auth.router, prefix="/api/auth", tags=["authentication"])
 app.include_router(users.router, prefix="/api/users", tags=["users"])
 app.include_router(buses.router, prefix="/api/buses", tags=["buses"])
 app.include_router(reservations.router, prefix="/api/reservations", tags=["reservations"])
 app.include_router(admin.router, prefix="/api/admin", tags=["admin"])
+app.include_router(holds.router, prefix="/api/holds", tags=["holds"])
+app.include_router(waitlist.router, prefix="/api/waitlist", tags=["waitlist"])
+app.include_router(lottery.router, prefix="/api/lottery", tags=["lottery"])
+app.include_router(schedule.router, prefix="/api/schedule", tags=["schedule"])
+app.include_router(tracking.router, prefix="/api/tracking", tags=["tracking"])
+app.include_router(sync.router, prefix="/api/sync", tags=["sync"])
+app.include_router(batch.router, prefix="/api/batch", tags=["batch"])
 
 @app.get("/")
 async def root():
@@ -31,6 +100,10 @@ async def root():
 async def health_check():
     return {"status": "healthy"}
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    return PlainTextResponse(render_metrics(), media_type=CONTENT_TYPE_LATEST)
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(
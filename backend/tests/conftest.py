@@ -0,0 +1,88 @@
+"""
+테스트 공통 설정
+
+앱 설정은 import 시점에 읽히므로 app 을 import 하기 전에 임시 SQLite DB 와 테스트용 환경 변수를 지정한다.
+테스트마다 새 사용자/노선/버스를 만들어 쓰므로 DB 는 세션 동안 하나만 둔다.
+"""
+import itertools
+import os
+import sys
+import tempfile
+from datetime import time
+
+_DB_DIR = tempfile.mkdtemp(prefix="gc-kit-bus-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{_DB_DIR}/test.db"
+os.environ["RATE_LIMIT_ENABLED"] = "false"
+os.environ["NOTIFY_ENABLED"] = "false"
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.database import Base, SessionLocal, engine
+from app.core.security import create_access_token
+from app.models.bus import Bus, BusRoute, BusType
+from app.models.user import User, UserRole
+
+_ids = itertools.count(1)
+
+
+@pytest.fixture(scope="session", autouse=True)
+def _schema():
+    Base.metadata.create_all(bind=engine)
+    yield
+
+
+@pytest.fixture(scope="session")
+def client():
+    from main import app
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+@pytest.fixture
+def db():
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+def auth_headers(user):
+    return {"Authorization": f"Bearer {create_access_token({'sub': user.username})}"}
+
+
+@pytest.fixture
+def make_user(db):
+    def factory(role=UserRole.USER):
+        n = next(_ids)
+        user = User(username=f"user{n}", email=f"user{n}@example.com", hashed_password="x",
+                    full_name=f"사용자{n}", role=role)
+        db.add(user)
+        db.commit()
+        db.refresh(user)
+        return user
+    return factory
+
+
+@pytest.fixture
+def make_bus(db):
+    def factory(total_seats=28, departure_time=time(8, 0), arrival_time=time(9, 0), driver=None, route=None):
+        n = next(_ids)
+        if route is None:
+            route = BusRoute(name=f"노선{n}", departure_location=f"출발{n}", destination=f"도착{n}")
+            db.add(route)
+            db.flush()
+        bus = Bus(bus_number=f"T-{n}", route_id=route.id,
+                  bus_type=BusType.SEAT_45 if total_seats == 45 else BusType.SEAT_28,
+                  total_seats=total_seats, departure_time=departure_time, arrival_time=arrival_time,
+                  driver_id=driver.id if driver else None)
+        db.add(bus)
+        db.commit()
+        db.refresh(bus)
+        # 새 버스는 운행 캐시에 아직 없으므로 계산된 운행을 다시 만들게 한다
+        from app.schedule import trip_schedule
+        trip_schedule.invalidate()
+        return bus
+    return factory
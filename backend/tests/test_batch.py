@@ -0,0 +1,60 @@
+import asyncio
+import itertools
+import time
+
+import pytest
+from fastapi.responses import StreamingResponse
+
+from app.core.config import settings
+from app.models.user import UserRole
+from conftest import auth_headers
+
+
+@pytest.fixture
+def streaming_routes(client, monkeypatch):
+    """목록(EXCLUDED_PATHS)에 없는 스트리밍 엔드포인트 두 개를 잠시 붙인다."""
+    async def forever():
+        for n in itertools.count():
+            yield f"data: {n}\n\n"
+            await asyncio.sleep(0.01)
+
+    async def events():
+        return StreamingResponse(forever(), media_type="text/event-stream")
+
+    async def text():
+        return StreamingResponse(forever(), media_type="text/plain")
+
+    app = client.app
+    before = list(app.router.routes)
+    app.add_api_route("/api/test-streams/events", events)
+    app.add_api_route("/api/test-streams/text", text)
+    monkeypatch.setattr(settings, "BATCH_TIMEOUT_SECONDS", 2.0)
+    yield
+    app.router.routes[:] = before
+
+
+def _batch(client, user, *paths):
+    return client.post("/api/batch/", headers=auth_headers(user),
+                       json={"requests": [{"id": str(i), "method": "GET", "path": path} for i, path in enumerate(paths)]})
+
+
+def test_streaming_sub_requests_do_not_hang_the_batch(client, make_user, streaming_routes):
+    user = make_user(UserRole.ADMIN)
+    started = time.monotonic()
+
+    response = _batch(client, user, "/api/test-streams/events", "/api/test-streams/text", "/api/auth/me")
+
+    assert time.monotonic() - started < settings.BATCH_TIMEOUT_SECONDS
+    assert response.status_code == 200
+    events, text, me = response.json()["responses"]
+    # SSE 는 content-type 으로 거절
+    assert events["status"] == 400
+    # 다른 스트리밍 응답은 연결 끊김을 보고 끝난다
+    assert text["status"] == 200
+    assert me["status"] == 200 and me["body"]["username"] == user.username
+
+
+def test_batch_rejects_excluded_paths(client, make_user):
+    response = _batch(client, make_user(), "/api/waitlist/events")
+
+    assert response.status_code == 400
@@ -0,0 +1,28 @@
+from datetime import date
+
+from benchmarks.booking_rush import classify, find_overlapping_bookings
+
+DAY = date(2026, 3, 2)
+
+
+def test_non_overlapping_segments_are_not_double_bookings():
+    rows = [(1, DAY, "1A", 0, 1), (1, DAY, "1A", 1, 3), (1, DAY, "2A", None, None)]
+    assert find_overlapping_bookings(rows) == []
+
+
+def test_overlapping_segments_and_full_route_are_reported():
+    rows = [
+        (1, DAY, "1A", 0, 2), (1, DAY, "1A", 1, 3),
+        (1, DAY, "2A", None, None), (1, DAY, "2A", 2, 3),
+        (2, DAY, "1A", None, None),
+    ]
+    assert sorted(find_overlapping_bookings(rows)) == [(1, DAY, "1A", 2), (1, DAY, "2A", 2)]
+
+
+def test_only_taken_seats_count_as_conflicts():
+    assert classify(200, None) == "success"
+    assert classify(400, "Seats already reserved: ['1A']") == "conflict"
+    assert classify(400, "Seats are being held by another user: ['1A']") == "conflict"
+    assert classify(400, "Invalid seat numbers: ['11E']") == "error"
+    assert classify(409, "This bus does not run on that date") == "error"
+    assert classify(None, None) == "error"
@@ -0,0 +1,92 @@
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import update
+
+from app.models.hold import SeatHold
+from app.models.lottery import Lottery, LotteryStatus
+from app.models.schedule import TripStatus
+from app.models.user import UserRole
+from app.schedule import trip_schedule
+from conftest import auth_headers
+
+TRAVEL_DATE = date.today() + timedelta(days=2)
+
+
+def _hold(client, user, bus, seats=("1A",)):
+    response = client.post("/api/holds/", headers=auth_headers(user), json={
+        "bus_id": bus.id, "seat_numbers": list(seats), "reservation_date": TRAVEL_DATE.isoformat(),
+    })
+    assert response.status_code == 200
+    return response.json()["hold_id"]
+
+
+def test_confirm_hold_books_seats(client, make_user, make_bus):
+    user, bus = make_user(), make_bus()
+    hold_id = _hold(client, user, bus, ("1A", "1B"))
+
+    response = client.post(f"/api/holds/{hold_id}/confirm", headers=auth_headers(user))
+    assert response.status_code == 200
+    assert sorted(item["seat_number"] for item in response.json()) == ["1A", "1B"]
+
+
+def test_hold_blocks_other_users(client, make_user, make_bus):
+    holder, other, bus = make_user(), make_user(), make_bus()
+    _hold(client, holder, bus)
+
+    response = client.post("/api/reservations/", headers=auth_headers(other), json={
+        "bus_id": bus.id, "seat_numbers": ["1A"], "reservation_date": TRAVEL_DATE.isoformat(),
+    })
+    assert response.status_code == 400
+    assert "held" in response.json()["detail"]
+
+
+def test_expired_hold_cannot_be_confirmed(client, db, make_user, make_bus):
+    user, bus = make_user(), make_bus()
+    hold_id = _hold(client, user, bus)
+    db.execute(update(SeatHold).where(SeatHold.hold_id == hold_id)
+               .values(expires_at=datetime.utcnow() - timedelta(seconds=1)))
+    db.commit()
+
+    response = client.post(f"/api/holds/{hold_id}/confirm", headers=auth_headers(user))
+    assert response.status_code == 410
+    assert db.query(SeatHold).filter(SeatHold.hold_id == hold_id).count() == 0
+
+
+def test_hold_on_cancelled_trip_cannot_be_confirmed(client, db, make_user, make_bus):
+    user, bus = make_user(), make_bus()
+    hold_id = _hold(client, user, bus)
+    trip_schedule.override(db, bus, TRAVEL_DATE, status=TripStatus.CANCELLED)
+    db.commit()
+    trip_schedule.forget(TRAVEL_DATE)
+
+    response = client.post(f"/api/holds/{hold_id}/confirm", headers=auth_headers(user))
+    assert response.status_code == 409
+
+
+def _direct(client, admin, user, bus, seats=("1A",)):
+    return client.post("/api/admin/reservations/direct", headers=auth_headers(admin), json={
+        "user_id": user.id, "bus_id": bus.id, "seat_numbers": list(seats),
+        "reservation_date": TRAVEL_DATE.isoformat(),
+    })
+
+
+def test_admin_direct_booking_respects_holds_and_lotteries(client, db, make_user, make_bus):
+    admin, holder, rider, bus = make_user(UserRole.ADMIN), make_user(), make_user(), make_bus()
+    _hold(client, holder, bus)
+
+    response = _direct(client, admin, rider, bus)
+    assert response.status_code == 400
+    assert "held" in response.json()["detail"]
+
+    # 좌석을 잡아 둔 본인에게는 예약해 주고 홀드는 예약으로 바뀐다
+    response = _direct(client, admin, holder, bus)
+    assert response.status_code == 200
+    assert db.query(SeatHold).filter(SeatHold.user_id == holder.id).count() == 0
+
+    lottery_bus = make_bus()
+    db.add(Lottery(bus_id=lottery_bus.id, reservation_date=TRAVEL_DATE,
+                   closes_at=datetime.utcnow() + timedelta(hours=1), status=LotteryStatus.OPEN))
+    db.commit()
+    response = _direct(client, admin, rider, lottery_bus)
+    assert response.status_code == 409
+    assert "lottery" in response.json()["detail"]
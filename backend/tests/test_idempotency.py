@@ -0,0 +1,40 @@
+import uuid
+from datetime import datetime, timedelta
+
+from app.core.database import SessionLocal
+from app.core.idempotency import IdempotencyStore
+
+
+def _key():
+    return f"tester:{uuid.uuid4()}"
+
+
+def test_second_claim_sees_request_in_progress():
+    store = IdempotencyStore(SessionLocal, ttl_seconds=3600, lease_seconds=60)
+    key = _key()
+
+    assert store.claim(key, "hash") is None
+    stored = store.claim(key, "hash")
+    assert stored is not None and stored.status_code is None
+    assert stored.expires_at <= datetime.utcnow() + timedelta(seconds=61)
+
+
+def test_expired_lease_can_be_taken_over():
+    # 처리하던 워커가 죽어 완료되지 않은 선점은 lease 가 지나면 다시 가져갈 수 있다
+    store = IdempotencyStore(SessionLocal, ttl_seconds=3600, lease_seconds=-1)
+    key = _key()
+
+    assert store.claim(key, "hash") is None
+    assert store.claim(key, "hash") is None
+
+
+def test_complete_keeps_response_for_full_ttl():
+    store = IdempotencyStore(SessionLocal, ttl_seconds=3600, lease_seconds=-1)
+    key = _key()
+
+    assert store.claim(key, "hash") is None
+    store.complete(key, "hash", 200, "application/json", b"[]")
+
+    stored = IdempotencyStore(SessionLocal, ttl_seconds=3600).claim(key, "hash")
+    assert stored.status_code == 200 and stored.body == b"[]"
+    assert stored.expires_at > datetime.utcnow() + timedelta(minutes=59)
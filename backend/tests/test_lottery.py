@@ -0,0 +1,74 @@
+import random
+from collections import Counter
+from datetime import date, datetime, timedelta
+
+from app.core.events import event_broker
+from app.lottery import draw_lottery, weighted_order
+from app.models.lottery import Lottery, LotteryEntry, LotteryEntryStatus, LotteryStatus
+from app.models.reservation import Reservation
+from app.models.schedule import TripStatus
+from app.schedule import trip_schedule
+
+
+def test_weighted_order_is_a_permutation():
+    entries = list("abcde")
+    order = weighted_order(entries, [1.0, 2.0, 3.0, 1.0, 1.0], random.Random(1))
+
+    assert sorted(order) == entries
+
+
+def test_weighted_order_favours_heavier_entries():
+    rng = random.Random(42)
+    firsts = Counter(weighted_order(["light", "heavy"], [1.0, 3.0], rng)[0] for _ in range(4000))
+
+    # 첫 자리에 올 확률은 가중치 비율(3/4)을 따른다
+    assert 0.72 < firsts["heavy"] / 4000 < 0.78
+
+
+def _lottery(db, bus, users, reservation_date):
+    lottery = Lottery(bus_id=bus.id, reservation_date=reservation_date,
+                      closes_at=datetime.utcnow() + timedelta(hours=1), status=LotteryStatus.OPEN)
+    db.add(lottery)
+    db.flush()
+    db.add_all(LotteryEntry(lottery_id=lottery.id, user_id=user.id, seat_count=1) for user in users)
+    db.commit()
+    return lottery.id
+
+
+def test_draw_allocates_seats(db, make_user, make_bus):
+    bus = make_bus()
+    users = [make_user() for _ in range(3)]
+    tomorrow = date.today() + timedelta(days=1)
+    lottery_id = _lottery(db, bus, users, tomorrow)
+
+    result = draw_lottery(db, lottery_id, force=True)
+
+    assert result["status"] == "drawn"
+    assert result["winners"] == 3
+    assert db.query(Reservation).filter(Reservation.bus_id == bus.id).count() == 3
+    assert draw_lottery(db, lottery_id, force=True) is None
+
+
+def test_draw_voids_lottery_for_cancelled_trip(db, make_user, make_bus, monkeypatch):
+    bus = make_bus()
+    users = [make_user() for _ in range(2)]
+    tomorrow = date.today() + timedelta(days=1)
+    lottery_id = _lottery(db, bus, users, tomorrow)
+    trip_schedule.override(db, bus, tomorrow, status=TripStatus.CANCELLED)
+    db.commit()
+    trip_schedule.forget(tomorrow)
+
+    published = []
+    monkeypatch.setattr(event_broker, "publish", lambda *event: published.append(event))
+
+    result = draw_lottery(db, lottery_id, force=True)
+
+    assert result["status"] == "void"
+    assert result["seats_allocated"] == 0
+    assert db.query(Reservation).filter(Reservation.bus_id == bus.id).count() == 0
+    db.expire_all()
+    assert db.get(Lottery, lottery_id).status == LotteryStatus.VOID
+    assert {entry.status for entry in db.query(LotteryEntry).filter(LotteryEntry.lottery_id == lottery_id)} \
+        == {LotteryEntryStatus.VOID}
+    assert sorted(user_id for user_id, _, _ in published) == sorted(user.id for user in users)
+    assert {data["result"] for _, _, data in published} == {"void"}
@@ -0,0 +1,125 @@
+import asyncio
+from datetime import date, datetime, timedelta
+
+from app.models.notification import NotificationLog, NotificationStatus
+from app.models.reservation import Reservation, ReservationStatus
+from app.notifications import reminders
+from app.notifications.reminders import ReminderScheduler
+from app.notifications.service import NotificationService
+
+TRAVEL_DATE = date.today() + timedelta(days=3)
+
+
+def _service():
+    service = NotificationService(provider=object())
+    queued = []
+
+    async def enqueue(message):
+        queued.append(message)
+
+    service.sender.enqueue = enqueue
+    return service, queued
+
+
+def _reserve(db, user, bus, seat, status=ReservationStatus.CONFIRMED):
+    reservation = Reservation(user_id=user.id, bus_id=bus.id, seat_number=seat, reservation_date=TRAVEL_DATE,
+                              status=status)
+    db.add(reservation)
+    db.commit()
+    return reservation.id
+
+
+def _created(*reservation_ids):
+    return [{"type": "reservation.created", "data": {"reservation_id": rid}} for rid in reservation_ids]
+
+
+def test_redelivered_events_are_sent_once_and_seats_grouped(db, make_user, make_bus):
+    user, bus = make_user(), make_bus()
+    first, second = _reserve(db, user, bus, "2A"), _reserve(db, user, bus, "1A")
+    service, queued = _service()
+
+    asyncio.run(service.handle(_created(first, second)))
+    asyncio.run(service.handle(_created(first, second)))
+
+    assert len(queued) == 1
+    assert "1A, 2A" in queued[0].body
+    logs = db.query(NotificationLog).filter(NotificationLog.reservation_id.in_([first, second])).all()
+    assert sorted(log.id for log in logs) == sorted(queued[0].log_ids)
+    assert {(log.kind, log.status) for log in logs} == {("confirmation", NotificationStatus.QUEUED)}
+
+
+def test_failed_enqueue_releases_the_claim(db, make_user, make_bus):
+    reservation_id = _reserve(db, make_user(), make_bus(), "1A")
+    service, queued = _service()
+
+    async def full(message):
+        raise asyncio.TimeoutError()
+
+    service.sender.enqueue = full
+    try:
+        asyncio.run(service.handle(_created(reservation_id)))
+    except asyncio.TimeoutError:
+        pass
+    assert db.query(NotificationLog).filter(NotificationLog.reservation_id == reservation_id).count() == 0
+
+    # 이벤트가 다시 오면 다시 만든다
+    service, queued = _service()
+    asyncio.run(service.handle(_created(reservation_id)))
+    assert len(queued) == 1
+
+
+def test_stale_queued_notifications_are_recovered_once(db, make_user, make_bus):
+    user, bus = make_user(), make_bus()
+    confirmed = _reserve(db, user, bus, "1A")
+    cancelled = _reserve(db, user, bus, "1B", ReservationStatus.CANCELLED)
+    fresh = _reserve(db, user, bus, "1C")
+    old = datetime.utcnow() - timedelta(hours=1)
+    logs = [
+        NotificationLog(reservation_id=confirmed, user_id=user.id, kind="confirmation",
+                        status=NotificationStatus.QUEUED, created_at=old),
+        NotificationLog(reservation_id=cancelled, user_id=user.id, kind="confirmation",
+                        status=NotificationStatus.QUEUED, created_at=old),
+        NotificationLog(reservation_id=fresh, user_id=user.id, kind="confirmation",
+                        status=NotificationStatus.QUEUED),
+    ]
+    db.add_all(logs)
+    db.commit()
+    stale_id, dropped_id, fresh_id = (log.id for log in logs)
+    service, queued = _service()
+
+    asyncio.run(service.recover())
+    asyncio.run(service.recover())
+
+    assert [message.log_ids for message in queued if set(message.log_ids) & {stale_id, dropped_id, fresh_id}] \
+        == [[stale_id]]
+    db.expire_all()
+    assert db.get(NotificationLog, stale_id).status == NotificationStatus.QUEUED
+    assert db.get(NotificationLog, dropped_id).status == NotificationStatus.FAILED
+    assert db.get(NotificationLog, fresh_id).status == NotificationStatus.QUEUED
+
+
+def test_reminders_are_requeued_when_sending_fails(monkeypatch):
+    monkeypatch.setattr(reminders, "RETRY_SECONDS", 0.05)
+    calls = []
+
+    async def fire(reservation_ids):
+        calls.append(reservation_ids)
+        if len(calls) == 1:
+            raise RuntimeError("database is down")
+
+    async def scenario():
+        scheduler = ReminderScheduler(fire)
+        scheduler._loaded_until = date.today() + timedelta(days=1)
+        scheduler._heap = [(datetime.now() - timedelta(seconds=1), 7)]
+        await scheduler.start()
+        for _ in range(100):
+            if len(calls) >= 2:
+                break
+            await asyncio.sleep(0.02)
+        await scheduler.stop()
+        return scheduler
+
+    scheduler = asyncio.run(scenario())
+
+    assert calls == [[7], [7]]
+    assert len(scheduler) == 0
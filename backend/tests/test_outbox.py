@@ -0,0 +1,125 @@
+import asyncio
+import json
+from datetime import date, datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.config import settings
+from app.core.outbox import OutboxDispatcher, _event_rows
+from app.models.outbox import OutboxEvent, OutboxStatus
+from app.models.reservation import Reservation, ReservationStatus
+
+
+@pytest.fixture
+def dispatcher(tmp_path):
+    # 앱이 돌리는 디스패처가 가져가지 않도록 별도 DB 에 이벤트를 둔다
+    engine = create_engine(f"sqlite:///{tmp_path}/outbox.db")
+    OutboxEvent.__table__.create(engine)
+    yield OutboxDispatcher(sessionmaker(bind=engine))
+    engine.dispose()
+
+
+def _add(dispatcher, count, now=None, **values):
+    now = now or datetime.utcnow() - timedelta(seconds=1)
+    rows = _event_rows("reservation.created", [{"reservation_id": n} for n in range(count)], now)
+    for row in rows:
+        row.update(values)
+    with dispatcher.session_factory() as db:
+        db.add_all(OutboxEvent(**row) for row in rows)
+        db.commit()
+
+
+def _events(dispatcher):
+    with dispatcher.session_factory() as db:
+        return db.query(OutboxEvent).order_by(OutboxEvent.id).all()
+
+
+class Recorder:
+    name = "recorder"
+
+    def __init__(self, fail=False):
+        self.fail = fail
+        self.batches = []
+
+    async def handle(self, events):
+        self.batches.append(events)
+        if self.fail:
+            raise RuntimeError("consumer down")
+
+
+def test_claimed_batch_is_leased_until_it_expires(dispatcher):
+    _add(dispatcher, 3)
+    now = datetime.utcnow()
+
+    first = dispatcher._claim(now)
+    assert len(first) == 3
+    # 임대 중에는 다른 디스패처가 가져가지 못한다
+    assert dispatcher._claim(now) == []
+    again = dispatcher._claim(now + timedelta(seconds=settings.OUTBOX_LEASE_SECONDS + 1))
+    assert [row.id for row in again] == [row.id for row in first]
+
+
+def test_dispatch_delivers_to_every_consumer(dispatcher):
+    _add(dispatcher, 2)
+    first, second = dispatcher.register(Recorder()), dispatcher.register(Recorder())
+
+    assert asyncio.run(dispatcher.dispatch_once()) == 2
+
+    assert [event["data"]["reservation_id"] for event in first.batches[0]] == [0, 1]
+    assert first.batches == second.batches
+    assert {(event.status, event.claim_token) for event in _events(dispatcher)} == {(OutboxStatus.DELIVERED, None)}
+    assert asyncio.run(dispatcher.dispatch_once()) == 0
+
+
+def test_failed_batch_backs_off_and_finally_fails(dispatcher, monkeypatch):
+    monkeypatch.setattr(settings, "OUTBOX_MAX_ATTEMPTS", 2)
+    _add(dispatcher, 1)
+    consumer = dispatcher.register(Recorder(fail=True))
+
+    started = datetime.utcnow()
+    asyncio.run(dispatcher.dispatch_once())
+    event, = _events(dispatcher)
+    assert event.status == OutboxStatus.PENDING and event.attempts == 1
+    assert event.claim_token is None and "consumer down" in event.last_error
+    backoff = (event.next_attempt_at - started).total_seconds()
+    assert 0.8 * settings.OUTBOX_BACKOFF_SECONDS - 0.1 <= backoff <= 1.2 * settings.OUTBOX_BACKOFF_SECONDS + 0.1
+    # 백오프가 끝나기 전에는 다시 보내지 않는다
+    assert asyncio.run(dispatcher.dispatch_once()) == 0
+
+    with dispatcher.session_factory() as db:
+        db.query(OutboxEvent).update({"next_attempt_at": datetime.utcnow() - timedelta(seconds=1)})
+        db.commit()
+    asyncio.run(dispatcher.dispatch_once())
+    event, = _events(dispatcher)
+    assert (event.status, event.attempts) == (OutboxStatus.FAILED, 2)
+    assert len(consumer.batches) == 2
+
+
+def test_retried_events_are_batched_by_attempt_count(dispatcher):
+    _add(dispatcher, 2)
+    _add(dispatcher, 1, attempts=3)
+    consumer = dispatcher.register(Recorder())
+
+    assert asyncio.run(dispatcher.dispatch_once()) == 3
+    assert sorted(len(batch) for batch in consumer.batches) == [1, 2]
+
+
+def test_reservation_changes_write_events_in_the_same_transaction(db, make_user, make_bus):
+    reservation = Reservation(user_id=make_user().id, bus_id=make_bus().id, seat_number="1A",
+                              reservation_date=date.today() + timedelta(days=1), status=ReservationStatus.CONFIRMED)
+    db.add(reservation)
+    db.commit()
+    reservation.status = ReservationStatus.CANCELLED
+    db.commit()
+
+    events = db.query(OutboxEvent).filter(OutboxEvent.aggregate_id == reservation.id).order_by(OutboxEvent.id).all()
+    assert [event.event_type for event in events] == ["reservation.created", "reservation.cancelled"]
+    assert json.loads(events[1].payload)["status"] == "cancelled"
+
+    # 롤백하면 이벤트도 남지 않는다
+    reservation.status = ReservationStatus.CONFIRMED
+    db.flush()
+    db.rollback()
+    assert db.query(OutboxEvent).filter(OutboxEvent.aggregate_id == reservation.id).count() == 2
@@ -0,0 +1,149 @@
+import asyncio
+import json
+import re
+
+from starlette.responses import PlainTextResponse
+
+from app.core import ratelimit
+from app.core.ratelimit import (
+    AUTH, BOOKING, BOOKING_IP, LOGIN_ACCOUNT, READ, RateLimitMiddleware, RateLimitPolicy, TokenBucketStore,
+    NO_REFILL_RETRY_SECONDS, batch_size, login_username,
+)
+from app.core.security import create_access_token
+
+
+def test_bucket_refills_over_time():
+    policy = RateLimitPolicy("test", per_minute=60, burst=2)
+    store = TokenBucketStore()
+
+    assert store.take(policy, "a", now=0.0) == 0
+    assert store.take(policy, "a", now=0.0) == 0
+    assert store.take(policy, "a", now=0.0) == 1.0
+    assert store.take(policy, "a", now=1.0) == 0
+
+
+def test_login_username_from_form_bodies():
+    assert login_username("application/x-www-form-urlencoded", b"username=Alice&password=x") == "alice"
+    assert login_username("application/x-www-form-urlencoded", b"username=%EA%B9%80&password=x") == "김"
+    multipart = (b'--b\r\nContent-Disposition: form-data; name="username"\r\n\r\nbob\r\n'
+                 b'--b\r\nContent-Disposition: form-data; name="password"\r\n\r\nx\r\n--b--\r\n')
+    assert login_username("multipart/form-data; boundary=b", multipart) == "bob"
+    assert login_username("application/x-www-form-urlencoded", b"password=x") is None
+
+
+def _call(middleware, path, headers=(), body=b"", client="10.0.0.1"):
+    scope = {"type": "http", "method": "POST", "path": path, "client": (client, 1234),
+             "headers": [(name.encode(), value.encode()) for name, value in headers]}
+    received, statuses = [], []
+
+    async def receive():
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            statuses.append(message["status"])
+
+    async def app(scope, receive, send):
+        received.append((await receive())["body"])
+        await PlainTextResponse("ok")(scope, receive, send)
+
+    middleware.app = app
+    asyncio.run(middleware(scope, receive, send))
+    return statuses[0], received
+
+
+def test_login_is_limited_per_account_across_ips():
+    middleware = RateLimitMiddleware(None, store=TokenBucketStore(), trust_forwarded=False)
+    form = [("content-type", "application/x-www-form-urlencoded")]
+
+    for attempt in range(LOGIN_ACCOUNT.burst):
+        status, received = _call(middleware, "/api/auth/login", form, b"username=victim&password=x",
+                                 client=f"10.0.1.{attempt}")
+        assert status == 200
+        # 미들웨어가 읽은 본문을 앱이 그대로 받는다
+        assert received == [b"username=victim&password=x"]
+    status, _ = _call(middleware, "/api/auth/login", form, b"username=victim&password=x", client="10.0.2.1")
+    assert status == 429
+    status, _ = _call(middleware, "/api/auth/login", form, b"username=other&password=x", client="10.0.2.1")
+    assert status == 200
+
+
+def test_login_is_still_limited_per_ip():
+    middleware = RateLimitMiddleware(None, store=TokenBucketStore(), trust_forwarded=False)
+    form = [("content-type", "application/x-www-form-urlencoded")]
+
+    for attempt in range(AUTH.burst):
+        assert _call(middleware, "/api/auth/login", form, f"username=u{attempt}".encode())[0] == 200
+    assert _call(middleware, "/api/auth/login", form, b"username=fresh")[0] == 429
+
+
+def test_authenticated_booking_checks_user_and_ip_buckets(client):
+    # 토큰 폐기 목록이 읽혀 있어야 토큰의 사용자를 주체로 쓴다 (읽기 전에는 모든 토큰을 폐기된 것으로 본다)
+    store = TokenBucketStore()
+    middleware = RateLimitMiddleware(None, store=store, trust_forwarded=False)
+
+    # 같은 IP에서 계정을 바꿔 가며 보내도 IP 버킷이 소진된다
+    for attempt in range(BOOKING_IP.burst):
+        token = create_access_token({"sub": f"script{attempt}"})
+        assert _call(middleware, "/api/reservations/", [("authorization", f"Bearer {token}")])[0] == 200
+    token = create_access_token({"sub": "script-next"})
+    assert _call(middleware, "/api/reservations/", [("authorization", f"Bearer {token}")])[0] == 429
+
+    # 다른 IP에서도 한 사용자는 사용자 버킷으로 제한된다
+    token = create_access_token({"sub": "single"})
+    for attempt in range(BOOKING.burst):
+        assert _call(middleware, "/api/reservations/", [("authorization", f"Bearer {token}")],
+                     client=f"10.1.0.{attempt}")[0] == 200
+    assert _call(middleware, "/api/reservations/", [("authorization", f"Bearer {token}")], client="10.1.1.1")[0] == 429
+
+
+def test_batch_takes_one_read_token_per_sub_request():
+    store = TokenBucketStore()
+    middleware = RateLimitMiddleware(None, store=store, trust_forwarded=False)
+    token = create_access_token({"sub": "batcher"})
+    headers = [("authorization", f"Bearer {token}"), ("content-type", "application/json")]
+    body = json.dumps({"requests": [{"method": "GET", "path": "/api/buses/"}] * 20}).encode()
+
+    for _ in range(READ.burst // 20):
+        status, received = _call(middleware, "/api/batch/", headers, body)
+        assert status == 200
+        assert received == [body]
+    assert _call(middleware, "/api/batch/", headers, body)[0] == 429
+
+
+def test_bucket_cost_is_capped_at_burst():
+    policy = RateLimitPolicy("test", per_minute=60, burst=2)
+    store = TokenBucketStore()
+
+    assert store.take(policy, "a", now=0.0, cost=5) == 0
+    assert store.take(policy, "a", now=0.0, cost=5) == 2.0
+    assert batch_size(b"not json") == batch_size(b'{"requests": []}') == 1
+
+
+
+
+def test_zero_rate_policy_answers_with_a_finite_retry_after(monkeypatch):
+    policy = RateLimitPolicy("closed", per_minute=0, burst=1)
+    store = TokenBucketStore()
+    assert store.take(policy, "a") == 0
+    assert store.take(policy, "a") == NO_REFILL_RETRY_SECONDS
+
+    # 미들웨어가 Retry-After 를 만들다 OverflowError 로 500 을 내지 않는다
+    monkeypatch.setattr(ratelimit, "ROUTE_GROUPS", [("POST", re.compile(r"^/api/closed$"), policy)])
+    middleware = RateLimitMiddleware(None, store=store, trust_forwarded=False)
+    scope = {"type": "http", "method": "POST", "path": "/api/closed", "client": ("10.0.0.1", 1234), "headers": []}
+    started = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            started.append(message)
+
+    middleware.app = PlainTextResponse("ok")
+    asyncio.run(middleware(scope, receive, send))
+    asyncio.run(middleware(scope, receive, send))
+
+    assert [message["status"] for message in started] == [200, 429]
+    assert (b"retry-after", b"60") in started[1]["headers"]
@@ -0,0 +1,61 @@
+import threading
+
+from app.core import database
+from app.core.database import ReadRouter
+from conftest import auth_headers
+
+
+def test_read_router_drops_expired_and_excess_keys(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(database.time, "monotonic", lambda: now[0])
+    router = ReadRouter(sticky_seconds=5, retry_seconds=1, max_keys=2)
+
+    router.mark_write("a")
+    router.mark_write("b")
+    router.mark_write("c")
+    assert list(router._last_write) == ["b", "c"]
+    assert router.is_sticky("c") and not router.is_sticky("a")
+
+    now[0] += 6
+    router.mark_write("b")
+    assert list(router._last_write) == ["b"]
+
+
+def test_read_router_mark_write_is_thread_safe():
+    router = ReadRouter(sticky_seconds=60, retry_seconds=1, max_keys=50)
+    errors = []
+
+    def writer(prefix):
+        try:
+            for n in range(2000):
+                router.mark_write(f"{prefix}:{n}")
+        except Exception as exc:
+            errors.append(exc)
+
+    threads = [threading.Thread(target=writer, args=(i,)) for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert len(router._last_write) <= 50
+
+
+def test_read_endpoints_resolve_the_user_on_the_read_session(client, make_user, monkeypatch):
+    rider = make_user()
+    opened = []
+    session_factory = database.SessionLocal
+
+    def counting():
+        session = session_factory()
+        opened.append(session)
+        return session
+
+    monkeypatch.setattr(database, "SessionLocal", counting)
+
+    response = client.get("/api/reservations/user", headers=auth_headers(rider))
+
+    assert response.status_code == 200
+    # replica 가 없으면 읽기 세션도 primary 이지만, 요청당 세션은 하나뿐이다
+    assert len(opened) == 1
@@ -0,0 +1,105 @@
+from types import SimpleNamespace
+
+import pytest
+
+from app.core.config import settings
+from app.models.bus import BusRoute
+from app.route_search import RouteSearchIndex
+from app.utils.hangul import decompose, initials, is_initials, normalize, words
+
+
+def test_decompose_splits_compound_vowels_and_finals():
+    assert decompose("판교") == "ㅍㅏㄴㄱㅛ"
+    assert decompose("광") == "ㄱㅗㅏㅇ"
+    assert decompose("닭") == "ㄷㅏㄹㄱ"
+    # 입력 중인 글자도 완성된 글자의 접두어가 된다
+    assert decompose("판ㄱ") == decompose("판교")[:4]
+    assert decompose("다ㄺ") == decompose("닭")
+    assert decompose("고ㅏ") == decompose("과")[:3]
+    assert decompose("A1") == "A1"
+
+
+def test_words_initials_and_normalize():
+    assert words("강남역 (2호선) Gate-B") == ["강남역", "2호선", "gate", "b"]
+    assert normalize("강남 역") == "강남역"
+    assert initials("강남역") == "ㄱㄴㅇ"
+    assert is_initials("ㅍㄱ") and not is_initials("판ㄱ") and not is_initials("")
+
+
+def _index(*routes):
+    index = RouteSearchIndex(session_factory=None)
+    index._loaded = True
+    for route_id, (name, departure, destination) in enumerate(routes, start=1):
+        index.upsert(SimpleNamespace(id=route_id, name=name, departure_location=departure,
+                                     destination=destination, is_active=True))
+    return index
+
+
+@pytest.fixture
+def index():
+    return _index(
+        ("판교 출근", "수원역", "판교역"),
+        ("강남 퇴근", "강남역", "수원역"),
+        ("광교 순환", "광교중앙역", "광교호수공원"),
+    )
+
+
+def test_prefix_and_partial_syllable_matches(index):
+    routes, stops = index.search("판ㄱ")
+    assert [route["id"] for route in routes] == [1]
+    assert routes[0]["matched_field"] == "destination" and routes[0]["match"] == "prefix"
+    assert stops == ["판교역"]
+
+    routes, _ = index.search("수원역")
+    assert [(route["id"], route["match"]) for route in routes] == [(2, "exact"), (1, "exact")]
+
+
+def test_infix_and_initials_matches(index):
+    routes, _ = index.search("중앙")
+    assert [(route["id"], route["match"]) for route in routes] == [(3, "infix")]
+
+    routes, stops = index.search("ㄱㄴ")
+    assert [(route["id"], route["match"]) for route in routes] == [(2, "initials")]
+    assert stops == ["강남역"]
+
+
+def test_typos_fall_back_to_trigram_matches(index):
+    routes, _ = index.search("광교호스공원")
+    assert [(route["id"], route["match"]) for route in routes] == [(3, "fuzzy")]
+    assert index.search("쟈갸") == ([], [])
+
+
+def test_upsert_replaces_and_removes_routes(index):
+    index.upsert(SimpleNamespace(id=1, name="판교 출근", departure_location="수원역", destination="분당역",
+                                 is_active=True))
+    # 옛 종점은 노선 이름에 오타 허용으로만 걸린다
+    assert [(route["id"], route["matched_field"], route["match"]) for route in index.search("판교역")[0]] \
+        == [(1, "name", "fuzzy")]
+    assert [route["id"] for route in index.search("분당")[0]] == [1]
+
+    index.upsert(SimpleNamespace(id=1, name="", departure_location="", destination="", is_active=False))
+    assert index.search("분당") == ([], [])
+    assert len(index) == 2
+
+
+def test_sync_picks_up_route_changes_from_other_processes(client, db, monkeypatch):
+    # client: 앱을 import 해야 변경 기록 리스너가 붙는다
+    monkeypatch.setattr(settings, "SYNC_SETTLE_SECONDS", 0)
+    route = BusRoute(name="동기화 노선", departure_location="출발정류장", destination="옛날종점")
+    db.add(route)
+    db.commit()
+    index = RouteSearchIndex()
+    index.reload()
+    assert route.id in [item["id"] for item in index.search("옛날종점")[0]]
+
+    # 다른 프로세스가 바꿨다 (이 색인의 upsert 를 거치지 않음)
+    route.destination = "새종점"
+    db.commit()
+    assert index.sync() == 1
+    assert route.id not in [item["id"] for item in index.search("옛날종점")[0]]
+    assert route.id in [item["id"] for item in index.search("새종점")[0]]
+
+    route.is_active = False
+    db.commit()
+    index.sync()
+    assert route.id not in [item["id"] for item in index.search("새종점")[0]]
@@ -0,0 +1,153 @@
+from datetime import date, datetime, time, timedelta
+from types import SimpleNamespace
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.reservation import Reservation, ReservationStatus
+from app.models.user import UserRole
+from app.models.schedule import BusService, ServiceCalendar, ServiceDay, ServiceException, Trip, TripStatus
+from app.notifications.reminders import ReminderScheduler, remind_at
+from app.schedule import runs_on, trip_schedule
+from conftest import auth_headers
+
+
+def _calendar(**days):
+    values = {day: True for day in ("monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday")}
+    values.update(days)
+    return SimpleNamespace(start_date=None, end_date=None, **values)
+
+
+def test_runs_on_weekdays_range_and_exceptions():
+    monday = date(2026, 10, 19)
+    weekdays = _calendar(saturday=False, sunday=False)
+
+    assert runs_on(weekdays, monday)
+    assert not runs_on(weekdays, monday + timedelta(days=5))
+    # 예외가 요일 패턴보다 우선한다
+    assert runs_on(weekdays, monday + timedelta(days=5), True)
+    assert not runs_on(weekdays, monday, False)
+
+    weekdays.start_date = monday + timedelta(days=1)
+    assert not runs_on(weekdays, monday)
+
+
+def test_calendar_and_exception_decide_materialized_trips(db, make_bus):
+    bus = make_bus()
+    tomorrow = date.today() + timedelta(days=1)
+    calendar = ServiceCalendar(name="휴무", **{day: False for day in (
+        "monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday")})
+    db.add(calendar)
+    db.flush()
+    db.add(BusService(bus_id=bus.id, calendar_id=calendar.id))
+    db.commit()
+    trip_schedule.invalidate()
+
+    assert trip_schedule.trip(bus.id, tomorrow) is None
+
+    db.add(ServiceException(calendar_id=calendar.id, service_date=tomorrow, runs=True))
+    db.commit()
+    trip_schedule.invalidate()
+
+    trip = trip_schedule.trip(bus.id, tomorrow)
+    assert trip is not None
+    assert trip.departure_time == bus.departure_time
+
+
+def test_invalidate_keeps_overrides(db, make_bus):
+    bus = make_bus()
+    tomorrow = date.today() + timedelta(days=1)
+    trip_schedule.override(db, bus, tomorrow, departure_time=time(10, 30))
+    db.commit()
+    trip_schedule.forget(tomorrow)
+
+    trip_schedule.invalidate()
+
+    assert trip_schedule.trip(bus.id, tomorrow).departure_time == time(10, 30)
+
+
+def test_scheduled_trip_sees_cancellation_from_other_worker(client, db, make_user, make_bus):
+    bus = make_bus()
+    rider = make_user()
+    tomorrow = date.today() + timedelta(days=1)
+    assert trip_schedule.trip(bus.id, tomorrow) is not None
+
+    # 다른 워커가 취소했다: DB 만 바뀌고 이 워커의 캐시는 그대로다
+    trip_schedule.override(db, bus, tomorrow, status=TripStatus.CANCELLED)
+    db.commit()
+
+    assert trip_schedule.trip(bus.id, tomorrow) is not None
+    assert trip_schedule.scheduled_trip(db, bus.id, tomorrow) is None
+
+    response = client.post("/api/reservations/", headers=auth_headers(rider),
+                           json={"bus_id": bus.id, "seat_numbers": ["1A"], "reservation_date": tomorrow.isoformat()})
+    assert response.status_code == 409
+    trip_schedule.forget(tomorrow)
+
+
+def test_scheduled_trip_rematerializes_after_other_worker_invalidates(db, make_bus):
+    bus = make_bus()
+    tomorrow = date.today() + timedelta(days=1)
+    assert trip_schedule.trip(bus.id, tomorrow) is not None
+
+    # 다른 워커의 invalidate: 계산된 운행과 ServiceDay 가 지워졌지만 이 워커의 캐시는 남아 있다
+    db.query(Trip).filter(Trip.service_date == tomorrow, Trip.is_override == False).delete()
+    db.query(ServiceDay).filter(ServiceDay.service_date == tomorrow).delete()
+    db.commit()
+
+    trip = trip_schedule.scheduled_trip(db, bus.id, tomorrow)
+    assert trip is not None and trip.bus_id == bus.id
+
+
+def test_reminders_follow_trip_departure(db, make_user, make_bus):
+    bus = make_bus(departure_time=time(8, 0))
+    rider = make_user()
+    tomorrow = date.today() + timedelta(days=1)
+    trip_schedule.override(db, bus, tomorrow, departure_time=time(11, 0))
+    db.add(Reservation(user_id=rider.id, bus_id=bus.id, seat_number="1A", reservation_date=tomorrow,
+                       status=ReservationStatus.CONFIRMED))
+    db.commit()
+    trip_schedule.forget(tomorrow)
+    reservation_id = db.query(Reservation.id).filter(Reservation.bus_id == bus.id).scalar()
+
+    entries = {rid: at for at, rid in ReminderScheduler(None, SessionLocal)._load_day(tomorrow)}
+
+    assert entries[reservation_id] == remind_at(tomorrow, time(11, 0))
+    assert entries[reservation_id] > datetime.combine(tomorrow, time(8, 0))
+
+
+def test_reservation_lists_manifest_and_sync_report_trip_times(client, db, make_user, make_bus, monkeypatch):
+    monkeypatch.setattr(settings, "SYNC_SETTLE_SECONDS", 0)
+    driver = make_user(UserRole.DRIVER)
+    rider = make_user()
+    moved = make_bus(departure_time=time(8, 0), driver=driver)
+    cancelled = make_bus(departure_time=time(9, 0), driver=driver)
+    tomorrow = date.today() + timedelta(days=1)
+    cursor = client.get("/api/sync/", headers=auth_headers(rider)).json()["cursor"]
+    db.add(Reservation(user_id=rider.id, bus_id=moved.id, seat_number="1A", reservation_date=tomorrow,
+                       status=ReservationStatus.CONFIRMED))
+    db.commit()
+    trip_schedule.override(db, moved, tomorrow, departure_time=time(11, 0), arrival_time=time(12, 0))
+    trip_schedule.override(db, cancelled, tomorrow, status=TripStatus.CANCELLED)
+    db.commit()
+    trip_schedule.forget(tomorrow)
+
+    reservations = client.get("/api/reservations/user", headers=auth_headers(rider)).json()
+    assert [item["departure_time"] for item in reservations if item["bus_id"] == moved.id] == ["11:00"]
+
+    manifest = client.get("/api/buses/driver/manifest", headers=auth_headers(driver),
+                          params={"reservation_date": tomorrow.isoformat()}).json()
+    # 취소된 운행은 명단에 없다
+    assert [(bus["bus_id"], bus["departure_time"], bus["arrival_time"]) for bus in manifest["buses"]] \
+        == [(moved.id, "11:00", "12:00")]
+    assert len(manifest["buses"][0]["passengers"]) == 1
+
+    my_bus = client.get("/api/buses/driver/my-buses", headers=auth_headers(driver),
+                        params={"reservation_date": tomorrow.isoformat()}).json()
+    assert {bus["id"]: (bus["departure_time"], bus["runs"]) for bus in my_bus} \
+        == {moved.id: ("11:00:00", True), cancelled.id: ("09:00:00", False)}
+    assert client.get(f"/api/buses/{moved.id}", params={"reservation_date": tomorrow.isoformat()}) \
+        .json()["departure_time"] == "11:00:00"
+
+    # 시각 변경은 그날 예약의 변경으로 기록되어 동기화가 다시 읽는다
+    changes = client.get("/api/sync/", headers=auth_headers(rider), params={"since": cursor}).json()
+    assert [(item["bus_id"], item["departure_time"]) for item in changes["reservations"]] == [(moved.id, "11:00")]
@@ -0,0 +1,137 @@
+from datetime import date, timedelta
+
+from app.models.reservation import Reservation, ReservationSegment, ReservationStatus
+from app.models.user import UserRole
+from app.utils.bus_seats import generate_seat_numbers
+from app.utils.segments import SegmentInventory, build_inventory
+from conftest import auth_headers
+
+SEATS = ["1A", "1B", "2A", "2B"]
+
+
+def test_overlapping_segments_conflict():
+    inventory = SegmentInventory(SEATS, 3)
+    inventory.occupy("1A", 0, 2)
+
+    assert not inventory.is_free("1A", 1, 3)
+    assert inventory.is_free("1A", 2, 3)
+    assert inventory.free_seats(0, 1) == ["1B", "2A", "2B"]
+    assert inventory.free_counts() == [3, 3, 4]
+
+
+def test_unknown_seat_is_appended():
+    inventory = SegmentInventory(SEATS, 2)
+    inventory.occupy("9D", 0, 1)
+
+    assert "9D" in inventory.seat_numbers
+    assert inventory.is_free("9D", 1, 2)
+    assert not inventory.is_free("9D", 0, 2)
+
+
+def test_full_route_rows_occupy_every_segment():
+    # 구간 행이 없는 전 구간 예약은 (seat, None, None) 으로 온다
+    inventory = build_inventory(SEATS, 4, [("1A", None, None), ("1B", 1, 2)])
+
+    assert inventory.free_counts() == [3, 2, 3]
+    for board_stop, alight_stop in [(0, 1), (1, 2), (2, 3), (0, 3)]:
+        assert not inventory.is_free("1A", board_stop, alight_stop)
+    assert inventory.is_free("1B", 0, 1)
+    assert inventory.is_free("1B", 2, 3)
+
+
+def test_full_route_and_segment_bookings_on_same_trip(client, make_user, make_bus):
+    admin = make_user(UserRole.ADMIN)
+    rider, other = make_user(), make_user()
+    bus = make_bus()
+    travel_date = (date.today() + timedelta(days=1)).isoformat()
+
+    # 정류장을 나누기 전에 받은 전 구간 예약
+    response = client.post("/api/reservations/", headers=auth_headers(rider),
+                           json={"bus_id": bus.id, "seat_numbers": ["1A"], "reservation_date": travel_date})
+    assert response.status_code == 200
+
+    response = client.put(f"/api/buses/routes/{bus.route_id}/stops", headers=auth_headers(admin),
+                          json={"stops": [{"name": "A"}, {"name": "B"}, {"name": "C"}]})
+    assert response.status_code == 200
+
+    response = client.get(f"/api/buses/{bus.id}/segments", params={"reservation_date": travel_date})
+    assert response.status_code == 200
+    assert [segment["available_seats"] for segment in response.json()["segments"]] == [27, 27]
+
+    def book(user, seat, board_stop, alight_stop):
+        return client.post("/api/reservations/", headers=auth_headers(user), json={
+            "bus_id": bus.id, "seat_numbers": [seat], "reservation_date": travel_date,
+            "board_stop": board_stop, "alight_stop": alight_stop,
+        })
+
+    assert book(other, "1A", 0, 1).status_code == 400
+    assert book(other, "2A", 0, 1).status_code == 200
+    assert book(rider, "2A", 1, 2).status_code == 200
+    assert book(rider, "2A", 0, 2).status_code == 400
+
+    response = client.get(f"/api/buses/{bus.id}/seats",
+                          params={"reservation_date": travel_date, "board_stop": 1, "alight_stop": 2})
+    assert response.status_code == 200
+    assert {"1A", "2A"} <= set(response.json()["reserved_seat_numbers"])
+
+
+def _split_route(client, admin, bus):
+    response = client.put(f"/api/buses/routes/{bus.route_id}/stops", headers=auth_headers(admin),
+                          json={"stops": [{"name": "A"}, {"name": "B"}, {"name": "C"}]})
+    assert response.status_code == 200
+
+
+def test_manifest_and_reservation_list_show_segments(client, make_user, make_bus):
+    admin, driver = make_user(UserRole.ADMIN), make_user(UserRole.DRIVER)
+    first, second = make_user(), make_user()
+    bus = make_bus(driver=driver)
+    travel_date = (date.today() + timedelta(days=1)).isoformat()
+    _split_route(client, admin, bus)
+
+    for user, board_stop, alight_stop in [(second, 1, 2), (first, 0, 1)]:
+        response = client.post("/api/reservations/", headers=auth_headers(user), json={
+            "bus_id": bus.id, "seat_numbers": ["1A"], "reservation_date": travel_date,
+            "board_stop": board_stop, "alight_stop": alight_stop,
+        })
+        assert response.status_code == 200
+
+    response = client.get("/api/buses/driver/manifest", headers=auth_headers(driver),
+                          params={"reservation_date": travel_date})
+    assert response.status_code == 200
+    body = response.json()
+    manifest = next(item for item in body["buses"] if item["bus_id"] == bus.id)
+    assert manifest["stops"] == ["A", "B", "C"]
+    passengers = [dict(zip(body["columns"], passenger)) for passenger in manifest["passengers"]]
+    assert [(p["seat_number"], p["full_name"], p["board_stop"], p["alight_stop"]) for p in passengers] == [
+        ("1A", first.full_name, 0, 1), ("1A", second.full_name, 1, 2),
+    ]
+
+    response = client.get("/api/reservations/", headers=auth_headers(first))
+    assert response.status_code == 200
+    assert [(item["seat_number"], item["board_stop"], item["alight_stop"])
+            for item in response.json()] == [("1A", 0, 1)]
+
+
+def test_waitlist_checks_free_seats_on_the_requested_segment(client, db, make_user, make_bus):
+    admin, rider = make_user(UserRole.ADMIN), make_user()
+    bus = make_bus()
+    travel_date = date.today() + timedelta(days=1)
+    _split_route(client, admin, bus)
+
+    # 모든 좌석이 A → B 구간만 찼다
+    for seat in generate_seat_numbers(bus.total_seats):
+        reservation = Reservation(user_id=admin.id, bus_id=bus.id, seat_number=seat,
+                                  reservation_date=travel_date, status=ReservationStatus.CONFIRMED)
+        db.add(reservation)
+        db.flush()
+        db.add(ReservationSegment(reservation_id=reservation.id, board_stop=0, alight_stop=1))
+    db.commit()
+
+    def join(board_stop=None, alight_stop=None):
+        return client.post("/api/waitlist/", headers=auth_headers(rider), json={
+            "bus_id": bus.id, "reservation_date": travel_date.isoformat(),
+            "board_stop": board_stop, "alight_stop": alight_stop,
+        })
+
+    assert join(1, 2).status_code == 400
+    assert join().status_code == 200
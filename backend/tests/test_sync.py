@@ -0,0 +1,101 @@
+from datetime import date, timedelta
+
+import pytest
+
+from app.core.config import settings
+from app.models.reservation import Reservation, ReservationStatus
+from app.models.user import UserRole
+from conftest import auth_headers
+
+TRAVEL_DATE = date.today() + timedelta(days=1)
+
+
+@pytest.fixture
+def settled(monkeypatch):
+    monkeypatch.setattr(settings, "SYNC_SETTLE_SECONDS", 0)
+
+
+def _sync(client, user, since=None, **params):
+    if since is not None:
+        params["since"] = since
+    response = client.get("/api/sync/", headers=auth_headers(user), params=params)
+    assert response.status_code == 200
+    return response.json()
+
+
+def _reserve(db, user, bus, seat="1A"):
+    reservation = Reservation(user_id=user.id, bus_id=bus.id, seat_number=seat, reservation_date=TRAVEL_DATE,
+                              status=ReservationStatus.CONFIRMED)
+    db.add(reservation)
+    db.commit()
+    return reservation
+
+
+def test_unknown_cursor_asks_for_a_full_resync(client, make_user, settled):
+    user = make_user()
+
+    first = _sync(client, user)
+    assert first["full_resync"] and not first["has_more"]
+    assert _sync(client, user, first["cursor"] + 1000)["full_resync"]
+    assert not _sync(client, user, first["cursor"])["full_resync"]
+
+
+def test_recent_changes_are_resent_until_they_settle(client, db, make_user, make_bus, settled, monkeypatch):
+    user = make_user()
+    cursor = _sync(client, user)["cursor"]
+    reservation = _reserve(db, user, make_bus())
+
+    monkeypatch.setattr(settings, "SYNC_SETTLE_SECONDS", 3600)
+    page = _sync(client, user, cursor)
+    # 아직 정착 전: 내용은 보내지만 커서는 그 앞에 머문다
+    assert [item["id"] for item in page["reservations"]] == [reservation.id]
+    assert page["cursor"] == cursor and not page["has_more"]
+
+    monkeypatch.setattr(settings, "SYNC_SETTLE_SECONDS", 0)
+    page = _sync(client, user, cursor)
+    assert page["cursor"] > cursor
+    assert _sync(client, user, page["cursor"])["reservations"] == []
+
+
+def test_pages_until_has_more_is_false(client, db, make_user, make_bus, settled):
+    user, bus = make_user(), make_bus()
+    cursor = _sync(client, user)["cursor"]
+    ids = [_reserve(db, user, bus, seat).id for seat in ("1A", "1B", "2A")]
+
+    seen = []
+    while True:
+        page = _sync(client, user, cursor, limit=2)
+        seen.extend(item["id"] for item in page["reservations"])
+        cursor = page["cursor"]
+        if not page["has_more"]:
+            break
+    assert seen == ids
+
+
+def test_cancelled_and_deactivated_rows_come_back_as_deleted(client, db, make_user, make_bus, settled):
+    user, bus = make_user(), make_bus()
+    reservation = _reserve(db, user, bus)
+    cursor = _sync(client, user)["cursor"]
+
+    reservation.status = ReservationStatus.CANCELLED
+    bus.is_active = False
+    bus.route.is_active = False
+    db.commit()
+    page = _sync(client, user, cursor)
+
+    assert page["deleted"] == {"reservations": [reservation.id], "buses": [bus.id], "routes": [bus.route_id]}
+    assert page["reservations"] == page["buses"] == page["routes"] == []
+
+
+def test_reservations_are_scoped_by_role(client, db, make_user, make_bus, settled):
+    driver, other_driver = make_user(UserRole.DRIVER), make_user(UserRole.DRIVER)
+    owner, stranger, admin = make_user(), make_user(), make_user(UserRole.ADMIN)
+    bus = make_bus(driver=driver)
+    cursor = _sync(client, owner)["cursor"]
+    reservation = _reserve(db, owner, bus)
+
+    def visible(user):
+        return reservation.id in [item["id"] for item in _sync(client, user, cursor)["reservations"]]
+
+    assert visible(owner) and visible(driver) and visible(admin)
+    assert not visible(stranger) and not visible(other_driver)
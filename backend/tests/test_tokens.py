@@ -0,0 +1,108 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.core.config import settings
+from app.core.revocation import BloomFilter, RevocationList, revocation_list
+from app.core.security import get_password_hash, new_jti
+
+
+def test_bloom_filter_has_no_false_negatives():
+    bloom = BloomFilter(1000, 0.01)
+    added = [new_jti() for _ in range(1000)]
+    for jti in added:
+        bloom.add(jti)
+
+    assert all(jti in bloom for jti in added)
+    false_positives = sum(new_jti() in bloom for _ in range(10000))
+    assert false_positives < 300
+
+
+def test_revocation_list_is_exact_and_shared_through_the_table(client, db):
+    jti, other = new_jti(), new_jti()
+    revocation_list.revoke(db, [(jti, datetime.utcnow() + timedelta(hours=1))])
+    db.commit()
+
+    assert revocation_list.is_revoked(jti)
+    assert not revocation_list.is_revoked(other)
+    assert not revocation_list.is_revoked(None)
+
+    # 다른 프로세스는 시작할 때 테이블에서 읽어 온다
+    worker = RevocationList()
+    worker.reload()
+    assert worker.is_revoked(jti)
+    later = new_jti()
+    revocation_list.revoke(db, [(later, datetime.utcnow() + timedelta(hours=1))])
+    db.commit()
+    assert not worker.is_revoked(later)
+    assert worker.sync() == 1
+    assert worker.is_revoked(later)
+
+
+def test_unloaded_list_fails_closed_without_querying(monkeypatch):
+    worker = RevocationList()
+    monkeypatch.setattr(worker, "reload", lambda: pytest.fail("is_revoked must not query the database"))
+
+    assert worker.is_revoked(new_jti())
+
+
+def test_reload_drops_expired_entries(db):
+    expired = new_jti()
+    revocation_list.revoke(db, [(expired, datetime.utcnow() - timedelta(seconds=1))])
+    db.commit()
+
+    worker = RevocationList()
+    worker.reload()
+
+    assert not worker.is_revoked(expired)
+
+
+def _login(client, db, make_user):
+    user = make_user()
+    user.hashed_password = get_password_hash("secret")
+    db.commit()
+    response = client.post("/api/auth/login", data={"username": user.username, "password": "secret"})
+    assert response.status_code == 200
+    return response.json()
+
+
+def test_login_issues_short_lived_access_tokens(client, db, make_user):
+    tokens = _login(client, db, make_user)
+
+    assert tokens["expires_in"] == settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60 == 15 * 60
+    assert tokens["refresh_token"]
+
+
+def test_refresh_rotates_and_logout_revokes(client, db, make_user):
+    tokens = _login(client, db, make_user)
+
+    response = client.post("/api/auth/refresh", json={"refresh_token": tokens["refresh_token"]})
+    assert response.status_code == 200
+    rotated = response.json()
+    assert rotated["refresh_token"] != tokens["refresh_token"]
+
+    # 리프레시 토큰은 access 토큰 자리에 쓸 수 없다
+    headers = {"Authorization": f"Bearer {rotated['refresh_token']}"}
+    assert client.get("/api/auth/me", headers=headers).status_code == 401
+
+    headers = {"Authorization": f"Bearer {rotated['access_token']}"}
+    assert client.get("/api/auth/me", headers=headers).status_code == 200
+    assert client.post("/api/auth/logout", headers=headers).status_code == 200
+    assert client.get("/api/auth/me", headers=headers).status_code == 401
+    assert client.post("/api/auth/refresh", json={"refresh_token": rotated["refresh_token"]}).status_code == 401
+
+
+def test_reused_refresh_token_revokes_the_whole_chain(client, db, make_user):
+    tokens = _login(client, db, make_user)
+    response = client.post("/api/auth/refresh", json={"refresh_token": tokens["refresh_token"]})
+    assert response.status_code == 200
+    rotated = response.json()
+
+    # 이미 쓴 리프레시 토큰이 다시 왔다
+    response = client.post("/api/auth/refresh", json={"refresh_token": tokens["refresh_token"]})
+    assert response.status_code == 401
+
+    assert client.post("/api/auth/refresh", json={"refresh_token": rotated["refresh_token"]}).status_code == 401
+    for access_token in (tokens["access_token"], rotated["access_token"]):
+        response = client.get("/api/auth/me", headers={"Authorization": f"Bearer {access_token}"})
+        assert response.status_code == 401
@@ -0,0 +1,135 @@
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+
+from app.api.tracking import _release
+from app.core.database import BATCH_SESSION_KEY, SessionLocal
+from app.models.location import BusLocation
+from app.models.user import UserRole
+from app.schemas.location import LocationPing
+from app.tracking import BusInfo, LocationTracker, RoutePath, haversine_m
+from conftest import auth_headers
+
+# 경도 0.01도 간격으로 동쪽으로 이어지는 세 정류장 (적도 근처라 약 1.1 km 씩)
+STOPS = [("A", 0.0, 0.0), ("B", 0.0, 0.01), ("C", 0.0, 0.02)]
+LEG_M = haversine_m(0.0, 0.0, 0.0, 0.01)
+
+
+def test_route_path_remaining_distance_and_next_stop():
+    path = RoutePath(STOPS)
+
+    remaining, next_stop = path.remaining(0.0, 0.005)
+    assert next_stop == "B"
+    assert remaining == pytest.approx(1.5 * LEG_M, rel=1e-3)
+
+    remaining, next_stop = path.remaining(0.0, 0.015)
+    assert next_stop == "C"
+    assert remaining == pytest.approx(0.5 * LEG_M, rel=1e-3)
+
+    # 경로에서 벗어난 만큼 더한다
+    remaining, _ = path.remaining(0.001, 0.015)
+    assert remaining == pytest.approx(0.5 * LEG_M + haversine_m(0.0, 0.0, 0.001, 0.0), rel=1e-2)
+
+
+def test_route_path_with_a_single_located_stop():
+    remaining, next_stop = RoutePath([("C", 0.0, 0.02)]).remaining(0.0, 0.01)
+
+    assert next_stop == "C"
+    assert remaining == pytest.approx(LEG_M, rel=1e-3)
+
+
+def _pings(start, points, seconds=10, **extra):
+    return [
+        LocationPing(latitude=lat, longitude=lon, recorded_at=start + timedelta(seconds=i * seconds), **extra)
+        for i, (lat, lon) in enumerate(points)
+    ]
+
+
+def test_eta_uses_recent_speed_and_skips_stale_pings():
+    tracker = LocationTracker()
+    info = BusInfo(driver_id=1, route_id=1, path=RoutePath(STOPS), destination="C")
+    start = datetime.utcnow() - timedelta(minutes=1)
+
+    # 10초마다 0.001도 (약 111 m) = 약 40 km/h
+    accepted, stale, invalid, snapshot = tracker.ingest(
+        1, 1, info, _pings(start, [(0.0, 0.000), (0.0, 0.001), (0.0, 0.002)]))
+    assert (accepted, stale, invalid) == (3, 0, 0)
+    speed = 2 * haversine_m(0.0, 0.0, 0.0, 0.001) / 20
+    assert snapshot["speed_kmh"] == pytest.approx(speed * 3.6, abs=0.1)
+    assert snapshot["next_stop"] == "B"
+    assert snapshot["eta_seconds"] == int((2 * LEG_M - 0.2 * LEG_M) / speed)
+
+    # 같은 배치를 다시 보내거나 이미 받은 시각 이전의 위치는 stale
+    accepted, stale, invalid, again = tracker.ingest(
+        1, 1, info, _pings(start, [(0.0, 0.000), (0.0, 0.001)]) + [
+            LocationPing(latitude=91, longitude=0, recorded_at=start),
+            LocationPing(latitude=0, longitude=0, recorded_at=datetime.utcnow() + timedelta(hours=1)),
+        ])
+    assert (accepted, stale, invalid) == (0, 2, 2)
+    assert again == snapshot
+    assert len(tracker._pending) == 3
+
+
+def test_eta_has_a_minimum_speed_when_stopped():
+    tracker = LocationTracker()
+    info = BusInfo(driver_id=1, route_id=1, path=RoutePath(STOPS), destination="C")
+    start = datetime.utcnow() - timedelta(minutes=1)
+
+    _, _, _, snapshot = tracker.ingest(1, 1, info, _pings(start, [(0.0, 0.01)] * 3))
+
+    assert snapshot["speed_kmh"] == 0
+    assert snapshot["eta_seconds"] == int(LEG_M / (10.0 / 3.6))
+
+
+def test_flush_requeues_rows_when_the_insert_fails(make_bus):
+    bus = make_bus()
+
+    class Broken:
+        def __enter__(self):
+            raise RuntimeError("database is down")
+
+        def __exit__(self, *exc):
+            return False
+
+    tracker = LocationTracker(session_factory=Broken)
+    start = datetime.utcnow() - timedelta(minutes=1)
+    tracker.ingest(bus.id, None, None, _pings(start, [(0.0, 0.0), (0.0, 0.001)]))
+    tracker.ingest(bus.id, None, None, _pings(start + timedelta(seconds=30), [(0.0, 0.002)]))
+
+    with pytest.raises(RuntimeError):
+        tracker.flush()
+    # 실패한 행이 앞에, 순서를 지켜 다시 들어간다
+    assert [row["longitude"] for row in tracker._pending] == [0.0, 0.001, 0.002]
+
+    tracker.session_factory = SessionLocal
+    assert tracker.flush() == 3
+    assert tracker._pending == []
+    with SessionLocal() as db:
+        assert db.query(BusLocation).filter(BusLocation.bus_id == bus.id).count() == 3
+
+
+def test_tracking_stream_is_not_allowed_in_a_batch(client, make_user, make_bus):
+    admin = make_user(UserRole.ADMIN)
+    bus = make_bus()
+
+    response = client.post("/api/batch/", headers=auth_headers(admin), json={"requests": [
+        {"method": "GET", "path": f"/api/tracking/buses/{bus.id}/stream"},
+    ]})
+
+    assert response.status_code == 400
+
+
+def test_release_keeps_the_shared_batch_session_open():
+    class Session:
+        closed = False
+
+        def close(self):
+            self.closed = True
+
+    shared, own = Session(), Session()
+    _release(SimpleNamespace(scope={BATCH_SESSION_KEY: shared}), shared)
+    _release(SimpleNamespace(scope={}), own)
+
+    assert not shared.closed
+    assert own.closed
@@ -0,0 +1,46 @@
+from datetime import date, time, timedelta
+
+from app.api.admin import _alternative_buses
+from app.models.user import UserRole
+from conftest import auth_headers
+
+TRIP_DATE = date.today() + timedelta(days=3)
+
+
+def test_alternatives_respect_window_on_same_route(db, make_bus):
+    bus = make_bus(departure_time=time(8, 0))
+    evening = make_bus(departure_time=time(18, 0), route=bus.route)
+    shortly_after = make_bus(departure_time=time(8, 20), route=bus.route)
+
+    alternatives = [row.id for row, _ in _alternative_buses(db, bus, TRIP_DATE, 60)]
+    assert alternatives == [shortly_after.id]
+    assert evening.id not in alternatives
+
+
+def test_closer_departure_wins_over_same_route(db, make_bus):
+    bus = make_bus(departure_time=time(8, 0))
+    same_route = make_bus(departure_time=time(8, 40), route=bus.route)
+    other_route = make_bus(departure_time=time(8, 10))
+    other_route.route.destination = bus.route.destination
+    tie = make_bus(departure_time=time(8, 10), route=bus.route)
+    db.commit()
+
+    alternatives = [row.id for row, _ in _alternative_buses(db, bus, TRIP_DATE, 60)]
+    # 출발 시각 차이가 같으면 같은 노선이 먼저
+    assert alternatives == [tie.id, other_route.id, same_route.id]
+
+
+def test_cancel_trip_does_not_move_passengers_outside_window(client, make_user, make_bus):
+    admin, rider = make_user(UserRole.ADMIN), make_user()
+    bus = make_bus(departure_time=time(8, 0))
+    make_bus(departure_time=time(18, 0), route=bus.route)
+    response = client.post("/api/reservations/", headers=auth_headers(rider), json={
+        "bus_id": bus.id, "seat_numbers": ["1A"], "reservation_date": TRIP_DATE.isoformat(),
+    })
+    assert response.status_code == 200
+
+    response = client.post(f"/api/admin/buses/{bus.id}/trips/{TRIP_DATE}/cancel", headers=auth_headers(admin),
+                           json={"window_minutes": 60})
+    assert response.status_code == 200
+    assert response.json()["cancelled"] == 1
+    assert response.json()["reaccommodated"] == 0
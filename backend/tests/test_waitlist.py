@@ -0,0 +1,33 @@
+from datetime import date, timedelta
+
+from app.api.waitlist import promote_waitlist
+from app.models.reservation import Reservation, ReservationStatus
+from app.models.waitlist import WaitlistEntry, WaitlistStatus
+
+
+def test_promotion_skips_waiters_who_already_booked_the_trip(db, make_user, make_bus):
+    bus = make_bus()
+    booked, waiting = make_user(), make_user()
+    travel_date = date.today() + timedelta(days=1)
+    cancelled = Reservation(user_id=make_user().id, bus_id=bus.id, seat_number="1A",
+                            reservation_date=travel_date, status=ReservationStatus.CANCELLED)
+    # 대기열에 들어간 뒤 다른 좌석을 직접 예약했다
+    db.add_all([
+        cancelled,
+        Reservation(user_id=booked.id, bus_id=bus.id, seat_number="2A", reservation_date=travel_date,
+                    status=ReservationStatus.CONFIRMED),
+        WaitlistEntry(user_id=booked.id, bus_id=bus.id, reservation_date=travel_date,
+                      status=WaitlistStatus.WAITING),
+        WaitlistEntry(user_id=waiting.id, bus_id=bus.id, reservation_date=travel_date,
+                      status=WaitlistStatus.WAITING),
+    ])
+    db.flush()
+
+    promotions = promote_waitlist(db, bus.id, travel_date, "1A")
+    db.commit()
+
+    assert [(item["user_id"], item["seat_number"]) for item in promotions] == [(waiting.id, "1A")]
+    statuses = dict(db.query(WaitlistEntry.user_id, WaitlistEntry.status)
+                    .filter(WaitlistEntry.bus_id == bus.id).all())
+    assert statuses == {booked.id: WaitlistStatus.CANCELLED, waiting.id: WaitlistStatus.PROMOTED}
+    assert db.query(Reservation).filter(Reservation.user_id == booked.id).count() == 1
@@ -25,6 +25,82 @@ interface AuthContextType {
 
 const AuthContext = createContext<AuthContextType | undefined>(undefined)
 
+const API_URL = process.env.NEXT_PUBLIC_API_URL || 'http://localhost:8000'
+// access 토큰은 짧게 발급되므로 만료 1분 전에 리프레시 토큰으로 미리 재발급
+const REFRESH_MARGIN_SECONDS = 60
+
+const tokenExpiry = (token: string | null): number | null => {
+  if (!token) return null
+  try {
+    const payload = JSON.parse(atob(token.split('.')[1] || '{}'))
+    return typeof payload.exp === 'number' ? payload.exp : null
+  } catch {
+    return null
+  }
+}
+
+const saveTokens = (accessToken: string, refreshToken?: string | null, expiresIn?: number | null) => {
+  localStorage.setItem('token', accessToken)
+  if (refreshToken) {
+    localStorage.setItem('refresh_token', refreshToken)
+  }
+  // 쿠키에도 토큰 저장 (미들웨어에서 사용)
+  const maxAge = expiresIn ?? 24 * 60 * 60
+  document.cookie = `token=${accessToken}; path=/; max-age=${maxAge}; samesite=strict`
+}
+
+const clearTokens = () => {
+  localStorage.removeItem('token')
+  localStorage.removeItem('refresh_token')
+  localStorage.removeItem('user')
+  document.cookie = 'token=; path=/; expires=Thu, 01 Jan 1970 00:00:01 GMT'
+}
+
+let pendingRefresh: Promise<string | null> | null = null
+
+/**
+ * 리프레시 토큰으로 access 토큰을 재발급한다. 실패하면 null.
+ * 리프레시 토큰은 한 번만 쓸 수 있으므로 동시에 불려도 요청은 하나만 보낸다.
+ */
+export function refreshAccessToken(): Promise<string | null> {
+  if (pendingRefresh) return pendingRefresh
+  pendingRefresh = (async () => {
+    const refreshToken = localStorage.getItem('refresh_token')
+    if (!refreshToken) return null
+    try {
+      const response = await fetch(`${API_URL}/api/auth/refresh`, {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({ refresh_token: refreshToken })
+      })
+      if (!response.ok) return null
+      const data = await response.json()
+      saveTokens(data.access_token, data.refresh_token, data.expires_in)
+      return data.access_token as string
+    } catch {
+      return null
+    } finally {
+      pendingRefresh = null
+    }
+  })()
+  return pendingRefresh
+}
+
+/**
+ * 인증 헤더를 붙여 요청하고, 401 이면 토큰을 한 번 재발급해 다시 보낸다.
+ */
+export async function authFetch(input: string, init: RequestInit = {}): Promise<Response> {
+  const send = (token: string | null) => {
+    const headers = new Headers(init.headers)
+    if (token) headers.set('Authorization', `Bearer ${token}`)
+    return fetch(input.startsWith('http') ? input : `${API_URL}${input}`, { ...init, headers })
+  }
+  const response = await send(localStorage.getItem('token'))
+  if (response.status !== 401) return response
+  const token = await refreshAccessToken()
+  return token ? send(token) : response
+}
+
 export function useAuth() {
   const context = useContext(AuthContext)
   if (context === undefined) {
@@ -53,6 +129,26 @@ export function AuthProvider({ children }: AuthProviderProps) {
     checkAuth()
   }, [])
 
+  // 로그인해 있는 동안 access 토큰이 만료되기 전에 재발급한다
+  useEffect(() => {
+    if (!user) return
+    let timer: ReturnType<typeof setTimeout>
+    const schedule = () => {
+      const exp = tokenExpiry(localStorage.getItem('token'))
+      if (exp === null) return
+      const delay = Math.max((exp - REFRESH_MARGIN_SECONDS) * 1000 - Date.now(), 0)
+      timer = setTimeout(async () => {
+        if (await refreshAccessToken()) {
+          schedule()
+        } else {
+          logout()
+        }
+      }, delay)
+    }
+    schedule()
+    return () => clearTimeout(timer)
+  }, [user])
+
   const checkAuth = async () => {
     try {
       const token = localStorage.getItem('token')
@@ -61,11 +157,11 @@ export function AuthProvider({ children }: AuthProviderProps) {
       if (token && userData) {
         // JWT 토큰 검증 (간단한 형태)
         try {
-          const payload = JSON.parse(atob(token.split('.')[1] || '{}'))
+          const exp = tokenExpiry(token)
           const now = Date.now() / 1000
 
-          // 토큰 만료 확인
-          if (payload.exp && payload.exp < now) {
+          // 토큰이 만료됐으면 리프레시 토큰으로 재발급
+          if (exp !== null && exp < now && !(await refreshAccessToken())) {
             throw new Error('Token expired')
           }
 
@@ -150,13 +246,10 @@ export function AuthProvider({ children }: AuthProviderProps) {
           password
         })
 
-        // 토큰과 사용자 정보 저장
-        localStorage.setItem('token', response.access_token)
+        // 토큰과 사용자 정보 저장 (리프레시 토큰으로 access 토큰을 재발급한다)
+        saveTokens(response.access_token, response.refresh_token, response.expires_in)
         localStorage.setItem('user', JSON.stringify(response.user))
 
-        // 쿠키에도 토큰 저장
-        document.cookie = `token=${response.access_token}; path=/; max-age=${24 * 60 * 60}; samesite=strict`
-
         setUser(response.user as User)
 
         // 역할에 따른 페이지로 리디렉션
@@ -175,9 +268,15 @@ export function AuthProvider({ children }: AuthProviderProps) {
   }
 
   const logout = () => {
-    localStorage.removeItem('token')
-    localStorage.removeItem('user')
-    document.cookie = 'token=; path=/; expires=Thu, 01 Jan 1970 00:00:01 GMT'
+    // 서버에서도 토큰과 리프레시 토큰 체인을 폐기한다 (실패해도 로컬 로그아웃은 진행)
+    const token = localStorage.getItem('token')
+    if (token) {
+      fetch(`${API_URL}/api/auth/logout`, {
+        method: 'POST',
+        headers: { Authorization: `Bearer ${token}` }
+      }).catch(() => {})
+    }
+    clearTokens()
     setUser(null)
     router.push('/login')
   }